@@ -6,8 +6,10 @@ from flask_cors import CORS
 
 from .config import get_config
 from .extensions import db, migrate
+from .profiling import init_sql_profiling
 from .routes import api_bp, health_bp
 from .scheduler import init_scheduler
+from .services.detail_cache import init_detail_cache
 
 
 def create_app(test_config: dict | None = None) -> Flask:
@@ -23,13 +25,26 @@ def create_app(test_config: dict | None = None) -> Flask:
     CORS(
         app,
         resources={r"/*": {"origins": app.config.get("CORS_ALLOW_ORIGINS", "*")}},
+        expose_headers=[
+            "X-Next-Cursor",
+            "Location",
+            "Server-Timing",
+            "X-Suggestions-Status",
+            "Age",
+            "ETag",
+            "Last-Modified",
+        ],
     )
 
     register_extensions(app)
     register_blueprints(app)
     register_error_handlers(app)
+    init_detail_cache(app)
 
-    if not app.testing:
+    if app.config.get("SQL_PROFILING_ENABLED"):
+        init_sql_profiling(app)
+
+    if not app.testing and app.config.get("SCHEDULER_ENABLED", True):
         init_scheduler(app)
 
     return app
@@ -1,5 +1,7 @@
 """Module d'intégration OpenAI pour l'assistant marketing."""
 
+from .cache import ResponseCache, get_response_cache
+from .client_pool import get_openai_client, get_pool_stats
 from .openai_client import OpenAIClient
 from .schemas import (
     ActionSchema,
@@ -11,6 +13,10 @@ from .schemas import (
 
 __all__ = [
     "OpenAIClient",
+    "ResponseCache",
+    "get_response_cache",
+    "get_openai_client",
+    "get_pool_stats",
     "ChatResponseSchema",
     "ActionSchema",
     "EntityToCreateSchema",
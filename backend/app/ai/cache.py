@@ -0,0 +1,289 @@
+"""Cache des réponses OpenAI (mémoire LRU + persistance SQL)."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any
+
+from flask import current_app
+from pydantic import BaseModel
+from sqlalchemy import delete, func, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from ..extensions import db
+from ..models import AIResponseCacheEntry
+
+logger = logging.getLogger(__name__)
+
+# Nombre d'écritures entre deux purges de la table persistante
+_PRUNE_EVERY = 50
+
+
+@lru_cache(maxsize=32)
+def _schema_fingerprint(schema: type[BaseModel]) -> str:
+    """Empreinte stable du schéma JSON attendu (invalide le cache si le schéma change)."""
+    raw = json.dumps(schema.model_json_schema(), sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def build_cache_key(
+    model: str,
+    messages: list[dict[str, str]],
+    response_format: type[BaseModel],
+) -> str:
+    """Calcule la clé de cache d'un appel (modèle + messages + schéma de réponse)."""
+    raw = json.dumps(
+        {
+            "model": model,
+            "messages": messages,
+            "schema": response_format.__name__,
+            "schema_fingerprint": _schema_fingerprint(response_format),
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Cache à deux niveaux des réponses validées d'OpenAI.
+
+    Le premier niveau est un LRU en mémoire (par processus), le second une
+    table SQL partagée entre workers. Les entrées expirent après un TTL et
+    chaque niveau est borné en nombre d'entrées.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: int = 86400,
+        max_entries: int = 256,
+        db_max_entries: int = 10000,
+        persistent: bool = True,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.db_max_entries = db_max_entries
+        self.persistent = persistent
+
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes_since_prune = 0
+        self._stats = {
+            "memory_hits": 0,
+            "persistent_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+        }
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any]) -> "ResponseCache":
+        return cls(
+            ttl_seconds=config.get("AI_CACHE_TTL_SECONDS", 86400),
+            max_entries=config.get("AI_CACHE_MAX_ENTRIES", 256),
+            db_max_entries=config.get("AI_CACHE_DB_MAX_ENTRIES", 10000),
+            persistent=config.get("AI_CACHE_PERSISTENT", True),
+        )
+
+    def get(self, key: str, response_format: type[BaseModel]) -> BaseModel | None:
+        """Retourne la réponse validée en cache, ou None si absente/expirée."""
+        payload = self._memory_get(key)
+        if payload is not None:
+            self._incr("memory_hits")
+            return response_format.model_validate_json(payload)
+
+        payload = self._persistent_get(key)
+        if payload is not None:
+            self._incr("persistent_hits")
+            self._memory_set(key, payload, time.time() + self.ttl_seconds)
+            return response_format.model_validate_json(payload)
+
+        self._incr("misses")
+        return None
+
+    def set(
+        self,
+        key: str,
+        value: BaseModel,
+        model: str,
+        ttl_seconds: int | None = None,
+    ) -> None:
+        """Enregistre une réponse validée dans les deux niveaux du cache."""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        if ttl <= 0:
+            return
+
+        payload = value.model_dump_json()
+        self._memory_set(key, payload, time.time() + ttl)
+        self._persistent_set(key, payload, model, type(value).__name__, ttl)
+        self._incr("stores")
+
+    def clear(self) -> None:
+        """Vide le niveau mémoire (le niveau persistant expire de lui-même)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """Compteurs de hits/misses et taille du niveau mémoire."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_size"] = len(self._entries)
+        lookups = stats["memory_hits"] + stats["persistent_hits"] + stats["misses"]
+        stats["hit_ratio"] = (
+            round((stats["memory_hits"] + stats["persistent_hits"]) / lookups, 4)
+            if lookups
+            else 0.0
+        )
+        return stats
+
+    def _incr(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._stats[name] += amount
+
+    def _memory_get(self, key: str) -> str | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, payload = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return payload
+
+    def _memory_set(self, key: str, payload: str, expires_at: float) -> None:
+        with self._lock:
+            self._entries[key] = (expires_at, payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def _persistent_get(self, key: str) -> str | None:
+        if not self.persistent:
+            return None
+
+        table = AIResponseCacheEntry.__table__
+        try:
+            with db.engine.connect() as conn:
+                row = conn.execute(
+                    select(table.c.payload, table.c.expires_at).where(
+                        table.c.cache_key == key
+                    )
+                ).first()
+        except SQLAlchemyError as exc:
+            logger.warning(
+                "[ai_cache][warning] Lecture du cache persistant impossible",
+                extra={"error": str(exc)},
+            )
+            return None
+
+        if row is None or _as_utc(row.expires_at) <= datetime.now(timezone.utc):
+            return None
+        return row.payload
+
+    def _persistent_set(
+        self,
+        key: str,
+        payload: str,
+        model: str,
+        schema_name: str,
+        ttl_seconds: int,
+    ) -> None:
+        if not self.persistent:
+            return
+
+        table = AIResponseCacheEntry.__table__
+        now = datetime.now(timezone.utc)
+        try:
+            with db.engine.begin() as conn:
+                conn.execute(delete(table).where(table.c.cache_key == key))
+                conn.execute(
+                    table.insert().values(
+                        cache_key=key,
+                        model=model,
+                        schema_name=schema_name,
+                        payload=payload,
+                        created_at=now,
+                        expires_at=now + timedelta(seconds=ttl_seconds),
+                    )
+                )
+        except SQLAlchemyError as exc:
+            logger.warning(
+                "[ai_cache][warning] Écriture du cache persistant impossible",
+                extra={"error": str(exc)},
+            )
+            return
+
+        with self._lock:
+            self._writes_since_prune += 1
+            should_prune = self._writes_since_prune >= _PRUNE_EVERY
+            if should_prune:
+                self._writes_since_prune = 0
+        if should_prune:
+            self.prune()
+
+    def prune(self) -> int:
+        """Supprime les entrées persistantes expirées puis les plus anciennes au-delà de la borne."""
+        if not self.persistent:
+            return 0
+
+        table = AIResponseCacheEntry.__table__
+        removed = 0
+        try:
+            with db.engine.begin() as conn:
+                removed += conn.execute(
+                    delete(table).where(table.c.expires_at <= datetime.now(timezone.utc))
+                ).rowcount or 0
+
+                count = conn.execute(select(func.count()).select_from(table)).scalar_one()
+                overflow = count - self.db_max_entries
+                if overflow > 0:
+                    oldest = [
+                        row.cache_key
+                        for row in conn.execute(
+                            select(table.c.cache_key)
+                            .order_by(table.c.expires_at.asc())
+                            .limit(overflow)
+                        )
+                    ]
+                    removed += conn.execute(
+                        delete(table).where(table.c.cache_key.in_(oldest))
+                    ).rowcount or 0
+        except SQLAlchemyError as exc:
+            logger.warning(
+                "[ai_cache][warning] Purge du cache persistant impossible",
+                extra={"error": str(exc)},
+            )
+            return 0
+
+        if removed:
+            self._incr("evictions", removed)
+        return removed
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite renvoie des datetimes naïfs
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def get_response_cache() -> ResponseCache | None:
+    """Retourne le cache de l'application courante (None si désactivé)."""
+    if not current_app.config.get("AI_CACHE_ENABLED", True):
+        return None
+
+    cache = current_app.extensions.get("ai_response_cache")
+    if cache is None:
+        cache = current_app.extensions.setdefault(
+            "ai_response_cache", ResponseCache.from_config(current_app.config)
+        )
+    return cache
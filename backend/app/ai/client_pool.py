@@ -0,0 +1,215 @@
+"""Client OpenAI partagé par processus (pool HTTP keep-alive).
+
+Le service ASGI utilise un client ``AsyncOpenAI`` par boucle d'événements,
+dont le pool est dimensionné pour des centaines d'appels simultanés.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import weakref
+from typing import Any
+
+import httpx
+from flask import current_app
+from openai import AsyncOpenAI, OpenAI
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_clients: dict[tuple, "_PooledClient"] = {}
+# Boucle d'événements -> clients asynchrones (un pool httpx ne change pas de boucle)
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[tuple, AsyncOpenAI]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+class _PooledClient:
+    """Client OpenAI et client httpx sous-jacent, avec statistiques de réutilisation."""
+
+    def __init__(self, config: dict[str, Any]):
+        self._stats_lock = threading.Lock()
+        self._seen_connections: set[int] = set()
+        self.requests = 0
+        self.new_connections = 0
+
+        self.http_client = httpx.Client(
+            limits=httpx.Limits(
+                max_connections=config.get("OPENAI_POOL_MAX_CONNECTIONS", 20),
+                max_keepalive_connections=config.get("OPENAI_POOL_MAX_KEEPALIVE", 10),
+                keepalive_expiry=config.get("OPENAI_KEEPALIVE_EXPIRY", 60),
+            ),
+            timeout=httpx.Timeout(
+                config.get("OPENAI_TIMEOUT", 30),
+                connect=config.get("OPENAI_CONNECT_TIMEOUT", 5),
+            ),
+            event_hooks={"response": [self._on_response]},
+        )
+        self.client = OpenAI(
+            api_key=config.get("OPENAI_API_KEY") or "local",
+            base_url=config.get("OPENAI_BASE_URL") or None,
+            max_retries=config.get("OPENAI_MAX_RETRIES", 0),
+            http_client=self.http_client,
+        )
+
+    def _connections(self) -> list:
+        pool = getattr(self.http_client._transport, "_pool", None)
+        return list(getattr(pool, "connections", []))
+
+    def _on_response(self, response: httpx.Response) -> None:
+        current = {id(conn) for conn in self._connections()}
+        with self._stats_lock:
+            self.requests += 1
+            self.new_connections += len(current - self._seen_connections)
+            self._seen_connections = current
+
+        # En-tête posé par le SDK sur chaque tentative (0 pour la première)
+        if response.request.headers.get("x-stainless-retry-count", "0") != "0":
+            from .instrumentation import record_sdk_retry
+
+            record_sdk_retry()
+
+    def stats(self) -> dict[str, Any]:
+        connections = self._connections()
+        with self._stats_lock:
+            requests = self.requests
+            new_connections = self.new_connections
+        return {
+            "pid": os.getpid(),
+            "open_connections": len(connections),
+            "idle_connections": sum(1 for conn in connections if conn.is_idle()),
+            "requests": requests,
+            "new_connections": new_connections,
+            "reuse_ratio": round(1 - new_connections / requests, 4) if requests else 0.0,
+        }
+
+
+def _client_key(config: dict[str, Any]) -> tuple:
+    # Un client par processus (les workers gunicorn ne partagent pas leurs sockets)
+    return (
+        os.getpid(),
+        config.get("OPENAI_API_KEY"),
+        config.get("OPENAI_BASE_URL"),
+        config.get("OPENAI_TIMEOUT", 30),
+        config.get("OPENAI_CONNECT_TIMEOUT", 5),
+        config.get("OPENAI_POOL_MAX_CONNECTIONS", 20),
+        config.get("OPENAI_POOL_MAX_KEEPALIVE", 10),
+    )
+
+
+def _get_pooled_client() -> _PooledClient:
+    config = current_app.config
+    if not config.get("OPENAI_API_KEY") and not config.get("OPENAI_BASE_URL"):
+        raise ValueError("OPENAI_API_KEY non configurée")
+
+    key = _client_key(config)
+    pooled = _clients.get(key)
+    if pooled is None:
+        with _lock:
+            pooled = _clients.get(key)
+            if pooled is None:
+                pooled = _PooledClient(config)
+                _clients[key] = pooled
+                logger.info(
+                    "[client_pool][start] Client OpenAI initialisé",
+                    extra={"pid": key[0], "base_url": config.get("OPENAI_BASE_URL")},
+                )
+    return pooled
+
+
+def get_openai_client() -> OpenAI:
+    """
+    Retourne le client OpenAI partagé du processus courant.
+
+    Un client injecté dans ``app.extensions["openai_client"]`` (tests,
+    benchmarks) est prioritaire.
+
+    Raises:
+        ValueError: Si ni OPENAI_API_KEY ni OPENAI_BASE_URL ne sont configurées
+    """
+    override = current_app.extensions.get("openai_client")
+    if override is not None:
+        return override
+    return _get_pooled_client().client
+
+
+async def _on_async_response(response: httpx.Response) -> None:
+    if response.request.headers.get("x-stainless-retry-count", "0") != "0":
+        from .instrumentation import record_sdk_retry
+
+        record_sdk_retry()
+
+
+def get_async_openai_client() -> AsyncOpenAI:
+    """
+    Retourne le client AsyncOpenAI partagé de la boucle d'événements courante.
+
+    Un client injecté dans ``app.extensions["async_openai_client"]`` (tests,
+    benchmarks) est prioritaire.
+
+    Raises:
+        ValueError: Si ni OPENAI_API_KEY ni OPENAI_BASE_URL ne sont configurées
+    """
+    override = current_app.extensions.get("async_openai_client")
+    if override is not None:
+        return override
+
+    config = current_app.config
+    if not config.get("OPENAI_API_KEY") and not config.get("OPENAI_BASE_URL"):
+        raise ValueError("OPENAI_API_KEY non configurée")
+
+    clients = _async_clients.setdefault(asyncio.get_running_loop(), {})
+    key = _client_key(config)
+    client = clients.get(key)
+    if client is None:
+        max_connections = config.get("OPENAI_ASYNC_POOL_MAX_CONNECTIONS", 500)
+        client = clients[key] = AsyncOpenAI(
+            api_key=config.get("OPENAI_API_KEY") or "local",
+            base_url=config.get("OPENAI_BASE_URL") or None,
+            max_retries=config.get("OPENAI_MAX_RETRIES", 0),
+            http_client=httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_connections,
+                    keepalive_expiry=config.get("OPENAI_KEEPALIVE_EXPIRY", 60),
+                ),
+                timeout=httpx.Timeout(
+                    config.get("OPENAI_TIMEOUT", 30),
+                    connect=config.get("OPENAI_CONNECT_TIMEOUT", 5),
+                ),
+                event_hooks={"response": [_on_async_response]},
+            ),
+        )
+        logger.info(
+            "[client_pool][start] Client AsyncOpenAI initialisé",
+            extra={"pid": key[0], "base_url": config.get("OPENAI_BASE_URL")},
+        )
+    return client
+
+
+async def close_async_openai_clients() -> None:
+    """Ferme les clients AsyncOpenAI de la boucle courante (arrêt du service ASGI)."""
+    clients = _async_clients.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        await client.close()
+
+
+def get_pool_stats() -> dict[str, Any]:
+    """Statistiques du pool HTTP du processus courant (connexions ouvertes, réutilisation)."""
+    if current_app.extensions.get("openai_client") is not None:
+        return {"pid": os.getpid(), "overridden": True}
+
+    pooled = _clients.get(_client_key(current_app.config))
+    if pooled is None:
+        return {
+            "pid": os.getpid(),
+            "open_connections": 0,
+            "idle_connections": 0,
+            "requests": 0,
+            "new_connections": 0,
+            "reuse_ratio": 0.0,
+        }
+    return pooled.stats()
@@ -0,0 +1,150 @@
+"""Assemblage du contexte de prompt sous budget de tokens."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+from flask import current_app
+
+from .tokens import count_tokens, truncate_to_tokens
+
+# Préfixe « [auteur] » et retour à la ligne d'une entrée d'historique
+HISTORY_LINE_OVERHEAD = 4
+
+
+@dataclass
+class ContextText:
+    """Contexte formaté et répartition de son budget."""
+
+    text: str
+    tokens: int
+    budget: int
+    history_messages: int
+    history_available: int
+    truncated: bool
+
+
+def context_budget(intent: str | None = None) -> int:
+    """Budget de tokens du contexte pour une intention (valeur par défaut sinon)."""
+    config = current_app.config
+    budgets = config.get("CHAT_CONTEXT_TOKEN_BUDGETS") or {}
+    return int(budgets.get(intent or "", config.get("CHAT_CONTEXT_TOKEN_BUDGET", 1500)))
+
+
+def format_context_facts(context: dict[str, Any]) -> str:
+    """Partie stable du contexte (scénario, objectifs, cibles, ressources)."""
+    lines = []
+
+    if "scenario" in context:
+        scenario = context["scenario"]
+        lines.append(f"Scénario actuel: {scenario.get('nom', 'N/A')}")
+        lines.append(f"Thématique: {scenario.get('thematique', 'N/A')}")
+        lines.append(f"Statut: {scenario.get('statut', 'draft')}")
+
+    if "objectifs" in context and context["objectifs"]:
+        lines.append(f"\nObjectifs ({len(context['objectifs'])}):")
+        for obj in context["objectifs"]:
+            lines.append(f"  - {obj.get('label', 'N/A')}")
+
+    if "cibles" in context and context["cibles"]:
+        lines.append(f"\nCibles ({len(context['cibles'])}):")
+        for cible in context["cibles"]:
+            lines.append(f"  - {cible.get('label', 'N/A')}")
+
+    if "ressources" in context and context["ressources"]:
+        lines.append(f"\nRessources ({len(context['ressources'])}):")
+        for res in context["ressources"]:
+            lines.append(f"  - {res.get('titre', 'N/A')} ({res.get('type', 'N/A')})")
+
+    return "\n".join(lines)
+
+
+def _message_tokens(message: dict[str, Any], model: str | None) -> int:
+    token_count = message.get("token_count")
+    if token_count is None:
+        token_count = count_tokens(message.get("contenu", ""), model)
+    return token_count + HISTORY_LINE_OVERHEAD
+
+
+def build_context_text(
+    context: dict[str, Any],
+    budget: int | None = None,
+    model: str | None = None,
+) -> ContextText:
+    """
+    Formate les faits du scénario puis autant d'historique récent que le budget
+    le permet.
+
+    Les messages sont ajoutés du plus récent au plus ancien, en entier, à
+    partir de leur ``token_count`` précalculé ; seul le plus récent peut être
+    tronqué s'il dépasse à lui seul le budget restant.
+
+    Args:
+        context: Contexte (scenario, facts_text, historique, token_budget)
+        budget: Budget en tokens (``context["token_budget"]`` ou défaut sinon)
+        model: Modèle utilisé pour le comptage
+    """
+    if budget is None:
+        budget = context.get("token_budget") or context_budget()
+
+    facts = context.get("facts_text")
+    if facts is None:
+        facts = format_context_facts(context)
+    facts_tokens = count_tokens(facts, model)
+    truncated = False
+    if facts_tokens > budget:
+        facts = truncate_to_tokens(facts, budget, model)
+        facts_tokens = count_tokens(facts, model)
+        truncated = True
+
+    historique = context.get("historique") or []
+    header = f"\nHistorique récent ({len(historique)} messages):"
+    remaining = budget - facts_tokens - count_tokens(header, model)
+
+    selected: list[str] = []
+    for message in reversed(historique):
+        auteur = message.get("auteur", "unknown")
+        contenu = message.get("contenu", "")
+        cost = _message_tokens(message, model)
+        if cost > remaining:
+            if not selected and remaining > HISTORY_LINE_OVERHEAD:
+                contenu = truncate_to_tokens(contenu, remaining - HISTORY_LINE_OVERHEAD, model)
+                selected.append(f"  [{auteur}] {contenu}")
+                remaining = 0
+            truncated = True
+            break
+        selected.append(f"  [{auteur}] {contenu}")
+        remaining -= cost
+
+    parts = [facts] if facts else []
+    if selected:
+        parts.append(f"\nHistorique récent ({len(selected)} messages):")
+        parts.extend(reversed(selected))
+
+    text = "\n".join(parts) or "Aucun contexte disponible"
+    return ContextText(
+        text=text,
+        tokens=count_tokens(text, model),
+        budget=budget,
+        history_messages=len(selected),
+        history_available=len(historique),
+        truncated=truncated,
+    )
+
+
+def build_prompt_messages(
+    system_prompt: str,
+    user_message: str,
+    context: dict[str, Any] | None = None,
+    model: str | None = None,
+) -> list[dict[str, str]]:
+    """Assemble les messages envoyés à l'API (système, contexte, utilisateur)."""
+    messages = [{"role": "system", "content": system_prompt}]
+
+    if context:
+        context_str = build_context_text(context, model=model).text
+        messages.append({"role": "system", "content": f"Contexte:\n{context_str}"})
+
+    messages.append({"role": "user", "content": user_message})
+    return messages
@@ -0,0 +1,322 @@
+"""Point d'appel unique vers l'API chat : latence, tokens, retries et erreurs.
+
+Chaque tentative réserve son budget auprès du limiteur partagé
+(``rate_limiter``) ; les erreurs transitoires (429, timeout, connexion, 5xx)
+sont retentées après un backoff exponentiel avec gigue, au moins égal au
+``Retry-After`` du fournisseur.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from collections.abc import Iterator
+from contextvars import ContextVar
+from typing import Any
+
+from flask import current_app, has_app_context
+from openai import (
+    APIConnectionError,
+    APIStatusError,
+    APITimeoutError,
+    InternalServerError,
+    RateLimitError,
+)
+
+from ..metrics import get_metrics
+from .client_pool import get_async_openai_client, get_openai_client
+from .rate_limiter import (
+    RateLimitWaitExceeded,
+    backoff_delay,
+    get_rate_limiter,
+    retry_after_seconds,
+)
+from .tokens import count_message_tokens
+
+# Étiquettes de l'appel en cours (lues par le hook HTTP du pool pour les retries du SDK)
+_current_call: ContextVar[dict[str, str] | None] = ContextVar("llm_current_call", default=None)
+
+_METRICS = (
+    ("llm_requests_total", "counter", "Appels LLM par issue (success, timeout, rate_limited, ...)"),
+    ("llm_request_duration_seconds", "histogram", "Durée des appels LLM (flux complet en streaming)"),
+    ("llm_time_to_first_token_seconds", "histogram", "Délai avant le premier fragment en streaming"),
+    ("llm_prompt_tokens_total", "counter", "Tokens de prompt facturés"),
+    ("llm_completion_tokens_total", "counter", "Tokens de complétion facturés"),
+    ("llm_retries_total", "counter", "Nouvelles tentatives (kind=application, sdk ou backoff)"),
+    ("llm_rate_limit_wait_seconds", "histogram", "Attente du budget partagé avant l'appel"),
+    ("llm_validation_failures_total", "counter", "Réponses non conformes (JSON ou schéma)"),
+)
+
+
+def _registry():
+    registry = get_metrics()
+    for name, kind, help_text in _METRICS:
+        registry.describe(name, kind, help_text)
+    return registry
+
+
+def _outcome(exc: BaseException) -> str:
+    if isinstance(exc, RateLimitWaitExceeded):
+        return "throttled"
+    if isinstance(exc, APITimeoutError):
+        return "timeout"
+    if isinstance(exc, RateLimitError):
+        return "rate_limited"
+    if isinstance(exc, APIConnectionError):
+        return "connection_error"
+    if isinstance(exc, APIStatusError):
+        return "http_error"
+    return "error"
+
+
+def _record(labels: dict[str, str], outcome: str, started: float, usage: Any = None) -> None:
+    registry = _registry()
+    registry.inc("llm_requests_total", {**labels, "outcome": outcome})
+    registry.observe("llm_request_duration_seconds", time.perf_counter() - started, labels)
+    if usage is not None:
+        registry.inc("llm_prompt_tokens_total", labels, getattr(usage, "prompt_tokens", 0) or 0)
+        registry.inc(
+            "llm_completion_tokens_total", labels, getattr(usage, "completion_tokens", 0) or 0
+        )
+
+
+def record_validation_failure(call_site: str, model: str, schema: str) -> None:
+    """Compte une réponse reçue mais inexploitable (JSON invalide, schéma non respecté)."""
+    _registry().inc(
+        "llm_validation_failures_total",
+        {"call_site": call_site, "model": model, "schema": schema},
+    )
+
+
+def record_sdk_retry() -> None:
+    """Compte une nouvelle tentative HTTP du SDK pour l'appel en cours."""
+    labels = _current_call.get()
+    if labels is not None and has_app_context():
+        _registry().inc("llm_retries_total", {**labels, "kind": "sdk"})
+
+
+def _estimated_tokens(kwargs: dict[str, Any]) -> int:
+    """Tokens réservés pour l'appel : prompt estimé et complétion maximale."""
+    completion = kwargs.get("max_tokens") or current_app.config.get(
+        "LLM_RATE_LIMIT_COMPLETION_TOKENS", 500
+    )
+    return count_message_tokens(kwargs.get("messages") or [], kwargs.get("model")) + completion
+
+
+def _penalty(exc: BaseException) -> float | None:
+    """Suspension à appliquer au modèle pour tous les workers (429 avec ``Retry-After``)."""
+    if isinstance(exc, RateLimitError) and getattr(exc, "code", None) != "insufficient_quota":
+        return retry_after_seconds(exc) or None
+    return None
+
+
+def _next_delay(
+    exc: BaseException, labels: dict[str, str], started: float, retry: int
+) -> float | None:
+    """
+    Enregistre l'échec d'une tentative et retourne le délai avant la suivante,
+    ou None si l'erreur est définitive ou les tentatives épuisées.
+    """
+    _record(labels, _outcome(exc), started)
+    if isinstance(exc, RateLimitError):
+        if getattr(exc, "code", None) == "insufficient_quota":
+            return None
+    elif not isinstance(exc, (APIConnectionError, InternalServerError)):
+        return None
+
+    config = current_app.config
+    if retry >= max(1, config.get("LLM_RETRY_MAX_ATTEMPTS", 4)):
+        return None
+    delay = max(retry_after_seconds(exc) or 0.0, backoff_delay(retry))
+    if delay > config.get("LLM_RATE_LIMIT_MAX_WAIT_SECONDS", 30):
+        return None
+    _registry().inc("llm_retries_total", {**labels, "kind": "backoff"})
+    return delay
+
+
+def _start(call_site: str, schema: str, attempt: int, kwargs: dict[str, Any]) -> dict[str, str]:
+    labels = {"call_site": call_site, "model": kwargs.get("model", ""), "schema": schema}
+    if attempt > 1:
+        _registry().inc("llm_retries_total", {**labels, "kind": "application"})
+    return labels
+
+
+def _actual_tokens(usage: Any) -> int | None:
+    return getattr(usage, "total_tokens", None)
+
+
+def chat_completion(
+    call_site: str,
+    *,
+    schema: str = "none",
+    attempt: int = 1,
+    client: Any = None,
+    **kwargs: Any,
+) -> Any:
+    """
+    Appelle ``chat.completions.create`` en mesurant l'appel.
+
+    En streaming, retourne un itérateur qui mesure le flux jusqu'à son terme
+    (l'usage est demandé via ``stream_options``). Les erreurs transitoires
+    sont retentées jusqu'à ``LLM_RETRY_MAX_ATTEMPTS`` tentatives.
+
+    Args:
+        call_site: Point d'appel (étiquette ``call_site``)
+        schema: Format de réponse attendu (étiquette ``schema``)
+        attempt: Numéro de tentative applicative (>1 : compté comme retry)
+        client: Client OpenAI (client partagé du processus par défaut)
+        **kwargs: Paramètres de ``chat.completions.create``
+
+    Raises:
+        RateLimitWaitExceeded: Budget partagé indisponible dans le délai autorisé
+    """
+    labels = _start(call_site, schema, attempt, kwargs)
+    model = labels["model"]
+    if kwargs.get("stream"):
+        kwargs.setdefault("stream_options", {"include_usage": True})
+
+    client = client or get_openai_client()
+    limiter = get_rate_limiter()
+    estimated = _estimated_tokens(kwargs)
+
+    retry = 0
+    while True:
+        retry += 1
+        token = _current_call.set(labels)
+        started = time.perf_counter()
+        try:
+            _registry().observe(
+                "llm_rate_limit_wait_seconds", limiter.acquire(model, estimated), labels
+            )
+            started = time.perf_counter()
+            response = client.chat.completions.create(**kwargs)
+            break
+        except Exception as exc:
+            penalty = _penalty(exc)
+            if penalty:
+                limiter.penalize(model, penalty)
+            delay = _next_delay(exc, labels, started, retry)
+            if delay is None:
+                raise
+            time.sleep(delay)
+        finally:
+            _current_call.reset(token)
+
+    if kwargs.get("stream"):
+        return _observed_stream(response, labels, started, estimated)
+
+    usage = getattr(response, "usage", None)
+    _record(labels, "success", started, usage)
+    if _actual_tokens(usage) is not None:
+        limiter.settle(model, estimated, _actual_tokens(usage))
+    return response
+
+
+async def achat_completion(
+    call_site: str,
+    *,
+    schema: str = "none",
+    attempt: int = 1,
+    client: Any = None,
+    **kwargs: Any,
+) -> Any:
+    """
+    Variante asynchrone de ``chat_completion`` (sans streaming) pour le service ASGI.
+
+    L'attente du budget partagé et le backoff ne bloquent pas la boucle
+    d'événements ; les accès à la table du limiteur passent par le pool de
+    threads.
+
+    Raises:
+        RateLimitWaitExceeded: Budget partagé indisponible dans le délai autorisé
+    """
+    from ..aio import run_in_thread
+
+    labels = _start(call_site, schema, attempt, kwargs)
+    model = labels["model"]
+    client = client or get_async_openai_client()
+    limiter = get_rate_limiter()
+    estimated = _estimated_tokens(kwargs)
+
+    retry = 0
+    while True:
+        retry += 1
+        token = _current_call.set(labels)
+        started = time.perf_counter()
+        try:
+            _registry().observe(
+                "llm_rate_limit_wait_seconds",
+                await limiter.acquire_async(model, estimated),
+                labels,
+            )
+            started = time.perf_counter()
+            response = await client.chat.completions.create(**kwargs)
+            break
+        except Exception as exc:
+            penalty = _penalty(exc)
+            if penalty:
+                await run_in_thread(limiter.penalize, model, penalty)
+            delay = _next_delay(exc, labels, started, retry)
+            if delay is None:
+                raise
+            await asyncio.sleep(delay)
+        finally:
+            _current_call.reset(token)
+
+    usage = getattr(response, "usage", None)
+    _record(labels, "success", started, usage)
+    if _actual_tokens(usage) is not None:
+        await run_in_thread(limiter.settle, model, estimated, _actual_tokens(usage))
+    return response
+
+
+def _observed_stream(
+    stream: Any, labels: dict[str, str], started: float, estimated: int
+) -> Iterator[Any]:
+    usage = None
+    first = True
+    outcome = "cancelled"
+    try:
+        for chunk in stream:
+            if first:
+                first = False
+                _registry().observe(
+                    "llm_time_to_first_token_seconds", time.perf_counter() - started, labels
+                )
+            usage = getattr(chunk, "usage", None) or usage
+            yield chunk
+        outcome = "success"
+    except Exception as exc:
+        outcome = _outcome(exc)
+        raise
+    finally:
+        _record(labels, outcome, started, usage)
+        if _actual_tokens(usage) is not None:
+            get_rate_limiter().settle(labels["model"], estimated, _actual_tokens(usage))
+
+
+def _parse_json(call_site: str, model: str, response: Any) -> dict[str, Any]:
+    content = (response.choices[0].message.content or "").strip()
+    try:
+        return json.loads(content)
+    except json.JSONDecodeError:
+        record_validation_failure(call_site, model, "json")
+        raise
+
+
+def json_completion(call_site: str, **kwargs: Any) -> dict[str, Any]:
+    """
+    Appel dont la réponse est un objet JSON : retourne le dict parsé.
+
+    Raises:
+        json.JSONDecodeError: Réponse non JSON (comptée en échec de validation)
+    """
+    response = chat_completion(call_site, schema="json", **kwargs)
+    return _parse_json(call_site, kwargs.get("model", ""), response)
+
+
+async def ajson_completion(call_site: str, **kwargs: Any) -> dict[str, Any]:
+    """Variante asynchrone de ``json_completion``."""
+    response = await achat_completion(call_site, schema="json", **kwargs)
+    return _parse_json(call_site, kwargs.get("model", ""), response)
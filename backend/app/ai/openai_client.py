@@ -4,14 +4,25 @@ from __future__ import annotations
 
 import json
 import logging
+from collections.abc import Iterator
 from typing import Any
 
-import openai
 from flask import current_app
-from openai import OpenAI, OpenAIError, RateLimitError
+from openai import (
+    APIConnectionError,
+    InternalServerError,
+    OpenAIError,
+    RateLimitError,
+)
 from pydantic import ValidationError
 
+from .cache import build_cache_key, get_response_cache
+from .client_pool import get_async_openai_client, get_openai_client
+from .context_builder import build_prompt_messages
+from .instrumentation import achat_completion, chat_completion, record_validation_failure
+from .rate_limiter import RateLimitWaitExceeded
 from .schemas import ChatResponseSchema, PlanGenerationSchema
+from .streaming import JsonStringFieldStreamer
 
 logger = logging.getLogger(__name__)
 
@@ -20,12 +31,8 @@ class OpenAIClient:
     """Wrapper pour les appels à l'API OpenAI."""
 
     def __init__(self):
-        """Initialise le client OpenAI."""
-        api_key = current_app.config.get("OPENAI_API_KEY")
-        if not api_key:
-            raise ValueError("OPENAI_API_KEY non configurée")
-        
-        self.client = OpenAI(api_key=api_key)
+        """Initialise le client OpenAI (client HTTP partagé du processus)."""
+        self.client = get_openai_client()
         self.model = current_app.config.get("OPENAI_MODEL", "gpt-4o-mini")
         self.timeout = current_app.config.get("OPENAI_TIMEOUT", 30)
 
@@ -36,6 +43,7 @@ class OpenAIClient:
         context: dict[str, Any] | None = None,
         response_format: type[ChatResponseSchema] | type[PlanGenerationSchema] = ChatResponseSchema,
         max_retries: int = 2,
+        use_cache: bool = True,
     ) -> ChatResponseSchema | PlanGenerationSchema | None:
         """
         Appelle l'API OpenAI pour obtenir une réponse structurée.
@@ -46,129 +54,308 @@ class OpenAIClient:
             context: Contexte additionnel (scénario, historique, etc.)
             response_format: Schéma Pydantic attendu en réponse
             max_retries: Nombre de tentatives en cas d'échec
+            use_cache: Réutiliser une réponse identique déjà obtenue
 
         Returns:
             Instance du schéma validé ou None en cas d'échec
         """
-        messages = [{"role": "system", "content": system_prompt}]
-
-        if context:
-            context_str = self._format_context(context)
-            messages.append({"role": "system", "content": f"Contexte:\n{context_str}"})
-
-        messages.append({"role": "user", "content": user_message})
-
-        for attempt in range(max_retries):
-            try:
+        messages = self._build_messages(system_prompt, user_message, context)
+
+        cache = get_response_cache() if use_cache else None
+        cache_key = None
+        if cache is not None:
+            cache_key = build_cache_key(self.model, messages, response_format)
+            cached = cache.get(cache_key, response_format)
+            if cached is not None:
                 logger.info(
-                    "[openai_client][start] Appel OpenAI",
-                    extra={
-                        "model": self.model,
-                        "attempt": attempt + 1,
-                        "user_message_length": len(user_message),
-                    },
+                    "[openai_client][cache] Réponse servie depuis le cache",
+                    extra={"response_type": response_format.__name__},
                 )
+                return cached
 
-                response = self.client.chat.completions.create(
+        for attempt in range(max_retries):
+            self._log_attempt(attempt, user_message)
+            try:
+                response = chat_completion(
+                    "chat",
+                    schema=response_format.__name__,
+                    attempt=attempt + 1,
+                    client=self.client,
                     model=self.model,
                     messages=messages,
                     response_format={"type": "json_object"},
                     timeout=self.timeout,
                 )
+                validated = self._validate(response, response_format)
+            except Exception as exc:
+                if self._gives_up(exc, attempt, max_retries, response_format):
+                    return None
+                continue
+            if validated is None:
+                continue
 
-                content = response.choices[0].message.content
-                if not content:
-                    logger.warning("[openai_client][warning] Réponse vide de OpenAI")
-                    continue
+            if cache is not None and not self._is_error_response(validated):
+                cache.set(cache_key, validated, model=self.model)
 
-                # Parser et valider avec Pydantic
-                data = json.loads(content)
-                validated = response_format.model_validate(data)
+            return validated
 
-                logger.info(
-                    "[openai_client][success] Réponse OpenAI validée",
-                    extra={
-                        "tokens_used": response.usage.total_tokens if response.usage else 0,
-                        "response_type": response_format.__name__,
-                    },
-                )
+        return None
 
-                return validated
+    async def chat_completion_async(
+        self,
+        system_prompt: str,
+        user_message: str,
+        context: dict[str, Any] | None = None,
+        response_format: type[ChatResponseSchema] | type[PlanGenerationSchema] = ChatResponseSchema,
+        max_retries: int = 2,
+        use_cache: bool = True,
+    ) -> ChatResponseSchema | PlanGenerationSchema | None:
+        """
+        Variante asynchrone de ``chat_completion`` pour le service ASGI : client
+        ``AsyncOpenAI`` de la boucle, cache consulté via le pool de threads.
+        """
+        from ..aio import run_in_thread
 
-            except RateLimitError as exc:
-                logger.error(
-                    "[openai_client][error] Rate limit atteint",
-                    extra={"attempt": attempt + 1, "error": str(exc)},
-                )
-                if attempt == max_retries - 1:
-                    return None
+        messages = self._build_messages(system_prompt, user_message, context)
 
-            except ValidationError as exc:
-                logger.error(
-                    "[openai_client][error] Validation Pydantic échouée",
-                    extra={"attempt": attempt + 1, "errors": exc.errors()},
+        cache = get_response_cache() if use_cache else None
+        cache_key = None
+        if cache is not None:
+            cache_key = build_cache_key(self.model, messages, response_format)
+            cached = await run_in_thread(cache.get, cache_key, response_format)
+            if cached is not None:
+                logger.info(
+                    "[openai_client][cache] Réponse servie depuis le cache",
+                    extra={"response_type": response_format.__name__},
                 )
-                if attempt == max_retries - 1:
-                    return None
+                return cached
 
-            except OpenAIError as exc:
-                logger.error(
-                    "[openai_client][error] Erreur OpenAI",
-                    extra={"attempt": attempt + 1, "error": str(exc)},
+        for attempt in range(max_retries):
+            self._log_attempt(attempt, user_message)
+            try:
+                response = await achat_completion(
+                    "chat",
+                    schema=response_format.__name__,
+                    attempt=attempt + 1,
+                    client=get_async_openai_client(),
+                    model=self.model,
+                    messages=messages,
+                    response_format={"type": "json_object"},
+                    timeout=self.timeout,
                 )
-                if attempt == max_retries - 1:
+                validated = self._validate(response, response_format)
+            except Exception as exc:
+                if self._gives_up(exc, attempt, max_retries, response_format):
                     return None
+                continue
+            if validated is None:
+                continue
 
-            except json.JSONDecodeError as exc:
-                logger.error(
-                    "[openai_client][error] JSON invalide",
-                    extra={"attempt": attempt + 1, "error": str(exc)},
-                )
-                if attempt == max_retries - 1:
-                    return None
+            if cache is not None and not self._is_error_response(validated):
+                await run_in_thread(cache.set, cache_key, validated, model=self.model)
 
-            except Exception as exc:
-                logger.exception(
-                    "[openai_client][error] Erreur inattendue",
-                    extra={"attempt": attempt + 1, "error": str(exc)},
-                )
-                return None
+            return validated
 
         return None
 
-    def _format_context(self, context: dict[str, Any]) -> str:
-        """Formate le contexte en texte lisible pour le prompt."""
-        lines = []
-        
-        if "scenario" in context:
-            scenario = context["scenario"]
-            lines.append(f"Scénario actuel: {scenario.get('nom', 'N/A')}")
-            lines.append(f"Thématique: {scenario.get('thematique', 'N/A')}")
-            lines.append(f"Statut: {scenario.get('statut', 'draft')}")
-
-        if "objectifs" in context and context["objectifs"]:
-            lines.append(f"\nObjectifs ({len(context['objectifs'])}):")
-            for obj in context["objectifs"]:
-                lines.append(f"  - {obj.get('label', 'N/A')}")
-
-        if "cibles" in context and context["cibles"]:
-            lines.append(f"\nCibles ({len(context['cibles'])}):")
-            for cible in context["cibles"]:
-                lines.append(f"  - {cible.get('label', 'N/A')}")
-
-        if "ressources" in context and context["ressources"]:
-            lines.append(f"\nRessources ({len(context['ressources'])}):")
-            for res in context["ressources"]:
-                lines.append(f"  - {res.get('titre', 'N/A')} ({res.get('type', 'N/A')})")
-
-        if "historique" in context and context["historique"]:
-            lines.append(f"\nHistorique récent ({len(context['historique'])} messages):")
-            for msg in context["historique"][-5:]:  # Derniers 5 messages
-                auteur = msg.get("auteur", "unknown")
-                contenu = msg.get("contenu", "")[:100]  # Tronquer si trop long
-                lines.append(f"  [{auteur}] {contenu}")
-
-        return "\n".join(lines) if lines else "Aucun contexte disponible"
+    def _log_attempt(self, attempt: int, user_message: str) -> None:
+        logger.info(
+            "[openai_client][start] Appel OpenAI",
+            extra={
+                "model": self.model,
+                "attempt": attempt + 1,
+                "user_message_length": len(user_message),
+            },
+        )
+
+    def _validate(
+        self,
+        response: Any,
+        response_format: type[ChatResponseSchema] | type[PlanGenerationSchema],
+    ) -> ChatResponseSchema | PlanGenerationSchema | None:
+        """
+        Parse et valide la réponse avec Pydantic (None si la réponse est vide).
+
+        Raises:
+            json.JSONDecodeError: Réponse non JSON
+            ValidationError: Réponse non conforme au schéma
+        """
+        content = response.choices[0].message.content
+        if not content:
+            logger.warning("[openai_client][warning] Réponse vide de OpenAI")
+            return None
+
+        data = json.loads(content)
+        validated = response_format.model_validate(data)
+
+        logger.info(
+            "[openai_client][success] Réponse OpenAI validée",
+            extra={
+                "tokens_used": response.usage.total_tokens if response.usage else 0,
+                "response_type": response_format.__name__,
+            },
+        )
+        return validated
+
+    def _gives_up(
+        self,
+        exc: Exception,
+        attempt: int,
+        max_retries: int,
+        response_format: type[ChatResponseSchema] | type[PlanGenerationSchema],
+    ) -> bool:
+        """Journalise l'échec d'une tentative ; vrai s'il ne faut pas réessayer."""
+        last = attempt == max_retries - 1
+
+        if isinstance(exc, (RateLimitError, RateLimitWaitExceeded)):
+            # Déjà retenté avec backoff par chat_completion : inutile d'insister
+            logger.error(
+                "[openai_client][error] Rate limit atteint",
+                extra={"attempt": attempt + 1, "error": str(exc)},
+            )
+            return True
+
+        if isinstance(exc, (APIConnectionError, InternalServerError)):
+            # Timeout, connexion, 5xx : tentatives épuisées par chat_completion,
+            # relancer ici multiplierait les appels et le budget consommé
+            logger.error(
+                "[openai_client][error] Erreur OpenAI transitoire persistante",
+                extra={"attempt": attempt + 1, "error": str(exc)},
+            )
+            return True
+
+        if isinstance(exc, ValidationError):
+            record_validation_failure("chat", self.model, response_format.__name__)
+            logger.error(
+                "[openai_client][error] Validation Pydantic échouée",
+                extra={"attempt": attempt + 1, "errors": exc.errors()},
+            )
+            return last
+
+        if isinstance(exc, OpenAIError):
+            logger.error(
+                "[openai_client][error] Erreur OpenAI",
+                extra={"attempt": attempt + 1, "error": str(exc)},
+            )
+            return last
+
+        if isinstance(exc, json.JSONDecodeError):
+            record_validation_failure("chat", self.model, response_format.__name__)
+            logger.error(
+                "[openai_client][error] JSON invalide",
+                extra={"attempt": attempt + 1, "error": str(exc)},
+            )
+            return last
+
+        logger.exception(
+            "[openai_client][error] Erreur inattendue",
+            extra={"attempt": attempt + 1, "error": str(exc)},
+        )
+        return True
+
+    def stream_chat_completion(
+        self,
+        system_prompt: str,
+        user_message: str,
+        context: dict[str, Any] | None = None,
+        use_cache: bool = True,
+    ) -> Iterator[tuple[str, Any]]:
+        """
+        Appelle l'API OpenAI en mode streaming.
+
+        Produit des événements ``("delta", str)`` au fur et à mesure que le champ
+        ``message_markdown`` arrive, puis un unique ``("done", ChatResponseSchema | None)``
+        une fois la réponse complète parsée et validée.
+
+        Args:
+            system_prompt: Prompt système définissant le comportement
+            user_message: Message utilisateur
+            context: Contexte additionnel (scénario, historique, etc.)
+            use_cache: Réutiliser une réponse identique déjà obtenue
+        """
+        messages = self._build_messages(system_prompt, user_message, context)
+
+        cache = get_response_cache() if use_cache else None
+        cache_key = None
+        if cache is not None:
+            cache_key = build_cache_key(self.model, messages, ChatResponseSchema)
+            cached = cache.get(cache_key, ChatResponseSchema)
+            if cached is not None:
+                logger.info(
+                    "[openai_client][cache] Réponse streaming servie depuis le cache",
+                    extra={"response_type": ChatResponseSchema.__name__},
+                )
+                yield "delta", cached.message_markdown
+                yield "done", cached
+                return
+
+        logger.info(
+            "[openai_client][start] Appel OpenAI (streaming)",
+            extra={"model": self.model, "user_message_length": len(user_message)},
+        )
+
+        streamer = JsonStringFieldStreamer("message_markdown")
+        parts: list[str] = []
+
+        try:
+            stream = chat_completion(
+                "chat_stream",
+                schema=ChatResponseSchema.__name__,
+                client=self.client,
+                model=self.model,
+                messages=messages,
+                response_format={"type": "json_object"},
+                timeout=self.timeout,
+                stream=True,
+            )
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                fragment = chunk.choices[0].delta.content
+                if not fragment:
+                    continue
+                parts.append(fragment)
+                delta = streamer.feed(fragment)
+                if delta:
+                    yield "delta", delta
+
+            try:
+                validated = ChatResponseSchema.model_validate(json.loads("".join(parts)))
+            except (ValidationError, json.JSONDecodeError):
+                record_validation_failure("chat_stream", self.model, ChatResponseSchema.__name__)
+                raise
+
+        except (OpenAIError, ValidationError, json.JSONDecodeError) as exc:
+            logger.error(
+                "[openai_client][error] Échec de l'appel OpenAI en streaming",
+                extra={"error": str(exc)},
+            )
+            yield "done", None
+            return
+
+        logger.info(
+            "[openai_client][success] Réponse OpenAI streaming validée",
+            extra={"response_type": ChatResponseSchema.__name__},
+        )
+
+        if cache is not None and not self._is_error_response(validated):
+            cache.set(cache_key, validated, model=self.model)
+
+        yield "done", validated
+
+    def _build_messages(
+        self,
+        system_prompt: str,
+        user_message: str,
+        context: dict[str, Any] | None = None,
+    ) -> list[dict[str, str]]:
+        """Assemble les messages envoyés à l'API (système, contexte, utilisateur)."""
+        return build_prompt_messages(system_prompt, user_message, context, model=self.model)
+
+    @staticmethod
+    def _is_error_response(response: ChatResponseSchema | PlanGenerationSchema) -> bool:
+        """Les réponses signalant des erreurs ne sont pas mises en cache."""
+        return bool(getattr(response, "errors", None))
 
     def get_fallback_response(self, error_message: str | None = None) -> ChatResponseSchema:
         """Retourne une réponse de secours en cas d'échec OpenAI."""
@@ -181,3 +368,4 @@ class OpenAIClient:
             entities_to_create=[],
             errors=[error_message] if error_message else ["Service IA temporairement indisponible"],
         )
+
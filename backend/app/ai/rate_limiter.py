@@ -0,0 +1,309 @@
+"""Limiteur de débit partagé des appels LLM et calendrier de nouvelles tentatives.
+
+Chaque modèle dispose de deux seaux à jetons (requêtes et tokens par minute)
+stockés dans la table ``llm_rate_limits`` : tous les workers puisent dans le
+même budget. Un appel réserve une requête et ses tokens estimés (prompt +
+``max_tokens``) ; si le seau est vide, l'appelant attend son remplissage, au
+plus ``LLM_RATE_LIMIT_MAX_WAIT_SECONDS``. Sans limite configurée pour un
+modèle, aucune lecture n'est faite. Un 429 du fournisseur suspend le
+modèle pour tous les workers jusqu'à l'échéance de ``Retry-After``, et les
+nouvelles tentatives suivent un backoff exponentiel avec gigue.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any
+
+from flask import current_app
+from openai import OpenAIError
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from ..extensions import db
+from ..models import LLMRateLimit
+
+logger = logging.getLogger(__name__)
+
+# Nombre maximal de réservations concurrentes perdues avant abandon de l'appel
+_MAX_CONFLICTS = 50
+# Pause maximale (secondes) entre deux réservations perdues
+_MAX_CONFLICT_PAUSE = 0.05
+
+
+class RateLimitWaitExceeded(OpenAIError):
+    """Le budget du modèle ne se libère pas dans le délai d'attente autorisé."""
+
+    def __init__(self, model: str, wait_seconds: float):
+        super().__init__(
+            f"Budget LLM épuisé pour {model} (attente estimée {wait_seconds:.1f}s)"
+        )
+        self.model = model
+        self.wait_seconds = wait_seconds
+
+
+def model_limits(model: str) -> tuple[float, float]:
+    """Limites (requêtes/min, tokens/min) du modèle ; 0 désactive une dimension."""
+    config = current_app.config
+    limits = config.get("LLM_RATE_LIMITS", {}).get(model, {})
+    return (
+        float(limits.get("rpm", config.get("LLM_RATE_LIMIT_RPM", 0))),
+        float(limits.get("tpm", config.get("LLM_RATE_LIMIT_TPM", 0))),
+    )
+
+
+class LLMRateLimiter:
+    """Seaux à jetons partagés entre workers, un par modèle."""
+
+    def __init__(self, max_wait_seconds: float = 30.0, burst_seconds: float = 10.0):
+        self.max_wait_seconds = max_wait_seconds
+        self.burst_seconds = burst_seconds
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any]) -> "LLMRateLimiter":
+        return cls(
+            max_wait_seconds=config.get("LLM_RATE_LIMIT_MAX_WAIT_SECONDS", 30),
+            burst_seconds=config.get("LLM_RATE_LIMIT_BURST_SECONDS", 10),
+        )
+
+    def acquire(self, model: str, tokens: int) -> float:
+        """
+        Réserve une requête et ``tokens`` tokens, en attendant si nécessaire.
+
+        Returns:
+            Durée d'attente (secondes)
+
+        Raises:
+            RateLimitWaitExceeded: Si le budget ne se libère pas à temps
+        """
+        rpm, tpm = model_limits(model)
+        if not rpm and not tpm:
+            return 0.0
+
+        started = time.monotonic()
+        conflicts = 0
+        while True:
+            wait = self._try_acquire(model, rpm, tpm, tokens)
+            if wait is None:
+                conflicts += 1
+                time.sleep(self._conflict_pause(model, conflicts))
+                continue
+            if wait <= 0:
+                return time.monotonic() - started
+            time.sleep(self._pause(model, wait, started))
+
+    async def acquire_async(self, model: str, tokens: int) -> float:
+        """Variante asynchrone de ``acquire`` : l'attente ne bloque pas la boucle d'événements."""
+        from ..aio import run_in_thread
+
+        rpm, tpm = model_limits(model)
+        if not rpm and not tpm:
+            return 0.0
+
+        started = time.monotonic()
+        conflicts = 0
+        while True:
+            wait = await run_in_thread(self._try_acquire, model, rpm, tpm, tokens)
+            if wait is None:
+                conflicts += 1
+                await asyncio.sleep(self._conflict_pause(model, conflicts))
+                continue
+            if wait <= 0:
+                return time.monotonic() - started
+            await asyncio.sleep(self._pause(model, wait, started))
+
+    def _pause(self, model: str, wait: float, started: float) -> float:
+        """Durée avant nouvel essai ; lève si le délai d'attente autorisé serait dépassé."""
+        if time.monotonic() - started + wait > self.max_wait_seconds:
+            raise RateLimitWaitExceeded(model, wait)
+        # Gigue : les workers en attente ne repartent pas tous au même instant
+        return wait * random.uniform(1.0, 1.1)
+
+    def _conflict_pause(self, model: str, conflicts: int) -> float:
+        """
+        Pause avant une nouvelle réservation après un conflit de version.
+
+        Raises:
+            RateLimitWaitExceeded: Après ``_MAX_CONFLICTS`` conflits, plutôt que
+                de laisser partir l'appel sans réservation
+        """
+        if conflicts >= _MAX_CONFLICTS:
+            logger.warning(
+                "[rate_limiter][warning] Réservation abandonnée après conflits répétés",
+                extra={"model": model, "conflicts": conflicts},
+            )
+            raise RateLimitWaitExceeded(model, 0.0)
+        # Gigue croissante : les workers en concurrence se désynchronisent
+        return random.uniform(0, min(_MAX_CONFLICT_PAUSE, 0.001 * 2**conflicts))
+
+    def penalize(self, model: str, seconds: float) -> None:
+        """Suspend le modèle pour tous les workers (429 du fournisseur)."""
+        rpm, tpm = model_limits(model)
+        if not rpm and not tpm:
+            return
+        table = LLMRateLimit.__table__
+        until = time.time() + seconds
+        try:
+            with db.engine.begin() as conn:
+                updated = conn.execute(
+                    update(table)
+                    .where(table.c.model == model)
+                    .where(table.c.blocked_until < until)
+                    .values(blocked_until=until, version=table.c.version + 1)
+                ).rowcount
+                if not updated and conn.execute(
+                    select(table.c.model).where(table.c.model == model)
+                ).first() is None:
+                    conn.execute(table.insert().values(**self._full_bucket(model, rpm, tpm, until)))
+        except SQLAlchemyError as exc:
+            logger.warning(
+                "[rate_limiter][warning] Suspension du modèle impossible",
+                extra={"model": model, "error": str(exc)},
+            )
+
+    def settle(self, model: str, estimated: int, actual: int) -> None:
+        """Restitue (ou prélève) l'écart entre tokens estimés et facturés."""
+        rpm, tpm = model_limits(model)
+        if not tpm or estimated == actual:
+            return
+        table = LLMRateLimit.__table__
+        try:
+            with db.engine.begin() as conn:
+                # Le plafond est réappliqué au prochain remplissage
+                conn.execute(
+                    update(table)
+                    .where(table.c.model == model)
+                    .values(
+                        tokens=table.c.tokens + (estimated - actual),
+                        version=table.c.version + 1,
+                    )
+                )
+        except SQLAlchemyError as exc:
+            logger.warning(
+                "[rate_limiter][warning] Ajustement du budget impossible",
+                extra={"model": model, "error": str(exc)},
+            )
+
+    def _full_bucket(self, model: str, rpm: float, tpm: float, blocked_until: float = 0.0) -> dict:
+        return {
+            "model": model,
+            "requests": rpm * self.burst_seconds / 60,
+            "tokens": tpm * self.burst_seconds / 60,
+            "refilled_at": time.time(),
+            "blocked_until": blocked_until,
+            "version": 0,
+        }
+
+    def _try_acquire(self, model: str, rpm: float, tpm: float, tokens: int) -> float | None:
+        """
+        Une tentative de réservation (lecture puis UPDATE conditionné par la version).
+
+        Returns:
+            0 si réservé, le délai avant budget suffisant, ou None si un autre
+            worker a modifié le seau entre-temps
+        """
+        table = LLMRateLimit.__table__
+        now = time.time()
+        request_capacity = rpm * self.burst_seconds / 60
+        token_capacity = tpm * self.burst_seconds / 60
+        # Un appel plus gros que le seau attend qu'il soit plein
+        needed_tokens = min(tokens, token_capacity)
+
+        try:
+            with db.engine.begin() as conn:
+                row = conn.execute(select(table).where(table.c.model == model)).first()
+                if row is None:
+                    try:
+                        with conn.begin_nested():
+                            conn.execute(table.insert().values(**self._full_bucket(model, rpm, tpm)))
+                    except IntegrityError:
+                        pass
+                    # Seau créé par ce worker ou un autre : réservation immédiate
+                    row = conn.execute(select(table).where(table.c.model == model)).first()
+                    if row is None:
+                        return None
+
+                if now < row.blocked_until:
+                    return row.blocked_until - now
+
+                elapsed = max(0.0, now - row.refilled_at)
+                requests = min(request_capacity, row.requests + rpm / 60 * elapsed)
+                available_tokens = min(token_capacity, row.tokens + tpm / 60 * elapsed)
+
+                waits = []
+                if rpm and requests < 1:
+                    waits.append((1 - requests) / (rpm / 60))
+                if tpm and available_tokens < needed_tokens:
+                    waits.append((needed_tokens - available_tokens) / (tpm / 60))
+                if waits:
+                    return max(waits)
+
+                reserved = conn.execute(
+                    update(table)
+                    .where(table.c.model == model)
+                    .where(table.c.version == row.version)
+                    .values(
+                        requests=requests - 1 if rpm else 0,
+                        tokens=available_tokens - needed_tokens if tpm else 0,
+                        refilled_at=now,
+                        version=row.version + 1,
+                    )
+                ).rowcount
+        except SQLAlchemyError as exc:
+            # Table indisponible : l'appel part sans limitation locale
+            logger.warning(
+                "[rate_limiter][warning] Budget partagé indisponible",
+                extra={"model": model, "error": str(exc)},
+            )
+            return 0.0
+
+        return 0.0 if reserved else None
+
+
+def get_rate_limiter() -> LLMRateLimiter:
+    """Retourne le limiteur de l'application courante."""
+    limiter = current_app.extensions.get("llm_rate_limiter")
+    if limiter is None:
+        limiter = current_app.extensions.setdefault(
+            "llm_rate_limiter", LLMRateLimiter.from_config(current_app.config)
+        )
+    return limiter
+
+
+def retry_after_seconds(exc: BaseException) -> float | None:
+    """Délai demandé par le fournisseur (``retry-after-ms`` ou ``Retry-After``)."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return max(0.0, float(value) / 1000)
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int) -> float:
+    """Délai avant la tentative ``attempt + 1`` : exponentiel, gigue complète."""
+    config = current_app.config
+    base = config.get("LLM_RETRY_BASE_DELAY_MS", 500) / 1000
+    cap = config.get("LLM_RETRY_MAX_DELAY_SECONDS", 20)
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
@@ -0,0 +1,101 @@
+"""Extraction incrémentale d'un champ texte depuis un JSON reçu en streaming."""
+
+from __future__ import annotations
+
+import re
+
+_SIMPLE_ESCAPES = {
+    '"': '"',
+    "\\": "\\",
+    "/": "/",
+    "b": "\b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+}
+
+
+class JsonStringFieldStreamer:
+    """
+    Décode au fil de l'eau la valeur d'un champ chaîne d'un objet JSON partiel.
+
+    Chaque appel à ``feed`` reçoit un nouveau fragment de la réponse brute et
+    retourne les caractères de la valeur déjà décodables (séquences
+    d'échappement incomplètes conservées pour le fragment suivant).
+    """
+
+    def __init__(self, field: str = "message_markdown"):
+        self._start_pattern = re.compile(r'"' + re.escape(field) + r'"\s*:\s*"')
+        self._buffer = ""
+        self._pos: int | None = None
+        self.done = False
+
+    def feed(self, chunk: str) -> str:
+        if self.done or not chunk:
+            return ""
+
+        self._buffer += chunk
+        if self._pos is None:
+            match = self._start_pattern.search(self._buffer)
+            if not match:
+                return ""
+            self._pos = match.end()
+
+        out: list[str] = []
+        buffer = self._buffer
+        pos = self._pos
+
+        while pos < len(buffer):
+            char = buffer[pos]
+            if char == '"':
+                self.done = True
+                pos += 1
+                break
+            if char != "\\":
+                out.append(char)
+                pos += 1
+                continue
+
+            if pos + 1 >= len(buffer):
+                break
+            escape = buffer[pos + 1]
+            if escape in _SIMPLE_ESCAPES:
+                out.append(_SIMPLE_ESCAPES[escape])
+                pos += 2
+                continue
+            if escape != "u":
+                # Échappement invalide : restitué tel quel
+                out.append(escape)
+                pos += 2
+                continue
+
+            decoded, consumed = self._decode_unicode(buffer, pos)
+            if consumed == 0:
+                break
+            out.append(decoded)
+            pos += consumed
+
+        self._pos = pos
+        return "".join(out)
+
+    @staticmethod
+    def _decode_unicode(buffer: str, pos: int) -> tuple[str, int]:
+        """Décode ``\\uXXXX`` (et les paires de substitution) à partir de ``pos``."""
+        if pos + 6 > len(buffer):
+            return "", 0
+        code = int(buffer[pos + 2 : pos + 6], 16)
+
+        if 0xD800 <= code <= 0xDBFF:
+            if pos + 12 > len(buffer):
+                return "", 0
+            if buffer[pos + 6 : pos + 8] == "\\u":
+                low = int(buffer[pos + 8 : pos + 12], 16)
+                if 0xDC00 <= low <= 0xDFFF:
+                    combined = 0x10000 + ((code - 0xD800) << 10) + (low - 0xDC00)
+                    return chr(combined), 12
+
+        if 0xD800 <= code <= 0xDFFF:
+            # Substitut isolé : non encodable en UTF-8
+            return "\ufffd", 6
+        return chr(code), 6
@@ -0,0 +1,67 @@
+"""Comptage local des tokens (tiktoken si disponible, estimateur calibré sinon)."""
+
+from __future__ import annotations
+
+import math
+from functools import lru_cache
+from typing import Any
+
+try:  # Dépendance optionnelle
+    import tiktoken
+except ImportError:  # pragma: no cover - dépend de l'environnement
+    tiktoken = None
+
+# Caractères par token observés sur des échanges marketing en français
+# (cl100k/o200k) ; légèrement pessimiste pour ne pas dépasser le budget.
+CHARS_PER_TOKEN = 3.6
+
+# Surcoût par message du format chat (rôle, séparateurs) et amorce de réponse
+TOKENS_PER_MESSAGE = 4
+TOKENS_REPLY_PRIMING = 3
+
+
+@lru_cache(maxsize=8)
+def _encoding(model: str | None):
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model or "gpt-4o-mini")
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        # Fichiers d'encodage indisponibles (pas de réseau) : estimateur
+        return None
+
+
+def tokenizer_name(model: str | None = None) -> str:
+    """Nom de la méthode de comptage utilisée (``tiktoken:<encodage>`` ou ``estimator``)."""
+    encoding = _encoding(model)
+    return f"tiktoken:{encoding.name}" if encoding is not None else "estimator"
+
+
+def count_tokens(text: str | None, model: str | None = None) -> int:
+    """Nombre de tokens d'un texte."""
+    if not text:
+        return 0
+    encoding = _encoding(model)
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model: str | None = None) -> str:
+    """Tronque un texte à ``max_tokens`` tokens (chaîne vide si le budget est nul)."""
+    if max_tokens <= 0:
+        return ""
+    encoding = _encoding(model)
+    if encoding is not None:
+        tokens = encoding.encode(text, disallowed_special=())
+        return text if len(tokens) <= max_tokens else encoding.decode(tokens[:max_tokens])
+    return text[: int(max_tokens * CHARS_PER_TOKEN)]
+
+
+def count_message_tokens(messages: list[dict[str, Any]], model: str | None = None) -> int:
+    """Nombre de tokens d'une liste de messages chat (contenu et surcoût de format)."""
+    return TOKENS_REPLY_PRIMING + sum(
+        TOKENS_PER_MESSAGE + count_tokens(message.get("content"), model) for message in messages
+    )
@@ -0,0 +1,48 @@
+"""Exécution du code bloquant (base de données) depuis le service ASGI.
+
+Les routes asynchrones n'attendent sur la boucle d'événements que les appels
+LLM ; le travail SQL est déporté dans un pool de threads borné
+(``ASYNC_DB_MAX_WORKERS``). Chaque appel déporté ouvre son propre contexte
+d'application, donc sa propre session SQLAlchemy, fermée à la fin de l'appel :
+seules des données simples (IDs, dicts) circulent entre les étapes.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from flask import Flask, current_app
+
+T = TypeVar("T")
+
+
+def get_db_executor(app: Flask | None = None) -> ThreadPoolExecutor:
+    """Retourne le pool de threads de l'application (créé au premier usage)."""
+    app = app or current_app._get_current_object()
+    executor = app.extensions.get("db_executor")
+    if executor is None:
+        executor = app.extensions.setdefault(
+            "db_executor",
+            ThreadPoolExecutor(
+                max_workers=app.config.get("ASYNC_DB_MAX_WORKERS", 32),
+                thread_name_prefix="asgi-db",
+            ),
+        )
+    return executor
+
+
+async def run_in_thread(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Exécute ``fn`` dans le pool de threads, sous un contexte d'application neuf.
+
+    Doit être appelé sous le contexte d'application de la requête asynchrone.
+    """
+    app = current_app._get_current_object()
+
+    def call() -> T:
+        with app.app_context():
+            return fn(*args, **kwargs)
+
+    return await asyncio.get_running_loop().run_in_executor(get_db_executor(app), call)
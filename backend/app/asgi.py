@@ -0,0 +1,206 @@
+"""Service ASGI des routes IA.
+
+Un worker WSGI reste bloqué pendant toute la durée d'un appel LLM : le
+nombre de requêtes IA simultanées est plafonné par le nombre de threads.
+Ce service attend ces appels sur une boucle d'événements (``AsyncOpenAI``),
+les routes listées dans ``routes.async_views.ASYNC_VIEWS`` y sont servies
+nativement ; toutes les autres requêtes sont transmises à l'application
+Flask, exécutée dans un thread.
+
+Le routage, les hooks ``before_request``/``after_request`` (CORS,
+profilage) et les gestionnaires d'erreurs restent ceux de Flask.
+
+Lancement :
+    uvicorn --factory app.asgi:create_asgi_app --host 0.0.0.0 --port 5000
+"""
+
+from __future__ import annotations
+
+import asyncio
+import io
+import logging
+import sys
+from typing import Any, Awaitable, Callable
+
+from flask import Flask, request, request_started
+
+from . import create_app
+from .ai.client_pool import close_async_openai_clients
+from .routes.async_views import ASYNC_VIEWS
+
+logger = logging.getLogger(__name__)
+
+Receive = Callable[[], Awaitable[dict[str, Any]]]
+Send = Callable[[dict[str, Any]], Awaitable[None]]
+
+
+class AsyncAIApplication:
+    """Application ASGI : routes IA asynchrones, le reste délégué à Flask."""
+
+    def __init__(self, flask_app: Flask):
+        self.flask_app = flask_app
+
+    async def __call__(self, scope: dict[str, Any], receive: Receive, send: Send) -> None:
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        body = await _read_body(receive)
+        ctx = self.flask_app.request_context(_environ(scope, body))
+        ctx.push()
+        error: BaseException | None = None
+        try:
+            response = await self._dispatch()
+        except BaseException as exc:
+            error = exc
+            raise
+        finally:
+            ctx.pop(error)
+
+        if response is None:
+            await self._delegate(_environ(scope, body), send)
+            return
+
+        await send({
+            "type": "http.response.start",
+            "status": response.status_code,
+            "headers": [
+                (name.lower().encode("latin-1"), value.encode("latin-1"))
+                for name, value in response.headers.to_wsgi_list()
+            ],
+        })
+        await send({"type": "http.response.body", "body": response.get_data()})
+
+    async def _dispatch(self):
+        """Équivalent asynchrone de ``Flask.full_dispatch_request`` (None : délégation)."""
+        app = self.flask_app
+        if request.routing_exception is not None or request.method == "OPTIONS":
+            return None
+        view = ASYNC_VIEWS.get(request.url_rule.endpoint)
+        if view is None:
+            return None
+
+        try:
+            try:
+                request_started.send(app, _async_wrapper=app.ensure_sync)
+                rv = app.preprocess_request()
+                if rv is None:
+                    rv = await view(**request.view_args)
+                    if rv is None:
+                        return None
+            except Exception as exc:
+                rv = app.handle_user_exception(exc)
+            return app.finalize_request(rv)
+        except Exception as exc:
+            return app.handle_exception(exc)
+
+    async def _delegate(self, environ: dict[str, Any], send: Send) -> None:
+        """Exécute la requête dans l'application Flask, dans un thread du pool de la boucle."""
+        loop = asyncio.get_running_loop()
+        started: list[dict[str, Any]] = []
+
+        def sync_send(message: dict[str, Any]) -> None:
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        def start_response(status: str, headers: list[tuple[str, str]], exc_info: Any = None):
+            started[:] = [{
+                "type": "http.response.start",
+                "status": int(status.split(" ", 1)[0]),
+                "headers": [
+                    (name.lower().encode("latin-1"), value.encode("latin-1"))
+                    for name, value in headers
+                ],
+            }]
+
+        def run() -> None:
+            chunks = self.flask_app(environ, start_response)
+            sent = False
+            try:
+                # Réponses en flux (SSE, NDJSON) : chaque fragment part dès qu'il est produit
+                for chunk in chunks:
+                    if not chunk:
+                        continue
+                    if not sent:
+                        sync_send(started[0])
+                        sent = True
+                    sync_send({"type": "http.response.body", "body": chunk, "more_body": True})
+            finally:
+                if hasattr(chunks, "close"):
+                    chunks.close()
+            if not sent:
+                sync_send(started[0])
+            sync_send({"type": "http.response.body", "body": b""})
+
+        await loop.run_in_executor(None, run)
+
+    async def _lifespan(self, receive: Receive, send: Send) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                logger.info("[asgi][start] Service ASGI démarré")
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.close()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def close(self) -> None:
+        """Ferme les clients AsyncOpenAI de la boucle et le pool de threads SQL."""
+        await close_async_openai_clients()
+        executor = self.flask_app.extensions.pop("db_executor", None)
+        if executor is not None:
+            executor.shutdown(wait=False)
+        logger.info("[asgi][success] Service ASGI arrêté")
+
+
+def _environ(scope: dict[str, Any], body: bytes) -> dict[str, Any]:
+    """Environnement WSGI de la requête ASGI (corps déjà lu)."""
+    root_path = scope.get("root_path", "")
+    path = scope["path"]
+    if path.startswith(root_path):
+        path = path[len(root_path):]
+    server = scope.get("server") or ("localhost", 80)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": root_path.encode("utf-8").decode("latin-1"),
+        "PATH_INFO": path.encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope["query_string"].decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    if scope.get("client"):
+        environ["REMOTE_ADDR"] = scope["client"][0]
+    for name, value in scope.get("headers", []):
+        key = name.decode("latin-1").upper().replace("-", "_")
+        if key not in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+            key = f"HTTP_{key}"
+        value = value.decode("latin-1")
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+async def _read_body(receive: Receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body"):
+            break
+    return b"".join(chunks)
+
+
+def create_asgi_app(test_config: dict | None = None) -> AsyncAIApplication:
+    """Fabrique de l'application ASGI (``uvicorn --factory``)."""
+    return AsyncAIApplication(create_app(test_config))
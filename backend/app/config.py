@@ -1,3 +1,4 @@
+import json
 import os
 
 
@@ -13,9 +14,85 @@ class BaseConfig:
     SQLALCHEMY_ENGINE_OPTIONS = {"pool_pre_ping": True}
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
     OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+    OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL")
+    OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "30"))
+    OPENAI_CONNECT_TIMEOUT = float(os.getenv("OPENAI_CONNECT_TIMEOUT", "5"))
+    # Nouvelles tentatives HTTP du SDK ; celles de l'application (backoff partagé) suffisent
+    OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "0"))
+    OPENAI_POOL_MAX_CONNECTIONS = int(os.getenv("OPENAI_POOL_MAX_CONNECTIONS", "20"))
+    OPENAI_POOL_MAX_KEEPALIVE = int(os.getenv("OPENAI_POOL_MAX_KEEPALIVE", "10"))
+    OPENAI_KEEPALIVE_EXPIRY = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "60"))
+    # Service ASGI (app.asgi) : connexions AsyncOpenAI par boucle, threads des étapes SQL
+    OPENAI_ASYNC_POOL_MAX_CONNECTIONS = int(os.getenv("OPENAI_ASYNC_POOL_MAX_CONNECTIONS", "500"))
+    ASYNC_DB_MAX_WORKERS = int(os.getenv("ASYNC_DB_MAX_WORKERS", "32"))
+    AI_CACHE_ENABLED = os.getenv("AI_CACHE_ENABLED", "true").lower() == "true"
+    AI_CACHE_PERSISTENT = os.getenv("AI_CACHE_PERSISTENT", "true").lower() == "true"
+    AI_CACHE_TTL_SECONDS = int(os.getenv("AI_CACHE_TTL_SECONDS", "86400"))
+    AI_CACHE_MAX_ENTRIES = int(os.getenv("AI_CACHE_MAX_ENTRIES", "256"))
+    AI_CACHE_DB_MAX_ENTRIES = int(os.getenv("AI_CACHE_DB_MAX_ENTRIES", "10000"))
+    CHAT_CONTEXT_CACHE_ENABLED = os.getenv("CHAT_CONTEXT_CACHE_ENABLED", "true").lower() == "true"
+    CHAT_CONTEXT_CACHE_TTL_SECONDS = int(os.getenv("CHAT_CONTEXT_CACHE_TTL_SECONDS", "300"))
+    CHAT_CONTEXT_CACHE_MAX_ENTRIES = int(os.getenv("CHAT_CONTEXT_CACHE_MAX_ENTRIES", "512"))
+    # Détails scénario/configuration encodés, servis tant que leur version ne change pas ;
+    # stockage "memory" (LRU du worker) ou "local_kv" (fichier partagé par les workers)
+    DETAIL_CACHE_ENABLED = os.getenv("DETAIL_CACHE_ENABLED", "true").lower() == "true"
+    DETAIL_CACHE_BACKEND = os.getenv("DETAIL_CACHE_BACKEND", "memory")
+    DETAIL_CACHE_MAX_ENTRIES = int(os.getenv("DETAIL_CACHE_MAX_ENTRIES", "2048"))
+    DETAIL_CACHE_PATH = os.getenv("DETAIL_CACHE_PATH") or None
+    CHAT_HISTORY_MAX_MESSAGES = int(os.getenv("CHAT_HISTORY_MAX_MESSAGES", "30"))
+    CHAT_CONTEXT_TOKEN_BUDGET = int(os.getenv("CHAT_CONTEXT_TOKEN_BUDGET", "1500"))
+    # Budgets par intention, ex. {"generate_plan": 3000}
+    CHAT_CONTEXT_TOKEN_BUDGETS = json.loads(os.getenv("CHAT_CONTEXT_TOKEN_BUDGETS", "{}"))
     PURGE_TTL_DAYS = int(os.getenv("PURGE_TTL_DAYS", "7"))
     PURGE_JOB_HOUR = int(os.getenv("PURGE_JOB_HOUR", "2"))
+    PURGE_BATCH_SIZE = int(os.getenv("PURGE_BATCH_SIZE", "1000"))
+    PURGE_BATCH_SLEEP_MS = int(os.getenv("PURGE_BATCH_SLEEP_MS", "100"))
+    PURGE_DRY_RUN = os.getenv("PURGE_DRY_RUN", "false").lower() == "true"
+    SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "true").lower() == "true"
     SCHEDULER_TIMEZONE = os.getenv("SCHEDULER_TIMEZONE", "UTC")
+    SUGGEST_BATCH_MAX_WORKERS = int(os.getenv("SUGGEST_BATCH_MAX_WORKERS", "8"))
+    SUGGEST_BATCH_MAX_CONFIGURATIONS = int(os.getenv("SUGGEST_BATCH_MAX_CONFIGURATIONS", "50"))
+    SUGGEST_EXISTING_LABELS_TOP_K = int(os.getenv("SUGGEST_EXISTING_LABELS_TOP_K", "20"))
+    # Suggestions pré-générées : servies telles quelles jusqu'au TTL, puis
+    # servies périmées pendant leur régénération jusqu'à MAX_STALE
+    SUGGESTION_STORE_ENABLED = os.getenv("SUGGESTION_STORE_ENABLED", "true").lower() == "true"
+    SUGGESTION_STORE_TTL_SECONDS = int(os.getenv("SUGGESTION_STORE_TTL_SECONDS", "3600"))
+    SUGGESTION_STORE_MAX_STALE_SECONDS = int(os.getenv("SUGGESTION_STORE_MAX_STALE_SECONDS", "604800"))
+    SUGGESTION_REFRESH_LEASE_SECONDS = int(os.getenv("SUGGESTION_REFRESH_LEASE_SECONDS", "300"))
+    SUGGESTION_PREFETCH_ENABLED = os.getenv("SUGGESTION_PREFETCH_ENABLED", "true").lower() == "true"
+    # Appels IA identiques simultanés : une seule exécution partagée
+    SINGLE_FLIGHT_ENABLED = os.getenv("SINGLE_FLIGHT_ENABLED", "true").lower() == "true"
+    SINGLE_FLIGHT_PERSISTENT = os.getenv("SINGLE_FLIGHT_PERSISTENT", "true").lower() == "true"
+    SINGLE_FLIGHT_LEASE_SECONDS = int(os.getenv("SINGLE_FLIGHT_LEASE_SECONDS", "120"))
+    SINGLE_FLIGHT_WAIT_SECONDS = int(os.getenv("SINGLE_FLIGHT_WAIT_SECONDS", "120"))
+    SINGLE_FLIGHT_RESULT_TTL_SECONDS = int(os.getenv("SINGLE_FLIGHT_RESULT_TTL_SECONDS", "5"))
+    SINGLE_FLIGHT_POLL_INTERVAL_MS = int(os.getenv("SINGLE_FLIGHT_POLL_INTERVAL_MS", "250"))
+    # Débit LLM partagé entre workers, par modèle (0 : dimension non limitée) ;
+    # surcharges par modèle, ex. {"gpt-4o": {"rpm": 500, "tpm": 30000}}
+    LLM_RATE_LIMIT_RPM = int(os.getenv("LLM_RATE_LIMIT_RPM", "0"))
+    LLM_RATE_LIMIT_TPM = int(os.getenv("LLM_RATE_LIMIT_TPM", "0"))
+    LLM_RATE_LIMITS = json.loads(os.getenv("LLM_RATE_LIMITS", "{}"))
+    LLM_RATE_LIMIT_BURST_SECONDS = float(os.getenv("LLM_RATE_LIMIT_BURST_SECONDS", "10"))
+    LLM_RATE_LIMIT_MAX_WAIT_SECONDS = float(os.getenv("LLM_RATE_LIMIT_MAX_WAIT_SECONDS", "30"))
+    LLM_RATE_LIMIT_COMPLETION_TOKENS = int(os.getenv("LLM_RATE_LIMIT_COMPLETION_TOKENS", "500"))
+    LLM_RETRY_MAX_ATTEMPTS = int(os.getenv("LLM_RETRY_MAX_ATTEMPTS", "4"))
+    LLM_RETRY_BASE_DELAY_MS = int(os.getenv("LLM_RETRY_BASE_DELAY_MS", "500"))
+    LLM_RETRY_MAX_DELAY_SECONDS = float(os.getenv("LLM_RETRY_MAX_DELAY_SECONDS", "20"))
+    BATCH_CREATE_MAX_SCENARIOS = int(os.getenv("BATCH_CREATE_MAX_SCENARIOS", "5000"))
+    # Répertoire partagé des instantanés de métriques par worker (vide : worker seul)
+    METRICS_DIR = os.getenv("METRICS_DIR") or None
+    METRICS_FLUSH_INTERVAL_SECONDS = float(os.getenv("METRICS_FLUSH_INTERVAL_SECONDS", "5"))
+    SQL_PROFILING_ENABLED = os.getenv("SQL_PROFILING_ENABLED", "false").lower() == "true"
+    SQL_PROFILING_HEADER = os.getenv("SQL_PROFILING_HEADER", "X-Debug-Profile")
+    SLOW_REQUEST_THRESHOLD_MS = int(os.getenv("SLOW_REQUEST_THRESHOLD_MS", "500"))
+    SLOW_REQUEST_TOP_STATEMENTS = int(os.getenv("SLOW_REQUEST_TOP_STATEMENTS", "5"))
+    EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "200"))
+    API_DEFAULT_PAGE_SIZE = int(os.getenv("API_DEFAULT_PAGE_SIZE", "50"))
+    API_MAX_PAGE_SIZE = int(os.getenv("API_MAX_PAGE_SIZE", "200"))
+    JOBS_MAX_WORKERS = int(os.getenv("JOBS_MAX_WORKERS", "4"))
+    JOBS_STALE_AFTER_SECONDS = int(os.getenv("JOBS_STALE_AFTER_SECONDS", "600"))
+    JOBS_RESUME_INTERVAL_SECONDS = int(os.getenv("JOBS_RESUME_INTERVAL_SECONDS", "60"))
+    JOBS_EAGER = os.getenv("JOBS_EAGER", "false").lower() == "true"
     CORS_ALLOW_ORIGINS = os.getenv("CORS_ALLOW_ORIGINS", "*")
 
 
@@ -31,6 +108,8 @@ class TestingConfig(BaseConfig):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
     CORS_ALLOW_ORIGINS = "*"
+    AI_CACHE_PERSISTENT = False
+    SUGGESTION_PREFETCH_ENABLED = False
 
 
 def get_config():
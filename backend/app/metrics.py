@@ -0,0 +1,208 @@
+"""Registre de métriques du processus, exporté au format texte Prometheus.
+
+Chaque worker agrège ses compteurs et histogrammes en mémoire. Si
+``METRICS_DIR`` est configuré, il en écrit un instantané
+(``metrics_<pid>.json``) au plus toutes les ``METRICS_FLUSH_INTERVAL_SECONDS``
+et à l'arrêt ; ``/metrics`` additionne alors les instantanés de tous les
+workers, quel que soit celui qui reçoit la requête. Le répertoire est à vider
+au démarrage du déploiement (sinon les totaux des anciens processus restent
+comptés).
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+# Bornes des histogrammes de latence (secondes)
+DEFAULT_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+LabelSet = tuple[tuple[str, str], ...]
+
+
+def _labels(labels: dict[str, Any] | None) -> LabelSet:
+    return tuple(sorted((key, str(value)) for key, value in (labels or {}).items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: LabelSet, extra: tuple[str, str] | None = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class MetricsRegistry:
+    """Compteurs et histogrammes étiquetés, thread-safe."""
+
+    def __init__(self, directory: str | None = None, flush_interval: float = 5.0):
+        self.directory = Path(directory) if directory else None
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._descriptions: dict[str, tuple[str, str, tuple[float, ...]]] = {}
+        self._counters: dict[tuple[str, LabelSet], float] = {}
+        # [compteurs par borne..., somme, nombre]
+        self._histograms: dict[tuple[str, LabelSet], list[float]] = {}
+        self._last_flush = 0.0
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            atexit.register(self.flush, force=True)
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any]) -> "MetricsRegistry":
+        return cls(
+            directory=config.get("METRICS_DIR"),
+            flush_interval=config.get("METRICS_FLUSH_INTERVAL_SECONDS", 5.0),
+        )
+
+    def describe(
+        self,
+        name: str,
+        kind: str,
+        help_text: str,
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        """Déclare une métrique (``counter`` ou ``histogram``)."""
+        with self._lock:
+            self._descriptions.setdefault(name, (kind, help_text, buckets))
+
+    def inc(self, name: str, labels: dict[str, Any] | None = None, value: float = 1.0) -> None:
+        key = (name, _labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+        self.flush()
+
+    def observe(self, name: str, value: float, labels: dict[str, Any] | None = None) -> None:
+        key = (name, _labels(labels))
+        with self._lock:
+            buckets = self._descriptions.get(name, ("histogram", "", DEFAULT_BUCKETS))[2]
+            series = self._histograms.get(key)
+            if series is None:
+                series = self._histograms[key] = [0.0] * (len(buckets) + 2)
+            for position, bound in enumerate(buckets):
+                if value <= bound:
+                    series[position] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+        self.flush()
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "descriptions": {
+                    name: [kind, help_text, list(buckets)]
+                    for name, (kind, help_text, buckets) in self._descriptions.items()
+                },
+                "counters": [
+                    [name, list(map(list, labels)), value]
+                    for (name, labels), value in self._counters.items()
+                ],
+                "histograms": [
+                    [name, list(map(list, labels)), list(series)]
+                    for (name, labels), series in self._histograms.items()
+                ],
+            }
+
+    def flush(self, force: bool = False) -> None:
+        """Écrit l'instantané du processus dans ``METRICS_DIR`` (écriture atomique)."""
+        if self.directory is None:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_flush < self.flush_interval:
+            return
+        self._last_flush = now
+
+        path = self.directory / f"metrics_{os.getpid()}.json"
+        temporary = path.with_suffix(".tmp")
+        try:
+            temporary.write_text(json.dumps(self.snapshot()), encoding="utf-8")
+            os.replace(temporary, path)
+        except OSError as exc:
+            logger.warning(
+                "[metrics][warning] Écriture de l'instantané impossible",
+                extra={"path": str(path), "error": str(exc)},
+            )
+
+    def _snapshots(self) -> list[dict[str, Any]]:
+        snapshots = [self.snapshot()]
+        if self.directory is None:
+            return snapshots
+        own = f"metrics_{os.getpid()}.json"
+        for path in sorted(self.directory.glob("metrics_*.json")):
+            if path.name == own:
+                continue
+            try:
+                snapshots.append(json.loads(path.read_text(encoding="utf-8")))
+            except (OSError, ValueError):
+                continue  # fichier en cours de remplacement
+        return snapshots
+
+    def render(self) -> str:
+        """Exposition texte Prometheus (version 0.0.4), tous workers confondus."""
+        descriptions: dict[str, tuple[str, str, tuple[float, ...]]] = {}
+        counters: dict[tuple[str, LabelSet], float] = {}
+        histograms: dict[tuple[str, LabelSet], list[float]] = {}
+
+        for snapshot in self._snapshots():
+            for name, (kind, help_text, buckets) in snapshot["descriptions"].items():
+                descriptions.setdefault(name, (kind, help_text, tuple(buckets)))
+            for name, labels, value in snapshot["counters"]:
+                key = (name, tuple(map(tuple, labels)))
+                counters[key] = counters.get(key, 0.0) + value
+            for name, labels, series in snapshot["histograms"]:
+                key = (name, tuple(map(tuple, labels)))
+                total = histograms.setdefault(key, [0.0] * len(series))
+                for position, value in enumerate(series):
+                    total[position] += value
+
+        lines: list[str] = []
+        for name in sorted(descriptions):
+            kind, help_text, buckets = descriptions[name]
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == "counter":
+                for (series_name, labels), value in sorted(counters.items()):
+                    if series_name == name:
+                        lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+                continue
+            for (series_name, labels), series in sorted(histograms.items()):
+                if series_name != name:
+                    continue
+                cumulative = 0.0
+                for bound, count in zip(buckets, series):
+                    cumulative += count
+                    bucket_labels = _format_labels(labels, ("le", _format_value(bound)))
+                    lines.append(f"{name}_bucket{bucket_labels} {_format_value(cumulative)}")
+                inf_labels = _format_labels(labels, ("le", "+Inf"))
+                lines.append(f"{name}_bucket{inf_labels} {_format_value(series[-1])}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(series[-2])}")
+                lines.append(f"{name}_count{_format_labels(labels)} {_format_value(series[-1])}")
+        return "\n".join(lines) + "\n"
+
+
+def get_metrics() -> MetricsRegistry:
+    """Retourne le registre de l'application courante."""
+    registry = current_app.extensions.get("metrics")
+    if registry is None:
+        registry = current_app.extensions.setdefault(
+            "metrics", MetricsRegistry.from_config(current_app.config)
+        )
+    return registry
@@ -3,8 +3,8 @@ from __future__ import annotations
 from datetime import datetime, timezone, timedelta
 from enum import Enum
 
-from sqlalchemy import Enum as SAEnum, UniqueConstraint
-from sqlalchemy.orm import mapped_column, relationship
+from sqlalchemy import Enum as SAEnum, UniqueConstraint, event
+from sqlalchemy.orm import mapped_column, object_session, relationship
 
 from ..extensions import db
 
@@ -20,6 +20,20 @@ class TimestampMixin:
     )
 
 
+class VersionMixin:
+    # Compteur incrémenté à chaque modification : contrairement à updated_at
+    # (DATETIME à la seconde sous MySQL), il distingue deux écritures rapprochées
+    version = mapped_column(db.Integer, nullable=False, default=0, server_default="0")
+
+
+@event.listens_for(VersionMixin, "before_update", propagate=True)
+def _bump_version(mapper, connection, target) -> None:
+    session = object_session(target)
+    if session is not None and session.is_modified(target, include_collections=False):
+        # Incrément côté base : pas de lecture préalable, pas d'écriture perdue
+        target.version = type(target).version + 1
+
+
 configuration_objectifs = db.Table(
     "configuration_objectifs",
     db.Column("configuration_id", db.Integer, db.ForeignKey("configurations.id"), primary_key=True),
@@ -41,7 +55,7 @@ configuration_cibles = db.Table(
 )
 
 
-class Scenario(db.Model, TimestampMixin):
+class Scenario(db.Model, TimestampMixin, VersionMixin):
     __tablename__ = "scenarios"
 
     id = mapped_column(db.Integer, primary_key=True)
@@ -58,11 +72,14 @@ class Scenario(db.Model, TimestampMixin):
     messages = relationship("Message", back_populates="scenario", lazy="dynamic")
     recherches = relationship("Recherche", back_populates="scenario", lazy="selectin")
 
+    # Tri de la liste paginée (updated_at DESC, id DESC)
+    __table_args__ = (db.Index("ix_scenarios_updated_id", "updated_at", "id"),)
+
     def compute_ttl(self, ttl_days: int) -> datetime:
         return datetime.now(timezone.utc) + timedelta(days=ttl_days)
 
 
-class Objectif(db.Model, TimestampMixin):
+class Objectif(db.Model, TimestampMixin, VersionMixin):
     __tablename__ = "objectifs"
 
     id = mapped_column(db.Integer, primary_key=True)
@@ -74,7 +91,7 @@ class Objectif(db.Model, TimestampMixin):
     )
 
 
-class Cible(db.Model, TimestampMixin):
+class Cible(db.Model, TimestampMixin, VersionMixin):
     __tablename__ = "cibles"
 
     id = mapped_column(db.Integer, primary_key=True)
@@ -87,7 +104,7 @@ class Cible(db.Model, TimestampMixin):
     )
 
 
-class Configuration(db.Model, TimestampMixin):
+class Configuration(db.Model, TimestampMixin, VersionMixin):
     __tablename__ = "configurations"
 
     id = mapped_column(db.Integer, primary_key=True)
@@ -111,7 +128,7 @@ class Configuration(db.Model, TimestampMixin):
     messages = relationship("Message", back_populates="configuration", lazy="dynamic")
 
 
-class Plan(db.Model, TimestampMixin):
+class Plan(db.Model, TimestampMixin, VersionMixin):
     __tablename__ = "plans"
 
     id = mapped_column(db.Integer, primary_key=True)
@@ -126,7 +143,7 @@ class Plan(db.Model, TimestampMixin):
     articles = relationship("Article", back_populates="plan", cascade="all, delete-orphan", lazy="selectin")
 
 
-class PlanItem(db.Model, TimestampMixin):
+class PlanItem(db.Model, TimestampMixin, VersionMixin):
     __tablename__ = "plan_items"
 
     id = mapped_column(db.Integer, primary_key=True)
@@ -146,7 +163,7 @@ class AuteurType(str, Enum):
     SYSTEM = "system"
 
 
-class Article(db.Model, TimestampMixin):
+class Article(db.Model, TimestampMixin, VersionMixin):
     __tablename__ = "articles"
 
     id = mapped_column(db.Integer, primary_key=True)
@@ -167,10 +184,14 @@ class Message(db.Model, TimestampMixin):
     contenu = mapped_column(db.Text, nullable=False)
     role_action = mapped_column(db.String(60), nullable=True)
     ttl = mapped_column(db.DateTime(timezone=True), nullable=True)
+    token_count = mapped_column(db.Integer, nullable=True)
 
     scenario = relationship("Scenario", back_populates="messages")
     configuration = relationship("Configuration", back_populates="messages")
 
+    # Purge par lots des messages expirés
+    __table_args__ = (db.Index("ix_messages_ttl", "ttl"),)
+
 
 class Recherche(db.Model, TimestampMixin):
     __tablename__ = "recherches"
@@ -181,3 +202,75 @@ class Recherche(db.Model, TimestampMixin):
     resultat = mapped_column(db.Text, nullable=False)
 
     scenario = relationship("Scenario", back_populates="recherches")
+
+
+class AIResponseCacheEntry(db.Model):
+    __tablename__ = "ai_response_cache"
+
+    cache_key = mapped_column(db.String(64), primary_key=True)
+    model = mapped_column(db.String(80), nullable=False)
+    schema_name = mapped_column(db.String(80), nullable=False)
+    payload = mapped_column(db.Text, nullable=False)
+    created_at = mapped_column(
+        db.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
+    expires_at = mapped_column(db.DateTime(timezone=True), nullable=False, index=True)
+
+
+class StoredSuggestions(db.Model):
+    __tablename__ = "suggestion_store"
+
+    # Empreinte des entrées du prompt (type, scénario, objectifs sélectionnés)
+    input_key = mapped_column(db.String(64), primary_key=True)
+    kind = mapped_column(db.String(20), nullable=False)
+    payload = mapped_column(db.Text, nullable=False)
+    generated_at = mapped_column(db.DateTime(timezone=True), nullable=False, index=True)
+    refresh_started_at = mapped_column(db.DateTime(timezone=True), nullable=True)
+
+
+class AIFlight(db.Model):
+    __tablename__ = "ai_flights"
+
+    # Appel IA en cours ou tout juste terminé, partagé entre workers
+    flight_key = mapped_column(db.String(64), primary_key=True)
+    call_site = mapped_column(db.String(60), nullable=False)
+    owner = mapped_column(db.String(64), nullable=False)
+    status = mapped_column(db.String(20), nullable=False)
+    result = mapped_column(db.Text, nullable=True)
+    started_at = mapped_column(db.DateTime(timezone=True), nullable=False)
+    finished_at = mapped_column(db.DateTime(timezone=True), nullable=True)
+    expires_at = mapped_column(db.DateTime(timezone=True), nullable=False, index=True)
+
+
+class LLMRateLimit(db.Model):
+    __tablename__ = "llm_rate_limits"
+
+    # Seaux à jetons partagés entre workers (horodatages epoch en secondes)
+    model = mapped_column(db.String(80), primary_key=True)
+    requests = mapped_column(db.Float, nullable=False)
+    tokens = mapped_column(db.Float, nullable=False)
+    refilled_at = mapped_column(db.Float, nullable=False)
+    blocked_until = mapped_column(db.Float, nullable=False, default=0)
+    version = mapped_column(db.Integer, nullable=False, default=0)
+
+
+class JobStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class Job(db.Model, TimestampMixin):
+    __tablename__ = "jobs"
+    __table_args__ = (db.Index("ix_jobs_status_created", "status", "created_at"),)
+
+    id = mapped_column(db.String(36), primary_key=True)
+    kind = mapped_column(db.String(60), nullable=False)
+    status = mapped_column(db.String(20), default=JobStatus.PENDING.value, nullable=False)
+    payload = mapped_column(db.Text, nullable=False)
+    result = mapped_column(db.Text, nullable=True)
+    error = mapped_column(db.Text, nullable=True)
+    attempts = mapped_column(db.SmallInteger, default=0, nullable=False)
+    started_at = mapped_column(db.DateTime(timezone=True), nullable=True)
+    finished_at = mapped_column(db.DateTime(timezone=True), nullable=True)
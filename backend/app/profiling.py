@@ -0,0 +1,123 @@
+"""Profilage SQL par requête HTTP (nombre de requêtes, temps base, requêtes lentes).
+
+Activé par ``SQL_PROFILING_ENABLED``. Les événements du moteur SQLAlchemy
+cumulent, pour la requête HTTP en cours, le nombre d'instructions et leur
+durée par texte SQL. Le résumé est renvoyé dans l'en-tête ``Server-Timing``
+si la requête porte l'en-tête ``SQL_PROFILING_HEADER``, et une requête plus
+longue que ``SLOW_REQUEST_THRESHOLD_MS`` est journalisée avec ses
+instructions les plus coûteuses.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from typing import Any
+
+from flask import Flask, Response, g, has_request_context, request
+from sqlalchemy import event
+
+from .extensions import db
+
+logger = logging.getLogger(__name__)
+
+# Longueur maximale d'une instruction dans le journal
+_STATEMENT_MAX_LENGTH = 300
+
+
+class RequestProfile:
+    """Instructions SQL exécutées pendant une requête HTTP."""
+
+    __slots__ = ("started", "count", "db_seconds", "statements")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.count = 0
+        self.db_seconds = 0.0
+        # Texte SQL -> [exécutions, durée cumulée]
+        self.statements: dict[str, list[float]] = {}
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.db_seconds += seconds
+        entry = self.statements.setdefault(statement, [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+
+    def top_statements(self, limit: int) -> list[dict[str, Any]]:
+        ranked = sorted(self.statements.items(), key=lambda item: item[1][1], reverse=True)
+        return [
+            {
+                "statement": " ".join(statement.split())[:_STATEMENT_MAX_LENGTH],
+                "count": int(count),
+                "duration_ms": round(seconds * 1000, 2),
+            }
+            for statement, (count, seconds) in ranked[:limit]
+        ]
+
+
+def _current_profile() -> RequestProfile | None:
+    if not has_request_context():
+        return None
+    return g.get("sql_profile")
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_profile() is not None:
+        conn.info.setdefault("sql_profile_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current_profile()
+    started = conn.info.get("sql_profile_started")
+    if profile is not None and started:
+        profile.record(statement, time.perf_counter() - started.pop())
+
+
+def _server_timing(profile: RequestProfile, total_seconds: float) -> str:
+    return (
+        f'db;dur={profile.db_seconds * 1000:.2f};desc="{profile.count} queries", '
+        f"app;dur={total_seconds * 1000:.2f}"
+    )
+
+
+def init_sql_profiling(app: Flask) -> None:
+    """Branche le profilage sur le moteur de l'application et ses requêtes."""
+    with app.app_context():
+        engine = db.engine
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+    @app.before_request
+    def start_sql_profile():
+        g.sql_profile = RequestProfile()
+
+    @app.after_request
+    def report_sql_profile(response: Response) -> Response:
+        profile: RequestProfile | None = g.pop("sql_profile", None)
+        if profile is None:
+            return response
+        total = time.perf_counter() - profile.started
+
+        if request.headers.get(app.config.get("SQL_PROFILING_HEADER", "X-Debug-Profile")):
+            response.headers.add("Server-Timing", _server_timing(profile, total))
+
+        threshold_ms = app.config.get("SLOW_REQUEST_THRESHOLD_MS", 500)
+        if total * 1000 >= threshold_ms:
+            logger.warning(
+                "[profiling][slow] Requête lente",
+                extra={
+                    "method": request.method,
+                    "path": request.path,
+                    "endpoint": request.endpoint,
+                    "status": response.status_code,
+                    "duration_ms": round(total * 1000, 2),
+                    "db_ms": round(profile.db_seconds * 1000, 2),
+                    "query_count": profile.count,
+                    "top_statements": profile.top_statements(
+                        app.config.get("SLOW_REQUEST_TOP_STATEMENTS", 5)
+                    ),
+                },
+            )
+        return response
@@ -3,7 +3,9 @@ from flask import Blueprint
 from .chat import chat_bp
 from .cibles import init_cible_routes
 from .configurations import init_configuration_routes
+from .exports import init_export_routes
 from .health import init_health_routes
+from .jobs import init_job_routes
 from .objectifs import init_objectif_routes
 from .scenarios import init_scenario_routes
 
@@ -17,6 +19,8 @@ def _register_routes():
     init_configuration_routes(api_bp)
     init_objectif_routes(api_bp)
     init_cible_routes(api_bp)
+    init_job_routes(api_bp)
+    init_export_routes(api_bp)
     # Enregistrer les routes chat dans l'API blueprint
     api_bp.register_blueprint(chat_bp)
 
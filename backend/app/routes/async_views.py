@@ -0,0 +1,143 @@
+"""Vues asynchrones des routes IA, servies par ``app.asgi``.
+
+Mêmes URL, payloads et réponses que les vues Flask correspondantes : seul
+l'appel LLM est attendu sur la boucle d'événements, le travail SQL passe par
+le pool de threads (``run_in_thread``). Une vue qui retourne None rend la
+requête à la vue Flask (flux SSE, mise en file ``?async=true``).
+"""
+
+from flask import jsonify, request
+
+from ..aio import run_in_thread
+from ..services.chat_service import ChatService
+from ..services.cible_service import CibleService
+from ..services.configuration_service import ConfigurationService
+from ..services.objectif_service import ObjectifService
+from ..services.plan_service import PlanService
+from ..services.scenario_service import ScenarioService
+from ..services.suggestion_store import SuggestionStore
+from .chat import _wants_event_stream, validation_error
+from .configurations import suggestions_response, wants_fresh
+from .jobs import wants_async
+
+
+async def chat():
+    """Voir ``routes.chat.chat`` ; le streaming SSE reste servi par Flask."""
+    if _wants_event_stream():
+        return None
+
+    payload = request.get_json(silent=True) or {}
+    error = validation_error(payload)
+    if error:
+        return jsonify({"error": error}), 400
+
+    action = payload.get("action")
+    try:
+        if action:
+            result = await ChatService.process_action_async(
+                scenario_id=payload.get("scenario_id"),
+                action_type=action.get("type"),
+                payload=action.get("payload"),
+            )
+        else:
+            result = await ChatService.process_message_async(
+                scenario_id=payload.get("scenario_id"),
+                user_message=payload.get("message"),
+                intent=payload.get("intent"),
+            )
+
+        if "error" in result and not result.get("message"):
+            return jsonify(result), 400
+
+        return jsonify(result), 200
+
+    except Exception as exc:
+        return jsonify({
+            "error": "Erreur serveur lors du traitement",
+            "details": str(exc),
+        }), 500
+
+
+async def _configuration_suggestions(kind: str, configuration_id: int):
+    try:
+        scenario_id = await run_in_thread(ConfigurationService.get_scenario_id, configuration_id)
+        lookup = await SuggestionStore.get_suggestions_async(
+            kind, scenario_id, configuration_id, fresh=wants_fresh()
+        )
+        return suggestions_response(kind, lookup)
+    except LookupError:
+        return jsonify({"error": "Configuration not found"}), 404
+    except Exception as exc:
+        return jsonify({"error": str(exc)}), 500
+
+
+async def suggest_objectifs_for_configuration(configuration_id: int):
+    """Voir ``suggest_objectifs_for_configuration`` (routes.configurations)."""
+    return await _configuration_suggestions("objectifs", configuration_id)
+
+
+async def suggest_cibles_for_configuration(configuration_id: int):
+    """Voir ``suggest_cibles_for_configuration`` (routes.configurations)."""
+    return await _configuration_suggestions("cibles", configuration_id)
+
+
+async def suggest_objectifs_ai(scenario_id: int):
+    """Voir ``suggest_objectifs_ai`` (routes.objectifs)."""
+    try:
+        suggestions = await ObjectifService.suggest_objectifs_for_scenario_async(scenario_id)
+        return jsonify({"objectifs": suggestions}), 200
+    except LookupError as exc:
+        return jsonify({"error": str(exc)}), 404
+    except Exception as exc:
+        return jsonify({"error": f"Erreur lors de la génération: {str(exc)}"}), 500
+
+
+async def suggest_cibles_ai(scenario_id: int):
+    """Voir ``suggest_cibles_ai`` (routes.cibles)."""
+    payload = request.get_json(silent=True) or {}
+    try:
+        suggestions = await CibleService.suggest_cibles_for_scenario_async(
+            scenario_id, payload.get("configuration_id")
+        )
+        return jsonify({"cibles": suggestions}), 200
+    except LookupError as exc:
+        return jsonify({"error": str(exc)}), 404
+    except Exception as exc:
+        return jsonify({"error": f"Erreur lors de la génération: {str(exc)}"}), 500
+
+
+async def generate_plan_with_articles(configuration_id: int):
+    """Voir ``generate_plan_with_articles`` ; la mise en file reste servie par Flask."""
+    if wants_async():
+        return None
+
+    try:
+        result = await PlanService.generate_plan_with_articles_async(configuration_id)
+        return jsonify(result), 201
+    except LookupError:
+        return jsonify({"error": "Configuration not found"}), 404
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    except Exception as exc:
+        return jsonify({"error": str(exc)}), 500
+
+
+async def suggest_new_scenario():
+    """Voir ``suggest_new_scenario`` (routes.scenarios)."""
+    try:
+        suggestions = await ScenarioService.suggest_new_scenario_async()
+        return jsonify(suggestions), 200
+    except Exception as exc:
+        return jsonify({"error": str(exc)}), 500
+
+
+# Endpoint Flask -> vue asynchrone
+ASYNC_VIEWS = {
+    "api.chat.chat": chat,
+    "api.suggest_objectifs_for_configuration": suggest_objectifs_for_configuration,
+    "api.suggest_cibles_for_configuration": suggest_cibles_for_configuration,
+    "api.suggest_objectifs_ai": suggest_objectifs_ai,
+    "api.suggest_cibles_ai": suggest_cibles_ai,
+    "api.generate_plan_with_articles": generate_plan_with_articles,
+    "api.suggest_new_scenario": suggest_new_scenario,
+}
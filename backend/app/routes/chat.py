@@ -1,12 +1,37 @@
 """Routes API pour le chat conversationnel."""
 
-from flask import Blueprint, jsonify, request
+import json
+
+from flask import Blueprint, Response, jsonify, request, stream_with_context
 
 from ..services.chat_service import ChatService
 
 chat_bp = Blueprint("chat", __name__)
 
 
+def _sse(event: str, data: dict) -> str:
+    """Formate un événement Server-Sent Events."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _wants_event_stream() -> bool:
+    best = request.accept_mimetypes.best_match(["application/json", "text/event-stream"])
+    return best == "text/event-stream"
+
+
+def validation_error(payload: dict) -> str | None:
+    """Erreur de validation du payload de ``/chat`` (None si valide)."""
+    action = payload.get("action")
+    if not payload.get("message") and not action:
+        return "Message ou action requis"
+    if action:
+        if not action.get("type"):
+            return "Type d'action requis"
+        if not payload.get("scenario_id"):
+            return "scenario_id requis pour les actions"
+    return None
+
+
 @chat_bp.route("/chat", methods=["POST"])
 def chat():
     """
@@ -30,7 +55,13 @@ def chat():
             "entities_to_create": list (optionnel),
             "errors": list (optionnel)
         }
+
+    Avec ``Accept: text/event-stream``, la réponse est diffusée en SSE
+    (voir ``chat_stream``).
     """
+    if _wants_event_stream():
+        return chat_stream()
+
     payload = request.get_json(silent=True) or {}
     
     scenario_id = payload.get("scenario_id")
@@ -38,25 +69,17 @@ def chat():
     action = payload.get("action")
     
     # Validation
-    if not user_message and not action:
-        return jsonify({"error": "Message ou action requis"}), 400
+    error = validation_error(payload)
+    if error:
+        return jsonify({"error": error}), 400
     
     try:
         # Traiter une action
         if action:
-            action_type = action.get("type")
-            action_payload = action.get("payload")
-            
-            if not action_type:
-                return jsonify({"error": "Type d'action requis"}), 400
-            
-            if not scenario_id:
-                return jsonify({"error": "scenario_id requis pour les actions"}), 400
-            
             result = ChatService.process_action(
                 scenario_id=scenario_id,
-                action_type=action_type,
-                payload=action_payload,
+                action_type=action.get("type"),
+                payload=action.get("payload"),
             )
         
         # Traiter un message
@@ -82,6 +105,92 @@ def chat():
         }), 500
 
 
+@chat_bp.route("/chat/stream", methods=["POST"])
+def chat_stream():
+    """
+    Variante streaming (Server-Sent Events) de ``/chat``.
+
+    Même payload que ``/chat``. Événements émis :
+        event: token  -> {"delta": str} fragments de ``message`` au fil de la génération
+        event: done   -> réponse finale complète (même format que ``/chat``)
+        event: error  -> réponse finale en erreur (même format que ``/chat``,
+                         avec ``error``), à la place de ``done``
+    """
+    payload = request.get_json(silent=True) or {}
+
+    scenario_id = payload.get("scenario_id")
+    user_message = payload.get("message")
+    action = payload.get("action")
+
+    error = validation_error(payload)
+    if error:
+        return jsonify({"error": error}), 400
+
+    if action:
+        events = ChatService.stream_action(
+            scenario_id=scenario_id,
+            action_type=action.get("type"),
+            payload=action.get("payload"),
+        )
+    else:
+        events = ChatService.stream_message(
+            scenario_id=scenario_id,
+            user_message=user_message,
+            intent=payload.get("intent"),
+        )
+
+    def generate():
+        for event, data in events:
+            if event == "done" and "error" in data:
+                yield _sse("error", data)
+            else:
+                yield _sse(event, data)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@chat_bp.route("/chat/estimate", methods=["POST"])
+def estimate():
+    """
+    Estimation préalable du nombre de tokens du prompt (sans appel OpenAI).
+
+    Même payload que ``/chat`` (message et intent, ou action).
+
+    Returns:
+        {
+            "prompt_tokens": int,
+            "context_tokens": int,
+            "context_budget": int,
+            "history_messages": int,
+            "history_available": int,
+            "context_truncated": bool,
+            "model": str,
+            "tokenizer": str
+        }
+    """
+    payload = request.get_json(silent=True) or {}
+
+    scenario_id = payload.get("scenario_id")
+    user_message = payload.get("message")
+    intent = payload.get("intent")
+    action = payload.get("action")
+
+    if not user_message and not action:
+        return jsonify({"error": "Message ou action requis"}), 400
+
+    try:
+        result = ChatService.estimate_prompt(scenario_id, user_message, intent, action)
+    except LookupError:
+        return jsonify({"error": "Scenario not found"}), 404
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    return jsonify(result), 200
+
+
 @chat_bp.route("/chat/history/<int:scenario_id>", methods=["GET"])
 def get_history(scenario_id: int):
     """
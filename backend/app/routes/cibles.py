@@ -3,13 +3,27 @@
 from flask import jsonify, request
 
 from ..services.cible_service import CibleService
+from ..services.pagination import page_args
 
 
 def init_cible_routes(bp):
     @bp.route("/cibles", methods=["GET"])
     def list_cibles():
-        """Liste toutes les cibles existantes."""
-        cibles = CibleService.get_all_cibles()
+        """
+        Liste les cibles, paginées par curseur.
+
+        Paramètres : ``after``, ``limit``, ``label`` (préfixe), ``segment``.
+        """
+        try:
+            after, limit = page_args(request.args)
+            page = CibleService.list_cibles(
+                after=after,
+                limit=limit,
+                label_prefix=request.args.get("label"),
+                segment=request.args.get("segment"),
+            )
+        except ValueError as exc:
+            return jsonify({"error": str(exc)}), 400
         return jsonify({
             "cibles": [
                 {
@@ -18,8 +32,9 @@ def init_cible_routes(bp):
                     "persona": cible.persona,
                     "segment": cible.segment
                 }
-                for cible in cibles
-            ]
+                for cible in page.items
+            ],
+            "next_cursor": page.next_cursor,
         }), 200
 
     @bp.route("/cibles", methods=["POST"])
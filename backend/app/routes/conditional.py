@@ -0,0 +1,37 @@
+"""Requêtes conditionnelles (``If-None-Match``) des routes de lecture d'arbres."""
+
+from flask import Response, request
+
+from ..services.detail_cache import Detail
+from ..services.tree_version import TreeVersion
+
+
+def _validators(response: Response, version: TreeVersion) -> Response:
+    response.set_etag(version.etag)
+    if version.last_modified is not None:
+        response.last_modified = version.last_modified
+    # Le client peut conserver la réponse mais doit la revalider à chaque lecture
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def not_modified(version: TreeVersion) -> Response | None:
+    """
+    Réponse 304 si le client possède déjà cette version, None sinon.
+
+    Seul ``If-None-Match`` est pris en compte : ``Last-Modified`` ne reflète
+    pas les suppressions.
+    """
+    if request.if_none_match.contains(version.etag):
+        return _validators(Response(status=304), version)
+    return None
+
+
+def versioned_response(response: Response, version: TreeVersion) -> Response:
+    """Ajoute l'ETag et ``Last-Modified`` de la version servie."""
+    return _validators(response, version)
+
+
+def detail_response(detail: Detail) -> Response:
+    """Réponse d'un détail déjà encodé (cache des détails), avec ses validateurs."""
+    return _validators(Response(detail.body, mimetype="application/json"), detail.version)
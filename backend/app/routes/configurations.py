@@ -1,31 +1,64 @@
 """Routes API pour les configurations."""
 
-from flask import jsonify, request
+import json
+
+from flask import Response, jsonify, request, stream_with_context
 
 from ..schemas.scenario import (
     ConfigurationCreateSchema,
-    ConfigurationDetailSchema,
     ConfigurationSchema,
     ObjectifSchema,
     CibleSchema,
 )
 from ..services.configuration_service import ConfigurationService
+from ..services.job_service import JobService
+from ..services.pagination import page_args
+from ..services.suggestion_service import SuggestionService
+from ..services.suggestion_store import SuggestionLookup, SuggestionStore
+from .conditional import detail_response, not_modified
+from .jobs import accepted_response, wants_async
+from .pagination import paginated_list_response
+
+
+def wants_fresh() -> bool:
+    """Contournement du store de suggestions via ``?fresh=true``."""
+    return request.args.get("fresh", "false").lower() == "true"
+
+
+def suggestions_response(kind: str, lookup: SuggestionLookup):
+    """Réponse des suggestions avec leur provenance et leur âge."""
+    response = jsonify({kind: lookup.suggestions})
+    response.headers["X-Suggestions-Status"] = lookup.status
+    response.headers["Age"] = str(lookup.age_seconds)
+    return response
 
 
 def init_configuration_routes(bp):
     configuration_schema = ConfigurationSchema()
     configurations_schema = ConfigurationSchema(many=True)
-    configuration_detail_schema = ConfigurationDetailSchema()
     create_schema = ConfigurationCreateSchema()
 
     @bp.route("/scenarios/<int:scenario_id>/configurations", methods=["GET"])
     def list_configurations(scenario_id: int):
-        """Liste toutes les configurations d'un scénario."""
+        """
+        Liste les configurations d'un scénario, paginées par curseur.
+
+        Paramètres : ``after``, ``limit``, ``nom`` (préfixe). Le curseur de la
+        page suivante est renvoyé dans l'en-tête ``X-Next-Cursor``.
+        """
         try:
-            configurations = ConfigurationService.list_configurations(scenario_id)
-            return jsonify(configurations_schema.dump(configurations)), 200
+            after, limit = page_args(request.args)
+            page = ConfigurationService.list_configurations(
+                scenario_id,
+                after=after,
+                limit=limit,
+                nom_prefix=request.args.get("nom"),
+            )
         except LookupError:
             return jsonify({"error": "Scenario not found"}), 404
+        except ValueError as exc:
+            return jsonify({"error": str(exc)}), 400
+        return paginated_list_response(configurations_schema.dump(page.items), page.next_cursor)
 
     @bp.route("/scenarios/<int:scenario_id>/configurations", methods=["POST"])
     def create_configuration(scenario_id: int):
@@ -41,10 +74,15 @@ def init_configuration_routes(bp):
 
     @bp.route("/configurations/<int:configuration_id>", methods=["GET"])
     def get_configuration(configuration_id: int):
-        """Récupère les détails d'une configuration."""
+        """Récupère les détails d'une configuration (304 si l'ETag est inchangé)."""
         try:
-            configuration = ConfigurationService.get_configuration_detail(configuration_id)
-            return jsonify(configuration_detail_schema.dump(configuration)), 200
+            version = ConfigurationService.tree_version(configuration_id)
+            cached = not_modified(version)
+            if cached is not None:
+                return cached
+            return detail_response(
+                ConfigurationService.get_configuration_json(configuration_id, version)
+            )
         except LookupError:
             return jsonify({"error": "Configuration not found"}), 404
 
@@ -62,8 +100,7 @@ def init_configuration_routes(bp):
         """Ajoute un objectif à une configuration."""
         payload = request.get_json(silent=True) or {}
         try:
-            result = ConfigurationService.add_objectif(configuration_id, payload)
-            return jsonify(result), 200
+            return detail_response(ConfigurationService.add_objectif(configuration_id, payload))
         except LookupError:
             return jsonify({"error": "Configuration not found"}), 404
         except ValueError as exc:
@@ -74,8 +111,7 @@ def init_configuration_routes(bp):
         """Ajoute une cible à une configuration."""
         payload = request.get_json(silent=True) or {}
         try:
-            result = ConfigurationService.add_cible(configuration_id, payload)
-            return jsonify(result), 200
+            return detail_response(ConfigurationService.add_cible(configuration_id, payload))
         except LookupError:
             return jsonify({"error": "Configuration not found"}), 404
         except ValueError as exc:
@@ -85,8 +121,7 @@ def init_configuration_routes(bp):
     def remove_objectif_from_configuration(configuration_id: int, objectif_id: int):
         """Retire un objectif d'une configuration."""
         try:
-            result = ConfigurationService.remove_objectif(configuration_id, objectif_id)
-            return jsonify(result), 200
+            return detail_response(ConfigurationService.remove_objectif(configuration_id, objectif_id))
         except LookupError as exc:
             return jsonify({"error": str(exc)}), 404
 
@@ -94,8 +129,7 @@ def init_configuration_routes(bp):
     def remove_cible_from_configuration(configuration_id: int, cible_id: int):
         """Retire une cible d'une configuration."""
         try:
-            result = ConfigurationService.remove_cible(configuration_id, cible_id)
-            return jsonify(result), 200
+            return detail_response(ConfigurationService.remove_cible(configuration_id, cible_id))
         except LookupError as exc:
             return jsonify({"error": str(exc)}), 404
 
@@ -110,12 +144,19 @@ def init_configuration_routes(bp):
 
     @bp.route("/configurations/<int:configuration_id>/suggest-objectifs", methods=["POST"])
     def suggest_objectifs_for_configuration(configuration_id: int):
-        """Suggère des objectifs pertinents pour une configuration."""
+        """
+        Suggère des objectifs pertinents pour une configuration.
+
+        Les suggestions pré-générées sont servies immédiatement, même
+        périmées (régénérées en arrière-plan) ; ``?fresh=true`` force une
+        nouvelle génération. Provenance dans ``X-Suggestions-Status``.
+        """
         try:
-            configuration = ConfigurationService.get_configuration_detail(configuration_id)
-            from ..services.objectif_service import ObjectifService
-            suggestions = ObjectifService.suggest_objectifs_for_scenario(configuration.scenario_id)
-            return jsonify({"objectifs": suggestions}), 200
+            scenario_id = ConfigurationService.get_scenario_id(configuration_id)
+            lookup = SuggestionStore.get_suggestions(
+                "objectifs", scenario_id, configuration_id, fresh=wants_fresh()
+            )
+            return suggestions_response("objectifs", lookup)
         except LookupError:
             return jsonify({"error": "Configuration not found"}), 404
         except Exception as exc:
@@ -123,22 +164,72 @@ def init_configuration_routes(bp):
 
     @bp.route("/configurations/<int:configuration_id>/suggest-cibles", methods=["POST"])
     def suggest_cibles_for_configuration(configuration_id: int):
-        """Suggère des cibles pertinentes pour une configuration."""
+        """Suggère des cibles pertinentes pour une configuration (voir suggest-objectifs)."""
         try:
-            configuration = ConfigurationService.get_configuration_detail(configuration_id)
-            from ..services.cible_service import CibleService
-            suggestions = CibleService.suggest_cibles_for_scenario(
-                configuration.scenario_id, configuration_id
+            scenario_id = ConfigurationService.get_scenario_id(configuration_id)
+            lookup = SuggestionStore.get_suggestions(
+                "cibles", scenario_id, configuration_id, fresh=wants_fresh()
             )
-            return jsonify({"cibles": suggestions}), 200
+            return suggestions_response("cibles", lookup)
         except LookupError:
             return jsonify({"error": "Configuration not found"}), 404
         except Exception as exc:
             return jsonify({"error": str(exc)}), 500
 
+    @bp.route("/configurations/suggest-batch", methods=["POST"])
+    def suggest_batch():
+        """
+        Suggestions IA pour plusieurs configurations, exécutées en parallèle.
+
+        Payload:
+            {
+                "configuration_ids": list[int],
+                "kinds": list["objectifs" | "cibles"] (optionnel, tous par défaut)
+            }
+
+        Returns:
+            Flux NDJSON, une ligne par (configuration, type) dans l'ordre de
+            complétion : {"configuration_id", "kind", "status", "suggestions" | "error"}
+        """
+        payload = request.get_json(silent=True) or {}
+        try:
+            tasks = SuggestionService.prepare_batch(
+                payload.get("configuration_ids"), payload.get("kinds")
+            )
+        except ValueError as exc:
+            return jsonify({"error": str(exc)}), 400
+
+        def generate():
+            for result in SuggestionService.run_batch(tasks):
+                yield json.dumps(result, ensure_ascii=False) + "\n"
+
+        return Response(
+            stream_with_context(generate()),
+            mimetype="application/x-ndjson",
+            headers={"X-Accel-Buffering": "no"},
+        )
+
     @bp.route("/configurations/<int:configuration_id>/generate-plan", methods=["POST"])
     def generate_plan_with_articles(configuration_id: int):
-        """Génère un plan avec 5 articles pour une configuration."""
+        """
+        Génère un plan avec 5 articles pour une configuration.
+
+        Avec ``?async=true`` (ou ``Prefer: respond-async``), la génération est
+        mise en file et la route répond 202 avec l'URL de suivi de la tâche.
+        """
+        if wants_async():
+            try:
+                if not ConfigurationService.can_create_plan(configuration_id):
+                    return jsonify({
+                        "error": "La configuration doit avoir au moins 1 objectif et 1 cible"
+                    }), 400
+            except LookupError:
+                return jsonify({"error": "Configuration not found"}), 404
+            job = JobService.enqueue(
+                "plan.generate_with_articles", {"configuration_id": configuration_id}
+            )
+            return accepted_response(job)
+
         try:
             from ..services.plan_service import PlanService
             result = PlanService.generate_plan_with_articles(configuration_id)
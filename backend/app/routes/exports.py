@@ -0,0 +1,100 @@
+"""Routes API d'export en flux."""
+
+import unicodedata
+from urllib.parse import quote
+
+from flask import Response, jsonify, request, stream_with_context
+
+from ..services.export_service import ExportService
+
+
+def _parse_ids(raw: str | None) -> list[int] | None:
+    """Liste d'IDs ``1,2,3`` (None si absente). Lève ValueError si invalide."""
+    if not raw:
+        return None
+    try:
+        return [int(value) for value in raw.split(",") if value.strip()]
+    except ValueError as exc:
+        raise ValueError("ids doit être une liste d'entiers séparés par des virgules") from exc
+
+
+def content_disposition(filename: str) -> str:
+    """En-tête ``Content-Disposition`` d'un téléchargement (nom UTF-8 en RFC 5987)."""
+    try:
+        filename.encode("ascii")
+    except UnicodeEncodeError:
+        simple = unicodedata.normalize("NFKD", filename).encode("ascii", "ignore").decode("ascii")
+        quoted = quote(filename, safe="!#$&+-.^_`|~")
+        return f"attachment; filename=\"{simple}\"; filename*=UTF-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
+
+def stream_download(chunks, filename: str, mimetype: str) -> Response:
+    """
+    Téléchargement diffusé au fil de l'eau, compressé en gzip si le client
+    l'accepte (``Accept-Encoding``) et ne l'a pas désactivé (``?gzip=false``).
+    """
+    compress = (
+        request.args.get("gzip", "true").lower() != "false"
+        and "gzip" in request.accept_encodings
+    )
+    headers = {
+        "Content-Disposition": content_disposition(filename),
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+        "Vary": "Accept-Encoding",
+    }
+    if compress:
+        chunks = ExportService.gzip_stream(chunks)
+        headers["Content-Encoding"] = "gzip"
+
+    return Response(
+        stream_with_context(chunks),
+        mimetype=mimetype,
+        headers=headers,
+    )
+
+
+def init_export_routes(bp):
+    @bp.route("/export/scenarios.ndjson", methods=["GET"])
+    def export_scenarios_ndjson():
+        """
+        Exporte des scénarios complets, un par ligne (tous par défaut).
+
+        Query params:
+            ids: IDs séparés par des virgules (optionnel)
+            gzip: ``false`` pour désactiver la compression négociée
+        """
+        try:
+            scenario_ids = _parse_ids(request.args.get("ids"))
+        except ValueError as exc:
+            return jsonify({"error": str(exc)}), 400
+
+        return stream_download(
+            ExportService.scenarios_ndjson(scenario_ids),
+            "scenarios.ndjson",
+            "application/x-ndjson",
+        )
+
+    @bp.route("/export/workspace.ndjson", methods=["GET"])
+    def export_workspace_ndjson():
+        """Exporte tout l'espace de travail (objectifs, cibles, scénarios)."""
+        return stream_download(
+            ExportService.workspace_ndjson(), "workspace.ndjson", "application/x-ndjson"
+        )
+
+    @bp.route("/export/plans.csv", methods=["GET"])
+    def export_plans_csv():
+        """
+        Exporte les plans (items et articles) de toutes les configurations.
+
+        Query params:
+            ids: IDs de scénarios séparés par des virgules (tous par défaut)
+            gzip: ``false`` pour désactiver la compression négociée
+        """
+        try:
+            scenario_ids = _parse_ids(request.args.get("ids"))
+        except ValueError as exc:
+            return jsonify({"error": str(exc)}), 400
+
+        return stream_download(ExportService.plans_csv(scenario_ids), "plans.csv", "text/csv")
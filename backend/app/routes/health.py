@@ -1,7 +1,31 @@
-from flask import jsonify
+from flask import Response, jsonify
+
+from ..ai import get_response_cache
+from ..ai.client_pool import get_pool_stats
+from ..metrics import get_metrics
+from ..services.context_cache import get_context_cache
 
 
 def init_health_routes(bp):
     @bp.route("/health", methods=["GET"])
     def healthcheck():
         return jsonify({"status": "ok"}), 200
+
+    @bp.route("/health/llm", methods=["GET"])
+    def llm_stats():
+        """Statistiques du pool HTTP OpenAI et des caches IA du worker courant."""
+        cache = get_response_cache()
+        context_cache = get_context_cache()
+        return jsonify({
+            "pool": get_pool_stats(),
+            "cache": cache.stats() if cache else None,
+            "chat_context": context_cache.stats() if context_cache else None,
+        }), 200
+
+    @bp.route("/metrics", methods=["GET"])
+    def metrics():
+        """Métriques au format Prometheus (tous workers si ``METRICS_DIR`` est défini)."""
+        return Response(
+            get_metrics().render(),
+            content_type="text/plain; version=0.0.4; charset=utf-8",
+        )
@@ -0,0 +1,37 @@
+"""Routes API pour le suivi des tâches asynchrones."""
+
+from flask import jsonify, request, url_for
+
+from ..services.job_service import JobService
+
+
+def wants_async() -> bool:
+    """Mode asynchrone demandé via ``?async=true`` ou ``Prefer: respond-async``."""
+    if request.args.get("async", "false").lower() == "true":
+        return True
+    prefer = request.headers.get("Prefer", "")
+    return "respond-async" in [token.strip() for token in prefer.split(",")]
+
+
+def accepted_response(job):
+    """Réponse 202 Accepted pointant vers l'URL de suivi de la tâche."""
+    status_url = url_for("api.get_job", job_id=job.id)
+    response = jsonify({
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": status_url,
+    })
+    response.status_code = 202
+    response.headers["Location"] = status_url
+    return response
+
+
+def init_job_routes(bp):
+    @bp.route("/jobs/<job_id>", methods=["GET"])
+    def get_job(job_id: str):
+        """Récupère le statut, le résultat ou l'erreur d'une tâche."""
+        try:
+            job = JobService.get_job(job_id)
+        except LookupError:
+            return jsonify({"error": "Job not found"}), 404
+        return jsonify(JobService.serialize(job)), 200
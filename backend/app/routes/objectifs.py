@@ -3,13 +3,26 @@
 from flask import jsonify, request
 
 from ..services.objectif_service import ObjectifService
+from ..services.pagination import page_args
 
 
 def init_objectif_routes(bp):
     @bp.route("/objectifs", methods=["GET"])
     def list_objectifs():
-        """Liste tous les objectifs existants."""
-        objectifs = ObjectifService.get_all_objectifs()
+        """
+        Liste les objectifs, paginés par curseur.
+
+        Paramètres : ``after``, ``limit``, ``label`` (préfixe).
+        """
+        try:
+            after, limit = page_args(request.args)
+            page = ObjectifService.list_objectifs(
+                after=after,
+                limit=limit,
+                label_prefix=request.args.get("label"),
+            )
+        except ValueError as exc:
+            return jsonify({"error": str(exc)}), 400
         return jsonify({
             "objectifs": [
                 {
@@ -17,8 +30,9 @@ def init_objectif_routes(bp):
                     "label": obj.label,
                     "description": obj.description
                 }
-                for obj in objectifs
-            ]
+                for obj in page.items
+            ],
+            "next_cursor": page.next_cursor,
         }), 200
 
     @bp.route("/objectifs", methods=["POST"])
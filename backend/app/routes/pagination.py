@@ -0,0 +1,14 @@
+"""Réponses paginées des routes de liste."""
+
+from flask import jsonify
+
+
+def paginated_list_response(items, next_cursor):
+    """
+    Réponse 200 dont le corps reste une liste JSON (compatibilité client) ;
+    le curseur de la page suivante est exposé dans l'en-tête ``X-Next-Cursor``.
+    """
+    response = jsonify(items)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response
@@ -1,28 +1,53 @@
-import csv
-import io
 import json
 
-from flask import jsonify, request, send_file
+from flask import Response, current_app, jsonify, request
+from marshmallow import ValidationError
 
 from ..schemas.scenario import (
+    ScenarioBatchCreateSchema,
     ScenarioCreateSchema,
-    ScenarioDetailSchema,
     ScenarioSchema,
 )
+from ..services.export_service import ExportService
+from ..services.job_service import JobService
+from ..services.pagination import page_args
 from ..services.plan_service import PlanService
 from ..services.scenario_service import ScenarioService
+from .conditional import detail_response, not_modified, versioned_response
+from .exports import content_disposition, stream_download
+from .jobs import accepted_response, wants_async
+from .pagination import paginated_list_response
 
 
 def init_scenario_routes(bp):
     scenario_schema = ScenarioSchema()
-    scenarios_schema = ScenarioDetailSchema(many=True)  # Utiliser ScenarioDetailSchema pour inclure les configurations
-    scenario_detail_schema = ScenarioDetailSchema()
     create_schema = ScenarioCreateSchema()
+    batch_create_schema = ScenarioBatchCreateSchema(many=True)
 
     @bp.route("/scenarios", methods=["GET"])
     def list_scenarios():
-        scenarios = ScenarioService.list_scenarios()
-        return jsonify(scenarios_schema.dump(scenarios)), 200
+        """
+        Liste les scénarios (plus récents d'abord), paginés par curseur.
+
+        Paramètres : ``after``, ``limit``, ``statut``, ``thematique``, ``nom``
+        (préfixe). Le curseur de la page suivante est renvoyé dans l'en-tête
+        ``X-Next-Cursor``. Répond 304 si ``If-None-Match`` porte l'ETag courant.
+        """
+        try:
+            after, limit = page_args(request.args)
+            filters = {
+                "statut": request.args.get("statut"),
+                "thematique": request.args.get("thematique"),
+                "nom_prefix": request.args.get("nom"),
+            }
+            version = ScenarioService.list_version(after=after, limit=limit, **filters)
+            cached = not_modified(version)
+            if cached is not None:
+                return cached
+            page = ScenarioService.list_scenarios(after=after, limit=limit, **filters)
+        except ValueError as exc:
+            return jsonify({"error": str(exc)}), 400
+        return versioned_response(paginated_list_response(page.items, page.next_cursor), version)
 
     @bp.route("/scenarios", methods=["POST"])
     def create_scenario():
@@ -36,11 +61,16 @@ def init_scenario_routes(bp):
 
     @bp.route("/scenarios/<int:scenario_id>", methods=["GET"])
     def get_scenario(scenario_id: int):
+        """Détail d'un scénario ; 304 si ``If-None-Match`` porte l'ETag courant."""
         try:
-            scenario = ScenarioService.get_scenario_detail(scenario_id)
+            version = ScenarioService.tree_version(scenario_id)
+            cached = not_modified(version)
+            if cached is not None:
+                return cached
+            detail = ScenarioService.get_scenario_json(scenario_id, version)
         except LookupError:
             return jsonify({"error": "Scenario not found"}), 404
-        return jsonify(scenario_detail_schema.dump(scenario)), 200
+        return detail_response(detail)
 
     @bp.route("/scenarios/<int:scenario_id>", methods=["DELETE"])
     def delete_scenario(scenario_id: int):
@@ -91,8 +121,24 @@ def init_scenario_routes(bp):
 
     @bp.route("/scenarios/<int:scenario_id>/plan", methods=["POST"])
     def generate_plan(scenario_id: int):
-        """Génère ou régénère un plan marketing pour un scénario."""
+        """
+        Génère ou régénère un plan marketing pour un scénario.
+
+        Avec ``?async=true`` (ou ``Prefer: respond-async``), la génération est
+        mise en file et la route répond 202 avec l'URL de suivi de la tâche.
+        """
         regenerate = request.args.get("regenerate", "false").lower() == "true"
+
+        if wants_async():
+            try:
+                ScenarioService.get_scenario_nom(scenario_id)
+            except LookupError:
+                return jsonify({"error": "Scenario not found"}), 404
+            job = JobService.enqueue(
+                "plan.regenerate" if regenerate else "plan.generate",
+                {"scenario_id": scenario_id},
+            )
+            return accepted_response(job)
         
         if regenerate:
             result = PlanService.regenerate_plan(scenario_id)
@@ -107,72 +153,42 @@ def init_scenario_routes(bp):
 
     @bp.route("/scenarios/<int:scenario_id>/export/json", methods=["GET"])
     def export_json(scenario_id: int):
-        """Exporte un scénario complet en JSON."""
+        """
+        Exporte un scénario complet en JSON.
+
+        Pour plusieurs scénarios, voir ``/export/scenarios.ndjson`` (flux).
+        """
         try:
-            scenario = ScenarioService.get_scenario_detail(scenario_id)
-            data = scenario_detail_schema.dump(scenario)
-            
-            # Créer un fichier JSON en mémoire
-            json_str = json.dumps(data, ensure_ascii=False, indent=2)
-            buffer = io.BytesIO(json_str.encode('utf-8'))
-            buffer.seek(0)
-            
-            filename = f"scenario_{scenario_id}_{scenario.nom.replace(' ', '_')}.json"
-            
-            return send_file(
-                buffer,
-                mimetype='application/json',
-                as_attachment=True,
-                download_name=filename,
-            )
+            data = ScenarioService.get_scenario_tree(scenario_id)
         except LookupError:
             return jsonify({"error": "Scenario not found"}), 404
 
+        filename = f"scenario_{scenario_id}_{data['nom'].replace(' ', '_')}.json"
+        return Response(
+            json.dumps(data, ensure_ascii=False, indent=2),
+            mimetype="application/json",
+            headers={"Content-Disposition": content_disposition(filename)},
+        )
+
     @bp.route("/scenarios/<int:scenario_id>/export/csv", methods=["GET"])
     def export_csv(scenario_id: int):
-        """Exporte le plan marketing d'un scénario en CSV."""
+        """
+        Exporte les plans marketing d'un scénario en CSV (flux).
+
+        Une ligne par item ou article, pour tous les plans de toutes ses
+        configurations. Compressé en gzip si le client l'accepte.
+        """
         try:
-            scenario = ScenarioService.get_scenario_detail(scenario_id)
-            plan = PlanService.get_latest_plan(scenario_id)
-            
-            if not plan:
-                return jsonify({"error": "Aucun plan généré pour ce scénario"}), 404
-            
-            # Créer le CSV en mémoire
-            output = io.StringIO()
-            writer = csv.writer(output)
-            
-            # En-tête
-            writer.writerow([f"Plan marketing - {scenario.nom}"])
-            writer.writerow([f"Généré le: {plan.generated_at.strftime('%Y-%m-%d %H:%M')}"])
-            writer.writerow([])
-            writer.writerow(["Format", "Message", "Canal", "Fréquence", "KPI"])
-            
-            # Items
-            for item in plan.items:
-                writer.writerow([
-                    item.format,
-                    item.message,
-                    item.canal,
-                    item.frequence or "",
-                    item.kpi or "",
-                ])
-            
-            # Convertir en bytes
-            buffer = io.BytesIO(output.getvalue().encode('utf-8'))
-            buffer.seek(0)
-            
-            filename = f"plan_{scenario_id}_{scenario.nom.replace(' ', '_')}.csv"
-            
-            return send_file(
-                buffer,
-                mimetype='text/csv',
-                as_attachment=True,
-                download_name=filename,
-            )
+            nom = ScenarioService.get_scenario_nom(scenario_id)
         except LookupError:
             return jsonify({"error": "Scenario not found"}), 404
 
+        if not ExportService.has_plans(scenario_id):
+            return jsonify({"error": "Aucun plan généré pour ce scénario"}), 404
+
+        filename = f"plan_{scenario_id}_{nom.replace(' ', '_')}.csv"
+        return stream_download(ExportService.plans_csv([scenario_id]), filename, "text/csv")
+
     @bp.route("/scenarios/suggest-new", methods=["POST"])
     def suggest_new_scenario():
         """Génère plusieurs suggestions de nouveaux scénarios basées sur les scénarios existants."""
@@ -184,25 +200,35 @@ def init_scenario_routes(bp):
 
     @bp.route("/scenarios/batch-create", methods=["POST"])
     def batch_create_scenarios():
-        """Crée plusieurs scénarios en une seule requête."""
+        """
+        Crée plusieurs scénarios en une seule transaction.
+
+        Chaque scénario peut inclure ``configurations`` (avec ``objectifs`` et
+        ``cibles`` par libellé). Tout le lot est validé avant insertion : en
+        cas d'erreur, rien n'est créé.
+        """
         payload = request.get_json(silent=True) or {}
         scenarios_data = payload.get("scenarios", [])
-        
-        if not scenarios_data:
+
+        if not scenarios_data or not isinstance(scenarios_data, list):
             return jsonify({"error": "No scenarios provided"}), 400
-        
+
+        max_scenarios = current_app.config.get("BATCH_CREATE_MAX_SCENARIOS", 5000)
+        if len(scenarios_data) > max_scenarios:
+            return jsonify({"error": f"Maximum {max_scenarios} scénarios par requête"}), 400
+
+        try:
+            items = batch_create_schema.load(scenarios_data)
+        except ValidationError as exc:
+            return jsonify({"error": "Validation failed", "details": exc.messages}), 400
+
         try:
-            created_scenarios = []
-            for scenario_data in scenarios_data:
-                data = create_schema.load(scenario_data)
-                scenario = ScenarioService.create_scenario(data)
-                created_scenarios.append(scenario)
-            
-            return jsonify({
-                "count": len(created_scenarios),
-                "scenarios": scenarios_schema.dump(created_scenarios)
-            }), 201
+            scenario_ids = ScenarioService.bulk_create_scenarios(items)
         except ValueError as exc:
             return jsonify({"error": str(exc)}), 400
-        except Exception as exc:
-            return jsonify({"error": str(exc)}), 500
+
+        return jsonify({
+            "count": len(scenario_ids),
+            "ids": scenario_ids,
+            "scenarios": ScenarioService.get_scenario_trees(scenario_ids),
+        }), 201
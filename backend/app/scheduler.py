@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+import atexit
+from datetime import datetime, timezone
+
 from apscheduler.schedulers.background import BackgroundScheduler
 from flask import Flask
 
+from .services.job_service import JobService
 from .services.maintenance import purge_expired_messages
 
 
@@ -18,9 +22,20 @@ def init_scheduler(app: Flask) -> None:
         replace_existing=True,
     )
 
+    # Reprise des tâches asynchrones (au démarrage puis périodiquement)
+    scheduler.add_job(
+        func=lambda: JobService.resume_pending(app),
+        trigger="interval",
+        seconds=app.config.get("JOBS_RESUME_INTERVAL_SECONDS", 60),
+        next_run_time=datetime.now(timezone.utc),
+        id="resume-pending-jobs",
+        replace_existing=True,
+    )
+
     scheduler.start()
 
-    @app.teardown_appcontext
-    def shutdown_session(exception=None):
+    # Arrêt à la fin du processus (et non à la fin de chaque contexte applicatif)
+    @atexit.register
+    def shutdown_scheduler():
         if scheduler.state != 0:  # 0 == STATE_STOPPED
             scheduler.shutdown(wait=False)
@@ -76,6 +76,29 @@ class ConfigurationCreateSchema(Schema):
     nom = fields.Str(required=True, validate=validate.Length(min=1, max=150))
 
 
+class ObjectifCreateSchema(Schema):
+    label = fields.Str(required=True, validate=validate.Length(min=1, max=120))
+    description = fields.Str(load_default=None, allow_none=True)
+
+
+class CibleCreateSchema(Schema):
+    label = fields.Str(required=True, validate=validate.Length(min=1, max=120))
+    persona = fields.Str(load_default=None, allow_none=True)
+    segment = fields.Str(load_default=None, allow_none=True, validate=validate.Length(max=120))
+
+
+class ConfigurationBatchSchema(Schema):
+    nom = fields.Str(required=True, validate=validate.Length(min=1, max=150))
+    objectifs = fields.List(fields.Nested(ObjectifCreateSchema), load_default=list)
+    cibles = fields.List(fields.Nested(CibleCreateSchema), load_default=list)
+
+
+class ScenarioBatchCreateSchema(ScenarioCreateSchema):
+    """Scénario d'un import groupé, avec ses configurations optionnelles."""
+
+    configurations = fields.List(fields.Nested(ConfigurationBatchSchema), load_default=list)
+
+
 class ArticleCreateSchema(Schema):
     plan_id = fields.Int(required=True)
     nom = fields.Str(required=True, validate=validate.Length(min=1, max=150))
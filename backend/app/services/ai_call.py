@@ -0,0 +1,51 @@
+"""Appels IA en trois étapes : préparation, appel LLM, finalisation.
+
+Un service décrit son appel par un ``AICall`` construit depuis la base
+(messages du prompt, paramètres) avec une finalisation optionnelle qui
+traite la réponse JSON (filtrage, persistance). Les étapes ne partagent que
+des données simples : ``run_ai_call`` les enchaîne dans le worker courant,
+``run_ai_call_async`` depuis le service ASGI, où seul l'appel LLM est attendu
+sur la boucle d'événements et la finalisation passe par le pool de threads.
+Les deux passent par le single-flight avec la même clé.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from ..ai.instrumentation import ajson_completion, json_completion
+from .single_flight import single_flight, single_flight_async
+
+
+@dataclass
+class AICall:
+    """Appel IA préparé : point d'appel, entité, messages et paramètres du modèle."""
+
+    call_site: str
+    entity_id: Any
+    messages: list[dict[str, str]]
+    params: dict[str, Any] = field(default_factory=dict)
+    # Traitement de la réponse JSON ; ne doit pas dépendre d'objets ORM de la préparation
+    finish: Callable[[dict[str, Any]], Any] | None = None
+
+
+def run_ai_call(call: AICall) -> Any:
+    """Exécute l'appel (une seule fois pour les demandes identiques simultanées)."""
+
+    def generate() -> Any:
+        result = json_completion(call.call_site, messages=call.messages, **call.params)
+        return call.finish(result) if call.finish else result
+
+    return single_flight(call.call_site, call.entity_id, call.messages, generate)
+
+
+async def run_ai_call_async(call: AICall) -> Any:
+    """Variante asynchrone de ``run_ai_call`` (sous le contexte de la requête ASGI)."""
+    from ..aio import run_in_thread
+
+    async def generate() -> Any:
+        result = await ajson_completion(call.call_site, messages=call.messages, **call.params)
+        return await run_in_thread(call.finish, result) if call.finish else result
+
+    return await single_flight_async(call.call_site, call.entity_id, call.messages, generate)
@@ -0,0 +1,151 @@
+"""Primitives d'écriture en masse (insertion multi-lignes, upsert par libellé)."""
+
+from __future__ import annotations
+
+from typing import Any, Iterable
+
+from sqlalchemy import insert
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+
+from ..extensions import db
+
+# Nombre de lignes par instruction (limite de variables SQLite / taille de paquet MySQL)
+INSERT_CHUNK = 500
+
+# Taille maximale des listes IN
+IN_CHUNK = 900
+
+
+def insert_returning_ids(model: Any, rows: list[dict[str, Any]]) -> list[int]:
+    """
+    Insère ``rows`` dans la table de ``model`` et retourne les IDs dans l'ordre
+    des lignes fournies, sans valider la transaction.
+
+    Les dialectes qui savent trier un ``INSERT ... RETURNING`` multi-lignes
+    (SQLite, PostgreSQL, MariaDB) insèrent par lots de ``INSERT_CHUNK`` lignes ;
+    MySQL, sans RETURNING, insère ligne à ligne dans la même transaction.
+    """
+    if not rows:
+        return []
+
+    dialect = db.session.get_bind().dialect
+    if dialect.insert_executemany_returning_sort_by_parameter_order:
+        statement = insert(model).returning(model.id, sort_by_parameter_order=True)
+        ids: list[int] = []
+        for start in range(0, len(rows), INSERT_CHUNK):
+            ids.extend(db.session.scalars(statement, rows[start : start + INSERT_CHUNK]))
+        return ids
+
+    return [
+        db.session.execute(insert(model).values(**row)).inserted_primary_key[0] for row in rows
+    ]
+
+
+def insert_rows(table: Any, rows: Iterable[dict[str, Any]]) -> int:
+    """Insère des lignes sans clé générée (tables d'association) via executemany."""
+    rows = list(rows)
+    for start in range(0, len(rows), INSERT_CHUNK):
+        db.session.execute(insert(table), rows[start : start + INSERT_CHUNK])
+    return len(rows)
+
+
+def _resolve_label_ids(model: Any, labels: list[str], found: dict[str, int]) -> dict[str, int]:
+    """
+    ``{label: id}`` pour chaque libellé demandé à partir des lignes ``found``
+    (libellés tels que stockés).
+
+    Avec une collation insensible à la casse ou aux accents
+    (``utf8mb4_unicode_ci``), la base renvoie le libellé stocké (« SEO ») pour
+    un libellé demandé équivalent (« seo ») : chaque libellé absent de
+    ``found`` est relu avec une égalité évaluée par la base, donc selon sa
+    collation.
+    """
+    ids = {label: found[label] for label in labels if label in found}
+    for label in labels:
+        if label not in ids:
+            row_id = db.session.scalar(db.select(model.id).where(model.label == label))
+            if row_id is not None:
+                ids[label] = row_id
+    return ids
+
+
+def _select_label_ids(model: Any, labels: list[str]) -> dict[str, int]:
+    found: dict[str, int] = {}
+    for start in range(0, len(labels), IN_CHUNK):
+        found.update(
+            db.session.execute(
+                db.select(model.label, model.id).where(
+                    model.label.in_(labels[start : start + IN_CHUNK])
+                )
+            ).all()
+        )
+    return _resolve_label_ids(model, labels, found)
+
+
+def upsert_labels(
+    model: Any,
+    entries: Iterable[dict[str, Any]],
+    fields: tuple[str, ...] = (),
+) -> dict[str, int]:
+    """
+    Get-or-create par libellé unique : retourne ``{label: id}`` en insérant
+    les libellés absents, sans valider la transaction.
+
+    Les lignes existantes sont conservées telles quelles (seuls les champs
+    ``fields`` de la première entrée d'un libellé servent à l'insertion).
+    Une seule instruction par lot sur SQLite/PostgreSQL
+    (``ON CONFLICT ... DO UPDATE ... RETURNING``) ; ``ON DUPLICATE KEY UPDATE``
+    puis une lecture des IDs sur MySQL/MariaDB. Deux requêtes concurrentes sur
+    le même libellé obtiennent le même ID au lieu d'une ``IntegrityError``.
+
+    Args:
+        model: ``Objectif`` ou ``Cible`` (colonne ``label`` unique)
+        entries: Dicts contenant au moins ``label``
+        fields: Colonnes complémentaires reprises des entrées
+    """
+    first_by_label: dict[str, dict[str, Any]] = {}
+    for entry in entries:
+        first_by_label.setdefault(entry["label"], entry)
+    if not first_by_label:
+        return {}
+
+    labels = list(first_by_label)
+    rows = [
+        {"label": label, **{field: first_by_label[label].get(field) for field in fields}}
+        for label in labels
+    ]
+    dialect = db.session.get_bind().dialect
+
+    if dialect.name in ("sqlite", "postgresql"):
+        insert_fn = sqlite.insert if dialect.name == "sqlite" else postgresql.insert
+        ids: dict[str, int] = {}
+        for start in range(0, len(rows), INSERT_CHUNK):
+            statement = insert_fn(model).values(rows[start : start + INSERT_CHUNK])
+            # DO UPDATE sans effet plutôt que DO NOTHING : RETURNING inclut
+            # alors aussi les lignes déjà présentes (libellé stocké conservé)
+            statement = statement.on_conflict_do_update(
+                index_elements=[model.label], set_={"label": model.label}
+            )
+            if dialect.insert_returning:
+                ids.update(db.session.execute(statement.returning(model.label, model.id)).all())
+            else:
+                db.session.execute(statement)
+        if not dialect.insert_returning:
+            return _select_label_ids(model, labels)
+        return _resolve_label_ids(model, labels, ids)
+
+    if dialect.name in ("mysql", "mariadb"):
+        for start in range(0, len(rows), INSERT_CHUNK):
+            statement = mysql.insert(model).values(rows[start : start + INSERT_CHUNK])
+            db.session.execute(statement.on_duplicate_key_update(label=model.label))
+        return _select_label_ids(model, labels)
+
+    ids = _select_label_ids(model, labels)
+    missing = [row for row in rows if row["label"] not in ids]
+    ids.update(zip((row["label"] for row in missing), insert_returning_ids(model, missing)))
+    return ids
+
+
+def upsert_label(model: Any, label: str, **fields: Any) -> int:
+    """ID d'un libellé unique, inséré avec ``fields`` s'il n'existe pas encore."""
+    return upsert_labels(model, [{"label": label, **fields}], tuple(fields))[label]
@@ -3,19 +3,24 @@
 from __future__ import annotations
 
 import logging
+from collections.abc import Iterator
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
 from flask import current_app
 
 from ..ai import ChatResponseSchema, OpenAIClient
+from ..ai.context_builder import build_context_text, build_prompt_messages, context_budget
 from ..ai.prompts import (
     SYSTEM_PROMPT_BASE,
     build_context_summary,
     get_prompt_for_intent,
 )
+from ..ai.tokens import count_message_tokens, count_tokens, tokenizer_name
+from ..aio import run_in_thread
 from ..extensions import db
 from ..models import AuteurType, Message, Scenario
+from .context_cache import load_context, load_scenario_state, record_message, serialize_message
 
 logger = logging.getLogger(__name__)
 
@@ -46,44 +51,15 @@ class ChatService:
         )
 
         try:
-            # Charger le scénario si fourni
-            scenario = None
-            context = {}
-            
-            if scenario_id:
-                scenario = Scenario.query.filter_by(id=scenario_id).first()
-                if not scenario:
-                    return {
-                        "message": "Scénario introuvable.",
-                        "actions": [],
-                        "error": "Scenario not found",
-                    }
-                
-                # Construire le contexte
-                context = ChatService._build_context(scenario)
-
-            # Sauvegarder le message utilisateur
-            if scenario_id:
-                ChatService.save_message(
-                    scenario_id=scenario_id,
-                    auteur=AuteurType.USER,
-                    contenu=user_message,
-                )
-
-            # Appeler OpenAI
-            ai_client = OpenAIClient()
-            
-            # Construire le prompt selon l'intention
-            system_prompt = SYSTEM_PROMPT_BASE
-            if intent:
-                intent_prompt = get_prompt_for_intent(intent)
-                if intent_prompt:
-                    system_prompt += f"\n\n{intent_prompt}"
+            turn = ChatService._prepare_turn(scenario_id, user_message, intent)
+            if "error" in turn:
+                return turn
 
+            ai_client = OpenAIClient()
             response = ai_client.chat_completion(
-                system_prompt=system_prompt,
+                system_prompt=turn["system_prompt"],
                 user_message=user_message,
-                context=context,
+                context=turn["context"],
                 response_format=ChatResponseSchema,
             )
 
@@ -91,36 +67,52 @@ class ChatService:
                 logger.error("[chat_service][error] Échec appel OpenAI")
                 response = ai_client.get_fallback_response()
 
-            # Sauvegarder la réponse assistant
-            if scenario_id:
-                ChatService.save_message(
-                    scenario_id=scenario_id,
-                    auteur=AuteurType.ASSISTANT,
-                    contenu=response.message_markdown,
-                    role_action=intent,
-                )
-
-            # Construire la réponse
-            result = {
-                "message": response.message_markdown,
-                "actions": [action.model_dump() for action in response.actions],
-                "entities_to_create": [
-                    entity.model_dump() for entity in response.entities_to_create
-                ],
+            return ChatService._finalize_turn(turn["scenario_id"], response, intent)
+
+        except Exception as exc:
+            logger.exception("[chat_service][error] Erreur traitement message")
+            return {
+                "message": "Une erreur est survenue lors du traitement de votre message.",
+                "actions": [],
+                "error": str(exc),
             }
 
-            if scenario:
-                result["scenario_state"] = ChatService._serialize_scenario(scenario)
+    @staticmethod
+    async def process_message_async(
+        scenario_id: int | None,
+        user_message: str,
+        intent: str | None = None,
+    ) -> dict[str, Any]:
+        """
+        Variante asynchrone (service ASGI) de ``process_message`` : préparation
+        et enregistrement du tour via le pool de threads, appel OpenAI attendu
+        sur la boucle d'événements.
+        """
+        logger.info(
+            "[chat_service][start] Traitement message",
+            extra={"scenario_id": scenario_id, "intent": intent},
+        )
 
-            if response.errors:
-                result["errors"] = response.errors
+        try:
+            turn = await run_in_thread(ChatService._prepare_turn, scenario_id, user_message, intent)
+            if "error" in turn:
+                return turn
 
-            logger.info(
-                "[chat_service][success] Message traité",
-                extra={"actions_count": len(response.actions)},
+            ai_client = OpenAIClient()
+            response = await ai_client.chat_completion_async(
+                system_prompt=turn["system_prompt"],
+                user_message=user_message,
+                context=turn["context"],
+                response_format=ChatResponseSchema,
             )
 
-            return result
+            if not response:
+                logger.error("[chat_service][error] Échec appel OpenAI")
+                response = ai_client.get_fallback_response()
+
+            return await run_in_thread(
+                ChatService._finalize_turn, turn["scenario_id"], response, intent
+            )
 
         except Exception as exc:
             logger.exception("[chat_service][error] Erreur traitement message")
@@ -130,6 +122,200 @@ class ChatService:
                 "error": str(exc),
             }
 
+    @staticmethod
+    def stream_message(
+        scenario_id: int | None,
+        user_message: str,
+        intent: str | None = None,
+    ) -> Iterator[tuple[str, dict[str, Any]]]:
+        """
+        Variante streaming de ``process_message``.
+
+        Produit des événements ``("token", {"delta": ...})`` pendant la génération
+        du message, puis un événement final ``("done", result)`` dont le contenu
+        est identique à la réponse de ``process_message``.
+
+        Args:
+            scenario_id: ID du scénario actif (None si création)
+            user_message: Message de l'utilisateur
+            intent: Intention détectée (optionnel)
+        """
+        logger.info(
+            "[chat_service][start] Traitement message (streaming)",
+            extra={"scenario_id": scenario_id, "intent": intent},
+        )
+
+        try:
+            turn = ChatService._prepare_turn(scenario_id, user_message, intent)
+            if "error" in turn:
+                yield "done", turn
+                return
+
+            ai_client = OpenAIClient()
+            response = None
+            for event, data in ai_client.stream_chat_completion(
+                system_prompt=turn["system_prompt"],
+                user_message=user_message,
+                context=turn["context"],
+            ):
+                if event == "delta":
+                    yield "token", {"delta": data}
+                else:
+                    response = data
+
+            if not response:
+                logger.error("[chat_service][error] Échec appel OpenAI (streaming)")
+                response = ai_client.get_fallback_response()
+
+            yield "done", ChatService._finalize_turn(turn["scenario_id"], response, intent)
+
+        except Exception as exc:
+            logger.exception("[chat_service][error] Erreur traitement message (streaming)")
+            yield "done", {
+                "message": "Une erreur est survenue lors du traitement de votre message.",
+                "actions": [],
+                "error": str(exc),
+            }
+
+    @staticmethod
+    def _prepare_turn(
+        scenario_id: int | None,
+        user_message: str,
+        intent: str | None,
+    ) -> dict[str, Any]:
+        """
+        Construit le contexte et le prompt, et enregistre le message utilisateur.
+
+        Returns:
+            Dict avec scenario_id, context, system_prompt (ou message/actions/error
+            si le scénario est introuvable)
+        """
+        context: dict[str, Any] = {}
+
+        if scenario_id:
+            context = ChatService._build_context(scenario_id)
+            if context is None:
+                return {
+                    "message": "Scénario introuvable.",
+                    "actions": [],
+                    "error": "Scenario not found",
+                }
+            context["token_budget"] = context_budget(intent)
+
+            ChatService.save_message(
+                scenario_id=scenario_id,
+                auteur=AuteurType.USER,
+                contenu=user_message,
+            )
+
+        return {
+            "scenario_id": scenario_id or None,
+            "context": context,
+            "system_prompt": ChatService._system_prompt(intent),
+        }
+
+    @staticmethod
+    def _system_prompt(intent: str | None) -> str:
+        """Construit le prompt système selon l'intention."""
+        system_prompt = SYSTEM_PROMPT_BASE
+        if intent:
+            intent_prompt = get_prompt_for_intent(intent)
+            if intent_prompt:
+                system_prompt += f"\n\n{intent_prompt}"
+        return system_prompt
+
+    @staticmethod
+    def estimate_prompt(
+        scenario_id: int | None,
+        user_message: str | None,
+        intent: str | None = None,
+        action: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        """
+        Estime la taille du prompt d'un tour de chat, sans appel OpenAI ni
+        enregistrement du message.
+
+        Args:
+            scenario_id: ID du scénario actif (None si création)
+            user_message: Message de l'utilisateur
+            intent: Intention (détermine le budget de contexte)
+            action: Action ``{"type", "payload"}`` estimée à la place du message
+
+        Returns:
+            Dict avec prompt_tokens, context_tokens, context_budget,
+            history_messages, history_available, context_truncated, model
+            et tokenizer
+
+        Raises:
+            LookupError: Si le scénario n'existe pas
+            ValueError: Si l'action n'a pas de type
+        """
+        if action:
+            intent = action.get("type")
+            if not intent:
+                raise ValueError("Type d'action requis")
+            user_message = ChatService._action_to_message(intent, action.get("payload"))
+
+        model = current_app.config.get("OPENAI_MODEL", "gpt-4o-mini")
+        context: dict[str, Any] = {}
+        if scenario_id:
+            context = ChatService._build_context(scenario_id)
+            if context is None:
+                raise LookupError("Scenario not found")
+            context["token_budget"] = context_budget(intent)
+
+        messages = build_prompt_messages(
+            ChatService._system_prompt(intent), user_message, context, model=model
+        )
+        context_text = build_context_text(context, model=model) if context else None
+
+        return {
+            "prompt_tokens": count_message_tokens(messages, model),
+            "context_tokens": context_text.tokens if context_text else 0,
+            "context_budget": context_budget(intent),
+            "history_messages": context_text.history_messages if context_text else 0,
+            "history_available": context_text.history_available if context_text else 0,
+            "context_truncated": context_text.truncated if context_text else False,
+            "model": model,
+            "tokenizer": tokenizer_name(model),
+        }
+
+    @staticmethod
+    def _finalize_turn(
+        scenario_id: int | None,
+        response: ChatResponseSchema,
+        intent: str | None,
+    ) -> dict[str, Any]:
+        """Enregistre la réponse de l'assistant et construit le résultat de l'API."""
+        if scenario_id:
+            ChatService.save_message(
+                scenario_id=scenario_id,
+                auteur=AuteurType.ASSISTANT,
+                contenu=response.message_markdown,
+                role_action=intent,
+            )
+
+        result = {
+            "message": response.message_markdown,
+            "actions": [action.model_dump() for action in response.actions],
+            "entities_to_create": [
+                entity.model_dump() for entity in response.entities_to_create
+            ],
+        }
+
+        if scenario_id:
+            result["scenario_state"] = ChatService._serialize_scenario(scenario_id)
+
+        if response.errors:
+            result["errors"] = response.errors
+
+        logger.info(
+            "[chat_service][success] Message traité",
+            extra={"actions_count": len(response.actions)},
+        )
+
+        return result
+
     @staticmethod
     def process_action(
         scenario_id: int,
@@ -153,26 +339,14 @@ class ChatService:
         )
 
         try:
-            scenario = Scenario.query.filter_by(id=scenario_id).first()
-            if not scenario:
+            user_message = ChatService._record_action(scenario_id, action_type, payload)
+            if user_message is None:
                 return {
                     "message": "Scénario introuvable.",
                     "actions": [],
                     "error": "Scenario not found",
                 }
 
-            # Sauvegarder l'action comme message système
-            action_label = payload.get("label", action_type) if payload else action_type
-            ChatService.save_message(
-                scenario_id=scenario_id,
-                auteur=AuteurType.SYSTEM,
-                contenu=f"Action déclenchée: {action_label}",
-                role_action=action_type,
-            )
-
-            # Construire un message utilisateur simulé pour l'action
-            user_message = ChatService._action_to_message(action_type, payload)
-
             # Traiter comme un message normal avec intention
             return ChatService.process_message(
                 scenario_id=scenario_id,
@@ -188,6 +362,108 @@ class ChatService:
                 "error": str(exc),
             }
 
+    @staticmethod
+    async def process_action_async(
+        scenario_id: int,
+        action_type: str,
+        payload: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        """Variante asynchrone (service ASGI) de ``process_action``."""
+        logger.info(
+            "[chat_service][start] Traitement action",
+            extra={"scenario_id": scenario_id, "action_type": action_type},
+        )
+
+        try:
+            user_message = await run_in_thread(
+                ChatService._record_action, scenario_id, action_type, payload
+            )
+        except Exception as exc:
+            logger.exception("[chat_service][error] Erreur traitement action")
+            return {
+                "message": "Une erreur est survenue lors du traitement de l'action.",
+                "actions": [],
+                "error": str(exc),
+            }
+
+        if user_message is None:
+            return {
+                "message": "Scénario introuvable.",
+                "actions": [],
+                "error": "Scenario not found",
+            }
+
+        return await ChatService.process_message_async(
+            scenario_id=scenario_id,
+            user_message=user_message,
+            intent=action_type,
+        )
+
+    @staticmethod
+    def stream_action(
+        scenario_id: int,
+        action_type: str,
+        payload: dict[str, Any] | None = None,
+    ) -> Iterator[tuple[str, dict[str, Any]]]:
+        """Variante streaming de ``process_action`` (voir ``stream_message``)."""
+        logger.info(
+            "[chat_service][start] Traitement action (streaming)",
+            extra={"scenario_id": scenario_id, "action_type": action_type},
+        )
+
+        try:
+            user_message = ChatService._record_action(scenario_id, action_type, payload)
+        except Exception as exc:
+            logger.exception("[chat_service][error] Erreur traitement action")
+            yield "done", {
+                "message": "Une erreur est survenue lors du traitement de l'action.",
+                "actions": [],
+                "error": str(exc),
+            }
+            return
+
+        if user_message is None:
+            yield "done", {
+                "message": "Scénario introuvable.",
+                "actions": [],
+                "error": "Scenario not found",
+            }
+            return
+
+        yield from ChatService.stream_message(
+            scenario_id=scenario_id,
+            user_message=user_message,
+            intent=action_type,
+        )
+
+    @staticmethod
+    def _record_action(
+        scenario_id: int,
+        action_type: str,
+        payload: dict[str, Any] | None,
+    ) -> str | None:
+        """
+        Enregistre l'action comme message système et la convertit en message utilisateur.
+
+        Returns:
+            Message utilisateur simulé, ou None si le scénario est introuvable
+        """
+        scenario = Scenario.query.filter_by(id=scenario_id).first()
+        if not scenario:
+            return None
+
+        # Sauvegarder l'action comme message système
+        action_label = payload.get("label", action_type) if payload else action_type
+        ChatService.save_message(
+            scenario_id=scenario_id,
+            auteur=AuteurType.SYSTEM,
+            contenu=f"Action déclenchée: {action_label}",
+            role_action=action_type,
+        )
+
+        # Construire un message utilisateur simulé pour l'action
+        return ChatService._action_to_message(action_type, payload)
+
     @staticmethod
     def get_conversation_history(
         scenario_id: int,
@@ -210,16 +486,7 @@ class ChatService:
             .all()
         )
 
-        return [
-            {
-                "id": msg.id,
-                "auteur": msg.auteur.value,
-                "contenu": msg.contenu,
-                "role_action": msg.role_action,
-                "created_at": msg.created_at.isoformat() if msg.created_at else None,
-            }
-            for msg in reversed(messages)  # Ordre chronologique
-        ]
+        return [serialize_message(msg) for msg in reversed(messages)]  # Ordre chronologique
 
     @staticmethod
     def save_message(
@@ -249,14 +516,19 @@ class ChatService:
             contenu=contenu,
             role_action=role_action,
             ttl=ttl,
+            token_count=count_tokens(contenu, current_app.config.get("OPENAI_MODEL")),
         )
 
         db.session.add(message)
+        # Flush avant commit : id et created_at sont connus sans relecture
+        db.session.flush()
+        entry = serialize_message(message)
         db.session.commit()
+        record_message(scenario_id, entry)
 
         logger.info(
             "[chat_service][success] Message sauvegardé",
-            extra={"message_id": message.id, "auteur": auteur.value},
+            extra={"message_id": entry["id"], "auteur": auteur.value},
         )
 
         return message
@@ -315,29 +587,19 @@ class ChatService:
         return actions
 
     @staticmethod
-    def _build_context(scenario: Scenario) -> dict[str, Any]:
-        """Construit le contexte pour OpenAI."""
-        from ..schemas.scenario import (
-            ConfigurationSchema,
-            ScenarioSchema,
-        )
-
-        scenario_schema = ScenarioSchema()
-        configuration_schema = ConfigurationSchema(many=True)
+    def _build_context(scenario_id: int) -> dict[str, Any] | None:
+        """
+        Construit le contexte pour OpenAI (None si le scénario n'existe pas).
 
-        return {
-            "scenario": scenario_schema.dump(scenario),
-            "configurations": configuration_schema.dump(scenario.configurations),
-            "historique": ChatService.get_conversation_history(scenario.id, limit=5),
-        }
+        Le contexte provient de l'instantané du scénario : seul l'historique
+        évolue d'un tour à l'autre, sans relecture en base.
+        """
+        return load_context(scenario_id)
 
     @staticmethod
-    def _serialize_scenario(scenario: Scenario) -> dict[str, Any]:
-        """Sérialise un scénario pour la réponse."""
-        from ..schemas.scenario import ScenarioDetailSchema
-
-        schema = ScenarioDetailSchema()
-        return schema.dump(scenario)
+    def _serialize_scenario(scenario_id: int) -> dict[str, Any] | None:
+        """Sérialise un scénario pour la réponse (format ``ScenarioDetailSchema``)."""
+        return load_scenario_state(scenario_id)
 
     @staticmethod
     def _action_to_message(action_type: str, payload: dict[str, Any] | None) -> str:
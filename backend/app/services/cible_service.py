@@ -2,15 +2,16 @@
 
 from __future__ import annotations
 
-import json
 import logging
 from typing import Any
 
-import openai
-from flask import current_app
-
+from ..aio import run_in_thread
 from ..extensions import db
 from ..models import Cible, Configuration, Scenario
+from .bulk import upsert_label
+from .label_index import drop_known_labels, similar_labels
+from .ai_call import AICall, run_ai_call, run_ai_call_async
+from .pagination import Page, paginate
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +29,32 @@ class CibleService:
         """
         return Cible.query.all()
 
+    @staticmethod
+    def list_cibles(
+        after: str | None = None,
+        limit: int | None = 50,
+        label_prefix: str | None = None,
+        segment: str | None = None,
+    ) -> Page:
+        """
+        Liste les cibles par ID croissant, page par page.
+
+        Args:
+            after: Curseur de la page précédente
+            limit: Taille de page (None : toutes les lignes)
+            label_prefix: Filtre sur le début du libellé
+            segment: Filtre exact sur le segment
+
+        Raises:
+            ValueError: Si le curseur est invalide
+        """
+        statement = db.select(Cible)
+        if label_prefix:
+            statement = statement.where(Cible.label.startswith(label_prefix, autoescape=True))
+        if segment:
+            statement = statement.where(Cible.segment == segment)
+        return paginate(statement, [(Cible.id, False)], after, limit)
+
     @staticmethod
     def create_cible(data: dict[str, Any]) -> Cible:
         """
@@ -49,13 +76,10 @@ class CibleService:
         if not label:
             raise ValueError("label est requis")
 
-        # Vérifier si la cible existe déjà
-        existing = Cible.query.filter_by(label=label).first()
-        if existing:
-            return existing
-
-        cible = Cible(label=label, persona=persona, segment=segment)
-        db.session.add(cible)
+        # Réutilise la cible existante (y compris créée en concurrence)
+        cible = db.session.get(
+            Cible, upsert_label(Cible, label, persona=persona, segment=segment)
+        )
         db.session.commit()
 
         logger.info(
@@ -66,21 +90,15 @@ class CibleService:
         return cible
 
     @staticmethod
-    def suggest_cibles_for_scenario(
-        scenario_id: int, configuration_id: int | None = None
-    ) -> list[dict[str, str]]:
+    def suggestion_call(scenario_id: int, configuration_id: int | None = None) -> AICall:
         """
-        Génère des suggestions de cibles pertinentes pour un scénario via IA.
-        Prend en compte les objectifs déjà sélectionnés si une configuration est fournie.
-        Évite les doublons en excluant les cibles existantes.
+        Prépare l'appel IA de suggestion de cibles pour un scénario, avec les
+        objectifs de la configuration si elle est fournie.
 
         Args:
             scenario_id: ID du scénario
             configuration_id: ID de la configuration (optionnel)
 
-        Returns:
-            Liste de 5-7 cibles suggérées avec label, persona et segment
-
         Raises:
             LookupError: Si le scénario n'existe pas
         """
@@ -88,26 +106,31 @@ class CibleService:
         if not scenario:
             raise LookupError(f"Scenario {scenario_id} not found")
 
-        # Récupérer les cibles existantes pour éviter les doublons
-        existing_cibles = CibleService.get_all_cibles()
-        existing_labels = [cible.label for cible in existing_cibles]
-        
-        existing_context = ""
-        if existing_labels:
-            existing_context = f"\n\nCibles DÉJÀ EXISTANTES à NE PAS proposer :\n" + "\n".join([f"- {label}" for label in existing_labels])
-
         # Récupérer les objectifs si une configuration est fournie
         objectifs_context = ""
+        objectif_labels: list[str] = []
         if configuration_id:
             configuration = Configuration.query.filter_by(id=configuration_id).first()
             if configuration and configuration.objectifs:
-                objectifs_list = [
-                    f"- {obj.label}" for obj in configuration.objectifs
-                ]
+                objectif_labels = [obj.label for obj in configuration.objectifs]
+                objectifs_list = [f"- {label}" for label in objectif_labels]
                 objectifs_context = f"\n\nObjectifs sélectionnés :\n" + "\n".join(
                     objectifs_list
                 )
 
+        # Seules les cibles existantes les plus proches du scénario sont
+        # rappelées ; les doublons restants sont filtrés après l'appel
+        existing_labels = similar_labels(
+            Cible,
+            " ".join(
+                filter(None, [scenario.nom, scenario.thematique, scenario.description, *objectif_labels])
+            ),
+        )
+
+        existing_context = ""
+        if existing_labels:
+            existing_context = f"\n\nCibles DÉJÀ EXISTANTES à NE PAS proposer :\n" + "\n".join([f"- {label}" for label in existing_labels])
+
         # Construire le prompt pour OpenAI
         prompt = f"""Vous êtes un expert en ciblage marketing B2B.
 
@@ -137,41 +160,78 @@ Répondez UNIQUEMENT au format JSON suivant (sans markdown, juste le JSON) :
   ]
 }}"""
 
+        messages = [
+            {
+                "role": "system",
+                "content": "Vous êtes un expert en ciblage marketing B2B. Vous répondez toujours en JSON valide.",
+            },
+            {"role": "user", "content": prompt},
+        ]
+
+        def finish(result: dict[str, Any]) -> list[dict[str, str]]:
+            return drop_known_labels(Cible, result.get("cibles", []))
+
+        return AICall(
+            "suggest_cibles",
+            scenario_id,
+            messages,
+            {"model": "gpt-4o-mini", "temperature": 0.7, "max_tokens": 1500},
+            finish,
+        )
+
+    @staticmethod
+    def suggest_cibles_for_scenario(
+        scenario_id: int, configuration_id: int | None = None
+    ) -> list[dict[str, str]]:
+        """
+        Génère des suggestions de cibles pertinentes pour un scénario via IA.
+        Prend en compte les objectifs déjà sélectionnés si une configuration est fournie.
+        Évite les doublons en excluant les cibles existantes.
+
+        Args:
+            scenario_id: ID du scénario
+            configuration_id: ID de la configuration (optionnel)
+
+        Returns:
+            Liste de 5-7 cibles suggérées avec label, persona et segment
+
+        Raises:
+            LookupError: Si le scénario n'existe pas
+        """
+        call = CibleService.suggestion_call(scenario_id, configuration_id)
         try:
-            # Appeler OpenAI
-            client = openai.OpenAI(api_key=current_app.config["OPENAI_API_KEY"])
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "Vous êtes un expert en ciblage marketing B2B. Vous répondez toujours en JSON valide.",
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0.7,
-                max_tokens=1500,
-            )
-
-            # Extraire la réponse
-            content = response.choices[0].message.content.strip()
-
-            # Parser le JSON
-            result = json.loads(content)
-
-            logger.info(
-                "[cible_service][success] Cibles suggérées",
-                extra={
-                    "scenario_id": scenario_id,
-                    "count": len(result.get("cibles", [])),
-                },
-            )
-
-            return result.get("cibles", [])
+            # Un seul appel pour les demandes identiques simultanées
+            cibles = run_ai_call(call)
+        except Exception as exc:
+            CibleService._log_failure(scenario_id, exc)
+            raise
+        CibleService._log_success(scenario_id, cibles)
+        return cibles
 
+    @staticmethod
+    async def suggest_cibles_for_scenario_async(
+        scenario_id: int, configuration_id: int | None = None
+    ) -> list[dict[str, str]]:
+        """Variante asynchrone (service ASGI) de ``suggest_cibles_for_scenario``."""
+        call = await run_in_thread(CibleService.suggestion_call, scenario_id, configuration_id)
+        try:
+            cibles = await run_ai_call_async(call)
         except Exception as exc:
-            logger.error(
-                "[cible_service][error] Erreur lors de la suggestion de cibles",
-                extra={"scenario_id": scenario_id, "error": str(exc)},
-            )
+            CibleService._log_failure(scenario_id, exc)
             raise
+        CibleService._log_success(scenario_id, cibles)
+        return cibles
+
+    @staticmethod
+    def _log_success(scenario_id: int, cibles: list[dict[str, str]]) -> None:
+        logger.info(
+            "[cible_service][success] Cibles suggérées",
+            extra={"scenario_id": scenario_id, "count": len(cibles)},
+        )
+
+    @staticmethod
+    def _log_failure(scenario_id: int, exc: Exception) -> None:
+        logger.error(
+            "[cible_service][error] Erreur lors de la suggestion de cibles",
+            extra={"scenario_id": scenario_id, "error": str(exc)},
+        )
@@ -3,36 +3,60 @@
 from __future__ import annotations
 
 import logging
+from datetime import datetime, timezone
 from typing import Any
 
 from ..extensions import db
 from ..models import Cible, Configuration, Objectif, Scenario
+from .bulk import upsert_label
+from .context_cache import invalidate_scenario_context
+from .detail_cache import Detail, invalidate_details, load_detail
+from .pagination import Page, paginate
+from .scenario_loader import ScenarioTreeLoader
+from .suggestion_store import SuggestionStore
+from .tree_version import TreeVersion, configuration_version
 
 logger = logging.getLogger(__name__)
 
 
+def _touch(configuration: Configuration) -> None:
+    """Les liens objectifs/cibles n'ont ni horodatage ni compteur : la configuration porte leur modification."""
+    configuration.updated_at = datetime.now(timezone.utc)
+
+
 class ConfigurationService:
     """Service de gestion des configurations de scénarios."""
 
     @staticmethod
-    def list_configurations(scenario_id: int) -> list[Configuration]:
+    def list_configurations(
+        scenario_id: int,
+        after: str | None = None,
+        limit: int | None = 50,
+        nom_prefix: str | None = None,
+    ) -> Page:
         """
-        Liste toutes les configurations d'un scénario.
+        Liste les configurations d'un scénario par ID croissant, page par page.
 
         Args:
             scenario_id: ID du scénario
+            after: Curseur de la page précédente
+            limit: Taille de page (None : toutes les lignes)
+            nom_prefix: Filtre sur le début du nom
 
         Returns:
-            Liste des configurations
+            Page de configurations
 
         Raises:
             LookupError: Si le scénario n'existe pas
+            ValueError: Si le curseur est invalide
         """
-        scenario = Scenario.query.filter_by(id=scenario_id).first()
-        if not scenario:
+        if db.session.get(Scenario, scenario_id) is None:
             raise LookupError(f"Scenario {scenario_id} not found")
 
-        return Configuration.query.filter_by(scenario_id=scenario_id).all()
+        statement = db.select(Configuration).where(Configuration.scenario_id == scenario_id)
+        if nom_prefix:
+            statement = statement.where(Configuration.nom.startswith(nom_prefix, autoescape=True))
+        return paginate(statement, [(Configuration.id, False)], after, limit)
 
     @staticmethod
     def create_configuration(data: dict[str, Any]) -> Configuration:
@@ -65,6 +89,9 @@ class ConfigurationService:
 
         db.session.add(configuration)
         db.session.commit()
+        invalidate_scenario_context(scenario_id)
+        invalidate_details(scenario_id)
+        SuggestionStore.prefetch(scenario_id, configuration.id, ["objectifs", "cibles"])
 
         logger.info(
             "[configuration_service][success] Configuration créée",
@@ -93,6 +120,62 @@ class ConfigurationService:
 
         return configuration
 
+    @staticmethod
+    def get_scenario_id(configuration_id: int) -> int:
+        """Scénario d'une configuration, sans charger ses relations."""
+        scenario_id = db.session.scalar(
+            db.select(Configuration.scenario_id).where(Configuration.id == configuration_id)
+        )
+        if scenario_id is None:
+            raise LookupError(f"Configuration {configuration_id} not found")
+        return scenario_id
+
+    @staticmethod
+    def get_configuration_tree(configuration_id: int) -> dict[str, Any]:
+        """
+        Détail sérialisé d'une configuration (même format que
+        ``ConfigurationDetailSchema``), chargé en un nombre fixe de requêtes.
+
+        Raises:
+            LookupError: Si la configuration n'existe pas
+        """
+        tree = ScenarioTreeLoader.load_configuration(configuration_id)
+        if tree is None:
+            raise LookupError(f"Configuration {configuration_id} not found")
+        return tree
+
+    @staticmethod
+    def get_configuration_json(
+        configuration_id: int, version: TreeVersion | None = None
+    ) -> Detail:
+        """
+        Détail JSON encodé d'une configuration, servi par le cache des détails
+        tant que sa version ne change pas.
+
+        Raises:
+            LookupError: Si la configuration n'existe pas
+        """
+        version = version or ConfigurationService.tree_version(configuration_id)
+        return load_detail(
+            "configuration",
+            configuration_id,
+            version,
+            lambda: ConfigurationService.get_configuration_tree(configuration_id),
+        )
+
+    @staticmethod
+    def tree_version(configuration_id: int) -> TreeVersion:
+        """
+        Version de l'arbre d'une configuration (une requête d'agrégats).
+
+        Raises:
+            LookupError: Si la configuration n'existe pas
+        """
+        version = configuration_version(configuration_id)
+        if not version.rows:
+            raise LookupError(f"Configuration {configuration_id} not found")
+        return version
+
     @staticmethod
     def delete_configuration(configuration_id: int) -> None:
         """
@@ -108,8 +191,11 @@ class ConfigurationService:
         if not configuration:
             raise LookupError(f"Configuration {configuration_id} not found")
 
+        scenario_id = configuration.scenario_id
         db.session.delete(configuration)
         db.session.commit()
+        invalidate_scenario_context(scenario_id)
+        invalidate_details(scenario_id, configuration_id)
 
         logger.info(
             "[configuration_service][success] Configuration supprimée",
@@ -117,7 +203,7 @@ class ConfigurationService:
         )
 
     @staticmethod
-    def add_objectif(configuration_id: int, payload: dict[str, Any]) -> dict[str, Any]:
+    def add_objectif(configuration_id: int, payload: dict[str, Any]) -> Detail:
         """
         Ajoute un objectif à une configuration.
 
@@ -126,7 +212,7 @@ class ConfigurationService:
             payload: Données de l'objectif
 
         Returns:
-            Dict avec configuration mise à jour
+            Détail encodé de la configuration mise à jour
 
         Raises:
             LookupError: Si la configuration n'existe pas
@@ -142,28 +228,29 @@ class ConfigurationService:
         if not label:
             raise ValueError("label est requis")
 
-        # Chercher ou créer l'objectif
-        objectif = Objectif.query.filter_by(label=label).first()
-        if not objectif:
-            objectif = Objectif(label=label, description=description)
-            db.session.add(objectif)
+        objectif = db.session.get(
+            Objectif, upsert_label(Objectif, label, description=description)
+        )
 
         # Ajouter à la configuration si pas déjà présent
         if objectif not in configuration.objectifs:
             configuration.objectifs.append(objectif)
+            _touch(configuration)
             db.session.commit()
+            invalidate_scenario_context(configuration.scenario_id)
+            invalidate_details(configuration.scenario_id, configuration_id)
+            # Les suggestions de cibles dépendent des objectifs sélectionnés
+            SuggestionStore.prefetch(configuration.scenario_id, configuration_id, ["cibles"])
 
         logger.info(
             "[configuration_service][success] Objectif ajouté",
             extra={"configuration_id": configuration_id, "objectif_id": objectif.id},
         )
 
-        from ..schemas.scenario import ConfigurationDetailSchema
-        schema = ConfigurationDetailSchema()
-        return schema.dump(configuration)
+        return ConfigurationService.get_configuration_json(configuration_id)
 
     @staticmethod
-    def add_cible(configuration_id: int, payload: dict[str, Any]) -> dict[str, Any]:
+    def add_cible(configuration_id: int, payload: dict[str, Any]) -> Detail:
         """
         Ajoute une cible à une configuration.
 
@@ -172,7 +259,7 @@ class ConfigurationService:
             payload: Données de la cible
 
         Returns:
-            Dict avec configuration mise à jour
+            Détail encodé de la configuration mise à jour
 
         Raises:
             LookupError: Si la configuration n'existe pas
@@ -189,28 +276,27 @@ class ConfigurationService:
         if not label:
             raise ValueError("label est requis")
 
-        # Chercher ou créer la cible
-        cible = Cible.query.filter_by(label=label).first()
-        if not cible:
-            cible = Cible(label=label, persona=persona, segment=segment)
-            db.session.add(cible)
+        cible = db.session.get(
+            Cible, upsert_label(Cible, label, persona=persona, segment=segment)
+        )
 
         # Ajouter à la configuration si pas déjà présent
         if cible not in configuration.cibles:
             configuration.cibles.append(cible)
+            _touch(configuration)
             db.session.commit()
+            invalidate_scenario_context(configuration.scenario_id)
+            invalidate_details(configuration.scenario_id, configuration_id)
 
         logger.info(
             "[configuration_service][success] Cible ajoutée",
             extra={"configuration_id": configuration_id, "cible_id": cible.id},
         )
 
-        from ..schemas.scenario import ConfigurationDetailSchema
-        schema = ConfigurationDetailSchema()
-        return schema.dump(configuration)
+        return ConfigurationService.get_configuration_json(configuration_id)
 
     @staticmethod
-    def remove_objectif(configuration_id: int, objectif_id: int) -> dict[str, Any]:
+    def remove_objectif(configuration_id: int, objectif_id: int) -> Detail:
         """
         Retire un objectif d'une configuration.
 
@@ -219,7 +305,7 @@ class ConfigurationService:
             objectif_id: ID de l'objectif
 
         Returns:
-            Dict avec configuration mise à jour
+            Détail encodé de la configuration mise à jour
 
         Raises:
             LookupError: Si la configuration ou l'objectif n'existe pas
@@ -234,19 +320,22 @@ class ConfigurationService:
 
         if objectif in configuration.objectifs:
             configuration.objectifs.remove(objectif)
+            _touch(configuration)
             db.session.commit()
+            invalidate_scenario_context(configuration.scenario_id)
+            invalidate_details(configuration.scenario_id, configuration_id)
+            # Les suggestions de cibles dépendent des objectifs sélectionnés
+            SuggestionStore.prefetch(configuration.scenario_id, configuration_id, ["cibles"])
 
         logger.info(
             "[configuration_service][success] Objectif retiré",
             extra={"configuration_id": configuration_id, "objectif_id": objectif_id},
         )
 
-        from ..schemas.scenario import ConfigurationDetailSchema
-        schema = ConfigurationDetailSchema()
-        return schema.dump(configuration)
+        return ConfigurationService.get_configuration_json(configuration_id)
 
     @staticmethod
-    def remove_cible(configuration_id: int, cible_id: int) -> dict[str, Any]:
+    def remove_cible(configuration_id: int, cible_id: int) -> Detail:
         """
         Retire une cible d'une configuration.
 
@@ -255,7 +344,7 @@ class ConfigurationService:
             cible_id: ID de la cible
 
         Returns:
-            Dict avec configuration mise à jour
+            Détail encodé de la configuration mise à jour
 
         Raises:
             LookupError: Si la configuration ou la cible n'existe pas
@@ -270,16 +359,17 @@ class ConfigurationService:
 
         if cible in configuration.cibles:
             configuration.cibles.remove(cible)
+            _touch(configuration)
             db.session.commit()
+            invalidate_scenario_context(configuration.scenario_id)
+            invalidate_details(configuration.scenario_id, configuration_id)
 
         logger.info(
             "[configuration_service][success] Cible retirée",
             extra={"configuration_id": configuration_id, "cible_id": cible_id},
         )
 
-        from ..schemas.scenario import ConfigurationDetailSchema
-        schema = ConfigurationDetailSchema()
-        return schema.dump(configuration)
+        return ConfigurationService.get_configuration_json(configuration_id)
 
     @staticmethod
     def can_create_plan(configuration_id: int) -> bool:
@@ -0,0 +1,237 @@
+"""Cache des contextes de chat par scénario (instantanés invalidés à l'écriture)."""
+
+from __future__ import annotations
+
+import copy
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any
+
+from flask import current_app
+
+from ..ai.context_builder import format_context_facts
+from ..extensions import db
+from ..models import AuteurType, Message
+from .scenario_loader import ScenarioTreeLoader
+
+# Nombre de messages d'historique conservés par instantané ; le budget de
+# tokens décide ensuite combien sont transmis au modèle
+HISTORY_SIZE = 30
+
+_SCENARIO_FIELDS = ("id", "nom", "thematique", "description", "statut", "created_at", "updated_at")
+_CONFIGURATION_FIELDS = ("id", "scenario_id", "nom", "created_at", "updated_at")
+
+
+def serialize_message(message: Message) -> dict[str, Any]:
+    """Sérialise un message d'historique (format de ``get_conversation_history``)."""
+    return {
+        "id": message.id,
+        "auteur": AuteurType(message.auteur).value,
+        "contenu": message.contenu,
+        "role_action": message.role_action,
+        "token_count": message.token_count,
+        "created_at": message.created_at.isoformat() if message.created_at else None,
+    }
+
+
+class _Snapshot:
+    __slots__ = ("tree", "facts", "facts_text", "history", "expires_at")
+
+    def __init__(
+        self,
+        tree: dict[str, Any],
+        history: list[dict[str, Any]],
+        expires_at: float,
+        history_size: int = HISTORY_SIZE,
+    ):
+        self.tree = tree
+        self.facts = {
+            "scenario": {key: tree[key] for key in _SCENARIO_FIELDS},
+            "configurations": [
+                {key: configuration[key] for key in _CONFIGURATION_FIELDS}
+                for configuration in tree["configurations"]
+            ],
+        }
+        self.facts_text = format_context_facts(self.facts)
+        self.history: deque[dict[str, Any]] = deque(history, maxlen=history_size)
+        self.expires_at = expires_at
+
+    def context(self) -> dict[str, Any]:
+        return {
+            **self.facts,
+            "historique": list(self.history),
+            "facts_text": self.facts_text,
+        }
+
+
+def _load_snapshot(scenario_id: int, expires_at: float = 0.0) -> _Snapshot | None:
+    """Charge l'arbre du scénario et son historique récent (8 requêtes)."""
+    tree = ScenarioTreeLoader.load_scenario(scenario_id)
+    if tree is None:
+        return None
+
+    history_size = current_app.config.get("CHAT_HISTORY_MAX_MESSAGES", HISTORY_SIZE)
+
+    messages = db.session.scalars(
+        db.select(Message)
+        .where(Message.scenario_id == scenario_id)
+        .order_by(Message.created_at.desc(), Message.id.desc())
+        .limit(history_size)
+    ).all()
+    return _Snapshot(
+        tree,
+        [serialize_message(message) for message in reversed(messages)],
+        expires_at,
+        history_size,
+    )
+
+
+class ChatContextCache:
+    """
+    Instantanés de contexte par scénario, en mémoire du processus.
+
+    Un instantané contient l'arbre du scénario (``scenario_state``), les faits
+    déjà formatés pour le prompt et les derniers messages. Les écritures des
+    services invalident l'instantané ; les nouveaux messages y sont ajoutés
+    sans relire l'historique. Le TTL borne l'obsolescence entre workers.
+    """
+
+    def __init__(self, ttl_seconds: int = 300, max_entries: int = 512):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[int, _Snapshot] = OrderedDict()
+        # Incrémenté à chaque invalidation : un chargement concurrent à une
+        # écriture n'est pas conservé
+        self._generations: dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any]) -> "ChatContextCache":
+        return cls(
+            ttl_seconds=config.get("CHAT_CONTEXT_CACHE_TTL_SECONDS", 300),
+            max_entries=config.get("CHAT_CONTEXT_CACHE_MAX_ENTRIES", 512),
+        )
+
+    def _snapshot(self, scenario_id: int) -> _Snapshot | None:
+        now = time.monotonic()
+        with self._lock:
+            snapshot = self._entries.get(scenario_id)
+            if snapshot is not None and snapshot.expires_at > now:
+                self._entries.move_to_end(scenario_id)
+                self._hits += 1
+                return snapshot
+            self._entries.pop(scenario_id, None)
+            self._misses += 1
+            generation = self._generations.get(scenario_id, 0)
+
+        snapshot = _load_snapshot(scenario_id, now + self.ttl_seconds)
+        if snapshot is None:
+            return None
+
+        with self._lock:
+            if self._generations.get(scenario_id, 0) != generation:
+                return snapshot
+            self._entries[scenario_id] = snapshot
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return snapshot
+
+    def get_context(self, scenario_id: int) -> dict[str, Any] | None:
+        """
+        Contexte de prompt d'un scénario (None s'il n'existe pas).
+
+        Returns:
+            Dict avec scenario, configurations, historique et facts_text
+        """
+        snapshot = self._snapshot(scenario_id)
+        if snapshot is None:
+            return None
+        with self._lock:
+            return snapshot.context()
+
+    def get_scenario_state(self, scenario_id: int) -> dict[str, Any] | None:
+        """Arbre du scénario (format ``ScenarioDetailSchema``), None s'il n'existe pas."""
+        snapshot = self._snapshot(scenario_id)
+        return copy.deepcopy(snapshot.tree) if snapshot is not None else None
+
+    def append_message(self, scenario_id: int | None, entry: dict[str, Any]) -> None:
+        """Ajoute un message sérialisé à l'historique de l'instantané, s'il existe."""
+        if scenario_id is None:
+            return
+        with self._lock:
+            snapshot = self._entries.get(scenario_id)
+            if snapshot is not None:
+                snapshot.history.append(entry)
+
+    def invalidate(self, scenario_id: int | None) -> None:
+        if scenario_id is None:
+            return
+        with self._lock:
+            self._generations[scenario_id] = self._generations.get(scenario_id, 0) + 1
+            if self._entries.pop(scenario_id, None) is not None:
+                self._invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            for scenario_id in self._entries:
+                self._generations[scenario_id] = self._generations.get(scenario_id, 0) + 1
+            self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "invalidations": self._invalidations,
+                "size": len(self._entries),
+                "hit_ratio": round(self._hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+def get_context_cache() -> ChatContextCache | None:
+    """Retourne le cache de l'application courante (None si désactivé)."""
+    if not current_app.config.get("CHAT_CONTEXT_CACHE_ENABLED", True):
+        return None
+
+    cache = current_app.extensions.get("chat_context_cache")
+    if cache is None:
+        cache = current_app.extensions.setdefault(
+            "chat_context_cache", ChatContextCache.from_config(current_app.config)
+        )
+    return cache
+
+
+def invalidate_scenario_context(scenario_id: int | None) -> None:
+    """Invalide l'instantané d'un scénario après une écriture."""
+    cache = get_context_cache()
+    if cache is not None:
+        cache.invalidate(scenario_id)
+
+
+def load_context(scenario_id: int) -> dict[str, Any] | None:
+    """Contexte de prompt d'un scénario, via le cache s'il est activé."""
+    cache = get_context_cache()
+    if cache is not None:
+        return cache.get_context(scenario_id)
+    snapshot = _load_snapshot(scenario_id)
+    return snapshot.context() if snapshot is not None else None
+
+
+def load_scenario_state(scenario_id: int) -> dict[str, Any] | None:
+    """Arbre sérialisé d'un scénario, via le cache s'il est activé."""
+    cache = get_context_cache()
+    if cache is not None:
+        return cache.get_scenario_state(scenario_id)
+    return ScenarioTreeLoader.load_scenario(scenario_id)
+
+
+def record_message(scenario_id: int | None, entry: dict[str, Any]) -> None:
+    """Ajoute un message enregistré (sérialisé) à l'instantané de son scénario."""
+    cache = get_context_cache()
+    if cache is not None:
+        cache.append_message(scenario_id, entry)
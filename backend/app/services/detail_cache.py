@@ -0,0 +1,242 @@
+"""Cache des réponses JSON de détail (scénario, configuration) invalidé à l'écriture.
+
+Une entrée contient le corps JSON déjà encodé d'un détail et la version
+(``tree_version``) de l'arbre dont il provient. Une lecture calcule la
+version courante (une requête d'agrégats, déjà nécessaire pour l'ETag) et
+ne sert l'entrée que si elle correspond. Toute écriture ORM incrémente le
+compteur ``version`` de la ligne modifiée : un détail mis en cache par un
+worker n'est donc plus servi après une écriture d'un autre worker, même
+dans la même seconde. Seule une écriture SQL directe qui n'incrémente pas
+``version`` passe inaperçue jusqu'à l'invalidation ou l'éviction de
+l'entrée. Les chemins d'écriture des services et le hook ``after_flush``
+suppriment en plus les entrées concernées dès l'écriture.
+
+Deux stockages : ``memory`` (LRU du processus) et ``local_kv`` (fichier
+SQLite partagé par les workers d'une machine, à la place d'un stockage
+clé-valeur externe).
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Protocol
+
+from flask import Flask, current_app, has_app_context
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from ..metrics import get_metrics
+from ..models import Configuration, Plan, Scenario
+from .tree_version import TreeVersion
+
+
+@dataclass
+class Detail:
+    """Corps JSON encodé d'un détail et version de l'arbre servi."""
+
+    body: bytes
+    version: TreeVersion
+
+
+class DetailCacheBackend(Protocol):
+    def get(self, key: str) -> tuple[str, bytes] | None: ...
+
+    def set(self, key: str, version: str, body: bytes) -> None: ...
+
+    def delete(self, key: str) -> None: ...
+
+
+class MemoryBackend:
+    """LRU borné en mémoire du processus."""
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[str, bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> tuple[str, bytes] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, version: str, body: bytes) -> None:
+        with self._lock:
+            self._entries[key] = (version, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class LocalKVBackend:
+    """Stockage clé-valeur local (fichier SQLite), partagé par les workers de la machine."""
+
+    _PRUNE_EVERY = 100
+
+    def __init__(self, path: str, max_entries: int = 2048):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._writes = 0
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS detail_cache ("
+                "key TEXT PRIMARY KEY, version TEXT NOT NULL, body BLOB NOT NULL, "
+                "used_at REAL NOT NULL)"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def get(self, key: str) -> tuple[str, bytes] | None:
+        row = self._connection().execute(
+            "SELECT version, body FROM detail_cache WHERE key = ?", (key,)
+        ).fetchone()
+        return (row[0], bytes(row[1])) if row else None
+
+    def set(self, key: str, version: str, body: bytes) -> None:
+        conn = self._connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO detail_cache (key, version, body, used_at) VALUES (?, ?, ?, ?)",
+            (key, version, body, time.time()),
+        )
+        self._writes += 1
+        if self._writes % self._PRUNE_EVERY == 0:
+            # Les plus anciennes écritures au-delà de la limite
+            conn.execute(
+                "DELETE FROM detail_cache WHERE key IN (SELECT key FROM detail_cache "
+                "ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def delete(self, key: str) -> None:
+        self._connection().execute("DELETE FROM detail_cache WHERE key = ?", (key,))
+
+
+def _count(name: str, labels: dict[str, Any]) -> None:
+    registry = get_metrics()
+    registry.describe(
+        "detail_cache_lookups_total", "counter", "Lectures du cache des détails par résultat"
+    )
+    registry.describe(
+        "detail_cache_invalidations_total", "counter", "Invalidations du cache des détails par origine"
+    )
+    registry.inc(name, labels)
+
+
+class DetailCache:
+    """Détails JSON encodés, par type d'entité et ID, étiquetés par version."""
+
+    def __init__(self, backend: DetailCacheBackend):
+        self.backend = backend
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any]) -> "DetailCache":
+        max_entries = config.get("DETAIL_CACHE_MAX_ENTRIES", 2048)
+        if config.get("DETAIL_CACHE_BACKEND", "memory") == "local_kv":
+            path = config.get("DETAIL_CACHE_PATH") or os.path.join(
+                tempfile.gettempdir(),
+                f"{config.get('PROJECT_NAME', 'app')}-detail-cache.sqlite3",
+            )
+            return cls(LocalKVBackend(path, max_entries))
+        return cls(MemoryBackend(max_entries))
+
+    def get(self, kind: str, entity_id: int, version: str) -> bytes | None:
+        entry = self.backend.get(f"{kind}:{entity_id}")
+        if entry is None:
+            result = "miss"
+        elif entry[0] != version:
+            result = "stale"
+        else:
+            _count("detail_cache_lookups_total", {"kind": kind, "result": "hit"})
+            return entry[1]
+        _count("detail_cache_lookups_total", {"kind": kind, "result": result})
+        return None
+
+    def set(self, kind: str, entity_id: int, version: str, body: bytes) -> None:
+        self.backend.set(f"{kind}:{entity_id}", version, body)
+
+    def invalidate(self, kind: str, entity_id: int | None, source: str = "service") -> None:
+        if entity_id is None:
+            return
+        self.backend.delete(f"{kind}:{entity_id}")
+        _count("detail_cache_invalidations_total", {"kind": kind, "source": source})
+
+
+def get_detail_cache() -> DetailCache | None:
+    """Retourne le cache de l'application courante (None si désactivé)."""
+    if not current_app.config.get("DETAIL_CACHE_ENABLED", True):
+        return None
+
+    cache = current_app.extensions.get("detail_cache")
+    if cache is None:
+        cache = current_app.extensions.setdefault(
+            "detail_cache", DetailCache.from_config(current_app.config)
+        )
+    return cache
+
+
+def load_detail(
+    kind: str, entity_id: int, version: TreeVersion, load: Callable[[], dict[str, Any]]
+) -> Detail:
+    """Détail encodé depuis le cache, ou chargé par ``load`` puis mis en cache."""
+    cache = get_detail_cache()
+    body = cache.get(kind, entity_id, version.etag) if cache is not None else None
+    if body is None:
+        body = current_app.json.dumps(load()).encode("utf-8")
+        if cache is not None:
+            cache.set(kind, entity_id, version.etag, body)
+    return Detail(body, version)
+
+
+def invalidate_details(scenario_id: int | None, configuration_id: int | None = None) -> None:
+    """Invalide le détail d'un scénario et, le cas échéant, d'une de ses configurations."""
+    cache = get_detail_cache()
+    if cache is not None:
+        cache.invalidate("scenario", scenario_id)
+        cache.invalidate("configuration", configuration_id)
+
+
+def _after_flush(session: Session, flush_context: Any) -> None:
+    """Invalide les détails touchés par les objets écrits (sans requête supplémentaire)."""
+    if not has_app_context():
+        return
+    cache = get_detail_cache()
+    if cache is None:
+        return
+
+    targets = set()
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        # Attributs déjà chargés uniquement : pas de chargement pendant le flush
+        values = inspect(instance).dict
+        if isinstance(instance, Scenario):
+            targets.add(("scenario", values.get("id")))
+        elif isinstance(instance, Configuration):
+            targets.add(("configuration", values.get("id")))
+            targets.add(("scenario", values.get("scenario_id")))
+        elif isinstance(instance, Plan):
+            targets.add(("configuration", values.get("configuration_id")))
+    for kind, entity_id in targets:
+        cache.invalidate(kind, entity_id, source="flush")
+
+
+def init_detail_cache(app: Flask) -> None:
+    """Branche l'invalidation ``after_flush`` (une fois par processus)."""
+    if not event.contains(Session, "after_flush", _after_flush):
+        event.listen(Session, "after_flush", _after_flush)
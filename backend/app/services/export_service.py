@@ -0,0 +1,243 @@
+"""Service d'export en flux (NDJSON, CSV, compression gzip à la volée)."""
+
+from __future__ import annotations
+
+import csv
+import json
+import logging
+import zlib
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+from flask import current_app
+
+from ..extensions import db
+from ..models import Article, Cible, Configuration, Objectif, Plan, PlanItem, Scenario
+from .scenario_loader import ScenarioTreeLoader
+
+logger = logging.getLogger(__name__)
+
+# Tampon minimal avant émission d'un bloc compressé
+_GZIP_FLUSH_BYTES = 64 * 1024
+
+
+PLAN_CSV_HEADER = [
+    "Type",
+    "Scénario ID",
+    "Scénario",
+    "Configuration ID",
+    "Configuration",
+    "Plan ID",
+    "Généré le",
+    "Élément ID",
+    "Format",
+    "Message",
+    "Canal",
+    "Fréquence",
+    "KPI",
+    "Nom",
+    "Résumé",
+]
+
+
+class _Echo:
+    """Pseudo-fichier pour ``csv.writer`` : retourne la ligne au lieu de la stocker."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def _ndjson_line(record: dict[str, Any]) -> bytes:
+    return (json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+class ExportService:
+    """Exports volumineux sérialisés un enregistrement à la fois."""
+
+    @staticmethod
+    def _stream_rows(statement) -> Iterator[Any]:
+        """
+        Parcourt ``statement`` avec un curseur côté serveur sur une connexion
+        dédiée : la session reste libre pour charger les arbres pendant le
+        parcours (un curseur non bufferisé MySQL bloque sa connexion).
+        """
+        batch_size = current_app.config.get("EXPORT_BATCH_SIZE", 200)
+        with db.engine.connect() as connection:
+            result = connection.execution_options(
+                stream_results=True, yield_per=batch_size
+            ).execute(statement)
+            yield from result
+
+    @staticmethod
+    def iter_scenarios(scenario_ids: list[int] | None = None) -> Iterator[dict[str, Any]]:
+        """
+        Arbres des scénarios (format ``ScenarioDetailSchema``), par ID croissant.
+
+        Args:
+            scenario_ids: Scénarios à exporter (tous si None)
+        """
+        batch_size = current_app.config.get("EXPORT_BATCH_SIZE", 200)
+        statement = db.select(Scenario.id).order_by(Scenario.id)
+        if scenario_ids is not None:
+            statement = statement.where(Scenario.id.in_(scenario_ids))
+
+        batch: list[int] = []
+        for row in ExportService._stream_rows(statement):
+            batch.append(row.id)
+            if len(batch) >= batch_size:
+                yield from ScenarioTreeLoader.load_scenarios(batch)
+                batch = []
+                # Libère les objets éventuellement chargés entre deux lots
+                db.session.expunge_all()
+        if batch:
+            yield from ScenarioTreeLoader.load_scenarios(batch)
+
+    @staticmethod
+    def scenarios_ndjson(scenario_ids: list[int] | None = None) -> Iterator[bytes]:
+        """Une ligne JSON par scénario."""
+        count = 0
+        for tree in ExportService.iter_scenarios(scenario_ids):
+            count += 1
+            yield _ndjson_line(tree)
+        logger.info("[export_service][success] Export NDJSON des scénarios", extra={"count": count})
+
+    @staticmethod
+    def workspace_ndjson() -> Iterator[bytes]:
+        """
+        Export complet de l'espace de travail : catalogues d'objectifs et de
+        cibles, puis scénarios. Chaque ligne vaut ``{"type": ..., "data": ...}``.
+        """
+        for row in ExportService._stream_rows(
+            db.select(Objectif.id, Objectif.label, Objectif.description).order_by(Objectif.id)
+        ):
+            yield _ndjson_line({"type": "objectif", "data": dict(row._mapping)})
+
+        for row in ExportService._stream_rows(
+            db.select(Cible.id, Cible.label, Cible.persona, Cible.segment).order_by(Cible.id)
+        ):
+            yield _ndjson_line({"type": "cible", "data": dict(row._mapping)})
+
+        for tree in ExportService.iter_scenarios():
+            yield _ndjson_line({"type": "scenario", "data": tree})
+
+    @staticmethod
+    def plan_rows_statement(scenario_ids: list[int] | None = None):
+        """
+        Lignes de plans (items et articles) de toutes les configurations, triées
+        par scénario, configuration, plan puis type.
+        """
+        plan_columns = (
+            Scenario.id.label("scenario_id"),
+            Scenario.nom.label("scenario_nom"),
+            Configuration.id.label("configuration_id"),
+            Configuration.nom.label("configuration_nom"),
+            Plan.id.label("plan_id"),
+            Plan.generated_at.label("generated_at"),
+        )
+
+        def _scoped(statement, model):
+            statement = (
+                statement.join(Plan, model.plan_id == Plan.id)
+                .join(Configuration, Plan.configuration_id == Configuration.id)
+                .join(Scenario, Configuration.scenario_id == Scenario.id)
+            )
+            if scenario_ids is not None:
+                statement = statement.where(Scenario.id.in_(scenario_ids))
+            return statement
+
+        items = _scoped(
+            db.select(
+                db.literal("item").label("type"),
+                *plan_columns,
+                PlanItem.id.label("element_id"),
+                PlanItem.format.label("format"),
+                PlanItem.message.label("message"),
+                PlanItem.canal.label("canal"),
+                PlanItem.frequence.label("frequence"),
+                PlanItem.kpi.label("kpi"),
+                db.null().label("nom"),
+                db.null().label("resume"),
+            ).select_from(PlanItem),
+            PlanItem,
+        )
+        articles = _scoped(
+            db.select(
+                db.literal("article").label("type"),
+                *plan_columns,
+                Article.id.label("element_id"),
+                db.null().label("format"),
+                db.null().label("message"),
+                db.null().label("canal"),
+                db.null().label("frequence"),
+                db.null().label("kpi"),
+                Article.nom.label("nom"),
+                Article.resume.label("resume"),
+            ).select_from(Article),
+            Article,
+        )
+        rows = db.union_all(items, articles).subquery()
+        return db.select(rows).order_by(
+            rows.c.scenario_id,
+            rows.c.configuration_id,
+            rows.c.plan_id,
+            rows.c.type.desc(),  # items avant articles
+            rows.c.element_id,
+        )
+
+    @staticmethod
+    def plans_csv(scenario_ids: list[int] | None = None) -> Iterator[bytes]:
+        """
+        Export CSV des plans, une ligne par item ou article, sans jamais
+        conserver plus d'un lot de lignes en mémoire.
+        """
+        writer = csv.writer(_Echo())
+        yield writer.writerow(PLAN_CSV_HEADER).encode("utf-8")
+
+        count = 0
+        for row in ExportService._stream_rows(ExportService.plan_rows_statement(scenario_ids)):
+            count += 1
+            yield writer.writerow([
+                row.type,
+                row.scenario_id,
+                row.scenario_nom,
+                row.configuration_id,
+                row.configuration_nom,
+                row.plan_id,
+                row.generated_at.strftime("%Y-%m-%d %H:%M") if row.generated_at else "",
+                row.element_id,
+                row.format or "",
+                row.message or "",
+                row.canal or "",
+                row.frequence or "",
+                row.kpi or "",
+                row.nom or "",
+                row.resume or "",
+            ]).encode("utf-8")
+        logger.info("[export_service][success] Export CSV des plans", extra={"rows": count})
+
+    @staticmethod
+    def has_plans(scenario_id: int) -> bool:
+        """Indique si au moins un plan existe pour une configuration du scénario."""
+        return db.session.scalar(
+            db.select(
+                db.select(Plan.id)
+                .join(Configuration, Plan.configuration_id == Configuration.id)
+                .where(Configuration.scenario_id == scenario_id)
+                .exists()
+            )
+        )
+
+    @staticmethod
+    def gzip_stream(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+        """Compresse un flux au format gzip, bloc par bloc."""
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31 : en-tête gzip
+        pending = 0
+        for chunk in chunks:
+            data = compressor.compress(chunk)
+            pending += len(chunk)
+            if pending >= _GZIP_FLUSH_BYTES:
+                data += compressor.flush(zlib.Z_SYNC_FLUSH)
+                pending = 0
+            if data:
+                yield data
+        yield compressor.flush()
@@ -0,0 +1,241 @@
+"""Service de tâches asynchrones (génération de plans et de suggestions en arrière-plan)."""
+
+from __future__ import annotations
+
+import json
+import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable
+
+from flask import Flask, current_app
+from sqlalchemy import update
+from sqlalchemy.exc import SQLAlchemyError
+
+from ..extensions import db
+from ..models import Job, JobStatus
+
+logger = logging.getLogger(__name__)
+
+
+def _job_handlers() -> dict[str, Callable[[dict[str, Any]], Any]]:
+    """Associe chaque type de tâche à la méthode de service qui l'exécute."""
+    from .plan_service import PlanService
+    from .suggestion_store import REFRESH_JOB_KIND, SuggestionStore
+
+    return {
+        "plan.generate_with_articles": lambda payload: PlanService.generate_plan_with_articles(
+            payload["configuration_id"]
+        ),
+        "plan.generate": lambda payload: PlanService.generate_plan(payload["scenario_id"]),
+        "plan.regenerate": lambda payload: PlanService.regenerate_plan(payload["scenario_id"]),
+        REFRESH_JOB_KIND: lambda payload: SuggestionStore.refresh(
+            payload["scenario_id"], payload.get("configuration_id"), payload["kinds"]
+        ),
+    }
+
+
+class JobService:
+    """File de tâches persistée en base et exécutée par un pool de threads borné."""
+
+    @staticmethod
+    def enqueue(kind: str, payload: dict[str, Any]) -> Job:
+        """
+        Enregistre une tâche puis la soumet au pool d'exécution.
+
+        Args:
+            kind: Type de tâche (voir ``_job_handlers``)
+            payload: Paramètres JSON de la tâche
+
+        Returns:
+            Tâche créée (statut pending)
+
+        Raises:
+            ValueError: Si le type de tâche est inconnu
+        """
+        if kind not in _job_handlers():
+            raise ValueError(f"Type de tâche inconnu: {kind}")
+
+        job = Job(
+            id=uuid.uuid4().hex,
+            kind=kind,
+            status=JobStatus.PENDING.value,
+            payload=json.dumps(payload),
+        )
+        db.session.add(job)
+        db.session.commit()
+
+        logger.info(
+            "[job_service][start] Tâche enregistrée",
+            extra={"job_id": job.id, "kind": kind},
+        )
+
+        JobService._submit(current_app._get_current_object(), job.id)
+        return job
+
+    @staticmethod
+    def get_job(job_id: str) -> Job:
+        """
+        Récupère une tâche.
+
+        Raises:
+            LookupError: Si la tâche n'existe pas
+        """
+        job = db.session.get(Job, job_id)
+        if not job:
+            raise LookupError(f"Job {job_id} not found")
+        return job
+
+    @staticmethod
+    def serialize(job: Job) -> dict[str, Any]:
+        """Sérialise une tâche pour la réponse API."""
+        return {
+            "id": job.id,
+            "kind": job.kind,
+            "status": job.status,
+            "result": json.loads(job.result) if job.result else None,
+            "error": job.error,
+            "attempts": job.attempts,
+            "created_at": job.created_at.isoformat() if job.created_at else None,
+            "started_at": job.started_at.isoformat() if job.started_at else None,
+            "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        }
+
+    @staticmethod
+    def resume_pending(app: Flask) -> int:
+        """
+        Relance les tâches en attente et celles bloquées en ``running`` depuis
+        plus de ``JOBS_STALE_AFTER_SECONDS`` (worker arrêté pendant l'exécution).
+
+        Une tâche en attente n'est relancée qu'au-delà du même délai : plus
+        récente, elle est encore dans la file du worker qui l'a créée.
+
+        Returns:
+            Nombre de tâches soumises
+        """
+        with app.app_context():
+            stale_before = datetime.now(timezone.utc) - timedelta(
+                seconds=app.config.get("JOBS_STALE_AFTER_SECONDS", 600)
+            )
+            try:
+                db.session.execute(
+                    update(Job)
+                    .where(Job.status == JobStatus.RUNNING.value)
+                    .where(Job.started_at < stale_before)
+                    .values(status=JobStatus.PENDING.value)
+                )
+                db.session.commit()
+                job_ids = [
+                    row.id
+                    for row in db.session.execute(
+                        db.select(Job.id)
+                        .where(Job.status == JobStatus.PENDING.value)
+                        .where(Job.created_at < stale_before)
+                        .order_by(Job.created_at)
+                    )
+                ]
+            except SQLAlchemyError as exc:
+                db.session.rollback()
+                logger.warning(
+                    "[job_service][warning] Reprise des tâches impossible",
+                    extra={"error": str(exc)},
+                )
+                return 0
+
+        for job_id in job_ids:
+            JobService._submit(app, job_id)
+
+        if job_ids:
+            logger.info(
+                "[job_service][info] Tâches en attente relancées",
+                extra={"count": len(job_ids)},
+            )
+        return len(job_ids)
+
+    @staticmethod
+    def _executor(app: Flask) -> ThreadPoolExecutor:
+        executor = app.extensions.get("job_executor")
+        if executor is None:
+            executor = app.extensions.setdefault(
+                "job_executor",
+                ThreadPoolExecutor(
+                    max_workers=app.config.get("JOBS_MAX_WORKERS", 4),
+                    thread_name_prefix="job-worker",
+                ),
+            )
+        return executor
+
+    @staticmethod
+    def _submit(app: Flask, job_id: str) -> None:
+        if app.config.get("JOBS_EAGER") or app.testing:
+            JobService._run(app, job_id)
+        else:
+            JobService._executor(app).submit(JobService._run, app, job_id)
+
+    @staticmethod
+    def _run(app: Flask, job_id: str) -> None:
+        """Réserve la tâche (UPDATE atomique) puis l'exécute dans un contexte applicatif."""
+        with app.app_context():
+            now = datetime.now(timezone.utc)
+            claimed = db.session.execute(
+                update(Job)
+                .where(Job.id == job_id)
+                .where(Job.status == JobStatus.PENDING.value)
+                .values(
+                    status=JobStatus.RUNNING.value,
+                    started_at=now,
+                    attempts=Job.attempts + 1,
+                )
+            ).rowcount
+            db.session.commit()
+            if not claimed:
+                # Déjà prise par un autre worker
+                return
+
+            job = db.session.get(Job, job_id)
+            handler = _job_handlers()[job.kind]
+
+            try:
+                result = handler(json.loads(job.payload))
+            except Exception as exc:
+                db.session.rollback()
+                logger.exception(
+                    "[job_service][error] Échec de la tâche",
+                    extra={"job_id": job_id, "kind": job.kind},
+                )
+                JobService._finish(job_id, JobStatus.FAILED, error=str(exc))
+                return
+
+            if isinstance(result, dict) and result.get("success") is False:
+                JobService._finish(
+                    job_id, JobStatus.FAILED, result=result, error=result.get("error")
+                )
+                return
+
+            JobService._finish(job_id, JobStatus.SUCCEEDED, result=result)
+            logger.info(
+                "[job_service][success] Tâche terminée",
+                extra={"job_id": job_id, "kind": job.kind},
+            )
+
+    @staticmethod
+    def _finish(
+        job_id: str,
+        status: JobStatus,
+        result: Any = None,
+        error: str | None = None,
+    ) -> None:
+        db.session.execute(
+            update(Job)
+            .where(Job.id == job_id)
+            .values(
+                status=status.value,
+                result=json.dumps(result, ensure_ascii=False, default=str)
+                if result is not None
+                else None,
+                error=error,
+                finished_at=datetime.now(timezone.utc),
+            )
+        )
+        db.session.commit()
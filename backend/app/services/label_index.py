@@ -0,0 +1,173 @@
+"""Index de similarité local des libellés d'objectifs et de cibles (TF-IDF sur n-grammes)."""
+
+from __future__ import annotations
+
+import heapq
+import math
+import re
+import threading
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Any, Iterable
+
+from flask import current_app
+
+from ..extensions import db
+from ..models import Cible, Objectif
+
+# Taille des n-grammes de caractères (robuste aux pluriels et fautes de frappe)
+NGRAM_SIZE = 3
+
+# Colonnes indexées en plus du libellé
+_TEXT_COLUMNS = {
+    Objectif: ("description",),
+    Cible: ("persona", "segment"),
+}
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def normalize_label(text: str | None) -> str:
+    """Forme comparable d'un libellé : sans accents, casse ni ponctuation."""
+    if not text:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return _NON_ALNUM.sub(" ", stripped.casefold()).strip()
+
+
+def _ngrams(text: str) -> Counter[str]:
+    padded = f" {normalize_label(text)} "
+    return Counter(padded[i : i + NGRAM_SIZE] for i in range(len(padded) - NGRAM_SIZE + 1))
+
+
+class LabelIndex:
+    """
+    Index TF-IDF en mémoire sur les n-grammes de caractères d'un catalogue.
+
+    Chaque document est un libellé enrichi de ses champs descriptifs ; la
+    requête (thématique, description du scénario…) est vectorisée avec les
+    mêmes IDF et comparée par similarité cosinus via un index inversé.
+    """
+
+    def __init__(self, documents: Iterable[tuple[str, str]], signature: Any = None):
+        """
+        Args:
+            documents: Couples (libellé, texte indexé)
+            signature: État de la table au moment de la construction
+        """
+        self.signature = signature
+        self.labels: list[str] = []
+        self.normalized: set[str] = set()
+        counts: list[Counter[str]] = []
+        document_frequency: Counter[str] = Counter()
+
+        for label, text in documents:
+            grams = _ngrams(text)
+            self.labels.append(label)
+            self.normalized.add(normalize_label(label))
+            counts.append(grams)
+            document_frequency.update(grams.keys())
+
+        total = len(self.labels)
+        self._idf = {
+            gram: math.log((1 + total) / (1 + frequency)) + 1.0
+            for gram, frequency in document_frequency.items()
+        }
+        self._postings: dict[str, list[tuple[int, float]]] = defaultdict(list)
+        for position, grams in enumerate(counts):
+            for gram, weight in self._weights(grams).items():
+                self._postings[gram].append((position, weight))
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def _weights(self, grams: Counter[str]) -> dict[str, float]:
+        weights = {
+            gram: count * self._idf[gram] for gram, count in grams.items() if gram in self._idf
+        }
+        norm = math.sqrt(sum(weight * weight for weight in weights.values()))
+        return {gram: weight / norm for gram, weight in weights.items()} if norm else {}
+
+    def top_k(self, query: str, k: int) -> list[str]:
+        """Les ``k`` libellés les plus proches de ``query`` (score non nul)."""
+        if k <= 0 or not self.labels:
+            return []
+        scores: dict[int, float] = defaultdict(float)
+        for gram, weight in self._weights(_ngrams(query)).items():
+            for position, document_weight in self._postings.get(gram, ()):
+                scores[position] += weight * document_weight
+        best = heapq.nlargest(k, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [self.labels[position] for position, _ in best]
+
+
+def _signature(model: Any) -> tuple:
+    # Une requête d'agrégat suffit à détecter une écriture d'un autre worker
+    return tuple(
+        db.session.execute(
+            db.select(db.func.count(model.id), db.func.max(model.id), db.func.max(model.updated_at))
+        ).one()
+    )
+
+
+def _build(model: Any, signature: tuple) -> LabelIndex:
+    columns = _TEXT_COLUMNS[model]
+    rows = db.session.execute(
+        db.select(model.label, *(getattr(model, column) for column in columns))
+    ).all()
+    return LabelIndex(
+        ((row[0], " ".join(value for value in row if value)) for row in rows),
+        signature,
+    )
+
+
+class LabelIndexRegistry:
+    """Index par catalogue, reconstruits quand la table a changé."""
+
+    def __init__(self):
+        self._indexes: dict[Any, LabelIndex] = {}
+        self._lock = threading.Lock()
+
+    def get(self, model: Any) -> LabelIndex:
+        signature = _signature(model)
+        with self._lock:
+            index = self._indexes.get(model)
+        if index is not None and index.signature == signature:
+            return index
+
+        index = _build(model, signature)
+        with self._lock:
+            self._indexes[model] = index
+        return index
+
+
+def get_label_index(model: Any) -> LabelIndex:
+    """Index à jour du catalogue ``model`` (``Objectif`` ou ``Cible``)."""
+    registry = current_app.extensions.get("label_index")
+    if registry is None:
+        registry = current_app.extensions.setdefault("label_index", LabelIndexRegistry())
+    return registry.get(model)
+
+
+def similar_labels(model: Any, query: str, k: int | None = None) -> list[str]:
+    """Libellés existants les plus proches de ``query`` à rappeler dans un prompt."""
+    if k is None:
+        k = current_app.config.get("SUGGEST_EXISTING_LABELS_TOP_K", 20)
+    return get_label_index(model).top_k(query, k)
+
+
+def drop_known_labels(model: Any, suggestions: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """
+    Retire les suggestions dont le libellé existe déjà au catalogue ou est
+    répété dans la réponse (accents et casse ignorés).
+    """
+    index = get_label_index(model)
+    seen: set[str] = set()
+    kept = []
+    for suggestion in suggestions:
+        key = normalize_label(suggestion.get("label"))
+        if not key or key in index.normalized or key in seen:
+            continue
+        seen.add(key)
+        kept.append(suggestion)
+    return kept
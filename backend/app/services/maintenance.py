@@ -1,22 +1,93 @@
 from __future__ import annotations
 
+import logging
+import time
 from datetime import datetime, timezone
+from typing import Any
 
 from flask import Flask
+from sqlalchemy import delete, func
 
 from ..extensions import db
 from ..models import Message
 
+logger = logging.getLogger(__name__)
 
-def purge_expired_messages(app: Flask) -> int:
-    """Delete messages whose TTL has expired."""
+
+def purge_expired_messages(
+    app: Flask,
+    batch_size: int | None = None,
+    sleep_ms: int | None = None,
+    dry_run: bool | None = None,
+) -> dict[str, Any]:
+    """
+    Delete messages whose TTL has expired, in short batches.
+
+    Each batch selects at most ``batch_size`` ids through the ``ttl`` index and
+    deletes them in its own transaction, then sleeps ``sleep_ms`` so that chat
+    writes are never blocked for long. In dry-run mode, only the number of
+    expired messages is counted.
+
+    Returns:
+        Report with dry_run, cutoff, deleted (or would_delete), batches, duration_ms
+    """
     with app.app_context():
-        now = datetime.now(timezone.utc)
-        deleted = (
-            db.session.query(Message)
-            .filter(Message.ttl.isnot(None))
-            .filter(Message.ttl < now)
-            .delete(synchronize_session=False)
-        )
-        db.session.commit()
-        return deleted or 0
+        config = app.config
+        batch_size = batch_size or config.get("PURGE_BATCH_SIZE", 1000)
+        sleep_ms = config.get("PURGE_BATCH_SLEEP_MS", 100) if sleep_ms is None else sleep_ms
+        dry_run = config.get("PURGE_DRY_RUN", False) if dry_run is None else dry_run
+
+        started = time.perf_counter()
+        cutoff = datetime.now(timezone.utc)
+        expired = db.and_(Message.ttl.isnot(None), Message.ttl < cutoff)
+        report: dict[str, Any] = {
+            "dry_run": dry_run,
+            "cutoff": cutoff.isoformat(),
+            "batch_size": batch_size,
+            "batches": 0,
+        }
+
+        if dry_run:
+            report["would_delete"] = db.session.scalar(
+                db.select(func.count()).select_from(Message).where(expired)
+            )
+            report["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            logger.info("[maintenance][info] Purge des messages (simulation)", extra=report)
+            return report
+
+        deleted = 0
+        while True:
+            ids = db.session.scalars(
+                db.select(Message.id).where(expired).order_by(Message.ttl).limit(batch_size)
+            ).all()
+            if not ids:
+                break
+
+            try:
+                deleted += db.session.execute(
+                    delete(Message).where(Message.id.in_(ids))
+                ).rowcount
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                logger.exception(
+                    "[maintenance][error] Échec d'un lot de purge",
+                    extra={"batch": report["batches"] + 1, "deleted": deleted},
+                )
+                raise
+
+            report["batches"] += 1
+            logger.info(
+                "[maintenance][info] Lot de messages purgé",
+                extra={"batch": report["batches"], "batch_deleted": len(ids), "deleted": deleted},
+            )
+
+            if len(ids) < batch_size:
+                break
+            if sleep_ms:
+                time.sleep(sleep_ms / 1000)
+
+        report["deleted"] = deleted
+        report["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        logger.info("[maintenance][success] Purge des messages terminée", extra=report)
+        return report
@@ -2,15 +2,16 @@
 
 from __future__ import annotations
 
-import json
 import logging
 from typing import Any
 
-import openai
-from flask import current_app
-
+from ..aio import run_in_thread
 from ..extensions import db
 from ..models import Objectif, Scenario
+from .bulk import upsert_label
+from .label_index import drop_known_labels, similar_labels
+from .ai_call import AICall, run_ai_call, run_ai_call_async
+from .pagination import Page, paginate
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +29,28 @@ class ObjectifService:
         """
         return Objectif.query.all()
 
+    @staticmethod
+    def list_objectifs(
+        after: str | None = None,
+        limit: int | None = 50,
+        label_prefix: str | None = None,
+    ) -> Page:
+        """
+        Liste les objectifs par ID croissant, page par page.
+
+        Args:
+            after: Curseur de la page précédente
+            limit: Taille de page (None : toutes les lignes)
+            label_prefix: Filtre sur le début du libellé
+
+        Raises:
+            ValueError: Si le curseur est invalide
+        """
+        statement = db.select(Objectif)
+        if label_prefix:
+            statement = statement.where(Objectif.label.startswith(label_prefix, autoescape=True))
+        return paginate(statement, [(Objectif.id, False)], after, limit)
+
     @staticmethod
     def create_objectif(data: dict[str, Any]) -> Objectif:
         """
@@ -48,13 +71,10 @@ class ObjectifService:
         if not label:
             raise ValueError("label est requis")
 
-        # Vérifier si l'objectif existe déjà
-        existing = Objectif.query.filter_by(label=label).first()
-        if existing:
-            return existing
-
-        objectif = Objectif(label=label, description=description)
-        db.session.add(objectif)
+        # Réutilise l'objectif existant (y compris créé en concurrence)
+        objectif = db.session.get(
+            Objectif, upsert_label(Objectif, label, description=description)
+        )
         db.session.commit()
 
         logger.info(
@@ -65,17 +85,13 @@ class ObjectifService:
         return objectif
 
     @staticmethod
-    def suggest_objectifs_for_scenario(scenario_id: int) -> list[dict[str, str]]:
+    def suggestion_call(scenario_id: int) -> AICall:
         """
-        Génère des suggestions d'objectifs pertinents pour un scénario via IA.
-        Évite les doublons en excluant les objectifs existants.
+        Prépare l'appel IA de suggestion d'objectifs pour un scénario.
 
         Args:
             scenario_id: ID du scénario
 
-        Returns:
-            Liste de 4-6 objectifs suggérés avec label et description
-
         Raises:
             LookupError: Si le scénario n'existe pas
         """
@@ -83,10 +99,13 @@ class ObjectifService:
         if not scenario:
             raise LookupError(f"Scenario {scenario_id} not found")
 
-        # Récupérer les objectifs existants pour éviter les doublons
-        existing_objectifs = ObjectifService.get_all_objectifs()
-        existing_labels = [obj.label for obj in existing_objectifs]
-        
+        # Seuls les objectifs existants les plus proches du scénario sont
+        # rappelés ; les doublons restants sont filtrés après l'appel
+        existing_labels = similar_labels(
+            Objectif,
+            " ".join(filter(None, [scenario.nom, scenario.thematique, scenario.description])),
+        )
+
         existing_context = ""
         if existing_labels:
             existing_context = f"\n\nObjectifs DÉJÀ EXISTANTS à NE PAS proposer :\n" + "\n".join([f"- {label}" for label in existing_labels])
@@ -119,38 +138,72 @@ Répondez UNIQUEMENT au format JSON suivant (sans markdown, juste le JSON) :
   ]
 }}"""
 
+        messages = [
+            {
+                "role": "system",
+                "content": "Vous êtes un expert en stratégie marketing B2B. Vous répondez toujours en JSON valide.",
+            },
+            {"role": "user", "content": prompt},
+        ]
+
+        def finish(result: dict[str, Any]) -> list[dict[str, str]]:
+            return drop_known_labels(Objectif, result.get("objectifs", []))
+
+        return AICall(
+            "suggest_objectifs",
+            scenario_id,
+            messages,
+            {"model": "gpt-4o-mini", "temperature": 0.7, "max_tokens": 1000},
+            finish,
+        )
+
+    @staticmethod
+    def suggest_objectifs_for_scenario(scenario_id: int) -> list[dict[str, str]]:
+        """
+        Génère des suggestions d'objectifs pertinents pour un scénario via IA.
+        Évite les doublons en excluant les objectifs existants.
+
+        Args:
+            scenario_id: ID du scénario
+
+        Returns:
+            Liste de 4-6 objectifs suggérés avec label et description
+
+        Raises:
+            LookupError: Si le scénario n'existe pas
+        """
+        call = ObjectifService.suggestion_call(scenario_id)
         try:
-            # Appeler OpenAI
-            client = openai.OpenAI(api_key=current_app.config["OPENAI_API_KEY"])
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "Vous êtes un expert en stratégie marketing B2B. Vous répondez toujours en JSON valide.",
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0.7,
-                max_tokens=1000,
-            )
-
-            # Extraire la réponse
-            content = response.choices[0].message.content.strip()
-
-            # Parser le JSON
-            result = json.loads(content)
-
-            logger.info(
-                "[objectif_service][success] Objectifs suggérés",
-                extra={"scenario_id": scenario_id, "count": len(result.get("objectifs", []))},
-            )
-
-            return result.get("objectifs", [])
+            # Un seul appel pour les demandes identiques simultanées
+            objectifs = run_ai_call(call)
+        except Exception as exc:
+            ObjectifService._log_failure(scenario_id, exc)
+            raise
+        ObjectifService._log_success(scenario_id, objectifs)
+        return objectifs
 
+    @staticmethod
+    async def suggest_objectifs_for_scenario_async(scenario_id: int) -> list[dict[str, str]]:
+        """Variante asynchrone (service ASGI) de ``suggest_objectifs_for_scenario``."""
+        call = await run_in_thread(ObjectifService.suggestion_call, scenario_id)
+        try:
+            objectifs = await run_ai_call_async(call)
         except Exception as exc:
-            logger.error(
-                "[objectif_service][error] Erreur lors de la suggestion d'objectifs",
-                extra={"scenario_id": scenario_id, "error": str(exc)},
-            )
+            ObjectifService._log_failure(scenario_id, exc)
             raise
+        ObjectifService._log_success(scenario_id, objectifs)
+        return objectifs
+
+    @staticmethod
+    def _log_success(scenario_id: int, objectifs: list[dict[str, str]]) -> None:
+        logger.info(
+            "[objectif_service][success] Objectifs suggérés",
+            extra={"scenario_id": scenario_id, "count": len(objectifs)},
+        )
+
+    @staticmethod
+    def _log_failure(scenario_id: int, exc: Exception) -> None:
+        logger.error(
+            "[objectif_service][error] Erreur lors de la suggestion d'objectifs",
+            extra={"scenario_id": scenario_id, "error": str(exc)},
+        )
@@ -0,0 +1,152 @@
+"""Pagination par curseur (keyset) pour les routes de liste."""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Mapping, Sequence
+
+from flask import current_app
+from sqlalchemy import and_, or_
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.elements import ColumnElement
+
+from ..extensions import db
+
+# (colonne, tri décroissant)
+SortKey = tuple[ColumnElement, bool]
+
+
+@dataclass
+class Page:
+    """Une page de résultats et le curseur de la suivante (None en fin de liste)."""
+
+    items: list[Any] = field(default_factory=list)
+    next_cursor: str | None = None
+
+
+def page_args(args: Mapping[str, str]) -> tuple[str | None, int | None]:
+    """
+    Lit ``after`` et ``limit`` depuis les paramètres de requête.
+
+    Sans ``limit`` ni ``after``, la liste est renvoyée entière (limite None) :
+    les clients qui ne suivent pas ``X-Next-Cursor`` reçoivent toujours toutes
+    les lignes. ``after`` seul utilise ``API_DEFAULT_PAGE_SIZE``.
+
+    Raises:
+        ValueError: Si ``limit`` n'est pas un entier positif
+    """
+    default_size = current_app.config.get("API_DEFAULT_PAGE_SIZE", 50)
+    max_size = current_app.config.get("API_MAX_PAGE_SIZE", 200)
+    after = args.get("after") or None
+
+    raw_limit = args.get("limit")
+    if raw_limit in (None, ""):
+        if after is None:
+            return None, None
+        limit = default_size
+    else:
+        try:
+            limit = int(raw_limit)
+        except ValueError as exc:
+            raise ValueError("limit doit être un entier") from exc
+        if limit < 1:
+            raise ValueError("limit doit être supérieur à 0")
+
+    return after, min(limit, max_size)
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    payload = json.dumps(
+        [value.isoformat() if isinstance(value, datetime) else value for value in values],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, keys: Sequence[SortKey]) -> list[Any]:
+    """
+    Décode un curseur opaque en valeurs de clés de tri.
+
+    Raises:
+        ValueError: Si le curseur est illisible ou ne correspond pas au tri
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (binascii.Error, UnicodeError, ValueError) as exc:
+        raise ValueError("Curseur invalide") from exc
+
+    if not isinstance(values, list) or len(values) != len(keys):
+        raise ValueError("Curseur invalide")
+
+    decoded = []
+    for value, (column, _descending) in zip(values, keys):
+        if value is not None and _is_datetime(column):
+            try:
+                value = datetime.fromisoformat(value)
+            except (TypeError, ValueError) as exc:
+                raise ValueError("Curseur invalide") from exc
+        decoded.append(value)
+    return decoded
+
+
+def _is_datetime(column: ColumnElement) -> bool:
+    try:
+        return issubclass(column.type.python_type, datetime)
+    except NotImplementedError:
+        return False
+
+
+def _after(keys: Sequence[SortKey], values: Sequence[Any]) -> ColumnElement:
+    """Prédicat « strictement après » pour un tri multi-colonnes (sens mixtes)."""
+    clauses = []
+    for index, (column, descending) in enumerate(keys):
+        equal_prefix = [keys[i][0] == values[i] for i in range(index)]
+        beyond = column < values[index] if descending else column > values[index]
+        clauses.append(and_(*equal_prefix, beyond))
+    return or_(*clauses)
+
+
+def paginate(
+    statement: Select,
+    keys: Sequence[SortKey],
+    after: str | None,
+    limit: int | None,
+) -> Page:
+    """
+    Exécute ``statement`` page par page selon ``keys``.
+
+    La dernière clé doit être unique (typiquement l'ID) pour garantir un ordre
+    stable. Le coût d'une page est le même quelle que soit sa profondeur :
+    aucune clause OFFSET, uniquement un prédicat sur l'index de tri.
+
+    Args:
+        statement: Requête filtrée, sans ORDER BY ni LIMIT
+        keys: Colonnes de tri et sens (True = décroissant)
+        after: Curseur de la page précédente
+        limit: Taille de page ; None renvoie toutes les lignes restantes
+
+    Raises:
+        ValueError: Si le curseur est invalide
+    """
+    if after:
+        statement = statement.where(_after(keys, decode_cursor(after, keys)))
+
+    statement = statement.order_by(
+        *(column.desc() if descending else column.asc() for column, descending in keys)
+    )
+    if limit is not None:
+        statement = statement.limit(limit + 1)
+
+    rows = db.session.execute(statement).all()
+    items = [row[0] if len(row) == 1 else row for row in rows[:limit]]
+
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor([getattr(last, column.key) for column, _ in keys])
+    return Page(items=items, next_cursor=next_cursor)
@@ -2,18 +2,18 @@
 
 from __future__ import annotations
 
-import json
 import logging
 from datetime import datetime, timezone
 from typing import Any
 
-import openai
-from flask import current_app
-
 from ..ai import OpenAIClient, PlanGenerationSchema
 from ..ai.prompts import PROMPT_GENERATE_PLAN, SYSTEM_PROMPT_BASE, build_context_summary
+from ..aio import run_in_thread
 from ..extensions import db
 from ..models import Article, Configuration, Plan, PlanItem, Scenario
+from .ai_call import AICall, run_ai_call, run_ai_call_async
+from .context_cache import invalidate_scenario_context
+from .detail_cache import invalidate_details
 
 logger = logging.getLogger(__name__)
 
@@ -99,6 +99,8 @@ class PlanService:
             # Mettre à jour le statut du scénario
             scenario.statut = "ready"
             db.session.commit()
+            invalidate_scenario_context(scenario_id)
+            invalidate_details(scenario_id)
 
             logger.info(
                 "[plan_service][success] Plan généré",
@@ -156,6 +158,8 @@ class PlanService:
         if old_plan:
             db.session.delete(old_plan)
             db.session.commit()
+            invalidate_scenario_context(scenario_id)
+            invalidate_details(scenario_id)
 
         # Générer un nouveau plan
         return PlanService.generate_plan(scenario_id)
@@ -252,16 +256,10 @@ class PlanService:
         return schema.dump(plan)
 
     @staticmethod
-    def generate_plan_with_articles(configuration_id: int) -> dict[str, Any]:
+    def plan_with_articles_call(configuration_id: int) -> AICall:
         """
-        Génère un plan avec 5 articles pour une configuration.
-        Utilise OpenAI pour créer des articles pertinents basés sur les objectifs et cibles.
-
-        Args:
-            configuration_id: ID de la configuration
-
-        Returns:
-            Dict avec le plan créé et ses articles
+        Prépare l'appel IA de génération d'un plan avec articles ; la
+        finalisation crée le plan et ses articles en base.
 
         Raises:
             LookupError: Si la configuration n'existe pas
@@ -278,6 +276,7 @@ class PlanService:
             )
 
         scenario = configuration.scenario
+        scenario_id = configuration.scenario_id
 
         # Construire le contexte pour l'IA
         objectifs_list = [f"- {obj.label}" for obj in configuration.objectifs]
@@ -318,28 +317,15 @@ Répondez UNIQUEMENT au format JSON suivant (sans markdown, juste le JSON) :
   ]
 }}"""
 
-        try:
-            # Appeler OpenAI
-            client = openai.OpenAI(api_key=current_app.config["OPENAI_API_KEY"])
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "Vous êtes un expert en content marketing B2B. Vous répondez toujours en JSON valide.",
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0.8,
-                max_tokens=1500,
-            )
-
-            # Extraire la réponse
-            content = response.choices[0].message.content.strip()
-
-            # Parser le JSON
-            result = json.loads(content)
+        messages = [
+            {
+                "role": "system",
+                "content": "Vous êtes un expert en content marketing B2B. Vous répondez toujours en JSON valide.",
+            },
+            {"role": "user", "content": prompt},
+        ]
 
+        def finish(result: dict[str, Any]) -> dict[str, Any]:
             # Créer le plan en base
             plan = Plan(
                 configuration_id=configuration_id,
@@ -364,6 +350,8 @@ Répondez UNIQUEMENT au format JSON suivant (sans markdown, juste le JSON) :
                 created_articles.append(article)
 
             db.session.commit()
+            invalidate_scenario_context(scenario_id)
+            invalidate_details(scenario_id, configuration_id)
 
             logger.info(
                 "[plan_service][success] Plan avec articles généré",
@@ -383,10 +371,52 @@ Répondez UNIQUEMENT au format JSON suivant (sans markdown, juste le JSON) :
                 ],
             }
 
+        return AICall(
+            "generate_plan_with_articles",
+            configuration_id,
+            messages,
+            {"model": "gpt-4o-mini", "temperature": 0.8, "max_tokens": 1500},
+            finish,
+        )
+
+    @staticmethod
+    def generate_plan_with_articles(configuration_id: int) -> dict[str, Any]:
+        """
+        Génère un plan avec 5 articles pour une configuration.
+        Utilise OpenAI pour créer des articles pertinents basés sur les objectifs et cibles.
+
+        Args:
+            configuration_id: ID de la configuration
+
+        Returns:
+            Dict avec le plan créé et ses articles
+
+        Raises:
+            LookupError: Si la configuration n'existe pas
+            ValueError: Si la configuration n'a pas les prérequis
+        """
+        call = PlanService.plan_with_articles_call(configuration_id)
+        try:
+            # Double clic ou onglets multiples : un seul plan créé et partagé
+            return run_ai_call(call)
         except Exception as exc:
             db.session.rollback()
-            logger.error(
-                "[plan_service][error] Erreur lors de la génération du plan",
-                extra={"configuration_id": configuration_id, "error": str(exc)},
-            )
+            PlanService._log_failure(configuration_id, exc)
             raise
+
+    @staticmethod
+    async def generate_plan_with_articles_async(configuration_id: int) -> dict[str, Any]:
+        """Variante asynchrone (service ASGI) de ``generate_plan_with_articles``."""
+        call = await run_in_thread(PlanService.plan_with_articles_call, configuration_id)
+        try:
+            return await run_ai_call_async(call)
+        except Exception as exc:
+            PlanService._log_failure(configuration_id, exc)
+            raise
+
+    @staticmethod
+    def _log_failure(configuration_id: int, exc: Exception) -> None:
+        logger.error(
+            "[plan_service][error] Erreur lors de la génération du plan",
+            extra={"configuration_id": configuration_id, "error": str(exc)},
+        )
@@ -0,0 +1,234 @@
+"""Chargement des arbres scénario/configuration par projections de colonnes."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+from datetime import datetime
+from typing import Any
+
+from ..extensions import db
+from ..models import (
+    Article,
+    Cible,
+    Configuration,
+    Objectif,
+    Plan,
+    PlanItem,
+    Scenario,
+    configuration_cibles,
+    configuration_objectifs,
+)
+
+# Taille maximale des listes IN (limite de variables SQLite)
+_IN_CHUNK = 900
+
+
+def _iso(value: datetime | None) -> str | None:
+    # Même format que marshmallow fields.DateTime()
+    return value.isoformat() if value is not None else None
+
+
+def _chunks(ids: list[int]) -> Iterator[list[int]]:
+    for start in range(0, len(ids), _IN_CHUNK):
+        yield ids[start : start + _IN_CHUNK]
+
+
+def _rows(statement_for_chunk, ids: list[int]) -> Iterator[Any]:
+    for chunk in _chunks(ids):
+        yield from db.session.execute(statement_for_chunk(chunk))
+
+
+class ScenarioTreeLoader:
+    """
+    Construit les mêmes structures que ``ScenarioDetailSchema`` et
+    ``ConfigurationDetailSchema`` sans hydrater d'objets ORM.
+
+    Chaque niveau de l'arbre est chargé par une requête ``IN`` sur colonnes :
+    le nombre de requêtes est constant (7 au plus pour des scénarios, 6 pour
+    des configurations), quel que soit le nombre de lignes.
+    """
+
+    @staticmethod
+    def load_scenarios(scenario_ids: Iterable[int]) -> list[dict[str, Any]]:
+        """Charge les scénarios demandés (dans l'ordre des IDs fournis)."""
+        scenario_ids = list(dict.fromkeys(scenario_ids))
+        if not scenario_ids:
+            return []
+
+        scenarios: dict[int, dict[str, Any]] = {}
+        for row in _rows(
+            lambda chunk: db.select(
+                Scenario.id,
+                Scenario.nom,
+                Scenario.thematique,
+                Scenario.description,
+                Scenario.statut,
+                Scenario.created_at,
+                Scenario.updated_at,
+            ).where(Scenario.id.in_(chunk)),
+            scenario_ids,
+        ):
+            scenarios[row.id] = {
+                "id": row.id,
+                "nom": row.nom,
+                "thematique": row.thematique,
+                "description": row.description,
+                "statut": row.statut,
+                "created_at": _iso(row.created_at),
+                "updated_at": _iso(row.updated_at),
+                "configurations": [],
+            }
+
+        configurations = ScenarioTreeLoader._load_configurations(
+            lambda chunk: Configuration.scenario_id.in_(chunk), list(scenarios)
+        )
+        for configuration in configurations:
+            scenarios[configuration["scenario_id"]]["configurations"].append(configuration)
+
+        return [scenarios[scenario_id] for scenario_id in scenario_ids if scenario_id in scenarios]
+
+    @staticmethod
+    def load_scenario(scenario_id: int) -> dict[str, Any] | None:
+        loaded = ScenarioTreeLoader.load_scenarios([scenario_id])
+        return loaded[0] if loaded else None
+
+    @staticmethod
+    def load_configurations(configuration_ids: Iterable[int]) -> list[dict[str, Any]]:
+        """Charge les configurations demandées (dans l'ordre des IDs fournis)."""
+        configuration_ids = list(dict.fromkeys(configuration_ids))
+        if not configuration_ids:
+            return []
+
+        loaded = {
+            configuration["id"]: configuration
+            for configuration in ScenarioTreeLoader._load_configurations(
+                lambda chunk: Configuration.id.in_(chunk), configuration_ids
+            )
+        }
+        return [loaded[cid] for cid in configuration_ids if cid in loaded]
+
+    @staticmethod
+    def load_configuration(configuration_id: int) -> dict[str, Any] | None:
+        loaded = ScenarioTreeLoader.load_configurations([configuration_id])
+        return loaded[0] if loaded else None
+
+    @staticmethod
+    def _load_configurations(criterion, ids: list[int]) -> list[dict[str, Any]]:
+        configurations: dict[int, dict[str, Any]] = {}
+        for row in _rows(
+            lambda chunk: db.select(
+                Configuration.id,
+                Configuration.scenario_id,
+                Configuration.nom,
+                Configuration.created_at,
+                Configuration.updated_at,
+            )
+            .where(criterion(chunk))
+            .order_by(Configuration.id),
+            ids,
+        ):
+            configurations[row.id] = {
+                "id": row.id,
+                "scenario_id": row.scenario_id,
+                "nom": row.nom,
+                "created_at": _iso(row.created_at),
+                "updated_at": _iso(row.updated_at),
+                "objectifs": [],
+                "cibles": [],
+                "plans": [],
+            }
+
+        configuration_ids = list(configurations)
+        if not configuration_ids:
+            return []
+
+        link = configuration_objectifs.c
+        for row in _rows(
+            lambda chunk: db.select(
+                link.configuration_id, Objectif.id, Objectif.label, Objectif.description
+            )
+            .join(Objectif, Objectif.id == link.objectif_id)
+            .where(link.configuration_id.in_(chunk))
+            .order_by(Objectif.id),
+            configuration_ids,
+        ):
+            configurations[row.configuration_id]["objectifs"].append(
+                {"id": row.id, "label": row.label, "description": row.description}
+            )
+
+        link = configuration_cibles.c
+        for row in _rows(
+            lambda chunk: db.select(
+                link.configuration_id, Cible.id, Cible.label, Cible.persona, Cible.segment
+            )
+            .join(Cible, Cible.id == link.cible_id)
+            .where(link.configuration_id.in_(chunk))
+            .order_by(Cible.id),
+            configuration_ids,
+        ):
+            configurations[row.configuration_id]["cibles"].append(
+                {
+                    "id": row.id,
+                    "label": row.label,
+                    "persona": row.persona,
+                    "segment": row.segment,
+                }
+            )
+
+        plans: dict[int, dict[str, Any]] = {}
+        for row in _rows(
+            lambda chunk: db.select(
+                Plan.id, Plan.configuration_id, Plan.resume, Plan.generated_at
+            )
+            .where(Plan.configuration_id.in_(chunk))
+            .order_by(Plan.id),
+            configuration_ids,
+        ):
+            plan = {
+                "id": row.id,
+                "resume": row.resume,
+                "generated_at": _iso(row.generated_at),
+                "items": [],
+                "articles": [],
+            }
+            plans[row.id] = plan
+            configurations[row.configuration_id]["plans"].append(plan)
+
+        plan_ids = list(plans)
+        if plan_ids:
+            for row in _rows(
+                lambda chunk: db.select(
+                    PlanItem.id,
+                    PlanItem.plan_id,
+                    PlanItem.format,
+                    PlanItem.message,
+                    PlanItem.canal,
+                    PlanItem.frequence,
+                    PlanItem.kpi,
+                )
+                .where(PlanItem.plan_id.in_(chunk))
+                .order_by(PlanItem.id),
+                plan_ids,
+            ):
+                plans[row.plan_id]["items"].append(
+                    {
+                        "id": row.id,
+                        "format": row.format,
+                        "message": row.message,
+                        "canal": row.canal,
+                        "frequence": row.frequence,
+                        "kpi": row.kpi,
+                    }
+                )
+
+            for row in _rows(
+                lambda chunk: db.select(Article.id, Article.plan_id, Article.nom, Article.resume)
+                .where(Article.plan_id.in_(chunk))
+                .order_by(Article.id),
+                plan_ids,
+            ):
+                plans[row.plan_id]["articles"].append(
+                    {"id": row.id, "nom": row.nom, "resume": row.resume}
+                )
+
+        return list(configurations.values())
@@ -3,12 +3,25 @@ from __future__ import annotations
 import logging
 from typing import Any
 
-from flask import current_app
 from sqlalchemy.exc import IntegrityError
-import openai
 
+from ..aio import run_in_thread
 from ..extensions import db
-from ..models import Cible, Configuration, Objectif, Scenario
+from ..models import (
+    Cible,
+    Configuration,
+    Objectif,
+    Scenario,
+    configuration_cibles,
+    configuration_objectifs,
+)
+from .ai_call import AICall, run_ai_call, run_ai_call_async
+from .bulk import insert_returning_ids, insert_rows, upsert_label, upsert_labels
+from .context_cache import invalidate_scenario_context
+from .detail_cache import Detail, invalidate_details, load_detail
+from .pagination import Page, paginate
+from .scenario_loader import ScenarioTreeLoader
+from .tree_version import TreeVersion, scenarios_version
 
 logger = logging.getLogger(__name__)
 
@@ -17,12 +30,71 @@ class ScenarioService:
     """Business logic for scenarios."""
 
     @staticmethod
-    def list_scenarios() -> list[Scenario]:
-        return (
-            Scenario.query.order_by(Scenario.updated_at.desc())
-            .limit(50)
-            .all()
+    def list_scenarios(
+        after: str | None = None,
+        limit: int | None = 50,
+        statut: str | None = None,
+        thematique: str | None = None,
+        nom_prefix: str | None = None,
+    ) -> Page:
+        """
+        Liste les scénarios du plus récemment modifié au plus ancien, avec leur
+        arbre de configurations.
+
+        Args:
+            after: Curseur de la page précédente
+            limit: Taille de page (None : toutes les lignes)
+            statut: Filtre exact sur le statut
+            thematique: Filtre exact sur la thématique
+            nom_prefix: Filtre sur le début du nom
+
+        Returns:
+            Page de scénarios sérialisés (format ``ScenarioDetailSchema``)
+
+        Raises:
+            ValueError: Si le curseur est invalide
+        """
+        statement = db.select(Scenario.id, Scenario.updated_at).where(
+            *ScenarioService._list_filters(statut, thematique, nom_prefix)
         )
+        page = paginate(
+            statement,
+            [(Scenario.updated_at, True), (Scenario.id, True)],
+            after,
+            limit,
+        )
+        page.items = ScenarioTreeLoader.load_scenarios(row.id for row in page.items)
+        return page
+
+    @staticmethod
+    def list_version(
+        after: str | None = None,
+        limit: int | None = 50,
+        statut: str | None = None,
+        thematique: str | None = None,
+        nom_prefix: str | None = None,
+    ) -> TreeVersion:
+        """
+        Version de la liste (mêmes paramètres que ``list_scenarios``) : une page
+        ne change que si l'un des scénarios filtrés ou son arbre change.
+        """
+        scenario_ids = db.select(Scenario.id).where(
+            *ScenarioService._list_filters(statut, thematique, nom_prefix)
+        )
+        return scenarios_version(scenario_ids, after, limit)
+
+    @staticmethod
+    def _list_filters(
+        statut: str | None, thematique: str | None, nom_prefix: str | None
+    ) -> list[Any]:
+        filters = []
+        if statut:
+            filters.append(Scenario.statut == statut)
+        if thematique:
+            filters.append(Scenario.thematique == thematique)
+        if nom_prefix:
+            filters.append(Scenario.nom.startswith(nom_prefix, autoescape=True))
+        return filters
 
     @staticmethod
     def create_scenario(payload: dict[str, Any]) -> Scenario:
@@ -35,6 +107,92 @@ class ScenarioService:
             raise ValueError("Unable to create scenario") from exc
         return scenario
 
+    @staticmethod
+    def bulk_create_scenarios(items: list[dict[str, Any]]) -> list[int]:
+        """
+        Crée des scénarios, et leurs configurations/objectifs/cibles imbriqués,
+        en une seule transaction avec des insertions multi-lignes.
+
+        Les objectifs et cibles sont rattachés par libellé : les existants sont
+        réutilisés, les autres créés une seule fois.
+
+        Args:
+            items: Scénarios validés par ``ScenarioBatchCreateSchema(many=True)``
+
+        Returns:
+            IDs des scénarios créés, dans l'ordre des éléments fournis
+
+        Raises:
+            ValueError: Si l'insertion échoue (rien n'est créé)
+        """
+        try:
+            scenario_ids = insert_returning_ids(
+                Scenario,
+                [
+                    {
+                        "nom": item["nom"],
+                        "thematique": item["thematique"],
+                        "description": item.get("description"),
+                    }
+                    for item in items
+                ],
+            )
+
+            configurations = [
+                (scenario_id, configuration)
+                for scenario_id, item in zip(scenario_ids, items)
+                for configuration in item.get("configurations") or []
+            ]
+            configuration_ids = insert_returning_ids(
+                Configuration,
+                [
+                    {"scenario_id": scenario_id, "nom": configuration["nom"]}
+                    for scenario_id, configuration in configurations
+                ],
+            )
+
+            objectif_ids = upsert_labels(
+                Objectif,
+                [
+                    entry
+                    for _, configuration in configurations
+                    for entry in configuration.get("objectifs") or []
+                ],
+                ("description",),
+            )
+            cible_ids = upsert_labels(
+                Cible,
+                [
+                    entry
+                    for _, configuration in configurations
+                    for entry in configuration.get("cibles") or []
+                ],
+                ("persona", "segment"),
+            )
+
+            objectif_links: dict[tuple[int, int], dict[str, int]] = {}
+            cible_links: dict[tuple[int, int], dict[str, int]] = {}
+            for configuration_id, (_, configuration) in zip(configuration_ids, configurations):
+                for entry in configuration.get("objectifs") or []:
+                    key = (configuration_id, objectif_ids[entry["label"]])
+                    objectif_links[key] = {"configuration_id": key[0], "objectif_id": key[1]}
+                for entry in configuration.get("cibles") or []:
+                    key = (configuration_id, cible_ids[entry["label"]])
+                    cible_links[key] = {"configuration_id": key[0], "cible_id": key[1]}
+            insert_rows(configuration_objectifs, objectif_links.values())
+            insert_rows(configuration_cibles, cible_links.values())
+
+            db.session.commit()
+        except IntegrityError as exc:
+            db.session.rollback()
+            raise ValueError("Unable to create scenarios") from exc
+
+        logger.info(
+            "[scenario_service][success] Scénarios créés en masse",
+            extra={"scenarios": len(scenario_ids), "configurations": len(configuration_ids)},
+        )
+        return scenario_ids
+
     @staticmethod
     def get_scenario_detail(scenario_id: int) -> Scenario:
         scenario = Scenario.query.filter_by(id=scenario_id).first()
@@ -42,6 +200,60 @@ class ScenarioService:
             raise LookupError("Scenario not found")
         return scenario
 
+    @staticmethod
+    def get_scenario_nom(scenario_id: int) -> str:
+        """Nom d'un scénario, sans charger ses relations."""
+        nom = db.session.scalar(db.select(Scenario.nom).where(Scenario.id == scenario_id))
+        if nom is None:
+            raise LookupError("Scenario not found")
+        return nom
+
+    @staticmethod
+    def get_scenario_tree(scenario_id: int) -> dict[str, Any]:
+        """
+        Détail sérialisé d'un scénario (même format que ``ScenarioDetailSchema``),
+        chargé en un nombre fixe de requêtes.
+
+        Raises:
+            LookupError: Si le scénario n'existe pas
+        """
+        tree = ScenarioTreeLoader.load_scenario(scenario_id)
+        if tree is None:
+            raise LookupError("Scenario not found")
+        return tree
+
+    @staticmethod
+    def get_scenario_json(scenario_id: int, version: TreeVersion | None = None) -> Detail:
+        """
+        Détail JSON encodé d'un scénario, servi par le cache des détails tant
+        que sa version ne change pas.
+
+        Raises:
+            LookupError: Si le scénario n'existe pas
+        """
+        version = version or ScenarioService.tree_version(scenario_id)
+        return load_detail(
+            "scenario", scenario_id, version, lambda: ScenarioService.get_scenario_tree(scenario_id)
+        )
+
+    @staticmethod
+    def tree_version(scenario_id: int) -> TreeVersion:
+        """
+        Version de l'arbre d'un scénario (une requête d'agrégats).
+
+        Raises:
+            LookupError: Si le scénario n'existe pas
+        """
+        version = scenarios_version(db.select(Scenario.id).where(Scenario.id == scenario_id))
+        if not version.rows:
+            raise LookupError("Scenario not found")
+        return version
+
+    @staticmethod
+    def get_scenario_trees(scenario_ids: list[int]) -> list[dict[str, Any]]:
+        """Détails sérialisés de plusieurs scénarios, dans l'ordre des IDs fournis."""
+        return ScenarioTreeLoader.load_scenarios(scenario_ids)
+
     @staticmethod
     def delete_scenario(scenario_id: int) -> None:
         """
@@ -60,6 +272,8 @@ class ScenarioService:
         try:
             db.session.delete(scenario)
             db.session.commit()
+            invalidate_scenario_context(scenario_id)
+            invalidate_details(scenario_id)
             logger.info(
                 "[scenario_service][success] Scénario supprimé",
                 extra={"scenario_id": scenario_id}
@@ -92,20 +306,17 @@ class ScenarioService:
         if not label:
             raise ValueError("Label requis")
 
-        # Vérifier si l'objectif existe déjà
-        objectif = Objectif.query.filter_by(label=label).first()
-        if not objectif:
-            objectif = Objectif(
-                label=label,
-                description=payload.get("description"),
-            )
-            db.session.add(objectif)
-            db.session.flush()
+        objectif = db.session.get(
+            Objectif,
+            upsert_label(Objectif, label, description=payload.get("description")),
+        )
 
         # Ajouter au scénario si pas déjà présent
         if objectif not in scenario.objectifs:
             scenario.objectifs.append(objectif)
             db.session.commit()
+            invalidate_scenario_context(scenario_id)
+            invalidate_details(scenario_id)
             logger.info(
                 "[scenario_service][success] Objectif ajouté",
                 extra={"scenario_id": scenario_id, "objectif_id": objectif.id},
@@ -143,21 +354,19 @@ class ScenarioService:
         if not label:
             raise ValueError("Label requis")
 
-        # Vérifier si la cible existe déjà
-        cible = Cible.query.filter_by(label=label).first()
-        if not cible:
-            cible = Cible(
-                label=label,
-                persona=payload.get("persona"),
-                segment=payload.get("segment"),
-            )
-            db.session.add(cible)
-            db.session.flush()
+        cible = db.session.get(
+            Cible,
+            upsert_label(
+                Cible, label, persona=payload.get("persona"), segment=payload.get("segment")
+            ),
+        )
 
         # Ajouter au scénario si pas déjà présent
         if cible not in scenario.cibles:
             scenario.cibles.append(cible)
             db.session.commit()
+            invalidate_scenario_context(scenario_id)
+            invalidate_details(scenario_id)
             logger.info(
                 "[scenario_service][success] Cible ajoutée",
                 extra={"scenario_id": scenario_id, "cible_id": cible.id},
@@ -176,14 +385,8 @@ class ScenarioService:
         }
 
     @staticmethod
-    def suggest_new_scenario() -> dict[str, Any]:
-        """
-        Génère plusieurs suggestions de nouveaux scénarios basées sur les scénarios existants.
-        Utilise OpenAI pour analyser les scénarios et proposer des idées innovantes.
-        
-        Returns:
-            dict: Liste de suggestions avec nom, thématique et description
-        """
+    def new_scenario_call() -> AICall:
+        """Prépare l'appel IA de suggestion de scénarios à partir des scénarios existants."""
         # Récupérer tous les scénarios existants
         scenarios = Scenario.query.all()
         
@@ -224,43 +427,69 @@ Répondez UNIQUEMENT au format JSON suivant (sans markdown, juste le JSON) :
   ]
 }}"""
 
+        messages = [
+            {
+                "role": "system",
+                "content": "Vous êtes un expert en stratégie marketing. Vous répondez toujours en JSON valide."
+            },
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
+
+        return AICall(
+            "suggest_scenarios",
+            None,
+            messages,
+            {
+                "model": "gpt-4o-mini",
+                "temperature": 0.8,  # Plus créatif
+                "max_tokens": 1500,  # Plus de tokens pour plusieurs suggestions
+            },
+        )
+
+    @staticmethod
+    def suggest_new_scenario() -> dict[str, Any]:
+        """
+        Génère plusieurs suggestions de nouveaux scénarios basées sur les scénarios existants.
+        Utilise OpenAI pour analyser les scénarios et proposer des idées innovantes.
+        
+        Returns:
+            dict: Liste de suggestions avec nom, thématique et description
+        """
+        call = ScenarioService.new_scenario_call()
         try:
-            # Appeler OpenAI
-            client = openai.OpenAI(api_key=current_app.config["OPENAI_API_KEY"])
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "Vous êtes un expert en stratégie marketing. Vous répondez toujours en JSON valide."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.8,  # Plus créatif
-                max_tokens=1500  # Plus de tokens pour plusieurs suggestions
-            )
-            
-            # Extraire la réponse
-            content = response.choices[0].message.content.strip()
-            
-            # Parser le JSON
-            import json
-            suggestion = json.loads(content)
-            
-            logger.info(
-                "[scenario_service][success] Suggestion générée",
-                extra={"suggestion": suggestion}
-            )
-            
-            return suggestion
-            
+            # Une seule fois pour les demandes identiques simultanées
+            suggestion = run_ai_call(call)
         except Exception as exc:
-            logger.error(
-                "[scenario_service][error] Erreur lors de la génération de suggestion",
-                extra={"error": str(exc)}
-            )
+            ScenarioService._log_suggestion_failure(exc)
             raise
+        logger.info(
+            "[scenario_service][success] Suggestion générée",
+            extra={"suggestion": suggestion}
+        )
+        return suggestion
+
+    @staticmethod
+    async def suggest_new_scenario_async() -> dict[str, Any]:
+        """Variante asynchrone (service ASGI) de ``suggest_new_scenario``."""
+        call = await run_in_thread(ScenarioService.new_scenario_call)
+        try:
+            suggestion = await run_ai_call_async(call)
+        except Exception as exc:
+            ScenarioService._log_suggestion_failure(exc)
+            raise
+        logger.info(
+            "[scenario_service][success] Suggestion générée",
+            extra={"suggestion": suggestion}
+        )
+        return suggestion
+
+    @staticmethod
+    def _log_suggestion_failure(exc: Exception) -> None:
+        logger.error(
+            "[scenario_service][error] Erreur lors de la génération de suggestion",
+            extra={"error": str(exc)}
+        )
 
@@ -0,0 +1,468 @@
+"""Exécution unique des appels IA identiques et simultanés (single-flight).
+
+Deux appels concurrents de même clé (point d'appel, entité, empreinte des
+entrées) partagent une seule exécution et son résultat. Dans un worker, les
+suivants attendent le ``Future`` du premier ; entre workers, l'insertion de
+la clé dans ``ai_flights`` fait office de verrou, et le résultat y reste
+``SINGLE_FLIGHT_RESULT_TTL_SECONDS`` pour les appels arrivés pendant
+l'exécution (un appel arrivé après la fin relance une exécution). Le
+titulaire prolonge son verrou tant que l'exécution dure (appels LLM avec
+nouvelles tentatives et attente du budget) ; un verrou dont le titulaire a
+disparu expire après ``SINGLE_FLIGHT_LEASE_SECONDS``.
+
+``single_flight_async`` applique les mêmes règles aux coroutines du service
+ASGI (``asyncio.Future`` partagés dans la boucle, table via le pool de threads).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Iterator, TypeVar
+
+from flask import current_app
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from ..extensions import db
+from ..metrics import get_metrics
+from ..models import AIFlight
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class SingleFlightRegistry:
+    """Exécutions en cours dans le processus, par clé."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: dict[str, Future] = {}
+        self._async_flights: dict[tuple[asyncio.AbstractEventLoop, str], asyncio.Future] = {}
+
+    def join_or_lead(self, key: str) -> tuple[Future, bool]:
+        """Retourne le ``Future`` de la clé et vrai si l'appelant doit l'exécuter."""
+        with self._lock:
+            future = self._flights.get(key)
+            if future is not None:
+                return future, False
+            future = self._flights[key] = Future()
+            return future, True
+
+    def release(self, key: str, future: Future) -> None:
+        with self._lock:
+            if self._flights.get(key) is future:
+                del self._flights[key]
+
+    def join_or_lead_async(self, key: str) -> tuple[asyncio.Future, bool]:
+        """Équivalent de ``join_or_lead`` pour les coroutines de la boucle courante."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            future = self._async_flights.get((loop, key))
+            if future is not None:
+                return future, False
+            future = self._async_flights[(loop, key)] = loop.create_future()
+            # Erreur consultée même sans appel en attente (pas d'avertissement asyncio)
+            future.add_done_callback(lambda done: done.cancelled() or done.exception())
+            return future, True
+
+    def release_async(self, key: str, future: asyncio.Future) -> None:
+        with self._lock:
+            if self._async_flights.get((future.get_loop(), key)) is future:
+                del self._async_flights[(future.get_loop(), key)]
+
+
+def get_single_flight_registry() -> SingleFlightRegistry:
+    """Retourne le registre de l'application courante."""
+    registry = current_app.extensions.get("single_flight")
+    if registry is None:
+        registry = current_app.extensions.setdefault("single_flight", SingleFlightRegistry())
+    return registry
+
+
+def flight_key(call_site: str, entity_id: Any, inputs: Any) -> str:
+    """Clé d'un appel : point d'appel, entité et empreinte des entrées."""
+    raw = json.dumps(
+        {"call_site": call_site, "entity_id": entity_id, "inputs": inputs},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _count(call_site: str, role: str) -> None:
+    registry = get_metrics()
+    registry.describe(
+        "ai_single_flight_requests_total",
+        "counter",
+        "Appels IA exécutés ou fusionnés (role=executed, coalesced_process, coalesced_database)",
+    )
+    registry.inc("ai_single_flight_requests_total", {"call_site": call_site, "role": role})
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite renvoie des datetimes naïfs
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def single_flight(call_site: str, entity_id: Any, inputs: Any, fn: Callable[[], T]) -> T:
+    """
+    Exécute ``fn`` une seule fois pour tous les appels concurrents de même clé.
+
+    Args:
+        call_site: Point d'appel (ex. ``suggest_cibles``)
+        entity_id: Entité concernée (scénario, configuration)
+        inputs: Entrées déterminant le résultat (messages du prompt), sérialisables en JSON
+        fn: Exécution à partager ; son résultat doit être sérialisable en JSON
+
+    Returns:
+        Résultat de ``fn``, éventuellement produit par un autre appel
+
+    Raises:
+        Exception: L'erreur de l'exécution partagée
+    """
+    config = current_app.config
+    if not config.get("SINGLE_FLIGHT_ENABLED", True):
+        return fn()
+
+    key = flight_key(call_site, entity_id, inputs)
+    registry = get_single_flight_registry()
+    future, leader = registry.join_or_lead(key)
+
+    if not leader:
+        try:
+            result = future.result(timeout=config.get("SINGLE_FLIGHT_WAIT_SECONDS", 120))
+        except FutureTimeoutError:
+            logger.warning(
+                "[single_flight][warning] Attente dépassée, exécution directe",
+                extra={"call_site": call_site, "entity_id": entity_id},
+            )
+            return fn()
+        _count(call_site, "coalesced_process")
+        return copy.deepcopy(result)
+
+    try:
+        result = _run_shared(key, call_site, fn)
+    except BaseException as exc:
+        future.set_exception(exc)
+        raise
+    else:
+        future.set_result(copy.deepcopy(result))
+        return result
+    finally:
+        registry.release(key, future)
+
+
+def _run_shared(key: str, call_site: str, fn: Callable[[], T]) -> T:
+    """Coordonne l'exécution entre workers via la table ``ai_flights``."""
+    config = current_app.config
+    if not config.get("SINGLE_FLIGHT_PERSISTENT", True):
+        result = fn()
+        _count(call_site, "executed")
+        return result
+
+    owner = f"{os.getpid()}:{threading.get_ident()}"
+    arrived = datetime.now(timezone.utc)
+    deadline = time.monotonic() + config.get("SINGLE_FLIGHT_WAIT_SECONDS", 120)
+    poll_seconds = config.get("SINGLE_FLIGHT_POLL_INTERVAL_MS", 250) / 1000
+
+    while True:
+        state, result = _acquire(key, call_site, owner, arrived)
+        if state == "leader":
+            break
+        if state == "done":
+            _count(call_site, "coalesced_database")
+            return result
+        if time.monotonic() >= deadline:
+            logger.warning(
+                "[single_flight][warning] Attente dépassée, exécution directe",
+                extra={"call_site": call_site},
+            )
+            result = fn()
+            _count(call_site, "executed")
+            return result
+        if state == "running":
+            time.sleep(poll_seconds)
+
+    try:
+        with _renewing(key, owner):
+            result = fn()
+    except BaseException:
+        _release(key, owner, None, failed=True)
+        raise
+    _release(key, owner, result)
+    _count(call_site, "executed")
+    return result
+
+
+async def single_flight_async(
+    call_site: str, entity_id: Any, inputs: Any, fn: Callable[[], Awaitable[T]]
+) -> T:
+    """
+    Variante asynchrone de ``single_flight`` (mêmes clés, même table).
+
+    Doit être appelée sous le contexte d'application de la requête asynchrone.
+    """
+    config = current_app.config
+    if not config.get("SINGLE_FLIGHT_ENABLED", True):
+        return await fn()
+
+    key = flight_key(call_site, entity_id, inputs)
+    registry = get_single_flight_registry()
+    future, leader = registry.join_or_lead_async(key)
+
+    if not leader:
+        try:
+            result = await asyncio.wait_for(
+                asyncio.shield(future), config.get("SINGLE_FLIGHT_WAIT_SECONDS", 120)
+            )
+        except asyncio.TimeoutError:
+            logger.warning(
+                "[single_flight][warning] Attente dépassée, exécution directe",
+                extra={"call_site": call_site, "entity_id": entity_id},
+            )
+            return await fn()
+        except asyncio.CancelledError:
+            # Exécution partagée annulée (client du premier appel parti) : pas cet appel
+            if not future.cancelled():
+                raise
+            return await fn()
+        _count(call_site, "coalesced_process")
+        return copy.deepcopy(result)
+
+    try:
+        result = await _run_shared_async(key, call_site, fn)
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except BaseException as exc:
+        future.set_exception(exc)
+        raise
+    else:
+        future.set_result(copy.deepcopy(result))
+        return result
+    finally:
+        registry.release_async(key, future)
+
+
+async def _run_shared_async(key: str, call_site: str, fn: Callable[[], Awaitable[T]]) -> T:
+    """Équivalent de ``_run_shared`` : accès à la table déportés, attente non bloquante."""
+    from ..aio import run_in_thread
+
+    config = current_app.config
+    if not config.get("SINGLE_FLIGHT_PERSISTENT", True):
+        result = await fn()
+        _count(call_site, "executed")
+        return result
+
+    owner = f"{os.getpid()}:task-{id(asyncio.current_task())}"
+    arrived = datetime.now(timezone.utc)
+    deadline = time.monotonic() + config.get("SINGLE_FLIGHT_WAIT_SECONDS", 120)
+    poll_seconds = config.get("SINGLE_FLIGHT_POLL_INTERVAL_MS", 250) / 1000
+
+    while True:
+        state, result = await run_in_thread(_acquire, key, call_site, owner, arrived)
+        if state == "leader":
+            break
+        if state == "done":
+            _count(call_site, "coalesced_database")
+            return result
+        if time.monotonic() >= deadline:
+            logger.warning(
+                "[single_flight][warning] Attente dépassée, exécution directe",
+                extra={"call_site": call_site},
+            )
+            result = await fn()
+            _count(call_site, "executed")
+            return result
+        if state == "running":
+            await asyncio.sleep(poll_seconds)
+
+    renewal = asyncio.create_task(_renew_async(key, owner))
+    try:
+        result = await fn()
+    except BaseException:
+        renewal.cancel()
+        await run_in_thread(_release, key, owner, None, True)
+        raise
+    renewal.cancel()
+    await run_in_thread(_release, key, owner, result)
+    _count(call_site, "executed")
+    return result
+
+
+@contextmanager
+def _renewing(key: str, owner: str) -> Iterator[None]:
+    """Prolonge le verrou depuis un thread tant que le bloc s'exécute."""
+    app = current_app._get_current_object()
+    stop = threading.Event()
+
+    def renew() -> None:
+        with app.app_context():
+            while not stop.wait(_lease_seconds() / 3):
+                _renew(key, owner)
+
+    thread = threading.Thread(target=renew, name="single-flight-lease", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+async def _renew_async(key: str, owner: str) -> None:
+    """Équivalent de ``_renewing`` : tâche annulée à la fin de l'exécution."""
+    from ..aio import run_in_thread
+
+    while True:
+        await asyncio.sleep(_lease_seconds() / 3)
+        await run_in_thread(_renew, key, owner)
+
+
+def _lease_seconds() -> float:
+    return current_app.config.get("SINGLE_FLIGHT_LEASE_SECONDS", 120)
+
+
+def _renew(key: str, owner: str) -> None:
+    """Repousse l'expiration du verrou tant que son titulaire l'exécute."""
+    table = AIFlight.__table__
+    try:
+        with db.engine.begin() as conn:
+            conn.execute(
+                update(table)
+                .where(table.c.flight_key == key)
+                .where(table.c.owner == owner)
+                .where(table.c.status == "running")
+                .values(
+                    expires_at=datetime.now(timezone.utc) + timedelta(seconds=_lease_seconds())
+                )
+            )
+    except SQLAlchemyError as exc:
+        logger.warning(
+            "[single_flight][warning] Prolongation du verrou partagé impossible",
+            extra={"flight_key": key, "error": str(exc)},
+        )
+
+
+def _acquire(key: str, call_site: str, owner: str, arrived: datetime) -> tuple[str, Any]:
+    """
+    Tente de prendre le verrou de la clé. Un résultat n'est partagé qu'avec
+    les appels arrivés avant la fin de son exécution.
+
+    Returns:
+        (``leader``, None), (``done``, résultat), (``running``, None) ou
+        (``retry``, None) si l'entrée vient de changer
+    """
+    table = AIFlight.__table__
+    now = datetime.now(timezone.utc)
+    lease = timedelta(seconds=_lease_seconds())
+
+    try:
+        with db.engine.begin() as conn:
+            conn.execute(delete(table).where(table.c.expires_at < now - lease))
+            conn.execute(
+                table.insert().values(
+                    flight_key=key,
+                    call_site=call_site,
+                    owner=owner,
+                    status="running",
+                    started_at=now,
+                    expires_at=now + lease,
+                )
+            )
+        return "leader", None
+    except IntegrityError:
+        pass
+    except SQLAlchemyError as exc:
+        # Table indisponible : pas de coordination entre workers
+        logger.warning(
+            "[single_flight][warning] Verrou partagé indisponible",
+            extra={"call_site": call_site, "error": str(exc)},
+        )
+        return "leader", None
+
+    try:
+        with db.engine.begin() as conn:
+            row = conn.execute(
+                select(
+                    table.c.status, table.c.result, table.c.expires_at, table.c.finished_at
+                ).where(table.c.flight_key == key)
+            ).first()
+            if row is None:
+                return "retry", None
+            if _as_utc(row.expires_at) <= now or (
+                row.status == "done" and _as_utc(row.finished_at) < arrived
+            ):
+                # Titulaire disparu, ou exécution terminée avant l'arrivée : reprise atomique
+                taken = conn.execute(
+                    update(table)
+                    .where(table.c.flight_key == key)
+                    .where(
+                        db.or_(
+                            table.c.expires_at <= now,
+                            db.and_(table.c.status == "done", table.c.finished_at < arrived),
+                        )
+                    )
+                    .values(
+                        owner=owner,
+                        status="running",
+                        result=None,
+                        started_at=now,
+                        finished_at=None,
+                        expires_at=now + lease,
+                    )
+                ).rowcount
+                return ("leader" if taken else "retry"), None
+    except SQLAlchemyError as exc:
+        logger.warning(
+            "[single_flight][warning] Lecture du verrou partagé impossible",
+            extra={"call_site": call_site, "error": str(exc)},
+        )
+        return "leader", None
+
+    if row.status == "done":
+        return "done", json.loads(row.result)
+    return "running", None
+
+
+def _release(key: str, owner: str, result: Any, failed: bool = False) -> None:
+    """Publie le résultat pour les autres workers, ou libère la clé après un échec."""
+    table = AIFlight.__table__
+    owned = db.and_(table.c.flight_key == key, table.c.owner == owner)
+    now = datetime.now(timezone.utc)
+    try:
+        with db.engine.begin() as conn:
+            if failed:
+                conn.execute(delete(table).where(owned))
+            else:
+                conn.execute(
+                    update(table)
+                    .where(owned)
+                    .values(
+                        status="done",
+                        result=json.dumps(result, ensure_ascii=False, default=str),
+                        finished_at=now,
+                        expires_at=now
+                        + timedelta(
+                            seconds=current_app.config.get("SINGLE_FLIGHT_RESULT_TTL_SECONDS", 5)
+                        ),
+                    )
+                )
+    except SQLAlchemyError as exc:
+        logger.warning(
+            "[single_flight][warning] Libération du verrou partagé impossible",
+            extra={"flight_key": key, "error": str(exc)},
+        )
@@ -0,0 +1,139 @@
+"""Service de suggestions IA groupées (objectifs / cibles)."""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any
+
+from flask import Flask, current_app
+
+from ..extensions import db
+from ..models import Configuration
+from .cible_service import CibleService
+from .objectif_service import ObjectifService
+
+logger = logging.getLogger(__name__)
+
+SUGGESTION_KINDS = ("objectifs", "cibles")
+
+
+class SuggestionService:
+    """Orchestration des suggestions IA sur plusieurs configurations."""
+
+    @staticmethod
+    def prepare_batch(
+        configuration_ids: list[Any],
+        kinds: list[str] | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Valide une demande groupée et résout le scénario de chaque configuration.
+
+        Args:
+            configuration_ids: IDs des configurations
+            kinds: Types de suggestions (``objectifs``, ``cibles``), tous par défaut
+
+        Returns:
+            Liste de tâches (configuration_id, scenario_id, kind) ; scenario_id
+            vaut None pour une configuration introuvable
+
+        Raises:
+            ValueError: Si la demande est invalide
+        """
+        if not isinstance(configuration_ids, list) or not configuration_ids:
+            raise ValueError("configuration_ids doit être une liste non vide")
+        if not all(isinstance(item, int) and not isinstance(item, bool) for item in configuration_ids):
+            raise ValueError("configuration_ids doit contenir des entiers")
+
+        max_configurations = current_app.config.get("SUGGEST_BATCH_MAX_CONFIGURATIONS", 50)
+        if len(configuration_ids) > max_configurations:
+            raise ValueError(f"Maximum {max_configurations} configurations par requête")
+
+        kinds = kinds or list(SUGGESTION_KINDS)
+        unknown = [kind for kind in kinds if kind not in SUGGESTION_KINDS]
+        if unknown:
+            raise ValueError(f"Types de suggestion inconnus: {', '.join(map(str, unknown))}")
+
+        # Dédoublonnage en conservant l'ordre
+        configuration_ids = list(dict.fromkeys(configuration_ids))
+        kinds = list(dict.fromkeys(kinds))
+
+        scenario_ids = dict(
+            db.session.execute(
+                db.select(Configuration.id, Configuration.scenario_id).where(
+                    Configuration.id.in_(configuration_ids)
+                )
+            ).all()
+        )
+
+        return [
+            {
+                "configuration_id": configuration_id,
+                "scenario_id": scenario_ids.get(configuration_id),
+                "kind": kind,
+            }
+            for configuration_id in configuration_ids
+            for kind in kinds
+        ]
+
+    @staticmethod
+    def run_batch(tasks: list[dict[str, Any]]) -> Iterator[dict[str, Any]]:
+        """
+        Exécute les suggestions en parallèle (pool de threads borné) et produit
+        chaque résultat dès qu'il est disponible.
+
+        Args:
+            tasks: Tâches retournées par ``prepare_batch``
+
+        Yields:
+            Dict avec configuration_id, kind, status (ok/error) et suggestions ou error
+        """
+        app = current_app._get_current_object()
+        runnable = []
+        for task in tasks:
+            if task["scenario_id"] is None:
+                yield {
+                    "configuration_id": task["configuration_id"],
+                    "kind": task["kind"],
+                    "status": "error",
+                    "error": "Configuration not found",
+                }
+            else:
+                runnable.append(task)
+
+        if not runnable:
+            return
+
+        max_workers = min(app.config.get("SUGGEST_BATCH_MAX_WORKERS", 8), len(runnable))
+        pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="suggest-batch")
+        try:
+            futures = [pool.submit(SuggestionService._run_task, app, task) for task in runnable]
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            # Client déconnecté : on abandonne les tâches non démarrées
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _run_task(app: Flask, task: dict[str, Any]) -> dict[str, Any]:
+        result = {"configuration_id": task["configuration_id"], "kind": task["kind"]}
+
+        with app.app_context():
+            try:
+                if task["kind"] == "objectifs":
+                    suggestions = ObjectifService.suggest_objectifs_for_scenario(
+                        task["scenario_id"]
+                    )
+                else:
+                    suggestions = CibleService.suggest_cibles_for_scenario(
+                        task["scenario_id"], task["configuration_id"]
+                    )
+            except Exception as exc:
+                logger.error(
+                    "[suggestion_service][error] Échec d'une suggestion groupée",
+                    extra={**result, "error": str(exc)},
+                )
+                return {**result, "status": "error", "error": str(exc)}
+
+        return {**result, "status": "ok", "suggestions": suggestions}
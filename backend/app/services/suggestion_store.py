@@ -0,0 +1,340 @@
+"""Suggestions IA pré-générées, servies en stale-while-revalidate.
+
+Les suggestions d'objectifs et de cibles ne dépendent que du scénario (nom,
+thématique, description) et, pour les cibles, des objectifs sélectionnés. Le
+store les conserve par empreinte de ces entrées : une suggestion plus vieille
+que ``SUGGESTION_STORE_TTL_SECONDS`` est encore servie immédiatement pendant
+qu'une tâche la régénère, jusqu'à ``SUGGESTION_STORE_MAX_STALE_SECONDS``.
+La création d'une configuration et la modification de ses objectifs
+planifient une pré-génération.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from flask import current_app
+from sqlalchemy import delete, or_, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from ..aio import run_in_thread
+from ..extensions import db
+from ..metrics import get_metrics
+from ..models import (
+    Cible,
+    Job,
+    JobStatus,
+    Objectif,
+    Scenario,
+    StoredSuggestions,
+    configuration_objectifs,
+)
+from .label_index import drop_known_labels
+
+logger = logging.getLogger(__name__)
+
+REFRESH_JOB_KIND = "suggestions.refresh"
+
+_MODELS = {"objectifs": Objectif, "cibles": Cible}
+
+
+@dataclass
+class SuggestionLookup:
+    """Suggestions servies et leur provenance (hit, stale, miss, bypass)."""
+
+    suggestions: list[dict[str, Any]] = field(default_factory=list)
+    status: str = "miss"
+    age_seconds: int = 0
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite renvoie des datetimes naïfs
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _count(kind: str, status: str) -> None:
+    registry = get_metrics()
+    registry.describe(
+        "suggestion_store_lookups_total", "counter", "Lectures du store de suggestions par statut"
+    )
+    registry.inc("suggestion_store_lookups_total", {"kind": kind, "status": status})
+
+
+class SuggestionStore:
+    """Store persistant des suggestions d'objectifs et de cibles."""
+
+    @staticmethod
+    def input_key(kind: str, scenario_id: int, configuration_id: int | None = None) -> str:
+        """
+        Empreinte des entrées du prompt de suggestion.
+
+        Raises:
+            LookupError: Si le scénario n'existe pas
+        """
+        scenario = db.session.execute(
+            db.select(Scenario.nom, Scenario.thematique, Scenario.description).where(
+                Scenario.id == scenario_id
+            )
+        ).first()
+        if scenario is None:
+            raise LookupError(f"Scenario {scenario_id} not found")
+
+        inputs: dict[str, Any] = {
+            "kind": kind,
+            "nom": scenario.nom,
+            "thematique": scenario.thematique,
+            "description": scenario.description,
+        }
+        if kind == "cibles":
+            inputs["objectifs"] = sorted(
+                db.session.scalars(
+                    db.select(Objectif.label)
+                    .join(configuration_objectifs)
+                    .where(configuration_objectifs.c.configuration_id == configuration_id)
+                )
+            ) if configuration_id else []
+
+        raw = json.dumps(inputs, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def get_suggestions(
+        kind: str,
+        scenario_id: int,
+        configuration_id: int | None = None,
+        fresh: bool = False,
+    ) -> SuggestionLookup:
+        """
+        Retourne les suggestions pré-générées, même périmées, et planifie leur
+        régénération au-delà du TTL ; génère de façon synchrone en l'absence
+        d'entrée exploitable ou si ``fresh`` est demandé.
+
+        Args:
+            kind: ``objectifs`` ou ``cibles``
+            scenario_id: ID du scénario
+            configuration_id: ID de la configuration (objectifs sélectionnés)
+            fresh: Ignore le store et régénère
+
+        Raises:
+            LookupError: Si le scénario n'existe pas
+        """
+        key, lookup = SuggestionStore._lookup(kind, scenario_id, configuration_id, fresh)
+        if lookup is not None:
+            return lookup
+        suggestions = SuggestionStore._generate(kind, scenario_id, configuration_id)
+        return SuggestionStore._store(key, kind, suggestions, fresh)
+
+    @staticmethod
+    async def get_suggestions_async(
+        kind: str,
+        scenario_id: int,
+        configuration_id: int | None = None,
+        fresh: bool = False,
+    ) -> SuggestionLookup:
+        """Variante asynchrone (service ASGI) de ``get_suggestions``."""
+        from .cible_service import CibleService
+        from .objectif_service import ObjectifService
+
+        key, lookup = await run_in_thread(
+            SuggestionStore._lookup, kind, scenario_id, configuration_id, fresh
+        )
+        if lookup is not None:
+            return lookup
+        if kind == "objectifs":
+            suggestions = await ObjectifService.suggest_objectifs_for_scenario_async(scenario_id)
+        else:
+            suggestions = await CibleService.suggest_cibles_for_scenario_async(
+                scenario_id, configuration_id
+            )
+        return await run_in_thread(SuggestionStore._store, key, kind, suggestions, fresh)
+
+    @staticmethod
+    def _lookup(
+        kind: str, scenario_id: int, configuration_id: int | None, fresh: bool
+    ) -> tuple[str | None, SuggestionLookup | None]:
+        """
+        Entrée exploitable du store, ou la clé sous laquelle enregistrer une
+        nouvelle génération (None si le store est désactivé).
+
+        Raises:
+            LookupError: Si le scénario n'existe pas
+        """
+        config = current_app.config
+        if not config.get("SUGGESTION_STORE_ENABLED", True):
+            return None, None
+
+        key = SuggestionStore.input_key(kind, scenario_id, configuration_id)
+        if not fresh:
+            entry = db.session.get(StoredSuggestions, key)
+            if entry is not None:
+                age = (datetime.now(timezone.utc) - _as_utc(entry.generated_at)).total_seconds()
+                if age <= config.get("SUGGESTION_STORE_MAX_STALE_SECONDS", 604800):
+                    # Les libellés ajoutés au catalogue depuis la génération sont retirés
+                    suggestions = drop_known_labels(_MODELS[kind], json.loads(entry.payload))
+                    status = "hit"
+                    if age > config.get("SUGGESTION_STORE_TTL_SECONDS", 3600):
+                        status = "stale"
+                        SuggestionStore._claim_refresh(key, kind, scenario_id, configuration_id)
+                    _count(kind, status)
+                    return key, SuggestionLookup(suggestions, status, int(age))
+        return key, None
+
+    @staticmethod
+    def _store(
+        key: str | None, kind: str, suggestions: list[dict[str, Any]], fresh: bool
+    ) -> SuggestionLookup:
+        """Enregistre une génération synchrone et en retourne la provenance."""
+        if key is None:
+            return SuggestionLookup(suggestions, "bypass")
+        SuggestionStore._save(key, kind, suggestions)
+        status = "bypass" if fresh else "miss"
+        _count(kind, status)
+        return SuggestionLookup(suggestions, status)
+
+    @staticmethod
+    def prefetch(scenario_id: int, configuration_id: int | None, kinds: list[str]) -> None:
+        """
+        Planifie la pré-génération des suggestions d'une configuration.
+
+        Sans effet si ``SUGGESTION_PREFETCH_ENABLED`` est faux ; une erreur
+        d'enregistrement est journalisée sans interrompre l'appelant.
+        """
+        config = current_app.config
+        if not (
+            config.get("SUGGESTION_STORE_ENABLED", True)
+            and config.get("SUGGESTION_PREFETCH_ENABLED", True)
+        ):
+            return
+        SuggestionStore._schedule(scenario_id, configuration_id, kinds)
+
+    @staticmethod
+    def refresh(scenario_id: int, configuration_id: int | None, kinds: list[str]) -> dict[str, Any]:
+        """
+        Régénère les suggestions absentes ou périmées (exécuté par une tâche).
+
+        Les entrées sont recalculées à l'exécution : une tâche planifiée avant
+        une nouvelle modification produit directement le jeu à jour.
+
+        Returns:
+            Par type, le nombre de suggestions générées ou ``"fresh"``
+        """
+        ttl = current_app.config.get("SUGGESTION_STORE_TTL_SECONDS", 3600)
+        result: dict[str, Any] = {}
+        for kind in kinds:
+            key = SuggestionStore.input_key(kind, scenario_id, configuration_id)
+            entry = db.session.get(StoredSuggestions, key)
+            if entry is not None and entry.refresh_started_at is None and (
+                datetime.now(timezone.utc) - _as_utc(entry.generated_at)
+            ).total_seconds() <= ttl:
+                result[kind] = "fresh"
+                continue
+
+            suggestions = SuggestionStore._generate(kind, scenario_id, configuration_id)
+            SuggestionStore._save(key, kind, suggestions)
+            result[kind] = len(suggestions)
+
+        logger.info(
+            "[suggestion_store][success] Suggestions régénérées",
+            extra={"scenario_id": scenario_id, "configuration_id": configuration_id, **result},
+        )
+        return result
+
+    @staticmethod
+    def _generate(
+        kind: str, scenario_id: int, configuration_id: int | None
+    ) -> list[dict[str, Any]]:
+        from .cible_service import CibleService
+        from .objectif_service import ObjectifService
+
+        if kind == "objectifs":
+            return ObjectifService.suggest_objectifs_for_scenario(scenario_id)
+        return CibleService.suggest_cibles_for_scenario(scenario_id, configuration_id)
+
+    @staticmethod
+    def _save(key: str, kind: str, suggestions: list[dict[str, Any]]) -> None:
+        """Remplace l'entrée et purge celles au-delà de la péremption maximale."""
+        now = datetime.now(timezone.utc)
+        max_stale = current_app.config.get("SUGGESTION_STORE_MAX_STALE_SECONDS", 604800)
+        try:
+            db.session.execute(delete(StoredSuggestions).where(StoredSuggestions.input_key == key))
+            db.session.execute(
+                delete(StoredSuggestions).where(
+                    StoredSuggestions.generated_at < now - timedelta(seconds=max_stale)
+                )
+            )
+            db.session.add(
+                StoredSuggestions(
+                    input_key=key,
+                    kind=kind,
+                    payload=json.dumps(suggestions, ensure_ascii=False),
+                    generated_at=now,
+                )
+            )
+            db.session.commit()
+        except IntegrityError:
+            # Entrée écrite en concurrence par un autre worker : elle fait foi
+            db.session.rollback()
+        except SQLAlchemyError as exc:
+            db.session.rollback()
+            logger.warning(
+                "[suggestion_store][warning] Écriture des suggestions impossible",
+                extra={"kind": kind, "error": str(exc)},
+            )
+
+    @staticmethod
+    def _claim_refresh(
+        key: str, kind: str, scenario_id: int, configuration_id: int | None
+    ) -> None:
+        """Réserve la régénération (UPDATE atomique) pour qu'un seul worker la planifie."""
+        now = datetime.now(timezone.utc)
+        lease = timedelta(seconds=current_app.config.get("SUGGESTION_REFRESH_LEASE_SECONDS", 300))
+        try:
+            claimed = db.session.execute(
+                update(StoredSuggestions)
+                .where(StoredSuggestions.input_key == key)
+                .where(
+                    or_(
+                        StoredSuggestions.refresh_started_at.is_(None),
+                        StoredSuggestions.refresh_started_at < now - lease,
+                    )
+                )
+                .values(refresh_started_at=now)
+            ).rowcount
+            db.session.commit()
+        except SQLAlchemyError as exc:
+            db.session.rollback()
+            logger.warning(
+                "[suggestion_store][warning] Réservation de la régénération impossible",
+                extra={"kind": kind, "error": str(exc)},
+            )
+            return
+        if claimed:
+            SuggestionStore._schedule(scenario_id, configuration_id, [kind])
+
+    @staticmethod
+    def _schedule(scenario_id: int, configuration_id: int | None, kinds: list[str]) -> None:
+        from .job_service import JobService
+
+        payload = {"scenario_id": scenario_id, "configuration_id": configuration_id, "kinds": kinds}
+        try:
+            # Une tâche identique encore en attente suffit
+            pending = db.session.scalar(
+                db.select(Job.id)
+                .where(Job.status == JobStatus.PENDING.value)
+                .where(Job.kind == REFRESH_JOB_KIND)
+                .where(Job.payload == json.dumps(payload))
+                .limit(1)
+            )
+            if pending is None:
+                JobService.enqueue(REFRESH_JOB_KIND, payload)
+        except SQLAlchemyError as exc:
+            db.session.rollback()
+            logger.warning(
+                "[suggestion_store][warning] Planification des suggestions impossible",
+                extra={"scenario_id": scenario_id, "configuration_id": configuration_id, "error": str(exc)},
+            )
@@ -0,0 +1,133 @@
+"""Version des arbres scénario/configuration pour les requêtes conditionnelles.
+
+La version d'un arbre est calculée par une seule requête d'agrégats, sans
+charger ni sérialiser l'arbre : pour chaque niveau (scénarios,
+configurations, objectifs et cibles liés, plans, items, articles), le
+nombre de lignes, la somme des IDs, la somme des compteurs ``version`` et le
+plus récent ``updated_at``. Un ajout ou une suppression change le nombre ou
+la somme des IDs, une modification incrémente ``version`` (``updated_at``,
+à la seconde sous MySQL, ne distingue pas deux écritures de la même
+seconde et ne sert qu'à ``Last-Modified``) ; les liens objectifs/cibles
+n'ayant pas de compteur, leur ajout ou retrait modifie la configuration.
+Les écritures hors ORM doivent incrémenter ``version`` elles-mêmes.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy import func, literal
+from sqlalchemy.sql import Select
+
+from ..extensions import db
+from ..models import (
+    Article,
+    Cible,
+    Configuration,
+    Objectif,
+    Plan,
+    PlanItem,
+    Scenario,
+    configuration_cibles,
+    configuration_objectifs,
+)
+
+
+@dataclass
+class TreeVersion:
+    """ETag fort et date de dernière modification d'un arbre."""
+
+    etag: str
+    last_modified: datetime | None
+    rows: int
+
+
+def _part(index: int, ids, model, *where) -> Select:
+    return db.select(
+        literal(index).label("part"),
+        func.count().label("rows"),
+        func.coalesce(func.sum(ids), 0).label("ids"),
+        func.coalesce(func.sum(model.version), 0).label("versions"),
+        func.max(model.updated_at).label("updated_at"),
+    ).where(*where)
+
+
+def _version(parts: list[Select], *extra: Any) -> TreeVersion:
+    rows = sorted(db.session.execute(db.union_all(*parts)).all(), key=lambda row: row.part)
+    digest = hashlib.sha256(
+        repr([(row.rows, row.ids, row.versions, str(row.updated_at)) for row in rows] + list(extra)).encode()
+    )
+    timestamps = [
+        value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+        for value in (row.updated_at for row in rows)
+        if isinstance(value, datetime)
+    ]
+    return TreeVersion(
+        etag=digest.hexdigest()[:32],
+        last_modified=max(timestamps, default=None),
+        rows=rows[0].rows,
+    )
+
+
+def _subtree_parts(configuration_ids: Select) -> list[Select]:
+    """Agrégats des niveaux situés sous les configurations sélectionnées."""
+    objectifs = configuration_objectifs.c
+    cibles = configuration_cibles.c
+    plan_ids = db.select(Plan.id).where(Plan.configuration_id.in_(configuration_ids))
+    return [
+        _part(
+            2, objectifs.objectif_id, Objectif,
+            objectifs.configuration_id.in_(configuration_ids),
+        ).join_from(configuration_objectifs, Objectif, Objectif.id == objectifs.objectif_id),
+        _part(
+            3, cibles.cible_id, Cible,
+            cibles.configuration_id.in_(configuration_ids),
+        ).join_from(configuration_cibles, Cible, Cible.id == cibles.cible_id),
+        _part(4, Plan.id, Plan, Plan.configuration_id.in_(configuration_ids)),
+        _part(5, PlanItem.id, PlanItem, PlanItem.plan_id.in_(plan_ids)),
+        _part(6, Article.id, Article, Article.plan_id.in_(plan_ids)),
+    ]
+
+
+def scenarios_version(scenario_ids: Select, *extra: Any) -> TreeVersion:
+    """
+    Version des scénarios sélectionnés et de leurs sous-arbres.
+
+    Args:
+        scenario_ids: Sélection des IDs de scénarios
+        extra: Valeurs ajoutées à l'ETag (paramètres de la requête)
+
+    Returns:
+        Version ; ``rows`` est le nombre de scénarios sélectionnés
+    """
+    configuration_ids = db.select(Configuration.id).where(
+        Configuration.scenario_id.in_(scenario_ids)
+    )
+    return _version(
+        [
+            _part(0, Scenario.id, Scenario, Scenario.id.in_(scenario_ids)),
+            _part(
+                1, Configuration.id, Configuration,
+                Configuration.scenario_id.in_(scenario_ids),
+            ),
+            *_subtree_parts(configuration_ids),
+        ],
+        *extra,
+    )
+
+
+def configuration_version(configuration_id: int) -> TreeVersion:
+    """Version d'une configuration ; ``rows`` vaut 0 si elle n'existe pas."""
+    configuration_ids = db.select(Configuration.id).where(Configuration.id == configuration_id)
+    return _version(
+        [
+            _part(
+                1, Configuration.id, Configuration,
+                Configuration.id == configuration_id,
+            ),
+            *_subtree_parts(configuration_ids),
+        ]
+    )
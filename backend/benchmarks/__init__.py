@@ -0,0 +1 @@
+"""Benchmarks reproductibles du backend (exécutés hors de la suite pytest)."""
@@ -0,0 +1,259 @@
+"""
+Routes IA : workers WSGI synchrones comparés au service ASGI (``app.asgi``).
+
+Les deux modèles servent la même base, face au serveur OpenAI local
+(``fake_openai_server``) avec une latence réaliste :
+
+- ``sync`` : serveur WSGI werkzeug dont la concurrence est plafonnée à
+  ``--sync-workers`` requêtes, comme autant de workers gunicorn synchrones ;
+- ``async`` : uvicorn avec ``create_asgi_app`` (une seule boucle d'événements).
+
+``--concurrency`` clients envoient leurs requêtes en parallèle. Le rapport
+JSON donne, par route et par modèle, le débit, les centiles de latence et le
+nombre maximal d'appels LLM simultanés observés par le serveur local.
+
+Usage (depuis backend/) :
+    python -m benchmarks.bench_async --concurrency 200 --requests 400 --llm-latency-ms 800
+    python -m benchmarks.bench_async --sync-workers 4 --routes suggest_objectifs chat
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import statistics
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any
+
+import httpx
+import uvicorn
+from werkzeug.serving import make_server
+
+from app import create_app
+from app.asgi import AsyncAIApplication
+from app.extensions import db
+
+from .bench_endpoints import ROUTES, _QuietRequestHandler, _git_revision, _percentile, seed
+from .fake_openai_server import FakeOpenAIServer, StubConfig
+
+AI_ROUTES = ["chat", "suggest_objectifs", "suggest_cibles", "suggest_scenarios", "generate_plan"]
+
+
+class SyncServer:
+    """Serveur WSGI multi-thread limité à ``workers`` requêtes simultanées."""
+
+    name = "sync"
+
+    def __init__(self, app, workers: int):
+        slots = threading.BoundedSemaphore(workers)
+
+        def limited(environ, start_response):
+            with slots:
+                response = app(environ, start_response)
+                try:
+                    return [b"".join(response)]
+                finally:
+                    if hasattr(response, "close"):
+                        response.close()
+
+        self._server = make_server(
+            "127.0.0.1", 0, limited, threaded=True, request_handler=_QuietRequestHandler
+        )
+        self.base_url = f"http://127.0.0.1:{self._server.server_port}"
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def close(self) -> None:
+        self._server.shutdown()
+
+
+class AsyncServer:
+    """uvicorn servant ``AsyncAIApplication`` dans un thread d'arrière-plan."""
+
+    name = "async"
+
+    def __init__(self, app):
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        self._server = uvicorn.Server(
+            uvicorn.Config(
+                AsyncAIApplication(app), host="127.0.0.1", port=port, log_level="warning"
+            )
+        )
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.05)
+        self.base_url = f"http://127.0.0.1:{port}"
+
+    def close(self) -> None:
+        self._server.should_exit = True
+        self._thread.join(30)
+
+
+async def _load(
+    base_url: str, method: str, calls: list[tuple[str, dict | None]], concurrency: int
+) -> tuple[list[tuple[float, int]], float]:
+    slots = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=300, limits=limits) as client:
+
+        async def one(call: tuple[str, dict | None]) -> tuple[float, int]:
+            async with slots:
+                started = time.perf_counter()
+                response = await client.request(method, call[0], json=call[1])
+                return (time.perf_counter() - started) * 1000, response.status_code
+
+        started = time.perf_counter()
+        samples = await asyncio.gather(*(one(call) for call in calls))
+        return list(samples), time.perf_counter() - started
+
+
+def run_route(
+    server, stub: FakeOpenAIServer, route: str, ids: dict[str, list[int]], args: argparse.Namespace
+) -> dict[str, Any]:
+    method, build = ROUTES[route]
+    rng = random.Random(args.seed)
+    calls = [build(ids, rng) for _ in range(args.requests)]
+
+    with stub.state.lock:
+        stub.state.stats["max_in_flight"] = 0
+    samples, wall = asyncio.run(_load(server.base_url, method, calls, args.concurrency))
+
+    latencies = [sample[0] for sample in samples]
+    return {
+        "route": route,
+        "model": server.name,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "errors": sum(1 for sample in samples if sample[1] >= 400),
+        "req_per_s": round(args.requests / wall, 1),
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies), 2),
+            "p50": _percentile(latencies, 50),
+            "p90": _percentile(latencies, 90),
+            "p99": _percentile(latencies, 99),
+            "max": round(max(latencies), 2),
+        },
+        "llm_max_in_flight": stub.state.stats["max_in_flight"],
+    }
+
+
+def run(args: argparse.Namespace, database_uri: str) -> dict[str, Any]:
+    stub = FakeOpenAIServer(config=StubConfig(
+        latency_ms=args.llm_latency_ms,
+        latency_spread_ms=args.llm_latency_spread_ms,
+        latency_distribution=args.llm_latency_distribution,
+        seed=args.seed,
+    )).start()
+
+    engine_options: dict[str, Any] = {"pool_pre_ping": True}
+    if database_uri.startswith("sqlite"):
+        engine_options["connect_args"] = {"timeout": 30, "check_same_thread": False}
+
+    app = create_app(
+        {
+            "SQLALCHEMY_DATABASE_URI": database_uri,
+            "SQLALCHEMY_ENGINE_OPTIONS": engine_options,
+            "SCHEDULER_ENABLED": False,
+            # Chaque requête doit atteindre le LLM
+            "AI_CACHE_ENABLED": False,
+            "SUGGESTION_STORE_ENABLED": False,
+            "SUGGESTION_PREFETCH_ENABLED": False,
+            "SINGLE_FLIGHT_ENABLED": False,
+            "ASYNC_DB_MAX_WORKERS": args.db_workers,
+            "OPENAI_BASE_URL": stub.base_url,
+            "OPENAI_API_KEY": "local",
+            "OPENAI_POOL_MAX_CONNECTIONS": args.concurrency,
+            "OPENAI_POOL_MAX_KEEPALIVE": args.concurrency,
+        }
+    )
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        ids = seed(args.scenarios, args.configurations, args.messages)
+        dialect = db.engine.dialect.name
+
+    results = []
+    try:
+        for model in args.models:
+            server = SyncServer(app, args.sync_workers) if model == "sync" else AsyncServer(app)
+            try:
+                for route in args.routes:
+                    results.append(run_route(server, stub, route, ids, args))
+            finally:
+                server.close()
+    finally:
+        stub.stop()
+
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "database": dialect,
+            "sync_workers": args.sync_workers,
+            "db_workers": args.db_workers,
+            "llm_latency_ms": args.llm_latency_ms,
+            "llm_calls": stub.state.stats,
+        },
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scenarios", type=int, default=50)
+    parser.add_argument("--configurations", type=int, default=2, help="Par scénario")
+    parser.add_argument("--messages", type=int, default=10, help="Par scénario")
+    parser.add_argument("--requests", type=int, default=200, help="Par route et modèle")
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--routes", nargs="+", choices=AI_ROUTES, default=AI_ROUTES)
+    parser.add_argument("--models", nargs="+", choices=["sync", "async"], default=["sync", "async"])
+    parser.add_argument(
+        "--sync-workers", type=int, default=8, help="Requêtes simultanées du modèle synchrone"
+    )
+    parser.add_argument("--db-workers", type=int, default=32, help="ASYNC_DB_MAX_WORKERS")
+    parser.add_argument("--llm-latency-ms", type=float, default=800.0)
+    parser.add_argument("--llm-latency-spread-ms", type=float, default=0.0)
+    parser.add_argument(
+        "--llm-latency-distribution",
+        choices=["fixed", "uniform", "normal", "lognormal"],
+        default="fixed",
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--database-uri",
+        default=None,
+        help="Base cible, ex. MariaDB locale (par défaut un fichier SQLite temporaire)",
+    )
+    parser.add_argument("--output", default=None, help="Fichier JSON du rapport (stdout sinon)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_uri = args.database_uri or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        report = run(args, database_uri)
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fp:
+            fp.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
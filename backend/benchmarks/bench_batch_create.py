@@ -0,0 +1,89 @@
+"""
+Débit de ``POST /api/scenarios/batch-create`` : une transaction par scénario
+(ancienne boucle sur ``create_scenario``) contre l'insertion groupée.
+
+Usage (depuis backend/) :
+    python -m benchmarks.bench_batch_create --sizes 100 1000 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from app import create_app
+from app.extensions import db
+from app.schemas.scenario import ScenarioBatchCreateSchema, ScenarioCreateSchema
+from app.services.scenario_service import ScenarioService
+
+
+def payload(size: int, with_configurations: bool) -> list[dict]:
+    items = []
+    for index in range(size):
+        item = {"nom": f"Scénario {index}", "thematique": "SEO"}
+        if with_configurations:
+            item["configurations"] = [
+                {
+                    "nom": "Principale",
+                    "objectifs": [{"label": f"Objectif {index % 50}"}],
+                    "cibles": [{"label": f"Cible {index % 20}", "segment": "PME"}],
+                }
+            ]
+        items.append(item)
+    return items
+
+
+def loop_create(items: list[dict]) -> None:
+    schema = ScenarioCreateSchema()
+    for item in items:
+        ScenarioService.create_scenario(schema.load(item))
+
+
+def bulk_create(items: list[dict]) -> None:
+    ScenarioService.bulk_create_scenarios(ScenarioBatchCreateSchema(many=True).load(items))
+
+
+def measure(database_uri: str, strategy: str, items: list[dict]) -> dict:
+    app = create_app({"TESTING": True, "SQLALCHEMY_DATABASE_URI": database_uri})
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        started = time.perf_counter()
+        (loop_create if strategy == "per_item_commit" else bulk_create)(items)
+        elapsed = time.perf_counter() - started
+        db.session.remove()
+        db.drop_all()
+    return {
+        "strategy": strategy,
+        "scenarios": len(items),
+        "seconds": round(elapsed, 3),
+        "scenarios_per_second": round(len(items) / elapsed),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument(
+        "--database-uri",
+        default=None,
+        help="Base cible (par défaut un fichier SQLite temporaire, pour inclure les fsync)",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_uri = args.database_uri or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        results = []
+        for size in args.sizes:
+            results.append(measure(database_uri, "per_item_commit", payload(size, False)))
+            results.append(measure(database_uri, "bulk", payload(size, False)))
+            results.append(measure(database_uri, "bulk_nested", payload(size, True)))
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,457 @@
+"""
+Débit et latence des principales routes de l'API avec un faux LLM en processus
+(ou servi en HTTP local par ``fake_openai_server`` avec ``--llm http``).
+
+Les routes sont interrogées via le client de test Flask et/ou un vrai serveur
+WSGI (werkzeug multi-thread, HTTP local). Le rapport JSON (req/s, centiles de
+latence, requêtes SQL) se compare d'une exécution à l'autre.
+
+Le nombre de requêtes SQL provient de l'en-tête ``Server-Timing`` (profilage
+SQL) : pour les réponses en flux, seules les requêtes exécutées avant l'envoi
+des en-têtes sont comptées.
+
+Usage (depuis backend/) :
+    python -m benchmarks.bench_endpoints --scenarios 500 --requests 200 --output bench.json
+    python -m benchmarks.bench_endpoints --database-uri mysql+pymysql://u:p@127.0.0.1/bench \\
+        --transport wsgi --concurrency 8 --routes scenarios_list chat
+    python -m benchmarks.bench_endpoints --llm http --llm-latency-ms 800 \
+        --llm-rate-limit-ratio 0.05 --routes chat suggest_objectifs
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable
+
+import httpx
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+from app import create_app
+from app.extensions import db
+from app.models import (
+    Article,
+    Cible,
+    Configuration,
+    Message,
+    Objectif,
+    Plan,
+    PlanItem,
+    Scenario,
+    configuration_cibles,
+    configuration_objectifs,
+)
+from app.services.bulk import insert_returning_ids, insert_rows, upsert_labels
+
+from .fake_llm import FakeOpenAI
+from .fake_openai_server import FakeOpenAIServer, StubConfig
+
+_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+def seed(scenarios: int, configurations: int, messages: int) -> dict[str, list[int]]:
+    """Insère les volumes demandés ; retourne les IDs de scénarios et de configurations."""
+    objectif_ids = list(
+        upsert_labels(Objectif, [{"label": f"Objectif {n}"} for n in range(50)]).values()
+    )
+    cible_ids = list(
+        upsert_labels(
+            Cible, [{"label": f"Cible {n}", "segment": "PME"} for n in range(30)], ("segment",)
+        ).values()
+    )
+    scenario_ids = insert_returning_ids(
+        Scenario,
+        [
+            {"nom": f"Scénario {n}", "thematique": "SEO", "description": "Acquisition B2B"}
+            for n in range(scenarios)
+        ],
+    )
+    configuration_ids = insert_returning_ids(
+        Configuration,
+        [
+            {"scenario_id": scenario_id, "nom": f"Config {n}"}
+            for scenario_id in scenario_ids
+            for n in range(configurations)
+        ],
+    )
+    insert_rows(
+        configuration_objectifs,
+        (
+            {"configuration_id": cid, "objectif_id": objectif_ids[cid % len(objectif_ids)]}
+            for cid in configuration_ids
+        ),
+    )
+    insert_rows(
+        configuration_cibles,
+        (
+            {"configuration_id": cid, "cible_id": cible_ids[cid % len(cible_ids)]}
+            for cid in configuration_ids
+        ),
+    )
+    plan_ids = insert_returning_ids(
+        Plan, [{"configuration_id": cid, "resume": "Plan"} for cid in configuration_ids]
+    )
+    insert_rows(
+        PlanItem,
+        (
+            {"plan_id": pid, "format": "post", "message": "Publier", "canal": "LinkedIn"}
+            for pid in plan_ids
+            for _ in range(3)
+        ),
+    )
+    insert_rows(
+        Article, ({"plan_id": pid, "nom": f"Article {n}"} for pid in plan_ids for n in range(2))
+    )
+
+    ttl = datetime.now(timezone.utc) + timedelta(days=7)
+    insert_rows(
+        Message,
+        (
+            {
+                "scenario_id": scenario_id,
+                "auteur": "user" if n % 2 == 0 else "assistant",
+                "contenu": f"Message {n} sur la stratégie de contenu du scénario.",
+                "ttl": ttl,
+            }
+            for scenario_id in scenario_ids
+            for n in range(messages)
+        ),
+    )
+    db.session.commit()
+    return {"scenarios": scenario_ids, "configurations": configuration_ids}
+
+
+# Nom -> (méthode, construction du chemin et du corps à partir des IDs)
+RouteBuilder = Callable[[dict[str, list[int]], random.Random], tuple[str, dict | None]]
+ROUTES: dict[str, tuple[str, RouteBuilder]] = {
+    "scenarios_list": ("GET", lambda ids, rng: ("/api/scenarios?limit=50", None)),
+    "scenario_detail": (
+        "GET",
+        lambda ids, rng: (f"/api/scenarios/{rng.choice(ids['scenarios'])}", None),
+    ),
+    "chat": (
+        "POST",
+        lambda ids, rng: (
+            "/api/chat",
+            {"scenario_id": rng.choice(ids["scenarios"]), "message": "Des idées d'articles ?"},
+        ),
+    ),
+    "chat_stream": (
+        "POST",
+        lambda ids, rng: (
+            "/api/chat/stream",
+            {"scenario_id": rng.choice(ids["scenarios"]), "message": "Des idées d'articles ?"},
+        ),
+    ),
+    "suggest_objectifs": (
+        "POST",
+        lambda ids, rng: (
+            f"/api/configurations/{rng.choice(ids['configurations'])}/suggest-objectifs",
+            None,
+        ),
+    ),
+    "suggest_cibles": (
+        "POST",
+        lambda ids, rng: (
+            f"/api/configurations/{rng.choice(ids['configurations'])}/suggest-cibles",
+            None,
+        ),
+    ),
+    "suggest_scenarios": ("POST", lambda ids, rng: ("/api/scenarios/suggest-new", None)),
+    "generate_plan": (
+        "POST",
+        lambda ids, rng: (
+            f"/api/configurations/{rng.choice(ids['configurations'])}/generate-plan",
+            None,
+        ),
+    ),
+    "export_ndjson": (
+        "GET",
+        lambda ids, rng: (
+            "/api/export/scenarios.ndjson?ids="
+            + ",".join(map(str, rng.sample(ids["scenarios"], min(10, len(ids["scenarios"]))))),
+            None,
+        ),
+    ),
+    "export_csv": (
+        "GET",
+        lambda ids, rng: (f"/api/scenarios/{rng.choice(ids['scenarios'])}/export/csv", None),
+    ),
+}
+
+
+class TestClientTransport:
+    """Client de test Flask (un par thread)."""
+
+    name = "test_client"
+
+    def __init__(self, app):
+        self._app = app
+        self._local = threading.local()
+
+    def request(self, method: str, path: str, body: dict | None, headers: dict) -> tuple[int, str]:
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self._app.test_client()
+        response = client.open(path, method=method, json=body, headers=headers)
+        response.get_data()  # consomme les réponses en flux
+        return response.status_code, response.headers.get("Server-Timing", "")
+
+    def close(self) -> None:
+        pass
+
+
+class _QuietRequestHandler(WSGIRequestHandler):
+    def log_request(self, *args: Any, **kwargs: Any) -> None:
+        pass
+
+
+class WSGITransport:
+    """Serveur WSGI werkzeug multi-thread sur un port local éphémère."""
+
+    name = "wsgi"
+
+    def __init__(self, app):
+        self._server = make_server(
+            "127.0.0.1", 0, app, threaded=True, request_handler=_QuietRequestHandler
+        )
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        self._client = httpx.Client(
+            base_url=f"http://127.0.0.1:{self._server.server_port}",
+            timeout=60,
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=64),
+        )
+
+    def request(self, method: str, path: str, body: dict | None, headers: dict) -> tuple[int, str]:
+        response = self._client.request(method, path, json=body, headers=headers)
+        return response.status_code, response.headers.get("Server-Timing", "")
+
+    def close(self) -> None:
+        self._client.close()
+        self._server.shutdown()
+
+
+def _percentile(values: list[float], percent: float) -> float:
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(percent / 100 * len(ordered)) - 1))
+    return round(ordered[rank], 2)
+
+
+def run_route(
+    transport,
+    route: str,
+    ids: dict[str, list[int]],
+    requests: int,
+    concurrency: int,
+    warmup: int,
+    seed_value: int,
+) -> dict[str, Any]:
+    method, build = ROUTES[route]
+    rng = random.Random(seed_value)
+    calls = [build(ids, rng) for _ in range(warmup + requests)]
+    headers = {"X-Debug-Profile": "1"}
+
+    for path, body in calls[:warmup]:
+        transport.request(method, path, body, headers)
+
+    def one(call: tuple[str, dict | None]) -> tuple[float, int, int | None]:
+        started = time.perf_counter()
+        status, timing = transport.request(method, call[0], call[1], headers)
+        elapsed = (time.perf_counter() - started) * 1000
+        match = _QUERIES.search(timing)
+        return elapsed, status, int(match.group(1)) if match else None
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        samples = list(pool.map(one, calls[warmup:]))
+    wall = time.perf_counter() - started
+
+    latencies = [sample[0] for sample in samples]
+    queries = [sample[2] for sample in samples if sample[2] is not None]
+    return {
+        "route": route,
+        "transport": transport.name,
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": sum(1 for sample in samples if sample[1] >= 400),
+        "req_per_s": round(requests / wall, 1),
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies), 2),
+            "p50": _percentile(latencies, 50),
+            "p90": _percentile(latencies, 90),
+            "p95": _percentile(latencies, 95),
+            "p99": _percentile(latencies, 99),
+            "max": round(max(latencies), 2),
+        },
+        "queries": {
+            "median": statistics.median(queries) if queries else None,
+            "max": max(queries) if queries else None,
+        },
+    }
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args: argparse.Namespace, database_uri: str) -> dict[str, Any]:
+    stub: FakeOpenAIServer | None = None
+    llm_config: dict[str, Any] = {}
+    if args.llm == "http":
+        # Vrai client OpenAI (pool HTTP, retries du SDK) face au serveur local
+        stub = FakeOpenAIServer(config=StubConfig(
+            latency_ms=args.llm_latency_ms,
+            latency_spread_ms=args.llm_latency_spread_ms,
+            latency_distribution=args.llm_latency_distribution,
+            rate_limit_ratio=args.llm_rate_limit_ratio,
+            error_ratio=args.llm_error_ratio,
+            seed=args.seed,
+        )).start()
+        llm_config = {"OPENAI_BASE_URL": stub.base_url, "OPENAI_API_KEY": "local"}
+
+    engine_options: dict[str, Any] = {"pool_pre_ping": True}
+    if database_uri.startswith("sqlite"):
+        # Écritures concurrentes (chat, plans) : attente du verrou plutôt qu'échec
+        engine_options["connect_args"] = {"timeout": 30, "check_same_thread": False}
+
+    app = create_app(
+        {
+            "SQLALCHEMY_DATABASE_URI": database_uri,
+            "SQLALCHEMY_ENGINE_OPTIONS": engine_options,
+            "SCHEDULER_ENABLED": False,
+            "AI_CACHE_ENABLED": args.ai_cache,
+            "AI_CACHE_PERSISTENT": False,
+            "SUGGESTION_STORE_ENABLED": args.suggestion_store,
+            "SUGGESTION_PREFETCH_ENABLED": False,
+            "SQL_PROFILING_ENABLED": True,
+            "SLOW_REQUEST_THRESHOLD_MS": 10**9,
+            **llm_config,
+        }
+    )
+    fake: FakeOpenAI | None = None
+    if stub is None:
+        fake = FakeOpenAI(latency_ms=args.llm_latency_ms)
+        app.extensions["openai_client"] = fake
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        started = time.perf_counter()
+        ids = seed(args.scenarios, args.configurations, args.messages)
+        seed_seconds = time.perf_counter() - started
+        dialect = db.engine.dialect.name
+
+    transports = {"test_client": TestClientTransport, "wsgi": WSGITransport}
+    selected = list(transports) if args.transport == "both" else [args.transport]
+
+    results = []
+    try:
+        for name in selected:
+            transport = transports[name](app)
+            try:
+                for route in args.routes:
+                    results.append(
+                        run_route(
+                            transport, route, ids, args.requests, args.concurrency, args.warmup, args.seed
+                        )
+                    )
+            finally:
+                transport.close()
+    finally:
+        if stub is not None:
+            stub.stop()
+
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "database": dialect,
+            "volumes": {
+                "scenarios": args.scenarios,
+                "configurations_per_scenario": args.configurations,
+                "messages_per_scenario": args.messages,
+            },
+            "seed_seconds": round(seed_seconds, 2),
+            "llm": args.llm,
+            "llm_latency_ms": args.llm_latency_ms,
+            "llm_calls": fake.calls if fake is not None else stub.state.stats,
+            "ai_cache": args.ai_cache,
+            "suggestion_store": args.suggestion_store,
+        },
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scenarios", type=int, default=200)
+    parser.add_argument("--configurations", type=int, default=2, help="Par scénario")
+    parser.add_argument("--messages", type=int, default=20, help="Par scénario")
+    parser.add_argument("--requests", type=int, default=100, help="Par route et transport")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--routes", nargs="+", choices=sorted(ROUTES), default=list(ROUTES))
+    parser.add_argument("--transport", choices=["test_client", "wsgi", "both"], default="both")
+    parser.add_argument(
+        "--llm", choices=["inprocess", "http"], default="inprocess",
+        help="Faux client injecté ou serveur OpenAI local (fake_openai_server)",
+    )
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0)
+    parser.add_argument("--llm-latency-spread-ms", type=float, default=0.0, help="--llm http")
+    parser.add_argument(
+        "--llm-latency-distribution",
+        choices=["fixed", "uniform", "normal", "lognormal"],
+        default="fixed",
+        help="--llm http",
+    )
+    parser.add_argument("--llm-rate-limit-ratio", type=float, default=0.0, help="--llm http")
+    parser.add_argument("--llm-error-ratio", type=float, default=0.0, help="--llm http")
+    parser.add_argument("--ai-cache", action="store_true", help="Active le cache des réponses IA")
+    parser.add_argument(
+        "--suggestion-store", action="store_true", help="Sert les suggestions pré-générées"
+    )
+    parser.add_argument("--seed", type=int, default=42, help="Graine du choix des IDs")
+    parser.add_argument(
+        "--database-uri",
+        default=None,
+        help="Base cible, ex. MariaDB locale (par défaut un fichier SQLite temporaire)",
+    )
+    parser.add_argument("--output", default=None, help="Fichier JSON du rapport (stdout sinon)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_uri = args.database_uri or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        report = run(args, database_uri)
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fp:
+            fp.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Compare le chargement des scénarios via l'ORM + ``ScenarioDetailSchema``
+(lazy="selectin") et via ``ScenarioTreeLoader`` (projections de colonnes).
+
+Usage (depuis backend/) :
+    python -m benchmarks.bench_scenario_loading --sizes 50 500 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import time
+
+from sqlalchemy import event, insert
+
+from app import create_app
+from app.extensions import db
+from app.models import (
+    Article,
+    Cible,
+    Configuration,
+    Objectif,
+    Plan,
+    PlanItem,
+    Scenario,
+    configuration_cibles,
+    configuration_objectifs,
+)
+from app.schemas.scenario import ScenarioDetailSchema
+from app.services.scenario_loader import ScenarioTreeLoader
+
+
+def seed(count: int, configurations_per_scenario: int = 2) -> list[int]:
+    """Insère ``count`` scénarios complets (configurations, objectifs, cibles, plans)."""
+    db.session.execute(
+        insert(Objectif), [{"label": f"Objectif {i}"} for i in range(20)]
+    )
+    db.session.execute(
+        insert(Cible), [{"label": f"Cible {i}", "segment": "PME"} for i in range(20)]
+    )
+    db.session.execute(
+        insert(Scenario),
+        [{"nom": f"Scénario {i}", "thematique": "SEO"} for i in range(count)],
+    )
+    scenario_ids = db.session.scalars(db.select(Scenario.id).order_by(Scenario.id)).all()
+
+    db.session.execute(
+        insert(Configuration),
+        [
+            {"scenario_id": scenario_id, "nom": f"Config {n}"}
+            for scenario_id in scenario_ids
+            for n in range(configurations_per_scenario)
+        ],
+    )
+    configuration_ids = db.session.scalars(db.select(Configuration.id)).all()
+
+    db.session.execute(
+        insert(configuration_objectifs),
+        [{"configuration_id": cid, "objectif_id": cid % 20 + 1} for cid in configuration_ids],
+    )
+    db.session.execute(
+        insert(configuration_cibles),
+        [{"configuration_id": cid, "cible_id": cid % 20 + 1} for cid in configuration_ids],
+    )
+    db.session.execute(
+        insert(Plan), [{"configuration_id": cid, "resume": "Plan"} for cid in configuration_ids]
+    )
+    plan_ids = db.session.scalars(db.select(Plan.id)).all()
+    db.session.execute(
+        insert(PlanItem),
+        [
+            {"plan_id": pid, "format": "article", "message": "Publier", "canal": "Blog"}
+            for pid in plan_ids
+            for _ in range(3)
+        ],
+    )
+    db.session.execute(
+        insert(Article),
+        [{"plan_id": pid, "nom": f"Article {n}"} for pid in plan_ids for n in range(2)],
+    )
+    db.session.commit()
+    return list(scenario_ids)
+
+
+def measure(label: str, func, repeat: int) -> dict:
+    statements = []
+
+    def count(*args):
+        statements.append(1)
+
+    durations = []
+    query_counts = []
+    for _ in range(repeat):
+        db.session.expire_all()
+        db.session.expunge_all()
+        statements.clear()
+        event.listen(db.engine, "before_cursor_execute", count)
+        started = time.perf_counter()
+        try:
+            func()
+        finally:
+            durations.append((time.perf_counter() - started) * 1000)
+            event.remove(db.engine, "before_cursor_execute", count)
+        query_counts.append(len(statements))
+
+    return {
+        "strategy": label,
+        "queries": max(query_counts),
+        "latency_ms_median": round(statistics.median(durations), 2),
+        "latency_ms_max": round(max(durations), 2),
+    }
+
+
+def run(sizes: list[int], repeat: int, database_uri: str) -> list[dict]:
+    results = []
+    for size in sizes:
+        app = create_app({"TESTING": True, "SQLALCHEMY_DATABASE_URI": database_uri})
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+            ids = seed(size)
+
+            orm = measure(
+                "orm_selectin",
+                lambda: ScenarioDetailSchema(many=True).dump(
+                    Scenario.query.filter(Scenario.id.in_(ids)).all()
+                ),
+                repeat,
+            )
+            projected = measure(
+                "column_projection",
+                lambda: ScenarioTreeLoader.load_scenarios(ids),
+                repeat,
+            )
+            results.extend({"scenarios": size, **row} for row in (orm, projected))
+
+            db.session.remove()
+            db.drop_all()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 500, 5000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--database-uri", default="sqlite:///:memory:")
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.sizes, args.repeat, args.database_uri), indent=2))
+
+
+if __name__ == "__main__":
+    main()
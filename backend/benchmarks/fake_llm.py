@@ -0,0 +1,112 @@
+"""
+Remplaçant en processus du client OpenAI pour les benchmarks.
+
+Répond instantanément (ou après ``latency_ms``) avec un JSON plausible selon
+le format attendu par l'appelant, en streaming ou non, et renseigne ``usage``.
+S'injecte via ``app.extensions["openai_client"]`` ; ``fake_openai_server``
+sert les mêmes réponses en HTTP.
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any
+
+from app.ai.tokens import count_message_tokens, count_tokens
+
+_STREAM_CHUNK_CHARS = 24
+
+_PLAN_ITEM = {
+    "format": "article",
+    "message": "Publier un article de fond",
+    "canal": "LinkedIn + Blog",
+    "frequence": "1x par semaine",
+    "kpi": "500 vues",
+}
+
+
+def fake_reply(messages: list[dict[str, Any]], serial: int) -> str:
+    """
+    Réponse JSON plausible pour le format attendu par l'appelant, déduit du
+    modèle de réponse cité dans le prompt (services ``{"objectifs": [...]}``,
+    ``{"cibles": [...]}``, ``{"suggestions": [...]}``, ``{"articles": [...]}``)
+    ou, à défaut, ``ChatResponseSchema``. Les libellés sont uniques par appel.
+    """
+    prompt = messages[-1]["content"]
+    if '"objectifs": [' in prompt:
+        return json.dumps({"objectifs": [
+            {"label": f"Objectif suggéré {serial}-{n}", "description": "Mesurable"}
+            for n in range(5)
+        ]}, ensure_ascii=False)
+    if '"cibles": [' in prompt:
+        return json.dumps({"cibles": [
+            {"label": f"Cible suggérée {serial}-{n}", "persona": "Décideur", "segment": "PME"}
+            for n in range(6)
+        ]}, ensure_ascii=False)
+    if '"suggestions": [' in prompt:
+        return json.dumps({"suggestions": [
+            {"nom": f"Scénario suggéré {serial}-{n}", "thematique": "SEO", "description": "..."}
+            for n in range(3)
+        ]}, ensure_ascii=False)
+    if '"articles": [' in prompt:
+        return json.dumps({
+            "resume": "Plan de contenu",
+            "articles": [{"nom": f"Article {n}", "resume": "Angle"} for n in range(5)],
+        }, ensure_ascii=False)
+
+    reply: dict[str, Any] = {
+        "message_markdown": f"Réponse **{serial}** : voici quelques pistes pour votre scénario.",
+        "actions": [],
+        "entities_to_create": [],
+        "errors": [],
+    }
+    # Prompt de génération de plan : la réponse valide aussi PlanGenerationSchema
+    if any('"items": [' in message.get("content", "") for message in messages):
+        reply.update(resume="Stratégie de contenu", items=[_PLAN_ITEM] * 5)
+    return json.dumps(reply, ensure_ascii=False)
+
+
+class FakeOpenAI:
+    """Client factice exposant ``chat.completions.create``."""
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency_ms = latency_ms
+        self.calls = 0
+        self._counter = itertools.count(1)
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs: Any) -> Any:
+        with self._lock:
+            self.calls += 1
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+        content = fake_reply(kwargs["messages"], next(self._counter))
+        model = kwargs.get("model")
+        prompt_tokens = count_message_tokens(kwargs["messages"], model)
+        completion_tokens = count_tokens(content, model)
+        usage = SimpleNamespace(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            total_tokens=prompt_tokens + completion_tokens,
+        )
+        if not kwargs.get("stream"):
+            return SimpleNamespace(
+                choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+                usage=usage,
+            )
+
+        chunks = [
+            SimpleNamespace(
+                choices=[SimpleNamespace(delta=SimpleNamespace(content=content[i : i + _STREAM_CHUNK_CHARS]))],
+                usage=None,
+            )
+            for i in range(0, len(content), _STREAM_CHUNK_CHARS)
+        ]
+        chunks.append(SimpleNamespace(choices=[], usage=usage))
+        return iter(chunks)
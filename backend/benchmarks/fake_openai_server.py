@@ -0,0 +1,316 @@
+"""
+Serveur local compatible OpenAI (``POST /v1/chat/completions``) pour les tests
+de charge sans réseau.
+
+Les réponses sont celles de ``fake_llm.fake_reply`` (JSON valide pour les
+schémas du chat, du plan et des suggestions), en streaming SSE ou non. La
+latence suit une distribution configurable ; une fraction des appels peut
+répondre 429 (avec ``Retry-After``), 500, ou rester sans réponse pendant
+``--timeout-sleep-s`` pour déclencher le timeout du client.
+
+L'application s'y connecte par configuration :
+    OPENAI_BASE_URL=http://127.0.0.1:8089/v1 OPENAI_API_KEY=local
+
+Usage (depuis backend/) :
+    python -m benchmarks.fake_openai_server --port 8089 --latency-ms 800 \\
+        --latency-distribution lognormal --rate-limit-ratio 0.05
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import math
+import random
+import sys
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+from app.ai.tokens import count_message_tokens, count_tokens
+
+from .fake_llm import fake_reply
+
+
+@dataclass
+class StubConfig:
+    latency_ms: float = 0.0
+    latency_spread_ms: float = 0.0
+    latency_distribution: str = "fixed"  # fixed, uniform, normal, lognormal
+    rate_limit_ratio: float = 0.0
+    retry_after_s: float = 1.0
+    error_ratio: float = 0.0
+    timeout_ratio: float = 0.0
+    timeout_sleep_s: float = 60.0
+    stream_chunk_chars: int = 16
+    stream_chunk_delay_ms: float = 0.0
+    seed: int | None = None
+
+
+class _State:
+    def __init__(self, config: StubConfig):
+        self.config = config
+        self.random = random.Random(config.seed)
+        self.serial = itertools.count(1)
+        self.lock = threading.Lock()
+        self.stats = {
+            "requests": 0, "ok": 0, "rate_limited": 0, "errors": 0, "timeouts": 0,
+            "in_flight": 0, "max_in_flight": 0,
+        }
+        self.closing = threading.Event()
+
+    def enter(self) -> None:
+        """Début d'appel : suivi des appels simultanés (``max_in_flight``)."""
+        with self.lock:
+            self.stats["in_flight"] += 1
+            self.stats["max_in_flight"] = max(self.stats["max_in_flight"], self.stats["in_flight"])
+
+    def leave(self) -> None:
+        with self.lock:
+            self.stats["in_flight"] -= 1
+
+    def draw(self) -> tuple[str, float, int]:
+        """Issue de l'appel, latence (s) et numéro d'appel."""
+        config = self.config
+        with self.lock:
+            self.stats["requests"] += 1
+            serial = next(self.serial)
+            roll = self.random.random()
+            if config.latency_distribution == "uniform":
+                latency = self.random.uniform(
+                    config.latency_ms - config.latency_spread_ms,
+                    config.latency_ms + config.latency_spread_ms,
+                )
+            elif config.latency_distribution == "normal":
+                latency = self.random.gauss(config.latency_ms, config.latency_spread_ms)
+            elif config.latency_distribution == "lognormal" and config.latency_ms > 0:
+                # Médiane latency_ms ; spread = écart-type relatif
+                sigma = math.sqrt(math.log(1 + (config.latency_spread_ms / config.latency_ms) ** 2))
+                latency = config.latency_ms * self.random.lognormvariate(0, sigma)
+            else:
+                latency = config.latency_ms
+
+        if roll < config.rate_limit_ratio:
+            outcome = "rate_limited"
+        elif roll < config.rate_limit_ratio + config.error_ratio:
+            outcome = "errors"
+        elif roll < config.rate_limit_ratio + config.error_ratio + config.timeout_ratio:
+            outcome = "timeouts"
+        else:
+            outcome = "ok"
+        with self.lock:
+            self.stats[outcome] += 1
+        return outcome, max(0.0, latency) / 1000, serial
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "FakeOpenAIServer"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _send_json(self, status: int, payload: dict[str, Any], headers: dict | None = None) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status: int, kind: str, message: str, headers: dict | None = None) -> None:
+        self._send_json(
+            status, {"error": {"message": message, "type": kind, "code": kind}}, headers
+        )
+
+    def do_GET(self) -> None:
+        if self.path.rstrip("/") in ("/v1/models", "/models"):
+            self._send_json(200, {"object": "list", "data": [{"id": "gpt-4o-mini", "object": "model"}]})
+        elif self.path == "/stats":
+            with self.server.state.lock:
+                self._send_json(200, dict(self.server.state.stats))
+        else:
+            self._error(404, "not_found", "Route inconnue")
+
+    def do_POST(self) -> None:
+        if self.path.rstrip("/") not in ("/v1/chat/completions", "/chat/completions"):
+            self._error(404, "not_found", "Route inconnue")
+            return
+        self.server.state.enter()
+        try:
+            self._complete()
+        finally:
+            self.server.state.leave()
+
+    def _complete(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+            messages = request["messages"]
+        except (ValueError, KeyError):
+            self._error(400, "invalid_request_error", "Corps JSON invalide")
+            return
+
+        state = self.server.state
+        outcome, latency, serial = state.draw()
+        if outcome == "timeouts":
+            # Pas de réponse : le client expire, la connexion est fermée ensuite
+            state.closing.wait(state.config.timeout_sleep_s)
+            self.close_connection = True
+            return
+        state.closing.wait(latency)
+
+        if outcome == "rate_limited":
+            self._error(
+                429,
+                "rate_limit_exceeded",
+                "Rate limit reached (injected)",
+                {"Retry-After": f"{state.config.retry_after_s:g}"},
+            )
+            return
+        if outcome == "errors":
+            self._error(500, "server_error", "Internal error (injected)")
+            return
+
+        model = request.get("model", "gpt-4o-mini")
+        content = fake_reply(messages, serial)
+        prompt_tokens = count_message_tokens(messages, model)
+        completion_tokens = count_tokens(content, model)
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+
+        if not request.get("stream"):
+            self._send_json(200, {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                    "logprobs": None,
+                }],
+                "usage": usage,
+            })
+            return
+
+        self._stream(completion_id, model, content, usage, request)
+
+    def _stream(
+        self, completion_id: str, model: str, content: str, usage: dict, request: dict
+    ) -> None:
+        config = self.server.state.config
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def chunk(choices: list, extra: dict | None = None) -> None:
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": choices,
+                **(extra or {}),
+            }
+            self._write_chunk(f"data: {json.dumps(payload, ensure_ascii=False)}\n\n")
+
+        chunk([{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}])
+        step = max(1, config.stream_chunk_chars)
+        for start in range(0, len(content), step):
+            if config.stream_chunk_delay_ms:
+                time.sleep(config.stream_chunk_delay_ms / 1000)
+            chunk([{
+                "index": 0,
+                "delta": {"content": content[start : start + step]},
+                "finish_reason": None,
+            }])
+        chunk([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+        if (request.get("stream_options") or {}).get("include_usage"):
+            chunk([], {"usage": usage})
+        self._write_chunk("data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _write_chunk(self, text: str) -> None:
+        data = text.encode("utf-8")
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+
+class FakeOpenAIServer(ThreadingHTTPServer):
+    """Serveur HTTP multi-thread ; ``base_url`` à passer dans ``OPENAI_BASE_URL``."""
+
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, config: StubConfig | None = None):
+        super().__init__((host, port), _Handler)
+        self.state = _State(config or StubConfig())
+
+    def handle_error(self, request: Any, client_address: Any) -> None:
+        # Client parti (timeout, annulation de flux) : rien à signaler
+        if not isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            super().handle_error(request, client_address)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "FakeOpenAIServer":
+        """Démarre le serveur dans un thread d'arrière-plan."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self.state.closing.set()  # libère les appels en attente (timeouts injectés)
+        self.shutdown()
+        self.server_close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Latence moyenne (médiane en lognormal)")
+    parser.add_argument("--latency-spread-ms", type=float, default=0.0)
+    parser.add_argument(
+        "--latency-distribution", choices=["fixed", "uniform", "normal", "lognormal"], default="fixed"
+    )
+    parser.add_argument("--rate-limit-ratio", type=float, default=0.0, help="Part des appels en 429")
+    parser.add_argument("--retry-after-s", type=float, default=1.0)
+    parser.add_argument("--error-ratio", type=float, default=0.0, help="Part des appels en 500")
+    parser.add_argument("--timeout-ratio", type=float, default=0.0, help="Part des appels bloqués")
+    parser.add_argument("--timeout-sleep-s", type=float, default=60.0)
+    parser.add_argument("--stream-chunk-chars", type=int, default=16)
+    parser.add_argument("--stream-chunk-delay-ms", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    config = StubConfig(**{
+        key: value for key, value in vars(args).items() if key not in ("host", "port")
+    })
+    server = FakeOpenAIServer(args.host, args.port, config)
+    print(f"Fake OpenAI server: {server.base_url}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
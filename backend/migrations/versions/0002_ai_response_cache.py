@@ -0,0 +1,35 @@
+"""AI response cache
+
+Revision ID: 0002_ai_response_cache
+Revises: 0001_initial
+Create Date: 2026-10-17 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0002_ai_response_cache"
+down_revision = "0001_initial"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "ai_response_cache",
+        sa.Column("cache_key", sa.String(length=64), nullable=False),
+        sa.Column("model", sa.String(length=80), nullable=False),
+        sa.Column("schema_name", sa.String(length=80), nullable=False),
+        sa.Column("payload", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("CURRENT_TIMESTAMP"), nullable=True),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("cache_key"),
+    )
+    op.create_index("ix_ai_response_cache_expires_at", "ai_response_cache", ["expires_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_ai_response_cache_expires_at", table_name="ai_response_cache")
+    op.drop_table("ai_response_cache")
@@ -0,0 +1,23 @@
+"""Index for keyset pagination of scenarios
+
+Revision ID: 0004_scenarios_keyset_index
+Revises: 0003_jobs
+Create Date: 2026-10-17 00:00:00.000000
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "0004_scenarios_keyset_index"
+down_revision = "0003_jobs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_scenarios_updated_id", "scenarios", ["updated_at", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_scenarios_updated_id", table_name="scenarios")
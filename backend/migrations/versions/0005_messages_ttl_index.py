@@ -0,0 +1,23 @@
+"""Index on messages.ttl for batched purge
+
+Revision ID: 0005_messages_ttl_index
+Revises: 0004_scenarios_keyset_index
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "0005_messages_ttl_index"
+down_revision = "0004_scenarios_keyset_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_messages_ttl", "messages", ["ttl"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_messages_ttl", table_name="messages")
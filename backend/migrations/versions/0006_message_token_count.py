@@ -0,0 +1,24 @@
+"""Precomputed token count on messages
+
+Revision ID: 0006_message_token_count
+Revises: 0005_messages_ttl_index
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0006_message_token_count"
+down_revision = "0005_messages_ttl_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("messages", sa.Column("token_count", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("messages", "token_count")
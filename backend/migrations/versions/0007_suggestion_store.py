@@ -0,0 +1,34 @@
+"""Pre-generated suggestion store
+
+Revision ID: 0007_suggestion_store
+Revises: 0006_message_token_count
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0007_suggestion_store"
+down_revision = "0006_message_token_count"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "suggestion_store",
+        sa.Column("input_key", sa.String(length=64), nullable=False),
+        sa.Column("kind", sa.String(length=20), nullable=False),
+        sa.Column("payload", sa.Text(), nullable=False),
+        sa.Column("generated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("refresh_started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("input_key"),
+    )
+    op.create_index("ix_suggestion_store_generated_at", "suggestion_store", ["generated_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_suggestion_store_generated_at", table_name="suggestion_store")
+    op.drop_table("suggestion_store")
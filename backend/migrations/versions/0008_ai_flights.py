@@ -0,0 +1,37 @@
+"""Single-flight table for in-progress AI calls
+
+Revision ID: 0008_ai_flights
+Revises: 0007_suggestion_store
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0008_ai_flights"
+down_revision = "0007_suggestion_store"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "ai_flights",
+        sa.Column("flight_key", sa.String(length=64), nullable=False),
+        sa.Column("call_site", sa.String(length=60), nullable=False),
+        sa.Column("owner", sa.String(length=64), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("result", sa.Text(), nullable=True),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("flight_key"),
+    )
+    op.create_index("ix_ai_flights_expires_at", "ai_flights", ["expires_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_ai_flights_expires_at", table_name="ai_flights")
+    op.drop_table("ai_flights")
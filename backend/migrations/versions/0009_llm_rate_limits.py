@@ -0,0 +1,33 @@
+"""Shared token buckets for LLM rate limiting
+
+Revision ID: 0009_llm_rate_limits
+Revises: 0008_ai_flights
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0009_llm_rate_limits"
+down_revision = "0008_ai_flights"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "llm_rate_limits",
+        sa.Column("model", sa.String(length=80), nullable=False),
+        sa.Column("requests", sa.Float(), nullable=False),
+        sa.Column("tokens", sa.Float(), nullable=False),
+        sa.Column("refilled_at", sa.Float(), nullable=False),
+        sa.Column("blocked_until", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("version", sa.Integer(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("model"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("llm_rate_limits")
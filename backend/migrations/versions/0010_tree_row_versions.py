@@ -0,0 +1,30 @@
+"""Row version counters on scenario tree tables
+
+Revision ID: 0010_tree_row_versions
+Revises: 0009_llm_rate_limits
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0010_tree_row_versions"
+down_revision = "0009_llm_rate_limits"
+branch_labels = None
+depends_on = None
+
+TABLES = ("scenarios", "configurations", "objectifs", "cibles", "plans", "plan_items", "articles")
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        op.add_column(
+            table, sa.Column("version", sa.Integer(), nullable=False, server_default="0")
+        )
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.drop_column(table, "version")
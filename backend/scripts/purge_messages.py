@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import argparse
+import json
+
+from app import create_app
+from app.services.maintenance import purge_expired_messages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Purge expired chat messages in batches.")
+    parser.add_argument("--dry-run", action="store_true", help="Only count expired messages")
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--sleep-ms", type=int, default=None)
+    args = parser.parse_args()
+
+    # Exécution ponctuelle : pas de planificateur dans ce processus
+    app = create_app({"SCHEDULER_ENABLED": False})
+    report = purge_expired_messages(
+        app,
+        batch_size=args.batch_size,
+        sleep_ms=args.sleep_ms,
+        dry_run=args.dry_run or None,
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
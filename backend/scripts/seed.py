@@ -15,6 +15,7 @@ from app.models import (
     Scenario,
     scenario_cibles,
 )
+from app.services.bulk import upsert_label
 
 DATASET_FILE = Path(__file__).resolve().parents[2] / "dataset.json"
 
@@ -32,28 +33,18 @@ def load_json():
 
 
 def get_or_create_objectif(label: str, description: str | None = None) -> Objectif:
-    objectif = Objectif.query.filter_by(label=label).first()
-    if objectif:
-        return objectif
-    objectif = Objectif(label=label, description=description)
-    db.session.add(objectif)
-    db.session.flush()
-    return objectif
+    return db.session.get(Objectif, upsert_label(Objectif, label, description=description))
 
 
 def build_cible(cible_data: dict) -> Cible:
     label = cible_data.get("persona") or cible_data.get("segment") or "Cible"
-    existing = Cible.query.filter_by(label=label).first()
-    if existing:
-        return existing
-    cible = Cible(
-        label=label,
+    cible_id = upsert_label(
+        Cible,
+        label,
         persona=cible_data.get("persona"),
         segment=cible_data.get("segment"),
     )
-    db.session.add(cible)
-    db.session.flush()
-    return cible
+    return db.session.get(Cible, cible_id)
 
 
 def create_ressources(scenario: Scenario, ressources_existantes: dict) -> list[Ressource]:
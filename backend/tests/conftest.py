@@ -1,3 +1,5 @@
+from types import SimpleNamespace
+
 import pytest
 
 from app import create_app
@@ -12,6 +14,7 @@ def app():
             "TESTING": True,
             "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
             "SCHEDULER_TIMEZONE": "UTC",
+            "SUGGESTION_PREFETCH_ENABLED": False,
         }
     )
 
@@ -33,3 +36,39 @@ def scenario(app):
     db.session.add(item)
     db.session.commit()
     return item
+
+
+@pytest.fixture()
+def fake_openai(app):
+    """
+    Installe un faux client OpenAI et retourne la liste des appels reçus.
+
+    ``reply`` est le contenu de la réponse ou une fonction des arguments de
+    l'appel ; en streaming, le contenu est découpé en fragments de ``chunk_size``.
+    """
+
+    def install(reply, chunk_size: int = 7) -> list[dict]:
+        calls = []
+
+        def create(**kwargs):
+            calls.append(kwargs)
+            content = reply(kwargs) if callable(reply) else reply
+            if kwargs.get("stream"):
+                return [
+                    SimpleNamespace(
+                        choices=[
+                            SimpleNamespace(delta=SimpleNamespace(content=content[i : i + chunk_size]))
+                        ]
+                    )
+                    for i in range(0, len(content), chunk_size)
+                ]
+            return SimpleNamespace(
+                choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=None
+            )
+
+        app.extensions["openai_client"] = SimpleNamespace(
+            chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+        )
+        return calls
+
+    return install
@@ -0,0 +1,81 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import update
+
+from app.ai import ChatResponseSchema, OpenAIClient, ResponseCache
+from app.ai.cache import build_cache_key
+from app.extensions import db
+from app.models import AIResponseCacheEntry
+
+
+def _chat_response(markdown: str = "Bonjour") -> ChatResponseSchema:
+    return ChatResponseSchema(message_markdown=markdown)
+
+
+def test_memory_tier_hits_and_lru_eviction(app):
+    cache = ResponseCache(max_entries=2, persistent=False)
+    for key in ("a", "b", "c"):
+        cache.set(key, _chat_response(key), model="gpt-4o-mini")
+
+    assert cache.get("a", ChatResponseSchema) is None
+    assert cache.get("c", ChatResponseSchema).message_markdown == "c"
+
+    stats = cache.stats()
+    assert stats["memory_hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["evictions"] == 1
+
+
+def test_persistent_tier_survives_memory_clear(app):
+    cache = ResponseCache(persistent=True)
+    cache.set("key", _chat_response(), model="gpt-4o-mini")
+    cache.clear()
+
+    cached = cache.get("key", ChatResponseSchema)
+    assert cached.message_markdown == "Bonjour"
+    assert cache.stats()["persistent_hits"] == 1
+
+
+def test_expired_entries_are_ignored(app):
+    cache = ResponseCache(persistent=True)
+    cache.set("key", _chat_response(), model="gpt-4o-mini")
+    payload = _chat_response().model_dump_json()
+
+    # Entrée mémoire expirée : lue depuis le niveau persistant encore valide
+    cache._memory_set("key", payload, time.time() - 1)
+    assert cache.get("key", ChatResponseSchema).message_markdown == "Bonjour"
+    assert cache.stats()["persistent_hits"] == 1
+
+    # Les deux niveaux expirés : aucune réponse servie
+    cache._memory_set("key", payload, time.time() - 1)
+    db.session.execute(
+        update(AIResponseCacheEntry)
+        .where(AIResponseCacheEntry.cache_key == "key")
+        .values(expires_at=datetime.now(timezone.utc) - timedelta(seconds=1))
+    )
+    db.session.commit()
+    assert cache.get("key", ChatResponseSchema) is None
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["memory_size"] == 0
+
+
+def test_cache_key_depends_on_messages_and_schema():
+    messages = [{"role": "user", "content": "Salut"}]
+    key = build_cache_key("gpt-4o-mini", messages, ChatResponseSchema)
+    assert key == build_cache_key("gpt-4o-mini", list(messages), ChatResponseSchema)
+    assert key != build_cache_key("gpt-4o", messages, ChatResponseSchema)
+    assert key != build_cache_key(
+        "gpt-4o-mini", [{"role": "user", "content": "Salut !"}], ChatResponseSchema
+    )
+
+
+def test_chat_completion_served_from_cache(app, fake_openai):
+    calls = fake_openai('{"message_markdown": "Plan"}')
+    client = OpenAIClient()
+
+    first = client.chat_completion("system", "Génère-moi un plan")
+    second = client.chat_completion("system", "Génère-moi un plan")
+
+    assert first.message_markdown == second.message_markdown == "Plan"
+    assert len(calls) == 1
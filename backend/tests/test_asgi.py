@@ -0,0 +1,94 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.asgi import create_asgi_app
+from app.extensions import db
+from app.models import Configuration, Scenario
+from benchmarks.fake_openai_server import FakeOpenAIServer, StubConfig
+
+
+@pytest.fixture()
+def asgi(tmp_path):
+    server = FakeOpenAIServer(config=StubConfig(latency_ms=200)).start()
+    application = create_asgi_app(
+        {
+            "TESTING": True,
+            # Base fichier : les étapes SQL s'exécutent dans plusieurs threads
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'asgi.db'}",
+            "SUGGESTION_PREFETCH_ENABLED": False,
+            "SINGLE_FLIGHT_ENABLED": False,
+            "AI_CACHE_ENABLED": False,
+            "OPENAI_BASE_URL": server.base_url,
+            "OPENAI_API_KEY": "local",
+        }
+    )
+    with application.flask_app.app_context():
+        db.create_all()
+        scenario = Scenario(nom="Webinars", thematique="SEO")
+        db.session.add(scenario)
+        db.session.flush()
+        db.session.add(Configuration(scenario_id=scenario.id, nom="Config"))
+        db.session.commit()
+    yield application, server
+    server.stop()
+
+
+def _run(application, requests):
+    async def main():
+        transport = httpx.ASGITransport(app=application)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            try:
+                return await requests(client)
+            finally:
+                await application.close()
+
+    return asyncio.run(main())
+
+
+def test_concurrent_ai_requests_overlap_on_the_event_loop(asgi):
+    application, server = asgi
+
+    async def requests(client):
+        return await asyncio.gather(
+            *(client.post("/api/scenarios/suggest-new") for _ in range(20))
+        )
+
+    started = time.perf_counter()
+    responses = _run(application, requests)
+    elapsed = time.perf_counter() - started
+
+    assert [response.status_code for response in responses] == [200] * 20
+    assert all(response.json()["suggestions"] for response in responses)
+    assert server.state.stats["max_in_flight"] >= 10
+    # 20 appels de 200 ms en série prendraient 4 s
+    assert elapsed < 2
+
+
+def test_async_routes_keep_flask_responses_and_delegate_the_rest(asgi):
+    application, server = asgi
+
+    async def requests(client):
+        return (
+            await client.post("/api/configurations/1/suggest-objectifs"),
+            await client.post("/api/configurations/1/suggest-objectifs"),
+            await client.post("/api/configurations/999/suggest-objectifs"),
+            await client.post("/api/chat", json={}),
+            await client.get("/api/scenarios"),
+        )
+
+    suggested, stored, missing, invalid, delegated = _run(application, requests)
+
+    assert suggested.status_code == 200
+    assert suggested.headers["X-Suggestions-Status"] == "miss"
+    assert len(suggested.json()["objectifs"]) == 5
+    assert stored.headers["X-Suggestions-Status"] == "hit"
+    assert stored.json() == suggested.json()
+    assert missing.status_code == 404
+    assert missing.json() == {"error": "Configuration not found"}
+    assert invalid.status_code == 400
+    assert invalid.json() == {"error": "Message ou action requis"}
+    assert delegated.status_code == 200
+    assert server.state.stats["requests"] == 1
@@ -0,0 +1,89 @@
+from sqlalchemy import event, text
+
+from app.extensions import db
+from app.models import Cible, Configuration, Objectif
+from app.services.bulk import _select_label_ids, upsert_label, upsert_labels
+
+
+def test_upsert_labels_returns_existing_and_new_ids_in_one_statement(app):
+    existing = Objectif(label="Notoriété", description="Originale")
+    db.session.add(existing)
+    db.session.commit()
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(db.engine, "before_cursor_execute", listener)
+    try:
+        ids = upsert_labels(
+            Objectif,
+            [
+                {"label": "Notoriété", "description": "Remplacée ?"},
+                {"label": "Leads"},
+                {"label": "Leads", "description": "Doublon"},
+            ],
+            ("description",),
+        )
+    finally:
+        event.remove(db.engine, "before_cursor_execute", listener)
+    db.session.commit()
+
+    assert len(statements) == 1
+    assert ids["Notoriété"] == existing.id
+    assert db.session.get(Objectif, ids["Leads"]).label == "Leads"
+    assert db.session.get(Objectif, existing.id).description == "Originale"
+    assert db.session.scalar(db.select(db.func.count()).select_from(Objectif)) == 2
+
+
+def test_get_or_create_call_sites_reuse_labels(client, scenario):
+    first = client.post("/api/objectifs", json={"label": "Fidélisation"}).get_json()
+    second = client.post("/api/objectifs", json={"label": "Fidélisation"}).get_json()
+    assert first["id"] == second["id"]
+
+    configuration = Configuration(scenario_id=scenario.id, nom="Config")
+    db.session.add(configuration)
+    db.session.commit()
+
+    response = client.post(
+        f"/api/configurations/{configuration.id}/cibles",
+        json={"label": "DSI", "segment": "ETI"},
+    )
+    assert response.status_code == 200
+    client.post(f"/api/configurations/{configuration.id}/cibles", json={"label": "DSI"})
+    client.post(
+        f"/api/configurations/{configuration.id}/objectifs", json={"label": "Fidélisation"}
+    )
+
+    data = client.get(f"/api/configurations/{configuration.id}").get_json()
+    assert [cible["label"] for cible in data["cibles"]] == ["DSI"]
+    assert [objectif["id"] for objectif in data["objectifs"]] == [first["id"]]
+    assert db.session.scalar(db.select(db.func.count()).select_from(Cible)) == 1
+
+
+def test_labels_equal_under_case_insensitive_collation_reuse_the_row(app, client, scenario):
+    # Colonne comparée sans casse, comme utf8mb4_unicode_ci sous MariaDB
+    Objectif.__table__.drop(db.engine)
+    db.session.execute(
+        text(
+            "CREATE TABLE objectifs (id INTEGER PRIMARY KEY, "
+            "label VARCHAR(120) COLLATE NOCASE NOT NULL UNIQUE, description TEXT, "
+            "created_at DATETIME, updated_at DATETIME, version INTEGER NOT NULL DEFAULT 0)"
+        )
+    )
+    existing = Objectif(label="SEO")
+    db.session.add(existing)
+    db.session.commit()
+
+    ids = upsert_labels(Objectif, [{"label": "seo"}, {"label": "Leads"}])
+    db.session.commit()
+    assert ids["seo"] == existing.id
+    assert db.session.get(Objectif, existing.id).label == "SEO"
+    # Lecture des IDs après ON DUPLICATE KEY UPDATE (MySQL/MariaDB)
+    assert _select_label_ids(Objectif, ["seo", "Leads"]) == {"seo": existing.id, "Leads": ids["Leads"]}
+    assert upsert_label(Objectif, "Seo") == existing.id
+
+    configuration = Configuration(scenario_id=scenario.id, nom="Config")
+    db.session.add(configuration)
+    db.session.commit()
+    response = client.post(f"/api/configurations/{configuration.id}/objectifs", json={"label": "seo"})
+    assert response.status_code == 200
+    assert [objectif["id"] for objectif in response.get_json()["objectifs"]] == [existing.id]
@@ -0,0 +1,59 @@
+import json
+
+from app.ai.streaming import JsonStringFieldStreamer
+
+
+def test_streamer_decodes_escapes_split_across_chunks():
+    raw = '{"message_markdown": "Ligne 1\\nLigne \\"2\\" \\u00e9t\\u00e9", "actions": []}'
+    streamer = JsonStringFieldStreamer()
+    decoded = "".join(streamer.feed(raw[i : i + 3]) for i in range(0, len(raw), 3))
+
+    assert decoded == 'Ligne 1\nLigne "2" été'
+    assert streamer.done
+
+
+def _parse_events(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_chat_stream_emits_tokens_then_final_payload(client, scenario, fake_openai):
+    content = json.dumps(
+        {
+            "message_markdown": "Voici **trois** objectifs pour votre scénario.",
+            "actions": [{"id": "a1", "label": "Ajouter", "type": "add_objective"}],
+        }
+    )
+    calls = fake_openai(content)
+
+    response = client.post(
+        "/api/chat/stream",
+        json={"scenario_id": scenario.id, "message": "Aide-moi"},
+    )
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/event-stream"
+    assert calls[0]["stream"] is True
+    events = _parse_events(response.get_data(as_text=True))
+
+    tokens = [data["delta"] for event, data in events if event == "token"]
+    assert len(tokens) > 1
+    assert "".join(tokens) == "Voici **trois** objectifs pour votre scénario."
+
+    event, final = events[-1]
+    assert event == "done"
+    assert final["message"] == "".join(tokens)
+    assert final["actions"][0]["type"] == "add_objective"
+
+
+def test_chat_stream_reports_errors_as_error_event(client):
+    response = client.post("/api/chat/stream", json={"scenario_id": 999, "message": "Aide-moi"})
+
+    assert response.status_code == 200
+    events = _parse_events(response.get_data(as_text=True))
+    assert [event for event, _ in events] == ["error"]
+    assert events[0][1]["error"] == "Scenario not found"
+    assert events[0][1]["message"] == "Scénario introuvable."
@@ -0,0 +1,92 @@
+from sqlalchemy import event, update
+
+from app.extensions import db
+from app.models import Configuration
+
+
+def _count_statements(run):
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(db.engine, "before_cursor_execute", listener)
+    try:
+        response = run()
+    finally:
+        event.remove(db.engine, "before_cursor_execute", listener)
+    return response, statements
+
+
+def test_unchanged_scenario_answers_304_with_one_query(client, scenario):
+    configuration = Configuration(scenario_id=scenario.id, nom="Config")
+    db.session.add(configuration)
+    db.session.commit()
+
+    first = client.get(f"/api/scenarios/{scenario.id}")
+    etag = first.headers["ETag"]
+    assert first.status_code == 200
+    assert first.headers["Cache-Control"] == "no-cache"
+    assert "Last-Modified" in first.headers
+
+    cached, statements = _count_statements(
+        lambda: client.get(f"/api/scenarios/{scenario.id}", headers={"If-None-Match": etag})
+    )
+    assert cached.status_code == 304
+    assert cached.data == b""
+    assert cached.headers["ETag"] == etag
+    assert len(statements) == 1
+
+    # Lien objectif ajouté : nouvelle version du scénario
+    client.post(f"/api/configurations/{configuration.id}/objectifs", json={"label": "Notoriété"})
+    changed = client.get(f"/api/scenarios/{scenario.id}", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert changed.get_json()["configurations"][0]["objectifs"][0]["label"] == "Notoriété"
+
+    assert client.get("/api/scenarios/999", headers={"If-None-Match": etag}).status_code == 404
+
+
+def test_configuration_and_list_etags_follow_their_subtree(client, scenario):
+    configuration = Configuration(scenario_id=scenario.id, nom="Config")
+    db.session.add(configuration)
+    db.session.commit()
+    path = f"/api/configurations/{configuration.id}"
+
+    etag = client.get(path).headers["ETag"]
+    assert client.get(path, headers={"If-None-Match": etag}).status_code == 304
+    client.post(f"{path}/cibles", json={"label": "DSI", "segment": "ETI"})
+    assert client.get(path, headers={"If-None-Match": etag}).status_code == 200
+    assert client.get("/api/configurations/999").status_code == 404
+
+    list_etag = client.get("/api/scenarios?limit=10").headers["ETag"]
+    assert client.get("/api/scenarios?limit=10", headers={"If-None-Match": list_etag}).status_code == 304
+    # Autre page ou autres filtres : autre version
+    assert client.get("/api/scenarios?limit=5").headers["ETag"] != list_etag
+    client.delete(f"{path}/cibles/1")
+    assert client.get("/api/scenarios?limit=10", headers={"If-None-Match": list_etag}).status_code == 200
+
+
+def test_same_second_edit_changes_etag(client, scenario):
+    configuration = Configuration(scenario_id=scenario.id, nom="Config")
+    db.session.add(configuration)
+    db.session.commit()
+    path = f"/api/configurations/{configuration.id}"
+    etag = client.get(path).headers["ETag"]
+    scenario_etag = client.get(f"/api/scenarios/{scenario.id}").headers["ETag"]
+
+    # updated_at remis à sa valeur : écriture dans la même seconde sous MySQL
+    updated_at = configuration.updated_at
+    configuration.nom = "Renommée"
+    db.session.commit()
+    db.session.execute(
+        update(Configuration)
+        .where(Configuration.id == configuration.id)
+        .values(updated_at=updated_at)
+    )
+    db.session.commit()
+
+    assert configuration.updated_at == updated_at
+    changed = client.get(path, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.get_json()["nom"] == "Renommée"
+    assert client.get(
+        f"/api/scenarios/{scenario.id}", headers={"If-None-Match": scenario_etag}
+    ).status_code == 200
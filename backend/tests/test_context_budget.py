@@ -0,0 +1,69 @@
+from app.ai.context_builder import build_context_text
+from app.ai.tokens import count_tokens
+from app.extensions import db
+from app.models import Message
+
+
+def _history(*contents):
+    return [
+        {"auteur": "user", "contenu": contenu, "token_count": count_tokens(contenu)}
+        for contenu in contents
+    ]
+
+
+def test_context_packs_recent_history_within_budget(app):
+    long_message = "Détail important " * 40
+    context = {
+        "facts_text": "Scénario actuel: Test",
+        "historique": _history("Ancien " * 200, "Court", long_message),
+    }
+
+    built = build_context_text(context, budget=300)
+
+    # Le message long récent est transmis en entier, l'ancien ne tient plus
+    assert long_message in built.text
+    assert "[user] Court" in built.text
+    assert "Ancien" not in built.text
+    assert built.history_messages == 2
+    assert built.history_available == 3
+    assert built.truncated
+    assert built.tokens <= 300
+
+
+def test_estimate_reports_prompt_tokens_without_saving(app, client, scenario):
+    app.config["CHAT_CONTEXT_TOKEN_BUDGETS"] = {"generate_plan": 50}
+    db.session.add(
+        Message(scenario_id=scenario.id, auteur="user", contenu="Bonjour " * 30, token_count=60)
+    )
+    db.session.commit()
+
+    response = client.post(
+        "/api/chat/estimate",
+        json={"scenario_id": scenario.id, "message": "Que proposes-tu ?"},
+    )
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["context_budget"] == 1500
+    assert data["history_messages"] == 1
+    assert not data["context_truncated"]
+    assert data["prompt_tokens"] > data["context_tokens"] > 0
+
+    response = client.post(
+        "/api/chat/estimate",
+        json={"scenario_id": scenario.id, "action": {"type": "generate_plan"}},
+    )
+    data = response.get_json()
+    assert data["context_budget"] == 50
+    assert data["context_truncated"]
+    assert data["context_tokens"] <= 50
+
+    assert db.session.scalar(db.select(db.func.count()).select_from(Message)) == 1
+    assert client.post("/api/chat/estimate", json={"scenario_id": 999, "message": "x"}).status_code == 404
+
+
+def test_saved_messages_store_token_count(app, scenario):
+    from app.models import AuteurType
+    from app.services.chat_service import ChatService
+
+    message = ChatService.save_message(scenario.id, AuteurType.USER, "Je veux plus de leads B2B")
+    assert message.token_count == count_tokens("Je veux plus de leads B2B")
@@ -0,0 +1,62 @@
+import json
+
+from sqlalchemy import event
+
+from app.extensions import db
+from app.services.context_cache import get_context_cache
+
+
+def _selects(app, action):
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    try:
+        result = action()
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record)
+    return result, statements
+
+
+def test_chat_context_is_reused_and_history_appended(app, client, scenario, fake_openai):
+    app.config["AI_CACHE_ENABLED"] = False
+    calls = fake_openai(
+        lambda kwargs: json.dumps({"message_markdown": f"Réponse {len(calls)}", "actions": []})
+    )
+    scenario_id = scenario.id
+
+    first = client.post("/api/chat", json={"scenario_id": scenario_id, "message": "Bonjour"})
+    assert first.status_code == 200
+
+    response, selects = _selects(
+        app,
+        lambda: client.post("/api/chat", json={"scenario_id": scenario_id, "message": "Et ensuite ?"}),
+    )
+    assert response.status_code == 200
+    # Instantané réutilisé : ni arbre du scénario ni historique relus
+    assert selects == []
+    assert response.get_json()["scenario_state"]["id"] == scenario_id
+
+    context = calls[-1]["messages"][-2]["content"]
+    assert "[user] Bonjour" in context
+    assert "[assistant] Réponse 1" in context
+    assert "Et ensuite" not in context
+    assert get_context_cache().stats()["hits"] >= 2
+
+
+def test_configuration_write_invalidates_chat_context(app, client, scenario, fake_openai):
+    app.config["AI_CACHE_ENABLED"] = False
+    fake_openai(json.dumps({"message_markdown": "Réponse", "actions": []}))
+    scenario_id = scenario.id
+
+    client.post("/api/chat", json={"scenario_id": scenario_id, "message": "Bonjour"})
+    created = client.post(f"/api/scenarios/{scenario_id}/configurations", json={"nom": "Config A"})
+    assert created.status_code == 201
+
+    response = client.post("/api/chat", json={"scenario_id": scenario_id, "message": "Et maintenant ?"})
+    state = response.get_json()["scenario_state"]
+    assert [configuration["nom"] for configuration in state["configurations"]] == ["Config A"]
+    assert get_context_cache().stats()["invalidations"] == 1
@@ -0,0 +1,92 @@
+from sqlalchemy import event, update
+
+from app.extensions import db
+from app.models import Configuration
+from app.services.detail_cache import DetailCache, LocalKVBackend, get_detail_cache
+
+
+def _statements(run):
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(db.engine, "before_cursor_execute", listener)
+    try:
+        response = run()
+    finally:
+        event.remove(db.engine, "before_cursor_execute", listener)
+    return response, statements
+
+
+def test_detail_is_served_from_cache_until_written(client, scenario):
+    configuration = Configuration(scenario_id=scenario.id, nom="Config")
+    db.session.add(configuration)
+    db.session.commit()
+    path = f"/api/configurations/{configuration.id}"
+
+    first = client.get(path)
+    cached, statements = _statements(lambda: client.get(path))
+    assert cached.data == first.data
+    assert cached.headers["ETag"] == first.headers["ETag"]
+    # Version seule : le détail n'est ni rechargé ni réencodé
+    assert len(statements) == 1
+
+    added = client.post(f"{path}/objectifs", json={"label": "Notoriété"})
+    assert added.status_code == 200
+    assert added.get_json()["objectifs"][0]["label"] == "Notoriété"
+    assert added.headers["ETag"] != first.headers["ETag"]
+    # La réponse de l'écriture alimente le cache de la lecture suivante
+    after, statements = _statements(lambda: client.get(path))
+    assert after.data == added.data
+    assert len(statements) == 1
+    assert client.get(path, headers={"If-None-Match": added.headers["ETag"]}).status_code == 304
+
+    text = client.get("/metrics").get_data(as_text=True)
+    assert 'detail_cache_lookups_total{kind="configuration",result="hit"} 2' in text
+    assert 'detail_cache_invalidations_total{kind="configuration",source="service"}' in text
+
+
+def test_flush_hook_invalidates_and_local_kv_is_shared(app, client, scenario, tmp_path):
+    configuration = Configuration(scenario_id=scenario.id, nom="Config")
+    db.session.add(configuration)
+    db.session.commit()
+    client.get(f"/api/scenarios/{scenario.id}")
+    cache = get_detail_cache()
+    assert cache.backend.get(f"scenario:{scenario.id}") is not None
+
+    # Écriture ORM hors des services : le hook after_flush invalide
+    configuration.nom = "Renommée"
+    db.session.commit()
+    assert cache.backend.get(f"scenario:{scenario.id}") is None
+    assert client.get(f"/api/scenarios/{scenario.id}").get_json()["configurations"][0]["nom"] == "Renommée"
+    text = client.get("/metrics").get_data(as_text=True)
+    assert 'detail_cache_invalidations_total{kind="scenario",source="flush"}' in text
+
+    # Deux workers partagent le même fichier clé-valeur
+    path = str(tmp_path / "detail-cache.sqlite3")
+    worker_a = DetailCache(LocalKVBackend(path))
+    worker_b = DetailCache(LocalKVBackend(path))
+    worker_a.set("scenario", 1, "v1", b'{"id": 1}')
+    assert worker_b.get("scenario", 1, "v1") == b'{"id": 1}'
+    assert worker_b.get("scenario", 1, "v2") is None
+    worker_b.invalidate("scenario", 1)
+    assert worker_a.get("scenario", 1, "v1") is None
+
+
+def test_write_from_another_worker_is_never_served_stale(client, scenario):
+    configuration = Configuration(scenario_id=scenario.id, nom="Config")
+    db.session.add(configuration)
+    db.session.commit()
+    path = f"/api/configurations/{configuration.id}"
+    client.get(path)
+
+    # Écriture d'un autre worker : ni invalidation locale ni updated_at modifié
+    db.session.execute(
+        update(Configuration)
+        .where(Configuration.id == configuration.id)
+        .values(nom="Renommée", version=Configuration.version + 1)
+    )
+    db.session.commit()
+
+    assert get_detail_cache().backend.get(f"configuration:{configuration.id}") is not None
+    assert client.get(path).get_json()["nom"] == "Renommée"
+    text = client.get("/metrics").get_data(as_text=True)
+    assert 'detail_cache_lookups_total{kind="configuration",result="stale"} 1' in text
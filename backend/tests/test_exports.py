@@ -0,0 +1,102 @@
+import csv
+import gzip
+import io
+import json
+
+from app.extensions import db
+from app.models import Article, Cible, Configuration, Objectif, Plan, PlanItem, Scenario
+
+
+def _seed(count=3):
+    ids = []
+    for index in range(count):
+        scenario = Scenario(nom=f"Scénario {index}", thematique="Export")
+        configuration = Configuration(nom="Config")
+        configuration.objectifs.append(Objectif(label=f"Objectif {index}"))
+        configuration.cibles.append(Cible(label=f"Cible {index}", segment="PME"))
+        scenario.configurations.append(configuration)
+        db.session.add(scenario)
+        db.session.flush()
+        ids.append(scenario.id)
+    db.session.commit()
+    return ids
+
+
+def _lines(response):
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_export_scenarios_ndjson(app, client):
+    app.config["EXPORT_BATCH_SIZE"] = 2
+    ids = _seed(3)
+
+    response = client.get("/api/export/scenarios.ndjson")
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    assert "Content-Encoding" not in response.headers
+    records = _lines(response)
+    assert [record["id"] for record in records] == ids
+    assert records[0]["configurations"][0]["objectifs"][0]["label"] == "Objectif 0"
+
+    response = client.get(f"/api/export/scenarios.ndjson?ids={ids[2]},{ids[0]}")
+    assert [record["id"] for record in _lines(response)] == [ids[0], ids[2]]
+
+    assert client.get("/api/export/scenarios.ndjson?ids=1,x").status_code == 400
+
+
+def test_export_workspace_gzip(client):
+    _seed(2)
+
+    response = client.get(
+        "/api/export/workspace.ndjson", headers={"Accept-Encoding": "gzip"}
+    )
+    assert response.headers["Content-Encoding"] == "gzip"
+    records = [json.loads(line) for line in gzip.decompress(response.data).splitlines()]
+    assert [record["type"] for record in records] == [
+        "objectif", "objectif", "cible", "cible", "scenario", "scenario"
+    ]
+    assert records[2]["data"]["segment"] == "PME"
+
+    response = client.get(
+        "/api/export/workspace.ndjson?gzip=false", headers={"Accept-Encoding": "gzip"}
+    )
+    assert "Content-Encoding" not in response.headers
+    assert len(_lines(response)) == 6
+
+
+def test_export_json_attachment(client, scenario):
+    scenario.nom = "Été 2025"
+    db.session.commit()
+
+    response = client.get(f"/api/scenarios/{scenario.id}/export/json")
+    assert response.status_code == 200
+    assert response.get_json()["nom"] == "Été 2025"
+    assert "filename*=UTF-8''" in response.headers["Content-Disposition"]
+
+
+def test_export_plans_csv(client, scenario):
+    assert client.get(f"/api/scenarios/{scenario.id}/export/csv").status_code == 404
+
+    for index in range(2):
+        configuration = Configuration(scenario_id=scenario.id, nom=f"Config {index}")
+        plan = Plan(resume="Plan")
+        plan.items.append(PlanItem(format="post", message="Publier, vite", canal="LinkedIn"))
+        plan.articles.append(Article(nom=f"Article {index}", resume="Résumé"))
+        configuration.plans.append(plan)
+        db.session.add(configuration)
+    db.session.commit()
+
+    response = client.get(
+        f"/api/scenarios/{scenario.id}/export/csv", headers={"Accept-Encoding": "gzip"}
+    )
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    rows = list(csv.reader(io.StringIO(gzip.decompress(response.data).decode("utf-8"))))
+    assert rows[0][0] == "Type"
+    assert [row[0] for row in rows[1:]] == ["item", "article", "item", "article"]
+    assert rows[1][9] == "Publier, vite"
+    assert rows[4][13] == "Article 1"
+
+    response = client.get("/api/export/plans.csv?ids=999")
+    assert response.mimetype == "text/csv"
+    assert len(response.get_data(as_text=True).splitlines()) == 1
@@ -0,0 +1,46 @@
+import openai
+import pytest
+
+from app.ai.instrumentation import json_completion
+from benchmarks.fake_openai_server import FakeOpenAIServer, StubConfig
+
+
+@pytest.fixture()
+def stub(app):
+    def start(**config):
+        server = FakeOpenAIServer(config=StubConfig(retry_after_s=0, **config)).start()
+        app.config.update(OPENAI_BASE_URL=server.base_url, OPENAI_API_KEY="local")
+        servers.append(server)
+        return server
+
+    servers: list[FakeOpenAIServer] = []
+    yield start
+    for server in servers:
+        server.stop()
+
+
+def test_real_client_talks_to_stub(app, client, stub):
+    server = stub()
+
+    data = json_completion(
+        "suggest_objectifs",
+        model="gpt-4o-mini",
+        messages=[{"role": "user", "content": 'Réponds {"objectifs": [...]}'}],
+    )
+
+    assert len(data["objectifs"]) == 5
+    assert server.state.stats["ok"] == 1
+    text = client.get("/metrics").get_data(as_text=True)
+    assert 'llm_requests_total{call_site="suggest_objectifs",model="gpt-4o-mini",outcome="success"' in text
+
+
+def test_injected_rate_limit_is_retried_with_backoff(app, client, stub):
+    server = stub(rate_limit_ratio=1.0)
+    app.config.update(LLM_RETRY_MAX_ATTEMPTS=2, LLM_RETRY_BASE_DELAY_MS=0)
+
+    with pytest.raises(openai.RateLimitError):
+        json_completion("suggest_cibles", model="gpt-4o-mini", messages=[{"role": "user", "content": "?"}])
+
+    assert server.state.stats["rate_limited"] == 2
+    text = client.get("/metrics").get_data(as_text=True)
+    assert 'llm_retries_total{call_site="suggest_cibles",kind="backoff",model="gpt-4o-mini"' in text
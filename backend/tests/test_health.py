@@ -2,3 +2,15 @@ def test_health_endpoint(client):
     response = client.get("/health")
     assert response.status_code == 200
     assert response.json == {"status": "ok"}
+
+
+def test_llm_pool_is_shared_and_reports_stats(app, client):
+    from app.ai import get_openai_client
+
+    app.config["OPENAI_API_KEY"] = "sk-test"
+    assert get_openai_client() is get_openai_client()
+
+    response = client.get("/health/llm")
+    assert response.status_code == 200
+    assert response.json["pool"]["open_connections"] == 0
+    assert "hit_ratio" in response.json["cache"]
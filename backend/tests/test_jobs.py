@@ -0,0 +1,62 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+from app.extensions import db
+from app.models import Cible, Configuration, Job, Objectif
+from app.services.job_service import JobService
+
+
+def test_async_plan_generation_returns_job(client, scenario, fake_openai):
+    configuration = Configuration(scenario_id=scenario.id, nom="Config")
+    configuration.objectifs.append(Objectif(label="Notoriété"))
+    configuration.cibles.append(Cible(label="CMO", segment="SaaS"))
+    db.session.add(configuration)
+    db.session.commit()
+
+    fake_openai(json.dumps({"resume": "Plan", "articles": [{"nom": "Article 1", "resume": "R"}]}))
+
+    response = client.post(f"/api/configurations/{configuration.id}/generate-plan?async=true")
+    assert response.status_code == 202
+    assert response.headers["Location"] == response.json["status_url"]
+
+    job = client.get(response.json["status_url"]).json
+    assert job["status"] == "succeeded"
+    assert job["result"]["articles"][0]["nom"] == "Article 1"
+
+
+def test_async_plan_generation_validates_prerequisites(client, scenario):
+    configuration = Configuration(scenario_id=scenario.id, nom="Vide")
+    db.session.add(configuration)
+    db.session.commit()
+
+    response = client.post(
+        f"/api/configurations/{configuration.id}/generate-plan",
+        headers={"Prefer": "respond-async"},
+    )
+    assert response.status_code == 400
+
+
+def test_async_plan_for_unknown_scenario_returns_404(client):
+    response = client.post("/api/scenarios/999/plan?async=true")
+    assert response.status_code == 404
+    assert db.session.scalar(db.select(db.func.count()).select_from(Job)) == 0
+
+
+def test_unknown_job_returns_404(client):
+    assert client.get("/api/jobs/inconnu").status_code == 404
+
+
+def test_resume_skips_jobs_still_queued_by_their_worker(app, monkeypatch):
+    now = datetime.now(timezone.utc)
+    db.session.add_all(
+        [
+            Job(id="recente", kind="plan.generate", payload="{}", created_at=now),
+            Job(id="orpheline", kind="plan.generate", payload="{}", created_at=now - timedelta(hours=1)),
+        ]
+    )
+    db.session.commit()
+    submitted = []
+    monkeypatch.setattr(JobService, "_submit", lambda app, job_id: submitted.append(job_id))
+
+    assert JobService.resume_pending(app) == 1
+    assert submitted == ["orpheline"]
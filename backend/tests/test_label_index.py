@@ -0,0 +1,47 @@
+from app.extensions import db
+from app.models import Objectif
+from app.services import objectif_service
+from app.services.label_index import LabelIndex, drop_known_labels, normalize_label
+
+
+def test_label_index_ranks_closest_labels():
+    index = LabelIndex(
+        [
+            ("Générer des leads qualifiés", "Générer des leads qualifiés acquisition B2B"),
+            ("Fidéliser les clients", "Fidéliser les clients rétention"),
+            ("Notoriété de marque", "Notoriété de marque brand awareness"),
+        ]
+    )
+    assert index.top_k("Campagne d'acquisition de leads", 1) == ["Générer des leads qualifiés"]
+    assert index.top_k("brand", 5)[0] == "Notoriété de marque"
+    assert index.top_k("zzz", 5) == []
+    assert normalize_label("  Notoriété  de MARQUE ! ") == "notoriete de marque"
+
+
+def test_suggestions_use_top_k_labels_and_drop_duplicates(app, scenario, fake_openai):
+    app.config["SUGGEST_EXISTING_LABELS_TOP_K"] = 2
+    db.session.add_all(
+        [Objectif(label=f"Objectif marketing {index}") for index in range(10)]
+        + [Objectif(label="Automatiser le marketing", description="marketing automation")]
+    )
+    db.session.commit()
+
+    calls = fake_openai(
+        '{"objectifs": [{"label": "AUTOMATISER le marketing"},'
+        ' {"label": "Réduire le churn"}, {"label": "reduire le Churn"}]}'
+    )
+
+    suggestions = objectif_service.ObjectifService.suggest_objectifs_for_scenario(scenario.id)
+
+    assert [item["label"] for item in suggestions] == ["Réduire le churn"]
+    prompt = calls[0]["messages"][-1]["content"]
+    existing = prompt.split("NE PAS proposer :\n")[1].split("\n\n")[0].splitlines()
+    assert len(existing) == 2
+    assert existing[0] == "- Automatiser le marketing"
+
+
+def test_drop_known_labels_sees_new_rows(app):
+    assert drop_known_labels(Objectif, [{"label": "Leads"}]) == [{"label": "Leads"}]
+    db.session.add(Objectif(label="leads"))
+    db.session.commit()
+    assert drop_known_labels(Objectif, [{"label": "Léads"}]) == []
@@ -0,0 +1,36 @@
+from datetime import datetime, timedelta, timezone
+
+from app.extensions import db
+from app.models import Message
+from app.services.maintenance import purge_expired_messages
+
+
+def _add_messages(scenario, count, ttl):
+    db.session.add_all(
+        Message(scenario_id=scenario.id, auteur="user", contenu=f"Message {index}", ttl=ttl)
+        for index in range(count)
+    )
+    db.session.commit()
+
+
+def test_purge_deletes_expired_messages_in_batches(app, scenario):
+    now = datetime.now(timezone.utc)
+    _add_messages(scenario, 7, now - timedelta(days=1))
+    _add_messages(scenario, 2, now + timedelta(days=1))
+    _add_messages(scenario, 1, None)
+
+    report = purge_expired_messages(app, batch_size=3, sleep_ms=0)
+
+    assert report["deleted"] == 7
+    assert report["batches"] == 3
+    assert report["duration_ms"] >= 0
+    assert db.session.scalar(db.select(db.func.count()).select_from(Message)) == 3
+
+
+def test_purge_dry_run_only_counts(app, scenario):
+    _add_messages(scenario, 4, datetime.now(timezone.utc) - timedelta(hours=1))
+
+    report = purge_expired_messages(app, dry_run=True)
+
+    assert report == {**report, "dry_run": True, "would_delete": 4, "batches": 0}
+    assert db.session.scalar(db.select(db.func.count()).select_from(Message)) == 4
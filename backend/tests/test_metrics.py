@@ -0,0 +1,58 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.ai.instrumentation import json_completion
+from app.metrics import MetricsRegistry
+
+
+def test_registry_merges_worker_snapshots(tmp_path):
+    registry = MetricsRegistry(directory=str(tmp_path), flush_interval=3600)
+    registry.describe("jobs_total", "counter", "Jobs")
+    registry.describe("job_seconds", "histogram", "Durée", buckets=(0.5, 1.0))
+    registry.inc("jobs_total", {"kind": "a"})
+    registry.observe("job_seconds", 0.7, {"kind": "a"})
+    registry.observe("job_seconds", 3.0, {"kind": "a"})
+    registry.flush(force=True)
+
+    # Instantané d'un autre worker
+    (snapshot,) = tmp_path.glob("metrics_*.json")
+    (tmp_path / "metrics_1.json").write_text(snapshot.read_text(encoding="utf-8"))
+
+    text = registry.render()
+    assert 'jobs_total{kind="a"} 2' in text
+    assert 'job_seconds_bucket{kind="a",le="0.5"} 0' in text
+    assert 'job_seconds_bucket{kind="a",le="1"} 2' in text
+    assert 'job_seconds_bucket{kind="a",le="+Inf"} 4' in text
+    assert 'job_seconds_sum{kind="a"} 7.4' in text
+
+
+def test_llm_calls_are_exported(app, client):
+    replies = iter(['{"objectifs": []}', "pas du json"])
+
+    def create(**kwargs):
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=next(replies)))],
+            usage=SimpleNamespace(prompt_tokens=120, completion_tokens=30),
+        )
+
+    app.extensions["openai_client"] = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+    )
+
+    assert json_completion("suggest_objectifs", model="gpt-4o-mini", messages=[]) == {
+        "objectifs": []
+    }
+    with pytest.raises(json.JSONDecodeError):
+        json_completion("suggest_objectifs", model="gpt-4o-mini", messages=[])
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.content_type.startswith("text/plain; version=0.0.4")
+    text = response.get_data(as_text=True)
+    labels = 'call_site="suggest_objectifs",model="gpt-4o-mini"'
+    assert f'llm_requests_total{{{labels},outcome="success",schema="json"}} 2' in text
+    assert f'llm_prompt_tokens_total{{{labels},schema="json"}} 240' in text
+    assert f'llm_validation_failures_total{{{labels},schema="json"}} 1' in text
+    assert f'llm_request_duration_seconds_count{{{labels},schema="json"}} 2' in text
@@ -0,0 +1,102 @@
+from datetime import datetime, timedelta, timezone
+
+from app.extensions import db
+from app.models import Cible, Configuration, Objectif, Scenario
+
+
+def _walk(client, url):
+    """Parcourt toutes les pages d'une liste dont le corps est un tableau."""
+    items, cursor = [], None
+    while True:
+        separator = "&" if "?" in url else "?"
+        page_url = f"{url}{separator}after={cursor}" if cursor else url
+        response = client.get(page_url)
+        assert response.status_code == 200
+        items.extend(response.get_json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return items
+
+
+def test_scenarios_keyset_pages_cover_all_rows(client, app):
+    now = datetime.now(timezone.utc)
+    for index in range(7):
+        # Deux scénarios partagent chaque date pour éprouver le départage par ID
+        db.session.add(
+            Scenario(
+                nom=f"Scénario {index}",
+                thematique="SEO" if index % 2 else "Ads",
+                statut="ready" if index < 3 else "draft",
+                updated_at=now - timedelta(minutes=index // 2),
+            )
+        )
+    db.session.commit()
+
+    expected = [
+        row.id
+        for row in db.session.execute(
+            db.select(Scenario.id).order_by(Scenario.updated_at.desc(), Scenario.id.desc())
+        )
+    ]
+
+    items = _walk(client, "/api/scenarios?limit=2")
+    assert [item["id"] for item in items] == expected
+
+    filtered = _walk(client, "/api/scenarios?limit=1&statut=ready&thematique=SEO")
+    assert [item["nom"] for item in filtered] == ["Scénario 1"]
+
+
+def test_configurations_and_catalogs_are_paginated(client, scenario):
+    for index in range(3):
+        db.session.add(Configuration(scenario_id=scenario.id, nom=f"Config {index}"))
+        db.session.add(Objectif(label=f"Notoriété {index}"))
+        db.session.add(Cible(label=f"PME {index}", segment="B2B" if index else "B2C"))
+    db.session.add(Objectif(label="Leads"))
+    db.session.commit()
+
+    configurations = _walk(client, f"/api/scenarios/{scenario.id}/configurations?limit=2")
+    assert [item["nom"] for item in configurations] == ["Config 0", "Config 1", "Config 2"]
+
+    response = client.get("/api/objectifs?limit=2&label=Noto")
+    data = response.get_json()
+    assert [item["label"] for item in data["objectifs"]] == ["Notoriété 0", "Notoriété 1"]
+
+    response = client.get(f"/api/objectifs?limit=2&label=Noto&after={data['next_cursor']}")
+    data = response.get_json()
+    assert [item["label"] for item in data["objectifs"]] == ["Notoriété 2"]
+    assert data["next_cursor"] is None
+
+    response = client.get("/api/cibles?segment=B2B")
+    assert [item["label"] for item in response.get_json()["cibles"]] == ["PME 1", "PME 2"]
+
+
+def test_invalid_cursor_and_limit_are_rejected(client, scenario):
+    assert client.get("/api/scenarios?after=not-a-cursor").status_code == 400
+    assert client.get("/api/cibles?limit=0").status_code == 400
+    assert client.get("/api/objectifs?limit=abc").status_code == 400
+
+
+def test_lists_without_paging_parameters_stay_complete(app, client, scenario):
+    app.config["API_DEFAULT_PAGE_SIZE"] = 2
+    for index in range(3):
+        db.session.add(Scenario(nom=f"Scénario {index}", thematique="SEO"))
+        db.session.add(Configuration(scenario_id=scenario.id, nom=f"Config {index}"))
+        db.session.add(Objectif(label=f"Notoriété {index}"))
+        db.session.add(Cible(label=f"PME {index}"))
+    db.session.commit()
+
+    # Clients sans curseur : la liste n'est pas tronquée
+    response = client.get("/api/scenarios")
+    assert len(response.get_json()) == 4
+    assert "X-Next-Cursor" not in response.headers
+    response = client.get(f"/api/scenarios/{scenario.id}/configurations")
+    assert len(response.get_json()) == 3
+    assert "X-Next-Cursor" not in response.headers
+    data = client.get("/api/objectifs").get_json()
+    assert len(data["objectifs"]) == 3 and data["next_cursor"] is None
+    assert len(client.get("/api/cibles").get_json()["cibles"]) == 3
+
+    # Pagination dès que limit est fourni, taille par défaut avec after seul
+    response = client.get("/api/objectifs?limit=1")
+    cursor = response.get_json()["next_cursor"]
+    assert len(client.get(f"/api/objectifs?after={cursor}").get_json()["objectifs"]) == 2
@@ -0,0 +1,44 @@
+import logging
+
+import pytest
+
+from app import create_app
+from app.extensions import db
+from app.models import Scenario
+
+
+@pytest.fixture()
+def profiled_app():
+    app = create_app(
+        {
+            "TESTING": True,
+            "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+            "SQL_PROFILING_ENABLED": True,
+            "SLOW_REQUEST_THRESHOLD_MS": 0,
+        }
+    )
+    with app.app_context():
+        db.create_all()
+        db.session.add(Scenario(nom="Profilé", thematique="SQL"))
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def test_server_timing_reports_queries_on_debug_header(profiled_app, caplog):
+    client = profiled_app.test_client()
+
+    assert "Server-Timing" not in client.get("/api/scenarios").headers
+
+    with caplog.at_level(logging.WARNING, logger="app.profiling"):
+        response = client.get("/api/scenarios", headers={"X-Debug-Profile": "1"})
+
+    timing = response.headers["Server-Timing"]
+    assert timing.startswith("db;dur=")
+    assert 'queries", app;dur=' in timing
+
+    record = caplog.records[-1]
+    assert record.path == "/api/scenarios"
+    assert record.query_count >= 1
+    assert record.top_statements[0]["statement"].startswith("SELECT")
@@ -0,0 +1,80 @@
+import time
+from types import SimpleNamespace
+
+import httpx
+import openai
+import pytest
+
+from app.ai import OpenAIClient
+from app.ai import rate_limiter as rate_limiter_module
+from app.ai.rate_limiter import RateLimitWaitExceeded, get_rate_limiter
+from app.extensions import db
+from app.models import LLMRateLimit
+
+
+def test_bucket_is_shared_and_waits_for_refill(app, monkeypatch):
+    # 60 requêtes/min, rafale de 2 s : deux appels immédiats puis une requête par seconde
+    app.config.update(LLM_RATE_LIMITS={"gpt-4o-mini": {"rpm": 60}}, LLM_RATE_LIMIT_BURST_SECONDS=2)
+    clock = [time.time()]
+    sleeps = []
+
+    def fake_sleep(seconds):
+        sleeps.append(seconds)
+        clock[0] += seconds
+
+    monkeypatch.setattr(rate_limiter_module.time, "time", lambda: clock[0])
+    monkeypatch.setattr(rate_limiter_module.time, "sleep", fake_sleep)
+    limiter = get_rate_limiter()
+
+    limiter.acquire("gpt-4o-mini", 100)
+    limiter.acquire("gpt-4o-mini", 100)
+    assert sleeps == []
+    # Seau vide : la troisième réservation attend environ une seconde
+    limiter.acquire("gpt-4o-mini", 100)
+    assert len(sleeps) == 1 and 1.0 <= sleeps[0] <= 1.1
+
+    # Modèle sans limite : aucun état partagé
+    limiter.acquire("gpt-4o", 100)
+    assert db.session.get(LLMRateLimit, "gpt-4o") is None
+
+
+def test_retry_after_blocks_model_until_deadline(app):
+    app.config.update(LLM_RATE_LIMIT_TPM=60000, LLM_RATE_LIMIT_MAX_WAIT_SECONDS=1)
+    limiter = get_rate_limiter()
+
+    limiter.penalize("gpt-4o-mini", 30)
+
+    with pytest.raises(RateLimitWaitExceeded) as excinfo:
+        limiter.acquire("gpt-4o-mini", 10)
+    assert excinfo.value.wait_seconds > 29
+
+
+def test_transport_errors_are_retried_by_one_layer_only(app):
+    app.config.update(LLM_RETRY_MAX_ATTEMPTS=2, LLM_RETRY_BASE_DELAY_MS=0)
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        raise openai.APITimeoutError(request=httpx.Request("POST", "http://openai.test"))
+
+    app.extensions["openai_client"] = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+    )
+
+    assert OpenAIClient().chat_completion("Système", "Bonjour", use_cache=False) is None
+    # Les tentatives du backoff seulement, pas max_retries × LLM_RETRY_MAX_ATTEMPTS
+    assert len(calls) == 2
+
+
+def test_version_conflicts_back_off_then_refuse(app, monkeypatch):
+    app.config.update(LLM_RATE_LIMIT_RPM=60)
+    sleeps = []
+    monkeypatch.setattr(rate_limiter_module.time, "sleep", sleeps.append)
+    limiter = get_rate_limiter()
+    # Un autre worker gagne toujours la réservation
+    monkeypatch.setattr(limiter, "_try_acquire", lambda *args: None)
+
+    with pytest.raises(RateLimitWaitExceeded):
+        limiter.acquire("gpt-4o-mini", 10)
+    assert len(sleeps) == rate_limiter_module._MAX_CONFLICTS - 1
+    assert all(0 <= pause <= rate_limiter_module._MAX_CONFLICT_PAUSE for pause in sleeps)
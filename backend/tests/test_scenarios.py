@@ -21,3 +21,85 @@ def test_get_scenario_detail(client, scenario):
     data = response.get_json()
     assert data["id"] == scenario.id
     assert data["nom"] == scenario.nom
+
+
+def test_tree_loader_matches_detail_schema(app, scenario):
+    from sqlalchemy import event
+
+    from app.extensions import db
+    from app.models import Article, Cible, Configuration, Objectif, Plan, PlanItem
+    from app.schemas.scenario import ScenarioDetailSchema
+    from app.services.scenario_loader import ScenarioTreeLoader
+
+    for index in range(2):
+        configuration = Configuration(scenario_id=scenario.id, nom=f"Config {index}")
+        configuration.objectifs.append(Objectif(label=f"Objectif {index}"))
+        configuration.cibles.append(Cible(label=f"Cible {index}", segment="PME"))
+        plan = Plan(resume="Plan")
+        plan.items.append(PlanItem(format="article", message="Publier", canal="Blog"))
+        plan.articles.append(Article(nom="Article", resume="Résumé"))
+        configuration.plans.append(plan)
+        db.session.add(configuration)
+    db.session.commit()
+    scenario_id = scenario.id
+    db.session.expire_all()
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(db.engine, "before_cursor_execute", listener)
+    try:
+        tree = ScenarioTreeLoader.load_scenario(scenario_id)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", listener)
+
+    assert len(statements) == 7
+    expected = ScenarioDetailSchema().dump(db.session.get(type(scenario), scenario_id))
+    assert tree == expected
+
+
+def test_batch_create_inserts_nested_payload_in_one_transaction(client, app):
+    from app.extensions import db
+    from app.models import Objectif
+
+    db.session.add(Objectif(label="Notoriété"))
+    db.session.commit()
+
+    payload = {
+        "scenarios": [
+            {
+                "nom": f"Import {index}",
+                "thematique": "SEO",
+                "configurations": [
+                    {
+                        "nom": "Principale",
+                        "objectifs": [{"label": "Notoriété"}, {"label": "Leads"}],
+                        "cibles": [{"label": "PME", "segment": "B2B"}],
+                    }
+                ],
+            }
+            for index in range(3)
+        ]
+    }
+    response = client.post("/api/scenarios/batch-create", json=payload)
+
+    assert response.status_code == 201
+    data = response.get_json()
+    assert data["count"] == 3
+    assert [scenario["id"] for scenario in data["scenarios"]] == data["ids"]
+    assert [scenario["nom"] for scenario in data["scenarios"]] == ["Import 0", "Import 1", "Import 2"]
+    configuration = data["scenarios"][2]["configurations"][0]
+    assert [objectif["label"] for objectif in configuration["objectifs"]] == ["Notoriété", "Leads"]
+    assert configuration["cibles"][0]["segment"] == "B2B"
+    assert db.session.scalar(db.select(db.func.count()).select_from(Objectif)) == 2
+
+
+def test_batch_create_rejects_whole_batch_on_invalid_item(client, app):
+    from app.extensions import db
+    from app.models import Scenario
+
+    payload = {"scenarios": [{"nom": "Valide", "thematique": "SEO"}, {"nom": "Sans thématique"}]}
+    response = client.post("/api/scenarios/batch-create", json=payload)
+
+    assert response.status_code == 400
+    assert "1" in response.get_json()["details"]
+    assert db.session.scalar(db.select(db.func.count()).select_from(Scenario)) == 0
@@ -0,0 +1,113 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.extensions import db
+from app.models import AIFlight
+from app.services import single_flight as single_flight_module
+from app.services.single_flight import flight_key, get_single_flight_registry, single_flight
+
+
+def test_concurrent_identical_calls_share_one_execution(app, client):
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+    results = {}
+
+    def generate():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {"plan_id": 1}
+
+    def call(name):
+        with app.app_context():
+            results[name] = single_flight("generate_plan", 7, ["prompt"], generate)
+
+    leader = threading.Thread(target=call, args=("leader",))
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=call, args=("follower",))
+    follower.start()
+    time.sleep(0.1)
+    release.set()
+    leader.join(5)
+    follower.join(5)
+
+    assert len(calls) == 1
+    assert results == {"leader": {"plan_id": 1}, "follower": {"plan_id": 1}}
+    text = client.get("/metrics").get_data(as_text=True)
+    assert 'ai_single_flight_requests_total{call_site="generate_plan",role="executed"} 1' in text
+    assert 'ai_single_flight_requests_total{call_site="generate_plan",role="coalesced_process"} 1' in text
+
+    # Appel arrivé après la fin : nouvelle exécution
+    assert single_flight("generate_plan", 7, ["prompt"], generate) == {"plan_id": 1}
+    assert len(calls) == 2
+    assert not get_single_flight_registry()._flights
+
+
+def test_call_in_progress_on_another_worker_is_awaited(app, client, monkeypatch):
+    key = flight_key("suggest_cibles", 3, ["prompt"])
+    now = datetime.now(timezone.utc)
+    db.session.add(
+        AIFlight(
+            flight_key=key,
+            call_site="suggest_cibles",
+            owner="other-worker",
+            status="running",
+            started_at=now,
+            expires_at=now + timedelta(minutes=2),
+        )
+    )
+    db.session.commit()
+
+    def other_worker_finishes(seconds):
+        db.session.execute(
+            db.update(AIFlight).values(
+                status="done",
+                result='[{"label": "DSI"}]',
+                finished_at=datetime.now(timezone.utc),
+            )
+        )
+        db.session.commit()
+
+    monkeypatch.setattr(single_flight_module.time, "sleep", other_worker_finishes)
+
+    def generate():
+        raise AssertionError("exécution en double")
+
+    assert single_flight("suggest_cibles", 3, ["prompt"], generate) == [{"label": "DSI"}]
+    text = client.get("/metrics").get_data(as_text=True)
+    assert 'ai_single_flight_requests_total{call_site="suggest_cibles",role="coalesced_database"} 1' in text
+
+
+def test_failed_execution_releases_the_key(app):
+    def fail():
+        raise RuntimeError("LLM indisponible")
+
+    with pytest.raises(RuntimeError):
+        single_flight("suggest_objectifs", 1, ["prompt"], fail)
+    assert db.session.scalar(db.select(db.func.count()).select_from(AIFlight)) == 0
+    assert single_flight("suggest_objectifs", 1, ["prompt"], lambda: ["ok"]) == ["ok"]
+
+
+def test_lease_is_renewed_while_the_leader_runs(app):
+    app.config.update(SINGLE_FLIGHT_LEASE_SECONDS=0.3)
+    key = flight_key("generate_plan", 9, ["prompt"])
+    states = []
+
+    def generate():
+        # Exécution plus longue que le bail : un autre worker ne reprend pas la clé
+        time.sleep(0.6)
+        states.append(
+            single_flight_module._acquire(
+                key, "generate_plan", "other-worker", datetime.now(timezone.utc)
+            )[0]
+        )
+        return {"plan_id": 9}
+
+    assert single_flight("generate_plan", 9, ["prompt"], generate) == {"plan_id": 9}
+    assert states == ["running"]
+    assert db.session.get(AIFlight, key).status == "done"
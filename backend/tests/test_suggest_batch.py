@@ -0,0 +1,58 @@
+import json
+import time
+
+from app.extensions import db
+from app.models import Configuration
+from app.services.cible_service import CibleService
+from app.services.objectif_service import ObjectifService
+
+
+def test_suggest_batch_streams_results_concurrently(client, scenario, monkeypatch):
+    configurations = [Configuration(scenario_id=scenario.id, nom=f"C{i}") for i in range(3)]
+    db.session.add_all(configurations)
+    db.session.commit()
+    ids = [configuration.id for configuration in configurations]
+
+    def slow_objectifs(scenario_id):
+        time.sleep(0.2)
+        return [{"label": "Notoriété"}]
+
+    def slow_cibles(scenario_id, configuration_id=None):
+        time.sleep(0.2)
+        return [{"label": f"CMO {configuration_id}"}]
+
+    monkeypatch.setattr(ObjectifService, "suggest_objectifs_for_scenario", slow_objectifs)
+    monkeypatch.setattr(CibleService, "suggest_cibles_for_scenario", slow_cibles)
+
+    started = time.monotonic()
+    response = client.post(
+        "/api/configurations/suggest-batch",
+        json={"configuration_ids": ids + [999999]},
+    )
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    elapsed = time.monotonic() - started
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    assert len(lines) == 8
+    assert lines[0] == {
+        "configuration_id": 999999,
+        "kind": "objectifs",
+        "status": "error",
+        "error": "Configuration not found",
+    }
+    ok = [line for line in lines if line["status"] == "ok"]
+    assert {(line["configuration_id"], line["kind"]) for line in ok} == {
+        (configuration_id, kind) for configuration_id in ids for kind in ("objectifs", "cibles")
+    }
+    assert elapsed < 6 * 0.2
+
+
+def test_suggest_batch_rejects_invalid_payload(client):
+    response = client.post("/api/configurations/suggest-batch", json={"configuration_ids": []})
+    assert response.status_code == 400
+    response = client.post(
+        "/api/configurations/suggest-batch",
+        json={"configuration_ids": [1], "kinds": ["ressources"]},
+    )
+    assert response.status_code == 400
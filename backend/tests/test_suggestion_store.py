@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta, timezone
+
+from app.extensions import db
+from app.models import StoredSuggestions
+from benchmarks.fake_llm import FakeOpenAI
+
+
+def _labels(response, kind):
+    return [item["label"] for item in response.get_json()[kind]]
+
+
+def test_suggestions_are_prefetched_and_served_stale_while_refreshing(app, client, scenario):
+    app.config["SUGGESTION_PREFETCH_ENABLED"] = True
+    fake = app.extensions["openai_client"] = FakeOpenAI()
+
+    created = client.post(f"/api/scenarios/{scenario.id}/configurations", json={"nom": "A"})
+    configuration_id = created.get_json()["id"]
+    # Objectifs et cibles pré-générés à la création
+    assert fake.calls == 2
+
+    url = f"/api/configurations/{configuration_id}/suggest-objectifs"
+    first = client.post(url)
+    assert first.headers["X-Suggestions-Status"] == "hit"
+    assert fake.calls == 2
+
+    db.session.execute(
+        db.update(StoredSuggestions).values(
+            generated_at=datetime.now(timezone.utc) - timedelta(hours=2)
+        )
+    )
+    db.session.commit()
+
+    stale = client.post(url)
+    assert stale.headers["X-Suggestions-Status"] == "stale"
+    assert int(stale.headers["Age"]) >= 7200
+    assert _labels(stale, "objectifs") == _labels(first, "objectifs")
+    # Régénération planifiée (exécutée immédiatement en test)
+    assert fake.calls == 3
+
+    refreshed = client.post(url)
+    assert refreshed.headers["X-Suggestions-Status"] == "hit"
+    assert _labels(refreshed, "objectifs") != _labels(first, "objectifs")
+
+    bypass = client.post(f"{url}?fresh=true")
+    assert bypass.headers["X-Suggestions-Status"] == "bypass"
+    assert fake.calls == 4
+
+
+def test_objectif_change_prefetches_cibles_for_new_selection(app, client, scenario):
+    fake = app.extensions["openai_client"] = FakeOpenAI()
+    created = client.post(f"/api/scenarios/{scenario.id}/configurations", json={"nom": "A"})
+    configuration_id = created.get_json()["id"]
+
+    url = f"/api/configurations/{configuration_id}/suggest-cibles"
+    assert client.post(url).headers["X-Suggestions-Status"] == "miss"
+    assert fake.calls == 1
+
+    app.config["SUGGESTION_PREFETCH_ENABLED"] = True
+    client.post(f"/api/configurations/{configuration_id}/objectifs", json={"label": "Notoriété"})
+    assert fake.calls == 2
+
+    response = client.post(url)
+    assert response.headers["X-Suggestions-Status"] == "hit"
+    assert fake.calls == 2
+    assert db.session.scalar(db.select(db.func.count()).select_from(StoredSuggestions)) == 2
@@ -31,7 +31,9 @@ CREATE TABLE IF NOT EXISTS scenarios (
     statut VARCHAR(20) DEFAULT 'draft' NOT NULL,
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    version INT NOT NULL DEFAULT 0,
     INDEX idx_thematique (thematique),
+    INDEX ix_scenarios_updated_id (updated_at, id),
     FOREIGN KEY (statut) REFERENCES scenario_status(code)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
@@ -42,6 +44,7 @@ CREATE TABLE IF NOT EXISTS configurations (
     nom VARCHAR(150) NOT NULL,
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    version INT NOT NULL DEFAULT 0,
     FOREIGN KEY (scenario_id) REFERENCES scenarios(id) ON DELETE CASCADE,
     INDEX idx_scenario (scenario_id)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
@@ -52,7 +55,8 @@ CREATE TABLE IF NOT EXISTS objectifs (
     label VARCHAR(120) NOT NULL UNIQUE,
     description TEXT,
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    version INT NOT NULL DEFAULT 0
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 -- Table cibles
@@ -62,7 +66,8 @@ CREATE TABLE IF NOT EXISTS cibles (
     persona TEXT,
     segment VARCHAR(120),
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    version INT NOT NULL DEFAULT 0
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 -- Table plans
@@ -73,6 +78,7 @@ CREATE TABLE IF NOT EXISTS plans (
     generated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    version INT NOT NULL DEFAULT 0,
     FOREIGN KEY (configuration_id) REFERENCES configurations(id) ON DELETE CASCADE,
     INDEX idx_configuration (configuration_id)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
@@ -88,6 +94,7 @@ CREATE TABLE IF NOT EXISTS plan_items (
     kpi VARCHAR(80),
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    version INT NOT NULL DEFAULT 0,
     FOREIGN KEY (plan_id) REFERENCES plans(id) ON DELETE CASCADE,
     INDEX idx_plan (plan_id)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
@@ -100,6 +107,7 @@ CREATE TABLE IF NOT EXISTS articles (
     resume VARCHAR(255),
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    version INT NOT NULL DEFAULT 0,
     FOREIGN KEY (plan_id) REFERENCES plans(id) ON DELETE CASCADE,
     INDEX idx_plan (plan_id)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
@@ -113,12 +121,14 @@ CREATE TABLE IF NOT EXISTS messages (
     contenu TEXT NOT NULL,
     role_action VARCHAR(60),
     ttl DATETIME,
+    token_count INT,
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     FOREIGN KEY (scenario_id) REFERENCES scenarios(id) ON DELETE CASCADE,
     FOREIGN KEY (configuration_id) REFERENCES configurations(id) ON DELETE CASCADE,
     INDEX idx_scenario_created (scenario_id, created_at),
-    INDEX idx_configuration (configuration_id)
+    INDEX idx_configuration (configuration_id),
+    INDEX ix_messages_ttl (ttl)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 -- Table recherches
@@ -151,6 +161,65 @@ CREATE TABLE IF NOT EXISTS configuration_cibles (
     FOREIGN KEY (cible_id) REFERENCES cibles(id) ON DELETE CASCADE
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
+-- Cache des réponses OpenAI (niveau persistant partagé entre workers)
+CREATE TABLE IF NOT EXISTS ai_response_cache (
+    cache_key VARCHAR(64) PRIMARY KEY,
+    model VARCHAR(80) NOT NULL,
+    schema_name VARCHAR(80) NOT NULL,
+    payload MEDIUMTEXT NOT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    expires_at DATETIME NOT NULL,
+    INDEX idx_expires_at (expires_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Tâches asynchrones (génération de plans en arrière-plan)
+CREATE TABLE IF NOT EXISTS jobs (
+    id VARCHAR(36) PRIMARY KEY,
+    kind VARCHAR(60) NOT NULL,
+    status VARCHAR(20) DEFAULT 'pending' NOT NULL,
+    payload TEXT NOT NULL,
+    result MEDIUMTEXT,
+    error TEXT,
+    attempts SMALLINT DEFAULT 0 NOT NULL,
+    started_at DATETIME,
+    finished_at DATETIME,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX idx_status_created (status, created_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Suggestions IA pré-générées (objectifs / cibles), servies en stale-while-revalidate
+CREATE TABLE IF NOT EXISTS suggestion_store (
+    input_key VARCHAR(64) PRIMARY KEY,
+    kind VARCHAR(20) NOT NULL,
+    payload MEDIUMTEXT NOT NULL,
+    generated_at DATETIME NOT NULL,
+    refresh_started_at DATETIME,
+    INDEX idx_generated_at (generated_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Appels IA en cours (single-flight entre workers) et résultats récents
+CREATE TABLE IF NOT EXISTS ai_flights (
+    flight_key VARCHAR(64) PRIMARY KEY,
+    call_site VARCHAR(60) NOT NULL,
+    owner VARCHAR(64) NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    result MEDIUMTEXT,
+    started_at DATETIME NOT NULL,
+    finished_at DATETIME,
+    expires_at DATETIME NOT NULL,
+    INDEX idx_expires_at (expires_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+CREATE TABLE IF NOT EXISTS llm_rate_limits (
+    model VARCHAR(80) PRIMARY KEY,
+    requests DOUBLE NOT NULL,
+    tokens DOUBLE NOT NULL,
+    refilled_at DOUBLE NOT NULL,
+    blocked_until DOUBLE NOT NULL DEFAULT 0,
+    version INT NOT NULL DEFAULT 0
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
 -- ============================================
 -- INSERTION DES DONNÉES DE DÉMONSTRATION
 -- ============================================